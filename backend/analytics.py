@@ -0,0 +1,526 @@
+"""
+Analytics Engine
+================
+Columnar analytics for ``/api/analytics/*`` on an embedded DuckDB, kept
+entirely off the OLTP path: every query runs in a worker thread against
+DuckDB, never through the app's aiosqlite connections.
+
+Sources
+-------
+    oltp.orders, oltp.positions
+        The main SQLite DB.  Attached read-only through DuckDB's sqlite
+        extension when it is installed (queries see live data).  Requests
+        only LOAD it; install it at deploy time with
+        ``python -c "import duckdb; duckdb.sql('INSTALL sqlite')"`` or set
+        ANALYTICS_INSTALL_EXTENSIONS=1 to let the engine download it.  Without
+        the extension the two tables are copied into DuckDB as a columnar
+        snapshot (chunked ``fetchmany`` → Arrow batches, needs ``pyarrow``).
+        Once a snapshot is ANALYTICS_REFRESH_SECONDS old, and only if
+        ``PRAGMA data_version`` says another connection committed, it is
+        re-copied in a background thread while queries keep reading the
+        previous copy.
+    bt_orders, bt_positions
+        Backtest outputs written by backtest_store.py,
+        ``<BACKTEST_DIR>/<run_id>/{orders,positions}.parquet``, scanned in
+        place with ``read_parquet`` (the run id is the directory).
+
+Both are normalised into two views that every query reads:
+
+    trades   closed positions — source, instrument, strategy, pnl, opened_ns,
+             closed_ns, holding_s, holding_bucket (HOLDING_BINS label)
+    fills    orders with filled quantity — source, instrument, strategy, qty, price, ts_ns
+
+Fees are not recorded anywhere, so fee drag is an estimate: filled
+notional × ANALYTICS_FEE_BPS (overridable per request).
+
+``duckdb`` is an optional dependency; without it every endpoint answers 503.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import backtest_store
+from migrations import day_bounds_ns
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "30"))
+ANALYTICS_THREADS = int(os.getenv("ANALYTICS_THREADS", "0"))  # 0 = one per core
+ANALYTICS_MEMORY_LIMIT = os.getenv("ANALYTICS_MEMORY_LIMIT", "512MB")
+ANALYTICS_FEE_BPS = float(os.getenv("ANALYTICS_FEE_BPS", "10"))
+ANALYTICS_SQLITE_EXTENSION = os.getenv("ANALYTICS_SQLITE_EXTENSION", "1") != "0"
+# Let the engine download the extension itself (else install it at deploy time)
+ANALYTICS_INSTALL_EXTENSIONS = os.getenv("ANALYTICS_INSTALL_EXTENSIONS", "0") == "1"
+
+_SNAPSHOT_CHUNK = 50_000
+
+# Columns copied in snapshot mode, with their Arrow types
+_SNAPSHOT_TABLES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "orders": (
+        ("id", "string"), ("instrument", "string"), ("side", "string"),
+        ("quantity", "float64"), ("price", "float64"), ("status", "string"),
+        ("filled_qty", "float64"), ("pnl", "float64"), ("strategy_id", "string"),
+        ("ts_ns", "int64"),
+    ),
+    "positions": (
+        ("id", "string"), ("instrument", "string"), ("side", "string"),
+        ("quantity", "float64"), ("entry_price", "float64"), ("exit_price", "float64"),
+        ("pnl", "float64"), ("is_open", "int64"), ("strategy_id", "string"),
+        ("opened_ns", "int64"), ("closed_at", "string"),
+    ),
+}
+
+_LIVE_TRADES = """
+    SELECT 'live' AS source, id, instrument,
+           COALESCE(NULLIF(strategy_id, ''), 'manual') AS strategy, side,
+           CAST(quantity AS DOUBLE) AS quantity,
+           CAST(entry_price AS DOUBLE) AS entry_price,
+           CAST(exit_price AS DOUBLE) AS exit_price,
+           CAST(COALESCE(pnl, 0) AS DOUBLE) AS pnl,
+           CAST(opened_ns AS BIGINT) AS opened_ns,
+           {closed_ns} AS closed_ns
+    FROM oltp.positions WHERE is_open = 0
+"""
+_CLOSED_NS = "epoch_ns(TRY_CAST(closed_at AS TIMESTAMPTZ))"
+_BT_TRADES = """
+    SELECT 'backtest', id, instrument_id, run_id, side,
+           CAST(quantity AS DOUBLE), CAST(avg_px_open AS DOUBLE), CAST(avg_px_close AS DOUBLE),
+           CAST(COALESCE(realized_pnl, 0) AS DOUBLE), CAST(ts_opened AS BIGINT), CAST(ts_closed AS BIGINT)
+    FROM bt_positions WHERE is_closed
+"""
+_LIVE_FILLS = """
+    SELECT 'live' AS source, id, instrument,
+           COALESCE(NULLIF(strategy_id, ''), 'manual') AS strategy, side,
+           CAST(filled_qty AS DOUBLE) AS qty,
+           CAST(COALESCE(price, 0) AS DOUBLE) AS price,
+           CAST(ts_ns AS BIGINT) AS ts_ns
+    FROM oltp.orders WHERE filled_qty > 0
+"""
+_BT_FILLS = """
+    SELECT 'backtest', id, instrument_id, run_id, side,
+           CAST(filled_qty AS DOUBLE), CAST(COALESCE(avg_px, 0) AS DOUBLE), CAST(ts_init AS BIGINT)
+    FROM bt_orders WHERE filled_qty > 0
+"""
+
+
+def _day(ns_col: str) -> str:
+    return f"strftime(epoch_ms({ns_col} // 1000000), '%Y-%m-%d')"
+
+
+# Grouping keys per endpoint; values are SQL over the trades / fills views
+PNL_GROUPS = {
+    "day": _day("closed_ns"),
+    "instrument": "instrument",
+    "strategy": "strategy",
+    "source": "source",
+}
+WIN_RATE_GROUPS = {
+    "strategy": "strategy",
+    "instrument": "instrument",
+    "hour": "CAST(hour(epoch_ms(closed_ns // 1000000)) AS VARCHAR)",
+    "weekday": "dayname(epoch_ms(closed_ns // 1000000))",
+    "holding": "holding_bucket",
+}
+FILL_GROUPS = {"day": _day("ts_ns"), "instrument": "instrument", "strategy": "strategy", "source": "source"}
+FEE_GROUPS = {"day": "day", "instrument": "instrument", "strategy": "strategy", "source": "source"}
+
+# Holding-time histogram bins: (label, upper bound in seconds)
+HOLDING_BINS: Tuple[Tuple[str, float], ...] = (
+    ("<1m", 60), ("1-5m", 300), ("5-15m", 900), ("15m-1h", 3600),
+    ("1-4h", 4 * 3600), ("4-24h", 86_400), ("1-7d", 7 * 86_400), (">7d", float("inf")),
+)
+
+
+def _holding_bucket_sql() -> str:
+    cases = " ".join(
+        f"WHEN holding_s < {upper} THEN '{label}'"
+        for label, upper in HOLDING_BINS if upper != float("inf")
+    )
+    return f"CASE {cases} ELSE '{HOLDING_BINS[-1][0]}' END"
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """DuckDB (or, without the sqlite extension, pyarrow) is not installed."""
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise AnalyticsUnavailable("Analytics require the 'duckdb' package")
+    return duckdb
+
+
+class AnalyticsEngine:
+    """One in-process DuckDB database; thread-safe, queried via cursors."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._con = None
+        self._db_path: Optional[Path] = None
+        self.mode: Optional[str] = None  # "attach" | "snapshot"
+        self._src: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._refresh_ms = 0.0
+        self._has_backtests: Optional[tuple] = None
+        self.queries = 0
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        with self._refresh_lock:  # let a background copy finish first
+            self._close_locked()
+
+    def _close_locked(self) -> None:
+        if self._src is not None:
+            self._src.close()
+            self._src = None
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+        self.mode = None
+        self._data_version = None
+        self._has_backtests = None
+
+    def _open(self, db_path: Path) -> None:
+        duckdb = _duckdb()
+        con = duckdb.connect(":memory:")
+        con.execute("SET TimeZone = 'UTC'")
+        con.execute(f"SET memory_limit = '{ANALYTICS_MEMORY_LIMIT}'")
+        if ANALYTICS_THREADS > 0:
+            con.execute(f"SET threads = {ANALYTICS_THREADS}")
+        self._con, self._db_path = con, db_path
+        if ANALYTICS_SQLITE_EXTENSION and self._try_attach(db_path):
+            self.mode = "attach"
+        else:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                self._close_locked()
+                raise AnalyticsUnavailable(
+                    "Analytics need DuckDB's sqlite extension or the 'pyarrow' package"
+                )
+            con.execute("CREATE SCHEMA oltp")
+            self.mode = "snapshot"
+        logger.info("Analytics engine ready (%s mode) over %s", self.mode, db_path)
+
+    def _try_attach(self, db_path: Path) -> bool:
+        # Only LOAD here: INSTALL (and DuckDB's autoinstall on LOAD) downloads
+        # the extension, which a request thread must not do unless opted in
+        try:
+            if ANALYTICS_INSTALL_EXTENSIONS:
+                self._con.execute("INSTALL sqlite")
+            else:
+                self._con.execute("SET autoinstall_known_extensions = false")
+            self._con.execute("LOAD sqlite")
+        except Exception as exc:
+            logger.info("DuckDB sqlite extension unavailable (%s); using snapshots", exc)
+            return False
+        path = str(db_path).replace("'", "''")
+        self._con.execute(f"ATTACH '{path}' AS oltp (TYPE sqlite, READ_ONLY)")
+        return True
+
+    # ── Refresh ───────────────────────────────────────────────────────────────
+
+    def _ensure(self, db_path: Path, backtest_dir: Path, force: bool = False) -> None:
+        with self._lock:
+            if self._con is None or self._db_path != db_path:
+                self._close()
+                self._open(db_path)
+            if self.mode == "snapshot":
+                if force or self._data_version is None:
+                    # First load (or explicit refresh): the caller waits for it
+                    with self._refresh_lock:
+                        self._refresh_snapshot()
+                elif not self._refreshing \
+                        and time.monotonic() - self._refreshed_at >= ANALYTICS_REFRESH_SECONDS:
+                    # Stale: re-copy in the background, keep serving the current copy
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._background_refresh, name="analytics-refresh", daemon=True
+                    ).start()
+            self._refresh_views(backtest_dir)
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._refresh_lock:
+                if self._con is not None:
+                    self._refresh_snapshot()
+        except Exception:
+            logger.exception("Analytics snapshot refresh failed")
+        finally:
+            self._refreshing = False
+
+    def _refresh_snapshot(self) -> None:
+        """Copy orders / positions into DuckDB if another connection committed since."""
+        if self._src is None:
+            if not self._db_path.exists():
+                raise FileNotFoundError(f"Database not found: {self._db_path}")
+            self._src = sqlite3.connect(
+                f"file:{self._db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        version = self._src.execute("PRAGMA data_version").fetchone()[0]
+        self._refreshed_at = time.monotonic()
+        if version == self._data_version:
+            return
+        started = time.perf_counter()
+        # Own cursor + one transaction on each side: both tables come from the
+        # same WAL snapshot and replace the old copies atomically for readers
+        con = self._con.cursor()
+        try:
+            con.begin()
+            self._src.execute("BEGIN")
+            try:
+                for table, columns in _SNAPSHOT_TABLES.items():
+                    self._copy_table(con, table, columns)
+            finally:
+                self._src.execute("COMMIT")
+            con.commit()
+        finally:
+            con.close()
+        self._data_version = version
+        self._refresh_ms = (time.perf_counter() - started) * 1000
+
+    def _copy_table(self, con, table: str, columns: Sequence[Tuple[str, str]]) -> None:
+        import pyarrow as pa
+
+        schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in columns])
+        cur = self._src.execute(f"SELECT {', '.join(n for n, _ in columns)} FROM {table}")
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            while True:
+                rows = cur.fetchmany(_SNAPSHOT_CHUNK)
+                if not rows:
+                    return
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(col, type=f.type) for col, f in zip(zip(*rows), schema)],
+                    schema=schema,
+                )
+
+        # Timestamps are parsed once here instead of in every query
+        extra = f", {_CLOSED_NS} AS closed_ns" if table == "positions" else ""
+        con.register("_snapshot_src", pa.RecordBatchReader.from_batches(schema, batches()))
+        try:
+            con.execute(f"CREATE OR REPLACE TABLE oltp.{table} AS SELECT *{extra} FROM _snapshot_src")
+        finally:
+            con.unregister("_snapshot_src")
+
+    def _refresh_views(self, backtest_dir: Path) -> None:
+        has_bt = {
+            kind: any(backtest_dir.glob(f"*/{kind}.parquet")) for kind in ("orders", "positions")
+        } if backtest_dir.is_dir() else {"orders": False, "positions": False}
+        key = (backtest_dir, tuple(sorted(has_bt.items())))
+        if key == self._has_backtests:
+            return
+        con = self._con
+        for kind, present in has_bt.items():
+            if present:
+                pattern = str(backtest_dir / "*" / f"{kind}.parquet").replace("'", "''")
+                con.execute(f"""
+                    CREATE OR REPLACE VIEW bt_{kind} AS
+                    SELECT *, regexp_extract(filename, '([^/\\\\]+)[/\\\\]{kind}\\.parquet$', 1) AS run_id
+                    FROM read_parquet('{pattern}', filename = true, union_by_name = true)
+                """)
+        live = _LIVE_TRADES.format(closed_ns="closed_ns" if self.mode == "snapshot" else _CLOSED_NS)
+        trades = live + (f" UNION ALL {_BT_TRADES}" if has_bt["positions"] else "")
+        fills = _LIVE_FILLS + (f" UNION ALL {_BT_FILLS}" if has_bt["orders"] else "")
+        con.execute(f"""
+            CREATE OR REPLACE VIEW trades AS
+            SELECT *, {_holding_bucket_sql()} AS holding_bucket
+            FROM (SELECT *, (closed_ns - opened_ns) / 1e9 AS holding_s FROM ({trades}))
+        """)
+        con.execute(f"CREATE OR REPLACE VIEW fills AS {fills}")
+        self._has_backtests = key
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def query(self, db_path: Path, sql: str, params: Sequence[Any] = (),
+              backtest_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
+        """Run ``sql`` (over the trades / fills views) and return dict rows."""
+        self._ensure(Path(db_path), Path(backtest_dir or backtest_store.store.root))
+        cur = self._con.cursor()
+        try:
+            cur.execute(sql, list(params))
+            names = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        self.queries += 1
+        return [dict(zip(names, r)) for r in rows]
+
+    def refresh(self, db_path: Path, backtest_dir: Optional[Path] = None) -> Dict[str, Any]:
+        self._ensure(Path(db_path), Path(backtest_dir or backtest_store.store.root), force=True)
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        bt = dict(self._has_backtests[1]) if self._has_backtests else {}
+        return {
+            "mode": self.mode,
+            "db_path": str(self._db_path) if self._db_path else None,
+            "snapshot_age_s": round(time.monotonic() - self._refreshed_at, 1)
+            if self.mode == "snapshot" and self._data_version is not None else None,
+            "last_refresh_ms": round(self._refresh_ms, 1) if self.mode == "snapshot" else None,
+            "backtest_sources": sorted(k for k, v in bt.items() if v),
+            "queries": self.queries,
+        }
+
+
+engine = AnalyticsEngine()
+
+
+# ── Query builders ────────────────────────────────────────────────────────────
+
+def _window(ts_col: str, source: str, start: Optional[str], end: Optional[str]) -> Tuple[str, List[Any]]:
+    """WHERE clause for a source filter and an inclusive UTC day range."""
+    clauses, params = [f"{ts_col} IS NOT NULL"], []
+    if source != "all":
+        clauses.append("source = ?")
+        params.append(source)
+    if start:
+        clauses.append(f"{ts_col} >= ?")
+        params.append(day_bounds_ns(start)[0])
+    if end:
+        clauses.append(f"{ts_col} < ?")
+        params.append(day_bounds_ns(end)[1])
+    return " AND ".join(clauses), params
+
+
+def _group(groups: Dict[str, str], by: str) -> str:
+    if by not in groups:
+        raise ValueError(f"Unknown grouping '{by}' (one of: {', '.join(groups)})")
+    return groups[by]
+
+
+def pnl_by(db_path: Path, by: str = "day", source: str = "all", start: Optional[str] = None,
+           end: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+    """Realised PnL of closed trades per day / instrument / strategy / source."""
+    key = _group(PNL_GROUPS, by)
+    where, params = _window("closed_ns", source, start, end)
+    order = "key" if by == "day" else "pnl DESC"
+    cumulative = ", round(sum(pnl) OVER (ORDER BY key), 8) AS cumulative_pnl" if by == "day" else ""
+    sql = f"""
+        SELECT *{cumulative} FROM (
+            SELECT {key} AS key,
+                   count(*) AS trades,
+                   count(*) FILTER (WHERE pnl > 0) AS wins,
+                   count(*) FILTER (WHERE pnl < 0) AS losses,
+                   round(sum(pnl), 8) AS pnl,
+                   round(avg(pnl), 8) AS avg_pnl,
+                   round(max(pnl), 8) AS best,
+                   round(min(pnl), 8) AS worst
+            FROM trades WHERE {where}
+            GROUP BY 1
+        ) ORDER BY {order} LIMIT ?
+    """
+    return engine.query(db_path, sql, params + [limit])
+
+
+def win_rate_by(db_path: Path, by: str = "strategy", source: str = "all",
+                start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Win rate, average win / loss, profit factor and expectancy per bucket."""
+    key = _group(WIN_RATE_GROUPS, by)
+    where, params = _window("closed_ns", source, start, end)
+    order = {
+        "hour": "CAST(key AS INTEGER)",
+        "weekday": "isodow(min(epoch_ms(closed_ns // 1000000)))",
+        "holding": "min(holding_s)",
+    }.get(by, "trades DESC")
+    sql = f"""
+        SELECT {key} AS key,
+               count(*) AS trades,
+               round(100.0 * count(*) FILTER (WHERE pnl > 0) / count(*), 2) AS win_rate,
+               round(avg(pnl) FILTER (WHERE pnl > 0), 8) AS avg_win,
+               round(avg(pnl) FILTER (WHERE pnl < 0), 8) AS avg_loss,
+               round(sum(pnl) FILTER (WHERE pnl > 0)
+                     / NULLIF(-sum(pnl) FILTER (WHERE pnl < 0), 0), 4) AS profit_factor,
+               round(avg(pnl), 8) AS expectancy
+        FROM trades WHERE {where}
+        GROUP BY 1 ORDER BY {order}
+    """
+    return engine.query(db_path, sql, params)
+
+
+def holding_times(db_path: Path, by: Optional[str] = None, source: str = "all",
+                  start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Holding-time distribution of closed trades (seconds): quantiles plus a
+    fixed-bin histogram, overall or per strategy / instrument.
+    """
+    key = _group({"strategy": "strategy", "instrument": "instrument"}, by) if by else "'all'"
+    where, params = _window("closed_ns", source, start, end)
+    labels = [label for label, _ in HOLDING_BINS]
+    hist = ", ".join(
+        f"count(*) FILTER (WHERE holding_bucket = '{label}') AS \"{label}\"" for label in labels
+    )
+    sql = f"""
+        SELECT {key} AS key,
+               count(*) AS trades,
+               round(avg(holding_s), 3) AS mean_s,
+               quantile_cont(holding_s, [0.1, 0.25, 0.5, 0.75, 0.9]) AS q,
+               round(max(holding_s), 3) AS max_s,
+               {hist}
+        FROM trades WHERE {where} AND holding_s >= 0
+        GROUP BY 1 ORDER BY trades DESC
+    """
+    out = []
+    for row in engine.query(db_path, sql, params):
+        q = row.pop("q") or [None] * 5
+        out.append({
+            "key": row.pop("key"),
+            "trades": row.pop("trades"),
+            "mean_s": row.pop("mean_s"),
+            "max_s": row.pop("max_s"),
+            "quantiles_s": {
+                p: (round(v, 3) if v is not None else None)
+                for p, v in zip(("p10", "p25", "p50", "p75", "p90"), q)
+            },
+            "histogram": [{"bucket": label, "trades": row[label]} for label in labels],
+        })
+    return out
+
+
+def fee_drag(db_path: Path, by: str = "strategy", source: str = "all", start: Optional[str] = None,
+             end: Optional[str] = None, fee_bps: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Estimated fees (filled notional × ``fee_bps``) against gross realised PnL,
+    joined per day / instrument / strategy / source.
+    """
+    _group(FEE_GROUPS, by)
+    bps = ANALYTICS_FEE_BPS if fee_bps is None else fee_bps
+    t_where, t_params = _window("closed_ns", source, start, end)
+    f_where, f_params = _window("ts_ns", source, start, end)
+    sql = f"""
+        WITH t AS (
+            SELECT {PNL_GROUPS[by]} AS key, count(*) AS trades, sum(pnl) AS gross_pnl
+            FROM trades WHERE {t_where} GROUP BY 1
+        ), f AS (
+            SELECT {FILL_GROUPS[by]} AS key, count(*) AS fills, sum(abs(qty) * price) AS notional
+            FROM fills WHERE {f_where} GROUP BY 1
+        )
+        SELECT key,
+               COALESCE(t.trades, 0) AS trades,
+               COALESCE(f.fills, 0) AS fills,
+               round(COALESCE(f.notional, 0), 8) AS notional,
+               round(COALESCE(t.gross_pnl, 0), 8) AS gross_pnl,
+               round(COALESCE(f.notional, 0) * ? / 10000, 8) AS est_fees,
+               round(COALESCE(t.gross_pnl, 0) - COALESCE(f.notional, 0) * ? / 10000, 8) AS net_pnl,
+               round(100 * COALESCE(f.notional, 0) * ? / 10000 / NULLIF(abs(t.gross_pnl), 0), 2) AS drag_pct
+        FROM t FULL OUTER JOIN f USING (key)
+        ORDER BY {"key" if by == "day" else "est_fees DESC"}
+    """
+    rows = engine.query(db_path, sql, [*t_params, *f_params, bps, bps, bps])
+    for row in rows:
+        row["fee_bps"] = bps
+    return rows
@@ -0,0 +1,324 @@
+"""
+Audit Log Archive
+=================
+Rolls ``audit_logs`` rows older than AUDIT_HOT_DAYS out of SQLite into
+compressed, day-partitioned JSONL files, and answers time-range queries
+across both tiers.
+
+Layout (one file per UTC day, rows sorted by (timestamp, id))::
+
+    AUDIT_ARCHIVE_DIR/
+        manifest.json                     day → rows, min/max ts, sha256, file
+        2025/03/audit-2025-03-14.jsonl.zst
+        2025/03/audit-2025-03-15.jsonl.zst
+
+Files are zstd-compressed when the optional ``zstandard`` package is
+installed, gzip otherwise (AUDIT_ARCHIVE_CODEC forces one).  Both codecs
+are readable regardless of which one wrote the partition.
+
+Archival only moves whole days, writes and fsyncs each partition before
+deleting its rows from the hot table, and merges by id when a partition
+already exists — so an interrupted run is simply repeated.
+
+Queries go hot table first; partitions are only opened when the page
+reaches back past the newest archived timestamp.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AUDIT_HOT_DAYS = int(os.getenv("AUDIT_HOT_DAYS", "90"))
+AUDIT_ARCHIVE_DIR = Path(
+    os.getenv("AUDIT_ARCHIVE_DIR", str(Path(__file__).parent / "data" / "audit_archive"))
+)
+AUDIT_ARCHIVE_CODEC = os.getenv("AUDIT_ARCHIVE_CODEC", "auto").lower()
+
+_EXTENSIONS = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+
+# ── Codecs ────────────────────────────────────────────────────────────────────
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def codec() -> str:
+    """The codec new partitions are written with."""
+    if AUDIT_ARCHIVE_CODEC == "gzip":
+        return "gzip"
+    if AUDIT_ARCHIVE_CODEC == "zstd" or _zstd() is not None:
+        if _zstd() is None:
+            raise RuntimeError("AUDIT_ARCHIVE_CODEC=zstd requires the 'zstandard' package")
+        return "zstd"
+    return "gzip"
+
+
+def _compress(data: bytes, name: str) -> bytes:
+    if name == "zstd":
+        return _zstd().ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _decompress(data: bytes, name: str) -> bytes:
+    if name == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Reading .zst audit partitions requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+# ── Partitions ────────────────────────────────────────────────────────────────
+
+class AuditArchive:
+    """Day-partitioned audit archive rooted at ``root``."""
+
+    def __init__(self, root: Path = AUDIT_ARCHIVE_DIR) -> None:
+        self.root = Path(root)
+
+    # Manifest ------------------------------------------------------------------
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self._manifest_path.read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        self._atomic_write(self._manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+    def newest_timestamp(self) -> Optional[str]:
+        manifest = self.manifest()
+        return max((p["max_ts"] for p in manifest.values()), default=None)
+
+    # Files ---------------------------------------------------------------------
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def read_partition(self, day: str, entry: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """All rows of one day, oldest first."""
+        entry = entry or self.manifest().get(day)
+        if entry is None:
+            return []
+        raw = _decompress((self.root / entry["file"]).read_bytes(), entry["codec"])
+        return [json.loads(line) for line in raw.splitlines() if line]
+
+    def write_partition(self, day: str, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge ``rows`` into the day's partition (dedup by id) and fsync it."""
+        manifest = self.manifest()
+        merged = {r["id"]: r for r in self.read_partition(day, manifest.get(day))}
+        merged.update({r["id"]: r for r in rows})
+        ordered = sorted(merged.values(), key=lambda r: (r["timestamp"], r["id"]))
+
+        name = codec()
+        payload = b"".join(
+            json.dumps(r, separators=(",", ":"), sort_keys=True).encode() + b"\n" for r in ordered
+        )
+        blob = _compress(payload, name)
+        rel = f"{day[:4]}/{day[5:7]}/audit-{day}{_EXTENSIONS[name]}"
+        self._atomic_write(self.root / rel, blob)
+
+        old = manifest.get(day)
+        if old and old["file"] != rel:
+            (self.root / old["file"]).unlink(missing_ok=True)
+        manifest[day] = {
+            "file": rel,
+            "codec": name,
+            "rows": len(ordered),
+            "bytes": len(blob),
+            "raw_bytes": len(payload),
+            "min_ts": ordered[0]["timestamp"],
+            "max_ts": ordered[-1]["timestamp"],
+            "sha256": hashlib.sha256(blob).hexdigest(),
+        }
+        self._save_manifest(manifest)
+        return manifest[day]
+
+    def verify(self) -> Dict[str, bool]:
+        """Check every partition against its manifest checksum."""
+        out = {}
+        for day, entry in self.manifest().items():
+            path = self.root / entry["file"]
+            out[day] = path.exists() and hashlib.sha256(path.read_bytes()).hexdigest() == entry["sha256"]
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        manifest = self.manifest()
+        days = sorted(manifest)
+        return {
+            "root": str(self.root),
+            "codec": codec(),
+            "partitions": len(days),
+            "rows": sum(p["rows"] for p in manifest.values()),
+            "bytes": sum(p["bytes"] for p in manifest.values()),
+            "raw_bytes": sum(p["raw_bytes"] for p in manifest.values()),
+            "oldest_day": days[0] if days else None,
+            "newest_day": days[-1] if days else None,
+        }
+
+    # Query ---------------------------------------------------------------------
+
+    def scan(
+        self,
+        *,
+        limit: int,
+        user_id: Optional[str] = None,
+        action: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        before: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to ``limit`` archived rows newest-first, with the same filters as
+        the hot table.  ``before`` is a keyset (timestamp, id) upper bound.
+        Partitions outside [since, min(until, before)] are never opened.
+        """
+        upper = min(filter(None, [until, before[0] if before else None]), default=None)
+        out: List[Dict[str, Any]] = []
+        manifest = self.manifest()
+        for day in sorted(manifest, reverse=True):
+            if upper is not None and day > upper[:10]:
+                continue
+            if since is not None and day < since[:10]:
+                break
+            for row in reversed(self.read_partition(day, manifest[day])):
+                ts = row["timestamp"]
+                if until is not None and ts >= until:
+                    continue
+                if since is not None and ts < since:
+                    continue
+                if before is not None and (ts, row["id"]) >= before:
+                    continue
+                if user_id and row.get("user_id") != user_id:
+                    continue
+                if action and row.get("action") != action:
+                    continue
+                out.append(row)
+            if len(out) >= limit:
+                break
+        return out[:limit]
+
+
+archive = AuditArchive()
+
+
+# ── Archival job ──────────────────────────────────────────────────────────────
+
+def cutoff_for(hot_days: int, now: Optional[datetime] = None) -> str:
+    """Start of the oldest UTC day that stays hot, as an ISO timestamp."""
+    now = now or datetime.now(timezone.utc)
+    day = (now - timedelta(days=hot_days)).date()
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).isoformat()
+
+
+_archive_lock: Optional[asyncio.Lock] = None
+
+
+async def archive_audit_logs(hot_days: int = AUDIT_HOT_DAYS, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Move whole days older than ``hot_days`` from ``audit_logs`` into the
+    archive.  Returns a summary of the partitions written.
+    """
+    import aiosqlite
+
+    import database
+    from audit_log import audit_writer
+
+    global _archive_lock
+    if _archive_lock is None:
+        _archive_lock = asyncio.Lock()
+
+    cutoff = cutoff_for(hot_days, now)
+    written = []
+    async with _archive_lock:
+        await audit_writer.flush()
+        async with aiosqlite.connect(database.DB_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                "SELECT DISTINCT substr(timestamp, 1, 10) FROM audit_logs WHERE timestamp < ? ORDER BY 1",
+                (cutoff,),
+            ) as cur:
+                days = [r[0] for r in await cur.fetchall()]
+
+            # One day at a time keeps memory flat on the first run over a big table
+            for day in days:
+                next_day = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+                async with db.execute(
+                    "SELECT * FROM audit_logs WHERE timestamp >= ? AND timestamp < ?", (day, next_day)
+                ) as cur:
+                    rows = [dict(r) for r in await cur.fetchall()]
+                entry = await asyncio.to_thread(archive.write_partition, day, rows)
+                # Partition is durable — now the hot copies can go
+                await db.execute(
+                    "DELETE FROM audit_logs WHERE timestamp >= ? AND timestamp < ?", (day, next_day)
+                )
+                await db.commit()
+                written.append({"day": day, "rows": entry["rows"], "moved": len(rows), "bytes": entry["bytes"]})
+
+    archived = sum(p["moved"] for p in written)
+    if archived:
+        logger.info("Archived %d audit rows older than %s into %d partition(s)", archived, cutoff, len(written))
+    return {"cutoff": cutoff, "archived": archived, "partitions": written}
+
+
+async def query_audit_logs(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginated audit log across the hot table and the archive, newest
+    first.  Same cursor format as ``database.query_audit_logs``.
+    """
+    import database
+
+    limit = max(1, min(int(limit), database.MAX_PAGE_SIZE))
+    rows, next_cursor = await database.query_audit_logs(
+        limit=limit, cursor=cursor, user_id=user_id, action=action, since=since, until=until,
+    )
+
+    newest_archived = archive.newest_timestamp()
+    # The archive only holds rows older than its newest entry; skip it while
+    # the hot page is full and still newer than that.
+    if newest_archived is None or (next_cursor and rows[-1]["timestamp"] > newest_archived):
+        return rows, next_cursor
+
+    before = database.decode_cursor(cursor) if cursor else None
+    cold = await asyncio.to_thread(
+        archive.scan, limit=limit + 1, user_id=user_id, action=action,
+        since=since, until=until, before=before,
+    )
+    merged = sorted(rows + cold, key=lambda r: (r["timestamp"], r["id"]), reverse=True)
+    rows = merged[:limit]
+    next_cursor = None
+    if len(merged) > limit:
+        next_cursor = database.encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+    return rows, next_cursor
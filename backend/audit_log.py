@@ -0,0 +1,206 @@
+"""
+Audit Log Writer
+================
+Write-behind pipeline for ``audit_logs``.  ``database.log_action`` appends
+the entry to an in-memory buffer and returns; a background task flushes
+the buffer with one ``executemany`` transaction every
+AUDIT_FLUSH_INTERVAL_MS or as soon as AUDIT_BATCH_SIZE entries are waiting.
+
+    log_action ──► buffer ──(interval | batch size)──► executemany + COMMIT
+
+Durability: the lifespan calls ``stop()`` on shutdown, which drains the
+buffer before the process exits; audit reads flush first, so an entry is
+visible to the API as soon as ``log_action`` returns.  A crash can lose at
+most one flush interval of entries.
+
+Backpressure: if the buffer reaches AUDIT_QUEUE_MAX (e.g. the DB is locked
+for a long time), AUDIT_OVERFLOW decides what happens:
+
+    block  — (default) the caller waits until a flush makes room; entries
+             are never discarded, a failed flush keeps them all
+    drop   — the new entry is discarded and counted in ``dropped``; after
+             a failed flush the oldest entries beyond the cap are dropped
+
+On shutdown ``stop()`` retries the final flush up to AUDIT_STOP_RETRIES
+times before reporting what is left as lost.
+
+Without a running writer (scripts, tests calling ``database`` directly)
+entries are written inline, exactly as before.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "block").lower()
+AUDIT_STOP_RETRIES = 3
+
+
+class AuditWriter:
+    """Buffers audit entries and flushes them in batches from one task."""
+
+    def __init__(
+        self,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_MS / 1000,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        max_queue: int = AUDIT_QUEUE_MAX,
+        overflow: str = AUDIT_OVERFLOW,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self._buffer: List[Dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        """True when the writer task lives on the caller's event loop."""
+        return self._task is not None and not self._task.done() and self._owns_loop()
+
+    def _owns_loop(self) -> bool:
+        try:
+            return self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            # Another app instance (nested TestClient) owns the writer; this
+            # loop falls back to inline writes.
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and drain everything still buffered."""
+        if not self.running:
+            return
+        # No cancel: a flush in progress must not be interrupted mid-batch
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        for attempt in range(AUDIT_STOP_RETRIES):
+            if not self._buffer:
+                break
+            await asyncio.sleep(self.flush_interval * (attempt + 1))
+            await self.flush()
+        if self._buffer:
+            logger.error("Audit writer stopped with %d unwritten entries (lost)", len(self._buffer))
+        self._task = None
+        self._loop = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._buffer:
+                await self.flush()
+        await self.flush()
+
+    # ── Write path ─────────────────────────────────────────────────────────────
+
+    async def submit(self, entry: Dict) -> None:
+        """Queue one entry; inline insert when no writer runs on this loop."""
+        if not self.running:
+            import database
+            await database.insert_audit_entries([entry])
+            return
+
+        if len(self._buffer) >= self.max_queue:
+            if self.overflow == "drop":
+                self.dropped += 1
+                return
+            self.blocked += 1
+            # Wait for room: a failed flush keeps every entry, so retry
+            # after a pause (stop() takes over once shutdown begins)
+            await self.flush()
+            while len(self._buffer) >= self.max_queue and not self._stopping:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+
+        self._buffer.append(entry)
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows written."""
+        if not self._buffer or not self._owns_loop():
+            return 0
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            return await self._write(batch)
+
+    async def _write(self, batch: List[Dict]) -> int:
+        if not batch:
+            return 0
+        import database
+        start = time.perf_counter()
+        try:
+            await database.insert_audit_entries(batch)
+        except Exception as exc:
+            # Keep the entries (oldest first) for the next attempt
+            self.errors += 1
+            logger.warning("Audit flush failed (%d entries kept): %s", len(batch), exc)
+            self._buffer[:0] = batch
+            overflow = len(self._buffer) - self.max_queue
+            if overflow > 0 and self.overflow == "drop":
+                del self._buffer[:overflow]
+                self.dropped += overflow
+            return 0
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.written += len(batch)
+        self.batches += 1
+        return len(batch)
+
+    # ── Introspection ──────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": len(self._buffer),
+            "max_depth": self.max_depth,
+            "queue_max": self.max_queue,
+            "overflow": self.overflow,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+            "errors": self.errors,
+            "last_flush_ms": self.last_flush_ms,
+            "flush_interval_ms": round(self.flush_interval * 1000),
+            "batch_size": self.batch_size,
+        }
+
+
+audit_writer = AuditWriter()
@@ -2,6 +2,10 @@
 API Key authentication middleware for Nautilus Trader API.
 Set the API_KEY environment variable to enable authentication.
 If API_KEY is not set, authentication is disabled (development mode).
+
+The production app (nautilus_fastapi) enforces the key inside
+middleware.RequestPipeline using API_KEY/_is_public from this module;
+ApiKeyMiddleware remains for the standalone nautilus_trader_api app.
 """
 
 import os
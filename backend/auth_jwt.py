@@ -6,13 +6,20 @@ Uses bcrypt directly (avoids passlib 1.7.x / bcrypt 5.x incompatibility).
 Users are persisted in SQLite (users table) seeded at startup.
 """
 
+import asyncio
+import hashlib
 import os
+import time
 import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional, Tuple
 
 import bcrypt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 
@@ -21,30 +28,163 @@ from jose import JWTError, jwt
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-CHANGE-IN-PRODUCTION-min-32-chars")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRE_HOURS", "8"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
 
 _bearer = HTTPBearer(auto_error=False)
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt directly."""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+# ── Password hashing ─────────────────────────────────────────────────────────
+#
+# bcrypt is deliberately slow (~250 ms at cost 12).  Running it inline in an
+# async handler stalls the event loop for every other client, so the async
+# helpers below run it on a small dedicated pool.  bcrypt releases the GIL,
+# so threads are the default; PASSWORD_HASH_EXECUTOR=process isolates it in
+# worker processes instead.  LOGIN_CONCURRENCY caps logins in flight so a
+# login storm queues (then gets 503) rather than saturating the CPU.
 
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_REHASH_ON_LOGIN = os.getenv("BCRYPT_REHASH_ON_LOGIN", "1").lower() not in ("0", "false", "no")
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+LOGIN_QUEUE_TIMEOUT = float(os.getenv("LOGIN_QUEUE_TIMEOUT", "5"))
+# Scheduling niceness for pool workers: on small hosts the event loop should
+# win the CPU over bcrypt (0 disables; Linux applies it per thread)
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))
 
-def verify_password(plain: str, hashed: str) -> bool:
-    """Verify a plaintext password against a bcrypt hash."""
+_hash_pool: Optional[Executor] = None
+# One semaphore per event loop (TestClient instances each run their own loop)
+_login_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_login_stats = {"in_flight": 0, "rejected": 0, "rehashed": 0}
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _checkpw(plain: str, hashed: str) -> bool:
     try:
         return bcrypt.checkpw(plain.encode(), hashed.encode())
     except Exception:
         return False
 
 
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt directly (blocking — prefer hash_password_async)."""
+    return _hashpw(password, BCRYPT_ROUNDS)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    """Verify a plaintext password against a bcrypt hash (blocking)."""
+    return _checkpw(plain, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if ``hashed`` was produced with a lower cost than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+def _lower_worker_priority(nice: int) -> None:
+    """Pool initializer: deprioritise this worker thread/process."""
+    if nice <= 0:
+        return
+    try:
+        import threading
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except (AttributeError, OSError):
+        pass  # not supported on this platform — run at normal priority
+
+
+def _pool() -> Executor:
+    global _hash_pool
+    if _hash_pool is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                initializer=_lower_worker_priority,
+                initargs=(PASSWORD_HASH_NICE,),
+            )
+        else:
+            _hash_pool = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix="bcrypt",
+                initializer=_lower_worker_priority,
+                initargs=(PASSWORD_HASH_NICE,),
+            )
+    return _hash_pool
+
+
+def shutdown_password_pool() -> None:
+    """Release pool workers (called on app shutdown; recreated on next use)."""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash on the bcrypt pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), _hashpw, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """Verify on the bcrypt pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), _checkpw, plain, hashed)
+
+
+@asynccontextmanager
+async def login_slot() -> AsyncIterator[None]:
+    """Bound concurrent logins; raise 503 if no slot frees up in time."""
+    loop = asyncio.get_running_loop()
+    sem = _login_slots.get(loop)
+    if sem is None:
+        sem = _login_slots[loop] = asyncio.Semaphore(LOGIN_CONCURRENCY)
+    try:
+        await asyncio.wait_for(sem.acquire(), timeout=LOGIN_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _login_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _login_stats["in_flight"] += 1
+    try:
+        yield
+    finally:
+        _login_stats["in_flight"] -= 1
+        sem.release()
+
+
+def login_stats() -> dict:
+    return {
+        **_login_stats,
+        "concurrency_limit": LOGIN_CONCURRENCY,
+        "pool": PASSWORD_HASH_EXECUTOR,
+        "pool_workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+    }
+
+
 async def authenticate_user(username: str, password: str) -> Optional[dict]:
     """Return user dict if credentials are valid, else None (DB-backed)."""
     import database
-    user = await database.get_user(username)
-    if user and verify_password(password, user["hashed_password"]):
-        return user
-    return None
+    async with login_slot():
+        user = await database.get_user(username)
+        if not user or not await verify_password_async(password, user["hashed_password"]):
+            return None
+        if BCRYPT_REHASH_ON_LOGIN and needs_rehash(user["hashed_password"]):
+            # Upgrade hashes created under an older/lower cost factor
+            new_hash = await hash_password_async(password)
+            if await database.update_user_password(user["id"], new_hash):
+                user["hashed_password"] = new_hash
+                _login_stats["rehashed"] += 1
+    return user
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -65,21 +205,143 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+# ── Verified-token cache + in-memory revocation set ──────────────────────────
+#
+# Every authenticated request used to decode the JWT (signature check) and
+# query revoked_tokens — twice when a route also depended on
+# get_current_user.  Verified payloads are now cached by token hash until
+# their exp, and revoked JTIs live in memory (loaded from the DB at startup,
+# updated by revoke_token, re-synced periodically for multi-worker setups),
+# so the steady-state auth path performs no decode and no DB query.
+
+# sha256(token) → (payload, exp epoch seconds); LRU-bounded
+_payload_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+# jti → exp epoch seconds (entries dropped once the token would expire anyway)
+_revoked: Dict[str, float] = {}
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _exp_of(payload: dict) -> float:
+    exp = payload.get("exp")
+    return float(exp) if exp is not None else time.time() + ACCESS_TOKEN_EXPIRE_HOURS * 3600
+
+
+def verify_token(token: str) -> Optional[dict]:
+    """decode_token() with an LRU cache of verified payloads (until exp)."""
+    key = _token_key(token)
+    now = time.time()
+    hit = _payload_cache.get(key)
+    if hit is not None:
+        payload, exp = hit
+        if exp > now:
+            _payload_cache.move_to_end(key)
+            return payload
+        del _payload_cache[key]
+        return None
+
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    _payload_cache[key] = (payload, _exp_of(payload))
+    if len(_payload_cache) > TOKEN_CACHE_SIZE:
+        _payload_cache.popitem(last=False)
+    return payload
+
+
+def is_revoked(jti: Optional[str]) -> bool:
+    """In-memory revocation check (no DB access)."""
+    if not jti:
+        return False
+    exp = _revoked.get(jti)
+    if exp is None:
+        return False
+    if exp <= time.time():
+        # Token has expired anyway — decode would reject it from now on
+        _revoked.pop(jti, None)
+        return False
+    return True
+
+
+async def revoke_token(payload: dict) -> None:
+    """Revoke a verified token: persist its JTI and block it in memory."""
+    jti = payload.get("jti")
+    if not jti:
+        return
+    exp = _exp_of(payload)
+    _revoked[jti] = exp
+    import database
+    await database.revoke_token(jti, datetime.fromtimestamp(exp, tz=timezone.utc).isoformat())
+
+
+async def load_revoked_tokens() -> int:
+    """(Re)load unexpired revoked JTIs from the DB; returns the set size."""
+    import database
+    rows = await database.list_revoked_tokens()
+    loaded = {}
+    for jti, expires_at in rows:
+        try:
+            loaded[jti] = datetime.fromisoformat(expires_at).timestamp()
+        except ValueError:
+            continue
+    # Merge rather than replace: revocations made while the query ran stay put
+    _revoked.update(loaded)
+    evict_expired_revocations()
+    return len(_revoked)
+
+
+def evict_expired_revocations() -> int:
+    """Drop expired entries from the revocation set and payload cache."""
+    now = time.time()
+    expired = [jti for jti, exp in _revoked.items() if exp <= now]
+    for jti in expired:
+        del _revoked[jti]
+    stale = [k for k, (_, exp) in _payload_cache.items() if exp <= now]
+    for k in stale:
+        del _payload_cache[k]
+    return len(expired)
+
+
+def token_cache_stats() -> dict:
+    return {
+        "cached_payloads": len(_payload_cache),
+        "cache_capacity": TOKEN_CACHE_SIZE,
+        "revoked_jtis": len(_revoked),
+    }
+
+
+def authenticate_bearer(token: str) -> Tuple[Optional[dict], Optional[str]]:
+    """Verify a bearer token. Returns (payload, None) or (None, error detail)."""
+    payload = verify_token(token)
+    if not payload:
+        return None, "Invalid or expired token"
+    if is_revoked(payload.get("jti")):
+        return None, "Token has been revoked"
+    return payload, None
+
+
 # ── FastAPI dependency helpers ────────────────────────────────────────────────
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(_bearer)) -> dict:
-    """Dependency: verify JWT and return payload. Raises 401 on failure."""
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(_bearer),
+) -> dict:
+    """Dependency: verified JWT payload. Raises 401 on failure.
+
+    Reuses the payload the JWT middleware already verified for this request
+    (request.state.user); only decodes when called outside the middleware.
+    """
+    payload = getattr(request.state, "user", None)
+    if payload is not None:
+        return payload
     if not credentials:
         raise HTTPException(status_code=401, detail="Missing token")
-    payload = decode_token(credentials.credentials)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    # Check persistent DB blacklist (survives restarts)
-    jti = payload.get("jti")
-    if jti:
-        import database
-        if await database.is_token_revoked(jti):
-            raise HTTPException(status_code=401, detail="Token has been revoked")
+    payload, error = authenticate_bearer(credentials.credentials)
+    if error:
+        raise HTTPException(status_code=401, detail=error)
+    request.state.user = payload
     return payload
 
 
@@ -0,0 +1,276 @@
+"""
+Backtest Result Cache
+=====================
+Content-addressed memoization for ``run_backtest`` / ``run_demo_backtest``.
+
+The key is a SHA-256 over the canonical JSON of everything that determines
+a result:
+
+    kind, strategy type, full strategy config, instrument, date range,
+    starting balance, data version, code version
+
+* data version: for catalog backtests a digest of every file under the
+  catalog's ``data/`` dir (name, size, mtime), recomputed at most every
+  CATALOG_CHECK_INTERVAL seconds; ``"synthetic"`` for demo runs.
+* code version: a digest of nautilus_core.py, strategies/*.py and the
+  installed nautilus_trader version, computed once per process.
+
+A cache entry only points at a run in backtest_store, so a hit costs one
+run.json read plus the equity curve and preview rows.  The index (key →
+run id) is an LRU of BACKTEST_CACHE_ENTRIES entries persisted to
+``<BACKTEST_DIR>/cache_index.json``; evicting an entry never deletes the
+run.  When the catalog's data version changes, entries built on the old
+version are dropped at once (counted as invalidations).  Entries whose run
+was deleted are dropped on lookup.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import backtest_store
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_CACHE_ENABLED = os.getenv("BACKTEST_CACHE", "1") != "0"
+BACKTEST_CACHE_ENTRIES = int(os.getenv("BACKTEST_CACHE_ENTRIES", "1000"))
+
+_INDEX_FILE = "cache_index.json"
+_CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "5"))
+_SOURCE_FILES = ("nautilus_core.py", "strategies")
+
+_code_version: Optional[str] = None
+_data_versions: Dict[str, tuple] = {}  # catalog path → (checked_at, version)
+
+
+def code_version() -> str:
+    """Digest of the backtest code and the installed nautilus_trader version."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        root = Path(__file__).parent
+        for name in _SOURCE_FILES:
+            path = root / name
+            files = sorted(path.rglob("*.py")) if path.is_dir() else [path]
+            for f in files:
+                if f.is_file():
+                    digest.update(str(f.relative_to(root)).encode())
+                    digest.update(f.read_bytes())
+        try:
+            from importlib.metadata import version
+            digest.update(version("nautilus_trader").encode())
+        except Exception:
+            digest.update(b"nautilus_trader:unknown")
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def data_version(catalog_path: str) -> str:
+    """Digest of the files under the catalog's data dir (cached briefly)."""
+    now = time.monotonic()
+    cached = _data_versions.get(catalog_path)
+    if cached and now - cached[0] < _CATALOG_CHECK_INTERVAL:
+        return cached[1]
+    digest = hashlib.sha256()
+    data_dir = os.path.join(catalog_path, "data")
+    for dirpath, dirnames, filenames in os.walk(data_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            rel = os.path.relpath(os.path.join(dirpath, name), data_dir)
+            digest.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    version = digest.hexdigest()[:16]
+    _data_versions[catalog_path] = (now, version)
+    return version
+
+
+def forget_data_version(catalog_path: str) -> None:
+    """Recompute the catalog's data version on the next lookup (after a reload)."""
+    _data_versions.pop(catalog_path, None)
+
+
+def _encode(obj: Any) -> Any:
+    """
+    JSON fallback: strategy config objects as their field dicts, else str.
+
+    Used as ``json.dumps(default=...)`` so configs nested anywhere in the
+    inputs (a portfolio key maps strategy id → config) hash by their
+    fields; ``str()`` of a config object may carry its identity instead.
+    """
+    for attr in ("dict", "model_dump"):
+        fn = getattr(obj, attr, None)
+        if callable(fn):
+            return fn()
+    return str(obj)
+
+
+def make_key(kind: str, *, strategy_type: str, config: Any, instrument_id: str,
+             start_date: str, end_date: str, starting_balance: float,
+             data_version: str, owner: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Cache key inputs plus their digest (``key``).
+
+    ``owner`` is the strategy id / portfolio name the run is stored under:
+    a hit returns that run as is, so it must not be served to another label.
+    """
+    inputs = {
+        "kind": kind,
+        "owner": owner,
+        "strategy_type": strategy_type,
+        "config": config,
+        "instrument_id": str(instrument_id),
+        "start_date": start_date,
+        "end_date": end_date,
+        "starting_balance": float(starting_balance),
+        "data_version": data_version,
+        "code_version": code_version(),
+    }
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=_encode)
+    return {"key": hashlib.sha256(canonical.encode()).hexdigest(), "inputs": inputs}
+
+
+class BacktestCache:
+    """LRU index of content key → stored run, with hit / miss counters."""
+
+    def __init__(self, capacity: int = BACKTEST_CACHE_ENTRIES) -> None:
+        self.capacity = capacity
+        self._entries: Optional[OrderedDict] = None
+        self._root: Optional[Path] = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stores = self.invalidations = self.evictions = 0
+        self.saved_seconds = 0.0
+
+    # ── Index ─────────────────────────────────────────────────────────────────
+
+    def _index(self) -> OrderedDict:
+        root = backtest_store.store.root
+        if self._entries is None or self._root != root:
+            path = root / _INDEX_FILE
+            try:
+                entries = json.loads(path.read_text()) if path.is_file() else []
+                self._entries = OrderedDict((e["key"], e) for e in entries)
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                # A corrupt index only costs re-runs: start over, the runs stay
+                logger.warning("Ignoring unreadable backtest cache index %s: %s", path, exc)
+                self._entries = OrderedDict()
+            self._root = root
+        return self._entries
+
+    def _save_index(self) -> None:
+        root = backtest_store.store.root
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = root / f"{_INDEX_FILE}.tmp"
+        tmp.write_text(json.dumps(list(self._entries.values())))
+        os.replace(tmp, root / _INDEX_FILE)
+
+    # ── Lookup / store ────────────────────────────────────────────────────────
+
+    def lookup(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Response body of the cached run (summary + equity curve + preview
+        rows, marked ``cache.hit``), or None on a miss.
+        """
+        if not BACKTEST_CACHE_ENABLED:
+            return None
+        with self._lock:
+            entries = self._index()
+            self._drop_stale_data(entries, key["inputs"])
+            entry = entries.get(key["key"])
+            summary = backtest_store.store.get(entry["run_id"]) if entry else None
+            if entry and summary is None:
+                del entries[key["key"]]  # run deleted since
+                self._save_index()
+            if summary is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(key["key"])
+            self.hits += 1
+            self.saved_seconds += entry.get("compute_s", 0.0)
+
+        store = backtest_store.store
+        run_id = summary["run_id"]
+        rows = summary.get("rows", {})
+        preview = backtest_store.PREVIEW_ROWS
+        return {
+            **summary,
+            "equity_curve": store.read_rows(run_id, "equity", 0, max(1, rows.get("equity", 0)))["rows"],
+            "orders": store.read_rows(run_id, "orders", 0, preview)["rows"],
+            "positions": store.read_rows(run_id, "positions", 0, preview)["rows"],
+            "cache": {"hit": True, "key": key["key"], "cached_at": entry.get("created_at")},
+        }
+
+    def store(self, key: Dict[str, Any], run_id: Optional[str], compute_s: float) -> None:
+        if not BACKTEST_CACHE_ENABLED or not run_id:
+            return
+        with self._lock:
+            entries = self._index()
+            entries[key["key"]] = {
+                "key": key["key"],
+                "run_id": run_id,
+                "kind": key["inputs"]["kind"],
+                "data_version": key["inputs"]["data_version"],
+                "code_version": key["inputs"]["code_version"],
+                "compute_s": round(compute_s, 3),
+                "created_at": time.time(),
+            }
+            entries.move_to_end(key["key"])
+            while len(entries) > self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+            self.stores += 1
+            self._save_index()
+
+    def _drop_stale_data(self, entries: OrderedDict, inputs: Dict[str, Any]) -> None:
+        """Drop entries of the same kind built on another data / code version."""
+        stale = [
+            k for k, e in entries.items()
+            if e["kind"] == inputs["kind"]
+            and (e["data_version"] != inputs["data_version"] or e["code_version"] != inputs["code_version"])
+        ]
+        if stale:
+            for k in stale:
+                del entries[k]
+            self.invalidations += len(stale)
+            self._save_index()
+            logger.info("Backtest cache: dropped %d entries built on older data/code", len(stale))
+
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """Drop every entry (or every entry of ``kind``); returns how many."""
+        with self._lock:
+            entries = self._index()
+            drop = [k for k, e in entries.items() if kind is None or e["kind"] == kind]
+            for k in drop:
+                del entries[k]
+            self.invalidations += len(drop)
+            if drop:
+                self._save_index()
+            return len(drop)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._index())
+        lookups = self.hits + self.misses
+        return {
+            "enabled": BACKTEST_CACHE_ENABLED,
+            "entries": entries,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+cache = BacktestCache()
@@ -0,0 +1,357 @@
+"""
+Backtest Result Store
+=====================
+Every backtest run is persisted in full, untruncated, under the data dir:
+
+    data/backtests/<run_id>/
+        run.json            run record: summary metrics, request, row counts
+        orders.parquet      one row per order
+        fills.parquet       one row per OrderFilled event
+        positions.parquet   one row per position
+        equity.parquet      equity curve (time, equity)
+        profile.*           optional profiles (run_profile.py)
+
+A run is written to ``.staging/<run_id>`` and renamed into place once
+complete, so a listed run always has all of its files.  Run ids sort
+chronologically (``BT-<utc timestamp>-<hex>``).
+
+Memory only ever holds summaries (the run record without any rows), in an
+LRU of BACKTEST_SUMMARY_CACHE entries; rows are read from Parquet on demand,
+one row group at a time and only the requested columns (``read_rows``).
+The same files are scanned by the analytics engine (analytics.py).
+
+Needs ``pyarrow`` (installed with nautilus_trader).
+"""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_DIR = Path(os.getenv("BACKTEST_DIR", str(Path(__file__).parent / "data" / "backtests")))
+BACKTEST_SUMMARY_CACHE = int(os.getenv("BACKTEST_SUMMARY_CACHE", "256"))
+BACKTEST_ROW_GROUP = int(os.getenv("BACKTEST_ROW_GROUP", "10000"))
+
+# Rows included inline in a POST /backtest response (the rest are paged)
+PREVIEW_ROWS = 200
+
+_STAGING = ".staging"
+_RUN_FILE = "run.json"
+_LATEST_FILE = "latest.json"  # strategy_id → newest run_id
+
+# Column name → Arrow type name, per table; dict keys not listed are dropped
+SCHEMAS: Dict[str, Sequence[tuple]] = {
+    "orders": (
+        ("id", "string"), ("strategy_id", "string"), ("instrument_id", "string"),
+        ("side", "string"), ("type", "string"),
+        ("quantity", "float64"), ("status", "string"), ("filled_qty", "float64"),
+        ("avg_px", "float64"), ("ts_init", "int64"), ("ts_last", "int64"),
+    ),
+    "fills": (
+        ("order_id", "string"), ("trade_id", "string"), ("instrument_id", "string"),
+        ("side", "string"), ("last_qty", "float64"), ("last_px", "float64"),
+        ("commission", "float64"), ("commission_currency", "string"),
+        ("liquidity_side", "string"), ("ts_event", "int64"),
+    ),
+    "positions": (
+        ("id", "string"), ("strategy_id", "string"), ("instrument_id", "string"), ("side", "string"),
+        ("quantity", "float64"), ("avg_px_open", "float64"), ("avg_px_close", "float64"),
+        ("realized_pnl", "float64"), ("unrealized_pnl", "float64"),
+        ("is_open", "bool_"), ("is_closed", "bool_"), ("ts_opened", "int64"), ("ts_closed", "int64"),
+    ),
+    "equity": (("time", "string"), ("equity", "float64")),
+}
+TABLES = tuple(SCHEMAS)
+# Extra files a run may carry (written by ``attach``)
+ARTIFACTS = ("profile.pstats", "profile.collapsed")
+
+
+class SummaryCache(OrderedDict):
+    """OrderedDict capped at ``capacity`` entries, least recently used evicted first."""
+
+    def __init__(self, capacity: int = BACKTEST_SUMMARY_CACHE) -> None:
+        super().__init__()
+        self.capacity = capacity
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.capacity:
+            self.popitem(last=False)
+
+
+def new_run_id() -> str:
+    return f"BT-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+
+
+def _valid_run_id(run_id: str) -> bool:
+    return run_id.startswith("BT-") and "/" not in run_id and "\\" not in run_id and ".." not in run_id
+
+
+class BacktestStore:
+    """Parquet-backed run store with an LRU of summaries."""
+
+    def __init__(self, root: Optional[Path] = None, capacity: int = BACKTEST_SUMMARY_CACHE) -> None:
+        self._root = Path(root) if root else None
+        self.summaries = SummaryCache(capacity)
+        self._latest: Optional[Dict[str, str]] = None
+        self._latest_root: Optional[Path] = None
+
+    @property
+    def root(self) -> Path:
+        # Read per call so tests and scripts can repoint BACKTEST_DIR
+        return self._root or BACKTEST_DIR
+
+    def run_dir(self, run_id: str) -> Path:
+        if not _valid_run_id(run_id):
+            raise KeyError(run_id)
+        return self.root / run_id
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def save(self, summary: Dict[str, Any], tables: Dict[str, List[Dict[str, Any]]],
+             run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Persist one run: ``summary`` (scalars only) plus full row lists per
+        table.  Returns the stored summary, which includes ``run_id``,
+        ``created_at`` and per-table ``rows`` counts.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        run_id = run_id or new_run_id()
+        staging = self.root / _STAGING / run_id
+        staging.mkdir(parents=True, exist_ok=True)
+        try:
+            counts = {}
+            for table, columns in SCHEMAS.items():
+                rows = tables.get(table) or []
+                schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in columns])
+                arrow = pa.Table.from_pydict(
+                    {name: [r.get(name) for r in rows] for name, _ in columns}, schema=schema
+                )
+                pq.write_table(arrow, staging / f"{table}.parquet",
+                               row_group_size=BACKTEST_ROW_GROUP, compression="zstd")
+                counts[table] = len(rows)
+            record = {
+                **summary,
+                "run_id": run_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "rows": counts,
+            }
+            (staging / _RUN_FILE).write_text(json.dumps(record, default=str))
+            os.replace(staging, self.root / run_id)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.summaries[run_id] = record
+        if record.get("strategy_id"):
+            latest = self._latest_index()
+            latest[str(record["strategy_id"])] = run_id
+            self._write_latest(latest)
+        return record
+
+    def attach(self, run_id: str, fields: Dict[str, Any],
+               files: Optional[Dict[str, bytes]] = None) -> Dict[str, Any]:
+        """
+        Merge ``fields`` into a stored run's record and write ``files``
+        (artifacts such as profiles, names in ARTIFACTS) next to its tables.
+        Each file is written to a temp name and renamed.  Returns the record.
+        """
+        run_dir = self.run_dir(run_id)
+        record = self.get(run_id)
+        if record is None:
+            raise KeyError(run_id)
+        for name, data in (files or {}).items():
+            if name not in ARTIFACTS:
+                raise ValueError(f"Unknown artifact '{name}'")
+            tmp = run_dir / f".{name}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, run_dir / name)
+        record = {**record, **fields}
+        tmp = run_dir / f".{_RUN_FILE}.tmp"
+        tmp.write_text(json.dumps(record, default=str))
+        os.replace(tmp, run_dir / _RUN_FILE)
+        self.summaries[run_id] = record
+        return record
+
+    def artifact_path(self, run_id: str, name: str) -> Path:
+        """Path of a stored artifact; KeyError if the run or file doesn't exist."""
+        if name not in ARTIFACTS:
+            raise KeyError(name)
+        path = self.run_dir(run_id) / name
+        if not path.is_file():
+            raise KeyError(name)
+        return path
+
+    def _latest_index(self) -> Dict[str, str]:
+        if self._latest is None or self._latest_root != self.root:
+            path = self.root / _LATEST_FILE
+            self._latest = json.loads(path.read_text()) if path.is_file() else {}
+            self._latest_root = self.root
+        return self._latest
+
+    def _write_latest(self, latest: Dict[str, str]) -> None:
+        tmp = self.root / f"{_LATEST_FILE}.tmp"
+        tmp.write_text(json.dumps(latest))
+        os.replace(tmp, self.root / _LATEST_FILE)
+
+    def delete(self, run_id: str) -> bool:
+        path = self.run_dir(run_id)
+        self.summaries.pop(run_id, None)
+        if not path.is_dir():
+            return False
+        shutil.rmtree(path)
+        latest = self._latest_index()
+        stale = [sid for sid, rid in latest.items() if rid == run_id]
+        if stale:
+            for sid in stale:
+                del latest[sid]
+            self._write_latest(latest)
+        return True
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Run summary, from the LRU or its run.json."""
+        cached = self.summaries.get(run_id)
+        if cached is not None:
+            return cached
+        try:
+            path = self.run_dir(run_id) / _RUN_FILE
+        except KeyError:
+            return None
+        if not path.is_file():
+            return None
+        record = json.loads(path.read_text())
+        self.summaries[run_id] = record
+        return record
+
+    def _run_ids(self) -> Iterator[str]:
+        """Stored run ids, newest first."""
+        if not self.root.is_dir():
+            return iter(())
+        return iter(sorted(
+            (e.name for e in os.scandir(self.root) if e.is_dir() and _valid_run_id(e.name)),
+            reverse=True,
+        ))
+
+    def list_runs(self, strategy_id: Optional[str] = None, offset: int = 0,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries newest first; only the returned page's run records are read."""
+        out: List[Dict[str, Any]] = []
+        skipped = 0
+        for run_id in self._run_ids():
+            summary = self.get(run_id)
+            if summary is None or (strategy_id and summary.get("strategy_id") != strategy_id):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            out.append(summary)
+            if len(out) >= limit:
+                break
+        return out
+
+    def latest(self, strategy_id: str) -> Optional[Dict[str, Any]]:
+        """Newest run of a strategy (one index lookup, no directory scan)."""
+        run_id = self._latest_index().get(strategy_id)
+        return self.get(run_id) if run_id else None
+
+    def count(self) -> int:
+        return sum(1 for _ in self._run_ids())
+
+    def read_rows(self, run_id: str, table: str, offset: int = 0, limit: int = 500,
+                  columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        One page of a run's table.  Only the row groups overlapping
+        ``[offset, offset + limit)`` are decoded, and only ``columns``.
+        Raises KeyError for an unknown run, ValueError for a bad table / column.
+        """
+        import pyarrow.parquet as pq
+
+        if table not in SCHEMAS:
+            raise ValueError(f"Unknown table '{table}' (one of: {', '.join(TABLES)})")
+        known = [name for name, _ in SCHEMAS[table]]
+        if columns:
+            unknown = [c for c in columns if c not in known]
+            if unknown:
+                raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+        path = self.run_dir(run_id) / f"{table}.parquet"
+        if not path.is_file():
+            raise KeyError(run_id)
+
+        pf = pq.ParquetFile(path)
+        total = pf.metadata.num_rows
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        for group in range(pf.num_row_groups):
+            size = pf.metadata.row_group(group).num_rows
+            if start + size <= offset:
+                start += size
+                continue
+            if len(rows) >= limit:
+                break
+            chunk = pf.read_row_group(group, columns=list(columns) if columns else None)
+            lo = max(0, offset - start)
+            rows.extend(chunk.slice(lo, limit - len(rows)).to_pylist())
+            start += size
+        end = offset + len(rows)
+        return {
+            "run_id": run_id,
+            "table": table,
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": end if end < total else None,
+            "rows": rows,
+        }
+
+    def recent_rows(self, run_ids: Sequence[str], table: str, limit: int) -> List[Dict[str, Any]]:
+        """Up to ``limit`` rows of ``table``, taken from ``run_ids`` in order."""
+        rows: List[Dict[str, Any]] = []
+        for run_id in run_ids:
+            if len(rows) >= limit:
+                break
+            try:
+                rows.extend(self.read_rows(run_id, table, 0, limit - len(rows))["rows"])
+            except KeyError:
+                continue
+        return rows
+
+    def open_positions(self, run_id: str) -> List[Dict[str, Any]]:
+        """Positions still open at the end of a run (row groups filtered by statistics)."""
+        import pyarrow.parquet as pq
+
+        path = self.run_dir(run_id) / "positions.parquet"
+        if not path.is_file():
+            return []
+        return pq.read_table(path, filters=[("is_open", "=", True)]).to_pylist()
+
+    def closed_positions(self, run_id: str, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Closed positions of a run (only ``columns``); KeyError for an unknown run."""
+        import pyarrow.parquet as pq
+
+        path = self.run_dir(run_id) / "positions.parquet"
+        if not path.is_file():
+            raise KeyError(run_id)
+        return pq.read_table(path, columns=list(columns) if columns else None,
+                             filters=[("is_closed", "=", True)]).to_pylist()
+
+
+store = BacktestStore()
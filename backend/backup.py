@@ -0,0 +1,321 @@
+"""
+Online Backup
+=============
+Hot backups of the main SQLite database that never block the event loop.
+
+A backup runs in a worker thread through SQLite's online-backup API,
+``BACKUP_PAGES_PER_STEP`` pages at a time.  Between steps the worker
+sleeps ``BACKUP_STEP_SLEEP_MS`` to leave I/O and the GIL to the app.  The
+main DB runs in WAL mode, so the copy reads from one pinned snapshot and
+concurrent commits are neither blocked nor cause the copy to restart.
+(A non-WAL file is copied without a pinned snapshot: each write from
+another connection restarts the copy from page 1, and after
+BACKUP_MAX_RESTARTS the remainder is copied in one step.)
+
+Each backup is a job with an id; ``GET /api/database/backup/jobs/{id}``
+reports pages copied / total while it runs (``POST /api/database/backup``
+awaits the job unless ``background`` is set).  The copy is written to a
+``.tmp`` file, optionally compressed (gzip, or zstd when the optional
+``zstandard`` package is installed) and only then renamed to
+``nautilus_backup_<ts>.db[.gz|.zst]``, so a listed backup is always
+complete.  After every successful backup only the newest
+``BACKUP_RETENTION`` files are kept.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+BACKUP_STEP_SLEEP_MS = float(os.getenv("BACKUP_STEP_SLEEP_MS", "5"))
+BACKUP_MAX_RESTARTS = int(os.getenv("BACKUP_MAX_RESTARTS", "3"))
+BACKUP_RETENTION = int(os.getenv("BACKUP_RETENTION", "10"))
+BACKUP_COMPRESSION = os.getenv("BACKUP_COMPRESSION", "none").lower()  # none | gzip | zstd
+
+BACKUP_PREFIX = "nautilus_backup_"
+SNAPSHOT_PREFIX = "nautilus_pre_restore_"
+_EXTENSIONS = {"none": ".db", "gzip": ".db.gz", "zstd": ".db.zst"}
+_CHUNK = 1024 * 1024
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_compression(name: Optional[str]) -> str:
+    name = (name or BACKUP_COMPRESSION).lower()
+    if name in ("", "off", "false"):
+        name = "none"
+    if name not in _EXTENSIONS:
+        raise ValueError(f"Unknown backup compression '{name}' (none, gzip, zstd)")
+    if name == "zstd" and _zstd() is None:
+        raise ValueError("zstd backups require the 'zstandard' package")
+    return name
+
+
+def _compress_file(src: Path, dst: Path, name: str) -> None:
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        if name == "zstd":
+            with _zstd().ZstdCompressor(level=3).stream_writer(fout) as writer:
+                shutil.copyfileobj(fin, writer, _CHUNK)
+        else:
+            with gzip.GzipFile(fileobj=fout, mode="wb", compresslevel=6, mtime=0) as writer:
+                shutil.copyfileobj(fin, writer, _CHUNK)
+        fout.flush()
+        os.fsync(fout.fileno())
+
+
+def decompress_to(src: Path, dst: Path) -> None:
+    """Expand a .db.gz / .db.zst backup into a plain SQLite file."""
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        if src.name.endswith(".zst"):
+            zstandard = _zstd()
+            if zstandard is None:
+                raise RuntimeError("Restoring a .zst backup requires the 'zstandard' package")
+            with zstandard.ZstdDecompressor().stream_reader(fin) as reader:
+                shutil.copyfileobj(reader, fout, _CHUNK)
+        else:
+            with gzip.GzipFile(fileobj=fin, mode="rb") as reader:
+                shutil.copyfileobj(reader, fout, _CHUNK)
+
+
+def is_backup_name(name: str) -> bool:
+    return name.startswith(BACKUP_PREFIX) and name.endswith(tuple(_EXTENSIONS.values()))
+
+
+def list_backup_files(directory: Path, prefix: str = BACKUP_PREFIX) -> List[Path]:
+    """Completed backups, newest first."""
+    files = [
+        f for f in directory.glob(f"{prefix}*")
+        if f.name.endswith(tuple(_EXTENSIONS.values())) and f.is_file()
+    ]
+    return sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)
+
+
+def enforce_retention(directory: Path, keep: int = BACKUP_RETENTION, prefix: str = BACKUP_PREFIX) -> List[str]:
+    """Delete all but the newest ``keep`` backups; returns the removed names."""
+    if keep <= 0:
+        return []
+    removed = []
+    for old in list_backup_files(directory, prefix)[keep:]:
+        old.unlink(missing_ok=True)
+        removed.append(old.name)
+    return removed
+
+
+# ── Paged copy ────────────────────────────────────────────────────────────────
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def paged_copy(
+    src_path: Path,
+    dst_path: Path,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep_ms: float = BACKUP_STEP_SLEEP_MS,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    max_restarts: int = BACKUP_MAX_RESTARTS,
+) -> int:
+    """
+    Copy ``src_path`` into ``dst_path`` with the online-backup API, ``pages``
+    pages per step, pausing ``sleep_ms`` between steps.  Returns how many
+    times SQLite restarted the copy because the source changed.
+
+    WAL sources are copied from a pinned read snapshot, so concurrent
+    commits neither wait for the copy nor restart it.  Rollback-journal
+    sources can't be pinned without blocking writers; after
+    ``max_restarts`` the rest is copied in one step.
+    """
+    restarts = 0
+    last_remaining = None
+
+    def progress(_status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if on_progress is not None:
+            on_progress(total - remaining, total)
+        if remaining and sleep_ms > 0:
+            time.sleep(sleep_ms / 1000)
+
+    src = sqlite3.connect(str(src_path), timeout=30, isolation_level=None)
+    dst = sqlite3.connect(str(dst_path))
+    try:
+        if src.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # opens the read snapshot
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            logger.info("Backup restarted %d times; copying the rest in one step", restarts)
+            src.backup(dst, pages=-1)
+        if src.in_transaction:
+            src.execute("COMMIT")
+    finally:
+        dst.close()
+        src.close()
+    return restarts
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+@dataclass
+class BackupJob:
+    id: str
+    status: str = "queued"          # queued | running | completed | failed
+    compression: str = "none"
+    pages_done: int = 0
+    pages_total: int = 0
+    restarts: int = 0
+    file: Optional[str] = None
+    size_bytes: int = 0
+    removed: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+    duration_s: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        return round(self.pages_done / self.pages_total, 4) if self.pages_total else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "progress": self.progress}
+
+
+class BackupManager:
+    """Starts backup jobs in worker threads and keeps the recent ones."""
+
+    MAX_JOBS = 50
+
+    def __init__(self) -> None:
+        self._jobs: "OrderedDict[str, BackupJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._active: Optional[BackupJob] = None
+
+    def get(self, job_id: str) -> Optional[BackupJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[BackupJob]:
+        return list(reversed(self._jobs.values()))
+
+    @property
+    def active(self) -> Optional[BackupJob]:
+        return self._active
+
+    def start(self, db_path: Path, compression: Optional[str] = None) -> BackupJob:
+        """Register a job and run it on a daemon thread. Raises RuntimeError if one is running."""
+        name = resolve_compression(compression)
+        with self._lock:
+            if self._active is not None:
+                raise RuntimeError(f"Backup {self._active.id} is already running")
+            job = BackupJob(id=f"BKP-{uuid.uuid4().hex[:8].upper()}", compression=name)
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.MAX_JOBS:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job, Path(db_path)), name=f"backup-{job.id}", daemon=True).start()
+        return job
+
+    def _run(self, job: BackupJob, db_path: Path) -> None:
+        start = time.perf_counter()
+        job.status = "running"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        final = db_path.parent / f"{BACKUP_PREFIX}{stamp}{_EXTENSIONS[job.compression]}"
+        raw_tmp = db_path.parent / f".{final.name}.raw.tmp"
+        out_tmp = db_path.parent / f".{final.name}.tmp"
+
+        def on_progress(done: int, total: int) -> None:
+            job.pages_done, job.pages_total = done, total
+
+        try:
+            job.restarts = paged_copy(db_path, raw_tmp, on_progress=on_progress)
+            if job.compression == "none":
+                os.replace(raw_tmp, out_tmp)
+            else:
+                _compress_file(raw_tmp, out_tmp, job.compression)
+            os.replace(out_tmp, final)
+            job.file = final.name
+            job.size_bytes = final.stat().st_size
+            job.removed = enforce_retention(db_path.parent)
+            job.status = "completed"
+        except Exception as exc:
+            logger.warning("Backup %s failed: %s", job.id, exc)
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            for tmp in (raw_tmp, out_tmp):
+                tmp.unlink(missing_ok=True)
+            job.finished_at = datetime.now(timezone.utc).isoformat()
+            job.duration_s = round(time.perf_counter() - start, 3)
+            with self._lock:
+                self._active = None
+
+    async def wait_async(self, job_id: str, poll_s: float = 0.05) -> BackupJob:
+        """Await the job without blocking the event loop."""
+        job = self._jobs[job_id]
+        while job.status in ("queued", "running"):
+            await asyncio.sleep(poll_s)
+        return job
+
+    def wait(self, job_id: str, timeout: float = 60.0) -> BackupJob:
+        """Block until the job finishes (scripts / tests)."""
+        deadline = time.monotonic() + timeout
+        job = self._jobs[job_id]
+        while job.status in ("queued", "running") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return job
+
+
+def restore(db_path: Path, backup_path: Path) -> str:
+    """
+    Snapshot the live DB, then copy ``backup_path`` over it (blocking; call
+    from a worker thread).  Returns the snapshot filename.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    snapshot = db_path.parent / f"{SNAPSHOT_PREFIX}{stamp}.db"
+    paged_copy(db_path, snapshot)
+
+    source = backup_path
+    expanded = None
+    if not backup_path.name.endswith(".db"):
+        expanded = db_path.parent / f".{backup_path.name}.restore.tmp"
+        decompress_to(backup_path, expanded)
+        source = expanded
+    try:
+        # The destination stays write-locked for the whole copy, so the live
+        # DB flips from old to restored contents atomically for other readers.
+        paged_copy(source, db_path, pages=-1, sleep_ms=0)
+    finally:
+        if expanded is not None:
+            expanded.unlink(missing_ok=True)
+    enforce_retention(db_path.parent, prefix=SNAPSHOT_PREFIX)
+    return snapshot.name
+
+
+manager = BackupManager()
@@ -0,0 +1,135 @@
+"""
+Analytics query benchmark
+=========================
+Seeds ``--rows`` closed positions and as many filled orders into a
+throwaway DB, then times every /api/analytics query:
+
+    snapshot    first query: open DuckDB and copy the SQLite tables
+                (attach mode: just the ATTACH)
+    warm        each query again, best of ``--repeat``
+
+``--mode loop`` instead times the old approach for PnL by day: fetch every
+position through sqlite3 and sum in a Python dict.
+
+    cd backend
+    python benchmarks/analytics_queries.py --rows 1000000
+    python benchmarks/analytics_queries.py --rows 1000000 --mode loop --json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed(path: Path, rows: int) -> None:
+    rnd = random.Random(7)
+    conn = sqlite3.connect(str(path))
+    batch = 50_000
+    for start in range(0, rows, batch):
+        positions, orders = [], []
+        for i in range(start, min(rows, start + batch)):
+            opened = _BASE + timedelta(seconds=i * 30)
+            closed = opened + timedelta(seconds=rnd.randint(5, 200_000))
+            inst = f"S{i % 40}USDT"
+            strat = f"STR-{i % 25}"
+            positions.append((f"P{i}", inst, "LONG", 1.0, 100.0, 101.0, rnd.gauss(0.5, 20), 0,
+                              strat, opened.isoformat(), closed.isoformat()))
+            orders.append((f"O{i}", inst, "BUY", 1.0, 100.0, "FILLED", 1.0, strat, opened.isoformat()))
+        conn.executemany(
+            "INSERT INTO positions (id, instrument, side, quantity, entry_price, exit_price, pnl,"
+            " is_open, strategy_id, opened_at, closed_at) VALUES (?,?,?,?,?,?,?,?,?,?,?)", positions)
+        conn.executemany(
+            "INSERT INTO orders (id, instrument, side, quantity, price, status, filled_qty,"
+            " strategy_id, timestamp) VALUES (?,?,?,?,?,?,?,?,?)", orders)
+        conn.commit()
+    conn.close()
+
+
+def _loop_pnl_by_day(path: Path) -> int:
+    """The hand-rolled approach, kept here for comparison."""
+    conn = sqlite3.connect(str(path))
+    days: Dict[str, float] = defaultdict(float)
+    for pnl, closed_at in conn.execute("SELECT pnl, closed_at FROM positions WHERE is_open = 0"):
+        days[closed_at[:10]] += pnl or 0.0
+    conn.close()
+    return len(days)
+
+
+def run(args) -> Dict:
+    import analytics
+    import database
+
+    database.DB_PATH = Path(args.dir) / "bench.db"
+    asyncio.run(database.init_db())
+    started = time.perf_counter()
+    _seed(database.DB_PATH, args.rows)
+    seed_s = time.perf_counter() - started
+
+    queries = {
+        "pnl_by_day": lambda: analytics.pnl_by(database.DB_PATH, "day"),
+        "pnl_by_strategy": lambda: analytics.pnl_by(database.DB_PATH, "strategy"),
+        "win_rate_by_hour": lambda: analytics.win_rate_by(database.DB_PATH, "hour"),
+        "holding_times": lambda: analytics.holding_times(database.DB_PATH, "instrument"),
+        "fee_drag_by_day": lambda: analytics.fee_drag(database.DB_PATH, "day"),
+    }
+    if args.mode == "loop":
+        queries = {"pnl_by_day": lambda: _loop_pnl_by_day(database.DB_PATH)}
+
+    phases: Dict[str, float] = {}
+    if args.mode == "duckdb":
+        start = time.perf_counter()
+        analytics.engine.refresh(database.DB_PATH)
+        phases["snapshot"] = round((time.perf_counter() - start) * 1000, 1)
+    for name, fn in queries.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        phases[name] = round(best * 1000, 1)
+    return {
+        "benchmark": "analytics_queries",
+        "config": {"mode": args.mode, "rows": args.rows, "repeat": args.repeat,
+                   "engine": analytics.engine.mode},
+        "seed_s": round(seed_s, 1),
+        "phases_ms": phases,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mode", choices=("duckdb", "loop"), default="duckdb")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        result = run(args)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"mode={cfg['mode']} engine={cfg['engine']} rows={cfg['rows']} (seeded in {result['seed_s']} s)\n")
+    for name, ms in result["phases_ms"].items():
+        print(f"  {name:<18} {ms:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
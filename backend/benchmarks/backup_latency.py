@@ -0,0 +1,164 @@
+"""
+Backup latency benchmark
+========================
+Builds a throwaway SQLite DB of ``--size-mb`` and backs it up while
+
+* an event-loop ticker measures how late a 1 ms ``asyncio.sleep`` wakes up
+  (what every in-flight request would feel), and
+* a writer thread commits one small INSERT every 5 ms on its own
+  connection (what order/audit writes would feel).
+
+``--mode inline`` reproduces the old handler (``Connection.backup()`` in
+one step, on the event loop); ``--mode paged`` (default) uses the backup
+subsystem (worker thread, BACKUP_PAGES_PER_STEP pages per step).
+
+    cd backend
+    python benchmarks/backup_latency.py --size-mb 200
+    python benchmarks/backup_latency.py --size-mb 200 --mode inline --json
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _build_db(path: Path, size_mb: int) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")  # as database.init_db sets it
+    conn.execute("CREATE TABLE blob (id INTEGER PRIMARY KEY, payload BLOB)")
+    chunk = b"\0" * 4000
+    rows = size_mb * 256  # ~4 KB each
+    for start in range(0, rows, 5000):
+        conn.executemany("INSERT INTO blob (payload) VALUES (?)", [(chunk,)] * min(5000, rows - start))
+        conn.commit()
+    conn.execute("CREATE TABLE w (id INTEGER PRIMARY KEY, ts REAL)")
+    conn.commit()
+    conn.close()
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def run(args) -> Dict:
+    import backup
+
+    db = Path(args.dir) / "bench.db"
+    _build_db(db, args.size_mb)
+
+    stop = threading.Event()
+    commit_lat: List[float] = []
+    errors = []
+
+    def writer() -> None:
+        conn = sqlite3.connect(str(db), timeout=30)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                conn.execute("INSERT INTO w (ts) VALUES (?)", (t0,))
+                conn.commit()
+            except sqlite3.Error as exc:
+                errors.append(str(exc))
+            commit_lat.append(time.perf_counter() - t0)
+            time.sleep(0.005)
+        conn.close()
+
+    lag: List[float] = []
+    ticking = True
+
+    async def ticker() -> None:
+        while ticking:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag.append(time.perf_counter() - t0 - 0.001)
+
+    wt = threading.Thread(target=writer)
+    wt.start()
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    if args.mode == "inline":
+        src = sqlite3.connect(str(db))
+        dst = sqlite3.connect(str(Path(args.dir) / "inline_copy.db"))
+        src.backup(dst)  # one step, on the event loop — the old handler
+        dst.close()
+        src.close()
+        restarts = 0
+    else:
+        job = backup.manager.start(db, args.compression)
+        while job.status in ("queued", "running"):
+            await asyncio.sleep(0.05)
+        if job.status != "completed":
+            raise RuntimeError(job.error)
+        restarts = job.restarts
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.2)
+    ticking = False
+    await tick
+    stop.set()
+    wt.join()
+
+    return {
+        "benchmark": "backup_latency",
+        "config": {
+            "mode": args.mode,
+            "size_mb": args.size_mb,
+            "pages_per_step": backup.BACKUP_PAGES_PER_STEP,
+            "step_sleep_ms": backup.BACKUP_STEP_SLEEP_MS,
+            "compression": args.compression or backup.BACKUP_COMPRESSION,
+        },
+        "backup_seconds": round(elapsed, 2),
+        "copy_restarts": restarts,
+        "event_loop_lag": _summary(lag),
+        "writer_commit": _summary(commit_lat),
+        "writer_errors": len(errors),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--mode", choices=("paged", "inline"), default="paged")
+    parser.add_argument("--compression", default=None, help="none | gzip | zstd (paged mode)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"mode={cfg['mode']} size={cfg['size_mb']} MB pages/step={cfg['pages_per_step']} "
+          f"sleep={cfg['step_sleep_ms']} ms compression={cfg['compression']}\n")
+    print(f"  backup took {result['backup_seconds']} s ({result['copy_restarts']} restarts)")
+    for label in ("event_loop_lag", "writer_commit"):
+        s = result[label]
+        print(f"  {label:<15} p50={s['p50_ms']:8.2f} ms  p99={s['p99_ms']:8.2f} ms  max={s['max_ms']:8.2f} ms")
+    print(f"  writer errors: {result['writer_errors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
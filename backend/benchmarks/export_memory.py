@@ -0,0 +1,162 @@
+"""
+Export memory benchmark
+=======================
+Seeds ``--rows`` orders into a throwaway DB and runs one export while
+
+* an event-loop ticker measures how late a 1 ms ``asyncio.sleep`` wakes up, and
+* a sampler records the process RSS every 10 ms.
+
+RSS growth is measured from the first chunk on, so one-time library
+loading (pyarrow, openpyxl) doesn't count against the export.
+
+``--mode stream`` (default) consumes exports.stream_export / render_export
+exactly as the HTTP response would; ``--mode inline`` reproduces the old
+handler for CSV (fetch every row, build the whole file in memory on the
+event loop).
+
+    cd backend
+    python benchmarks/export_memory.py --rows 1000000 --format csv
+    python benchmarks/export_memory.py --rows 1000000 --format parquet --json
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            import resource
+            return int(fh.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return 0.0
+
+
+def _seed(path: Path, rows: int) -> None:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    conn = sqlite3.connect(str(path))
+    for start in range(0, rows, 50_000):
+        conn.executemany(
+            "INSERT INTO orders (id, instrument, side, quantity, price, status, timestamp) VALUES (?,?,?,?,?,?,?)",
+            [(f"ORD-{i:08d}", "BTCUSDT", "BUY" if i % 2 else "SELL", 1.0, 100.0 + i % 1000, "FILLED",
+              (base + timedelta(seconds=i)).isoformat()) for i in range(start, min(rows, start + 50_000))],
+        )
+        conn.commit()
+    conn.close()
+
+
+def _inline_csv(db_path: Path) -> bytes:
+    """The old approach: every row in memory, the whole file in memory."""
+    import exports
+    conn = sqlite3.connect(str(db_path))
+    rows = conn.execute(exports._SELECT).fetchall()
+    conn.close()
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(exports.HEADERS)
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+
+async def run(args) -> Dict:
+    import database
+    import exports
+
+    database.DB_PATH = Path(args.dir) / "bench.db"
+    await database.init_db()
+    _seed(database.DB_PATH, args.rows)
+
+    lag: List[float] = []
+    rss: List[float] = []
+    ticking = True
+
+    async def ticker() -> None:
+        while ticking:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag.append(time.perf_counter() - t0 - 0.001)
+
+    async def sampler() -> None:
+        while ticking:
+            rss.append(_rss_mb())
+            await asyncio.sleep(0.01)
+
+    baseline = _rss_mb()
+    tasks = [asyncio.create_task(ticker()), asyncio.create_task(sampler())]
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    size = 0
+    if args.mode == "inline":
+        data = _inline_csv(database.DB_PATH)
+        rss.append(_rss_mb())
+        size = len(data)
+        del data
+    else:
+        if args.format in ("csv", "parquet"):
+            body = exports.stream_export(args.format, database.DB_PATH)
+        else:
+            body = exports.stream_file(await exports.render_export(args.format, database.DB_PATH))
+        async for chunk in body:
+            if not size:
+                baseline, rss[:] = _rss_mb(), []
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    ticking = False
+    await asyncio.gather(*tasks)
+    exports.shutdown_export_pool()
+
+    ordered = sorted(lag) or [0.0]
+    return {
+        "benchmark": "export_memory",
+        "config": {"rows": args.rows, "format": args.format, "mode": args.mode,
+                   "chunk_rows": exports.EXPORT_CHUNK_ROWS, "executor": exports.EXPORT_EXECUTOR},
+        "seconds": round(elapsed, 2),
+        "output_mb": round(size / 1024 / 1024, 1),
+        "rss_growth_mb": round(max(rss or [baseline]) - baseline, 1),
+        "event_loop_lag": {
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "parquet", "xlsx", "pdf"), default="csv")
+    parser.add_argument("--mode", choices=("stream", "inline"), default="stream")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+    if args.mode == "inline" and args.format != "csv":
+        parser.error("--mode inline only reproduces the CSV path")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"rows={cfg['rows']} format={cfg['format']} mode={cfg['mode']} chunk={cfg['chunk_rows']}\n")
+    print(f"  took {result['seconds']} s, {result['output_mb']} MB out")
+    print(f"  RSS growth: {result['rss_growth_mb']} MB")
+    lag = result["event_loop_lag"]
+    print(f"  event loop lag p99={lag['p99_ms']} ms max={lag['max_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,491 @@
+"""
+Load test
+=========
+Drives a scripted mixed workload against the backend at a target request
+rate, with Binance replaced by fake_exchange.py, and reports latency
+percentiles and throughput per endpoint.
+
+By default it starts two local processes: the fake exchange, then the
+backend (uvicorn) pointed at it through BINANCE_BASE_URL / BINANCE_WS_URL,
+with a throwaway DB and backtest dir.  With ``--target URL`` it drives an
+already running deployment instead.  Start that deployment with
+BINANCE_BASE_URL pointing at a fake exchange so it stays off the live
+service.  In that mode its own rate and risk limits apply, and the
+resulting 429 / 422 responses show up as errors.
+
+Workload mix (``--mix name=weight,...``); each arrival picks one by weight:
+
+    market_data   GET /api/market-data/instruments or /api/market-data/{symbol}
+    orders        POST /api/orders, every 4th one then cancelled
+    order_reads   GET /api/orders or /api/positions (+ POST /api/positions/sync with --live-orders)
+    alerts        alert churn: POST /api/alerts, then DELETE it
+    health        GET /api/health (probes the exchange)
+    backtest      POST /api/nautilus/demo-backtest (409 while one is running)
+
+Orders are paper orders by default: they never leave the backend, so
+the fake exchange's order endpoints are not part of the measured mix.
+``--live-orders`` connects the Binance adapter to the fake exchange
+before the first stage.  Orders then go to ``<SYMBOL>.BINANCE`` and
+through the adapter, so every POST /api/orders also costs a signed
+POST /api/v3/order, cancels a DELETE /api/v3/order, and position syncs
+a GET /api/v3/account.  The /_fake/stats counts in the report show the
+exchange side.  This needs nautilus_trader's Binance adapter in the
+backend.
+
+``--dashboards`` clients also stay connected to /ws for the whole run.
+They receive the heartbeat / live_data pushes and send a ping every
+``--ws-ping-s`` seconds.  The ping round trips are reported as
+"WS /ws ping".
+
+Arrivals are open-loop: at a fixed rate of ``--rps``, or Poisson with
+``--poisson``.  Each request's latency counts from when it was
+scheduled, so a saturated server shows up as growing latency rather
+than a quietly lower rate.  At most ``--max-inflight`` requests are
+outstanding.  Arrivals beyond that limit are counted as dropped.
+``--stages 20x30,50x30,100x30`` runs rate x seconds steps back to back
+and reports each step, which gives a capacity curve.  ``--scenario
+file.json`` sets any of these options, e.g. {"stages": [[20, 30],
+[80, 30]], "mix": {"orders": 5, "alerts": 1}, "dashboards": 50}.
+
+    cd backend
+    python benchmarks/load_test.py --rps 50 --duration 30 --dashboards 20
+    python benchmarks/load_test.py --stages 25x20,50x20,100x20 --exchange-latency-ms 40 --json
+    python benchmarks/load_test.py --rps 30 --mix orders=3,order_reads=1 --live-orders
+    python benchmarks/load_test.py --target http://10.0.0.5:8000 --rps 200 --mix orders=1
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+DEFAULT_MIX = {"market_data": 4, "orders": 3, "order_reads": 2, "alerts": 2, "health": 1, "backtest": 1}
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "DOTUSDT")
+
+
+# ── Local servers ─────────────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_exchange(port: int, config: Dict[str, Any]) -> None:
+    import uvicorn
+
+    import fake_exchange
+    uvicorn.run(fake_exchange.create_app(fake_exchange.FakeExchangeConfig(**config)),
+                host="127.0.0.1", port=port, log_level="warning")
+
+
+def _serve_backend(port: int, workdir: str, exchange_url: str) -> None:
+    os.environ.update(
+        BINANCE_BASE_URL=exchange_url,
+        BINANCE_WS_URL=exchange_url.replace("http", "ws", 1),
+        BACKTEST_DIR=str(Path(workdir) / "backtests"),
+        CATALOG_PRELOAD="off",
+        RATE_LIMIT_PER_MINUTE="100000000",
+        LOGIN_RATE_LIMIT_PER_MINUTE="1000",
+        BCRYPT_ROUNDS="4",
+    )
+    import uvicorn
+
+    import database
+    database.DB_PATH = Path(workdir) / "load.db"
+    from nautilus_fastapi import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _wait_ready(url: str, process, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise RuntimeError(f"{url} exited during startup (code {process.exitcode})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+@contextmanager
+def _process(target, args: tuple, ready_url: str) -> Iterator[None]:
+    proc = multiprocessing.get_context("spawn").Process(target=target, args=args, daemon=True)
+    proc.start()
+    try:
+        _wait_ready(ready_url, proc)
+        yield
+    finally:
+        proc.terminate()
+        proc.join(timeout=10)
+
+
+@contextmanager
+def local_stack(exchange_config: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Fake exchange + backend on loopback ports; yields (backend_url, exchange_url)."""
+    with ExitStack() as stack:
+        workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        exchange_url = f"http://127.0.0.1:{_free_port()}"
+        stack.enter_context(_process(_serve_exchange, (int(exchange_url.rsplit(":", 1)[1]), exchange_config),
+                                     f"{exchange_url}/_fake/config"))
+        port = _free_port()
+        backend_url = f"http://127.0.0.1:{port}"
+        stack.enter_context(_process(_serve_backend, (port, workdir, exchange_url), f"{backend_url}/health"))
+        yield backend_url, exchange_url
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+class Recorder:
+    """Latencies and outcomes per endpoint for one stage."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.counters: Counter = Counter()
+
+    def add(self, name: str, seconds: float, status) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][str(status)] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        total = errors = 0
+        for name in sorted(self.latencies):
+            ordered = sorted(self.latencies[name])
+            failed = sum(n for s, n in self.statuses[name].items() if not s.isdigit() or int(s) >= 400)
+            if not name.startswith("WS "):
+                total += len(ordered)
+                errors += failed
+            endpoints[name] = {
+                "count": len(ordered),
+                "errors": failed,
+                "rps": round(len(ordered) / elapsed, 2),
+                **{f"p{p}_ms": round(_percentile(ordered, p) * 1000, 2) for p in (50, 90, 99)},
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "status": dict(self.statuses[name]),
+            }
+        completed = self.counters["scheduled"] - self.counters["dropped"]
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "arrivals_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            **dict(self.counters),
+            "endpoints": endpoints,
+        }
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+
+# ── Workload ──────────────────────────────────────────────────────────────────
+
+class Session:
+    """Shared client, token and recorder for the operations of one run."""
+
+    def __init__(self, client, rng: random.Random) -> None:
+        self.client = client
+        self.rng = rng
+        self.rec = Recorder()
+        self.orders = 0
+        self.live = False  # orders routed through the Binance adapter (--live-orders)
+
+    async def call(self, name: str, method: str, url: str, t0: Optional[float] = None, **kwargs):
+        loop = asyncio.get_running_loop()
+        t0 = loop.time() if t0 is None else t0
+        import httpx
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+            status = resp.status_code
+        except httpx.HTTPError as exc:
+            resp, status = None, type(exc).__name__
+        self.rec.add(name, loop.time() - t0, status)
+        return resp
+
+
+async def _market_data(s: Session, t0: float) -> None:
+    if s.rng.random() < 0.3:
+        await s.call("GET /api/market-data/instruments", "GET", "/api/market-data/instruments", t0)
+    else:
+        await s.call("GET /api/market-data/{symbol}", "GET", f"/api/market-data/{s.rng.choice(SYMBOLS)}", t0)
+
+
+async def _orders(s: Session, t0: float) -> None:
+    s.orders += 1
+    side = s.rng.choice(("BUY", "SELL"))
+    if s.live:
+        order = {"instrument": f"{s.rng.choice(SYMBOLS)}.BINANCE", "quantity": 0.01}
+    else:
+        order = {"instrument": "EUR/USD.SIM", "quantity": 1000}
+    resp = await s.call("POST /api/orders", "POST", "/api/orders", t0, json={
+        **order, "side": side, "type": "LIMIT", "price": round(1.10 + s.rng.uniform(-0.01, 0.01), 5),
+    })
+    if s.orders % 4 == 0 and resp is not None and resp.status_code == 200:
+        await s.call("DELETE /api/orders/{id}", "DELETE", f"/api/orders/{resp.json()['order']['id']}")
+
+
+async def _order_reads(s: Session, t0: float) -> None:
+    if s.live and s.rng.random() < 0.25:
+        await s.call("POST /api/positions/sync", "POST", "/api/positions/sync", t0)
+    elif s.rng.random() < 0.5:
+        await s.call("GET /api/orders", "GET", "/api/orders", t0, params={"limit": 50})
+    else:
+        await s.call("GET /api/positions", "GET", "/api/positions", t0)
+
+
+async def _alerts(s: Session, t0: float) -> None:
+    resp = await s.call("POST /api/alerts", "POST", "/api/alerts", t0, json={
+        "symbol": s.rng.choice(SYMBOLS), "condition": "above", "price": 1e9, "message": "load test",
+    })
+    if resp is not None and resp.status_code == 200:
+        await s.call("DELETE /api/alerts/{id}", "DELETE", f"/api/alerts/{resp.json()['alert']['id']}")
+
+
+async def _health(s: Session, t0: float) -> None:
+    await s.call("GET /api/health", "GET", "/api/health", t0)
+
+
+async def _backtest(s: Session, t0: float) -> None:
+    await s.call("POST /api/nautilus/demo-backtest", "POST", "/api/nautilus/demo-backtest", t0,
+                 json={"fast_period": 10, "slow_period": 20, "num_bars": 500})
+
+
+OPERATIONS = {
+    "market_data": _market_data,
+    "orders": _orders,
+    "order_reads": _order_reads,
+    "alerts": _alerts,
+    "health": _health,
+    "backtest": _backtest,
+}
+
+
+async def _dashboard(url: str, token: str, s: Session, stop: asyncio.Event, ping_s: float) -> None:
+    """One /ws client: counts pushes, times ping -> pong."""
+    import websockets
+
+    loop = asyncio.get_running_loop()
+    try:
+        async with websockets.connect(f"{url}/ws?token={token}", ping_interval=None) as ws:
+            s.rec.counters["ws_connected"] += 1
+            pending: List[float] = []
+
+            async def pinger():
+                while not stop.is_set():
+                    pending.append(loop.time())
+                    await ws.send(json.dumps({"type": "ping"}))
+                    try:
+                        await asyncio.wait_for(stop.wait(), ping_s)
+                    except asyncio.TimeoutError:
+                        pass
+                await ws.close()
+
+            task = asyncio.create_task(pinger())
+            try:
+                async for raw in ws:
+                    kind = json.loads(raw).get("type", "?")
+                    s.rec.counters[f"ws_{kind}"] += 1
+                    if kind == "pong" and pending:
+                        s.rec.add("WS /ws ping", loop.time() - pending.pop(0), 200)
+            finally:
+                task.cancel()
+    except Exception as exc:  # refused, closed by the server, ...
+        if not stop.is_set():
+            s.rec.counters[f"ws_error_{type(exc).__name__}"] += 1
+
+
+async def _run_stage(s: Session, mix: Dict[str, float], rps: float, duration: float,
+                     max_inflight: int, poisson: bool) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    names = [n for n, w in mix.items() if w > 0]
+    weights = [mix[n] for n in names]
+    inflight: set = set()
+    start = next_at = loop.time()
+    scheduled = dropped = 0
+    while next_at - start < duration:
+        delay = next_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scheduled += 1
+        if len(inflight) >= max_inflight:
+            dropped += 1
+        else:
+            op = OPERATIONS[s.rng.choices(names, weights)[0]]
+            task = asyncio.create_task(op(s, next_at))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        next_at += s.rng.expovariate(rps) if poisson else 1 / rps
+    if inflight:
+        await asyncio.gather(*inflight)
+    s.rec.counters.update(scheduled=scheduled, dropped=dropped)
+    return {"target_rps": rps, **s.rec.report(loop.time() - start)}
+
+
+async def _connect_adapter(client) -> None:
+    """Connect the Binance adapter (any key works against the fake exchange)."""
+    resp = await client.post("/api/adapters/binance/connect",
+                             json={"api_key": "load-test-key", "api_secret": "load-test-secret"})
+    if resp.status_code != 200:
+        raise RuntimeError(f"--live-orders: Binance adapter did not connect "
+                           f"({resp.status_code}: {resp.text[:200]})")
+
+
+async def drive(args, base_url: str, exchange_url: Optional[str]) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        resp = await client.post("/api/auth/login", json={"username": args.username, "password": args.password})
+        resp.raise_for_status()
+        token = resp.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        if args.target is None:
+            # Throwaway DB: lift the order-count / size limits so the run isn't capped by risk rules
+            await client.post("/api/risk/limits", json={
+                "max_orders_per_day": 0, "max_position_size": 0, "max_daily_loss": 0})
+
+        s = Session(client, random.Random(args.seed))
+        if args.live_orders:
+            await _connect_adapter(client)
+            s.live = True
+        stop = asyncio.Event()
+        ws_url = base_url.replace("http", "ws", 1)
+        dashboards = [asyncio.create_task(_dashboard(ws_url, token, s, stop, args.ws_ping_s))
+                      for _ in range(args.dashboards)]
+        stages = []
+        for rps, duration in args.stages:
+            s.rec = Recorder()
+            stages.append(await _run_stage(s, args.mix, rps, duration, args.max_inflight, args.poisson))
+        stop.set()
+        await asyncio.gather(*dashboards)
+        if s.live:
+            await client.post("/api/adapters/binance/disconnect")
+
+        exchange_stats = None
+        if exchange_url:
+            try:
+                exchange_stats = (await client.get(f"{exchange_url}/_fake/stats")).json()
+            except httpx.HTTPError:
+                pass
+    return {
+        "benchmark": "load_test",
+        "config": {"target": args.target or "local", "mix": args.mix, "dashboards": args.dashboards,
+                   "max_inflight": args.max_inflight, "poisson": args.poisson,
+                   "live_orders": args.live_orders,
+                   "exchange": args.exchange_config if args.target is None else None},
+        "stages": stages,
+        "exchange": exchange_stats,
+    }
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in filter(None, value.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (known: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _parse_stages(value: str) -> List[Tuple[float, float]]:
+    try:
+        return [(float(r), float(d)) for r, d in (p.split("x") for p in value.split(",") if p)]
+    except ValueError:
+        raise argparse.ArgumentTypeError("stages are RPSxSECONDS, comma-separated (e.g. 20x30,50x30)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", help="drive a running backend at this URL instead of a local one")
+    parser.add_argument("--exchange-url", help="fake exchange to read /_fake/stats from (with --target)")
+    parser.add_argument("--scenario", type=Path, help="JSON file setting any of these options")
+    parser.add_argument("--rps", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--stages", type=_parse_stages, help="RPSxSECONDS,... (overrides --rps/--duration)")
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX))
+    parser.add_argument("--dashboards", type=int, default=20, help="clients held open on /ws")
+    parser.add_argument("--ws-ping-s", type=float, default=5.0)
+    parser.add_argument("--max-inflight", type=int, default=200)
+    parser.add_argument("--live-orders", action="store_true",
+                        help="route orders through the Binance adapter to the fake exchange")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of a fixed interval")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default=os.getenv("ADMIN_PASSWORD", "admin"))
+    parser.add_argument("--exchange-latency-ms", type=float, default=30.0)
+    parser.add_argument("--exchange-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--exchange-error-rate", type=float, default=0.0)
+    parser.add_argument("--exchange-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--exchange-ws-drop-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        for key, value in json.loads(args.scenario.read_text()).items():
+            if not hasattr(args, key):
+                parser.error(f"unknown scenario key '{key}'")
+            setattr(args, key, value)
+    if isinstance(args.mix, str):
+        args.mix = _parse_mix(args.mix)
+    args.stages = [tuple(st) for st in args.stages] if args.stages else [(args.rps, args.duration)]
+    args.exchange_config = {
+        "latency_ms": args.exchange_latency_ms, "jitter_ms": args.exchange_jitter_ms,
+        "error_rate": args.exchange_error_rate, "throttle_rate": args.exchange_throttle_rate,
+        "ws_drop_rate": args.exchange_ws_drop_rate,
+    }
+
+    if args.target:
+        result = asyncio.run(drive(args, args.target.rstrip("/"), args.exchange_url))
+    else:
+        with local_stack(args.exchange_config) as (backend_url, exchange_url):
+            result = asyncio.run(drive(args, backend_url, exchange_url))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"target={cfg['target']} dashboards={cfg['dashboards']} mix={cfg['mix']}")
+    for stage in result["stages"]:
+        print(f"\n{stage['target_rps']:g} rps target: {stage['arrivals_rps']:.1f} arrivals/s over "
+              f"{stage['elapsed_s']} s ({stage['dropped']} dropped), {stage['requests']} HTTP requests "
+              f"({stage['throughput_rps']:.1f}/s incl. follow-ups), {stage['error_rate']:.2%} errors")
+        ws = {k: v for k, v in stage.items() if k.startswith("ws_")}
+        if ws:
+            print(f"  websocket: {ws}")
+        print(f"  {'endpoint':<36} {'count':>6} {'rps':>7} {'p50 ms':>8} {'p90 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8}  status")
+        for name, e in stage["endpoints"].items():
+            print(f"  {name:<36} {e['count']:>6} {e['rps']:>7.1f} {e['p50_ms']:>8.1f} {e['p90_ms']:>8.1f} "
+                  f"{e['p99_ms']:>8.1f} {e['max_ms']:>8.1f}  {e['status']}")
+    if result["exchange"]:
+        print(f"\nfake exchange: {result['exchange']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
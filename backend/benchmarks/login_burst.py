@@ -0,0 +1,164 @@
+"""
+Login-burst benchmark
+=====================
+Measures POST /api/orders latency at a steady rate, first alone and then
+while a burst of concurrent logins is in flight.  With bcrypt on the
+dedicated pool the order p99 should barely move; ``--inline-bcrypt``
+restores the old behaviour (bcrypt on the event loop) for comparison.
+
+The app runs in-process on a temporary SQLite DB via httpx's ASGI
+transport, so every request shares one event loop — exactly the
+condition under which a blocking bcrypt call hurts.
+
+    cd backend
+    python benchmarks/login_burst.py
+    python benchmarks/login_burst.py --inline-bcrypt --rounds 12 --logins 20
+    python benchmarks/login_burst.py --json > result.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pct(50) * 1000, 2),
+        "p95_ms": round(pct(95) * 1000, 2),
+        "p99_ms": round(pct(99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+async def _order_stream(client, headers, count: int, rate: float) -> List[float]:
+    """Open-loop order submission: request i starts at t0 + i/rate."""
+    latencies: List[float] = []
+    body = {"instrument": "EUR/USD.SIM", "side": "BUY", "type": "MARKET", "quantity": 1}
+
+    async def one(delay: float) -> None:
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        r = await client.post("/api/orders", json=body, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if r.status_code >= 400:
+            raise RuntimeError(f"order failed: {r.status_code} {r.text}")
+
+    await asyncio.gather(*(one(i / rate) for i in range(count)))
+    return latencies
+
+
+async def _login_burst(client, count: int) -> Dict[str, int]:
+    async def one() -> int:
+        r = await client.post("/api/auth/login", json={"username": "admin", "password": "admin"})
+        return r.status_code
+
+    codes = await asyncio.gather(*(one() for _ in range(count)))
+    out: Dict[str, int] = {}
+    for c in codes:
+        out[str(c)] = out.get(str(c), 0) + 1
+    return out
+
+
+async def run(args) -> Dict:
+    import httpx
+
+    import auth_jwt
+    import database
+    from nautilus_fastapi import app
+
+    database.DB_PATH = Path(args.db_dir) / "bench.db"
+
+    if args.inline_bcrypt:
+        async def _inline_verify(plain, hashed):
+            return auth_jwt.verify_password(plain, hashed)
+        auth_jwt.verify_password_async = _inline_verify
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            r = await client.post("/api/auth/login", json={"username": "admin", "password": "admin"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+            # Warm-up (connection setup, first-use imports, caches)
+            await _order_stream(client, headers, 20, args.rate)
+
+            baseline = await _order_stream(client, headers, args.orders, args.rate)
+
+            burst_start = time.perf_counter()
+            orders_task = asyncio.create_task(_order_stream(client, headers, args.orders, args.rate))
+            login_codes = await _login_burst(client, args.logins)
+            login_secs = time.perf_counter() - burst_start
+            during = await orders_task
+
+    return {
+        "benchmark": "login_burst",
+        "config": {
+            "orders": args.orders,
+            "rate_per_sec": args.rate,
+            "logins": args.logins,
+            "bcrypt_rounds": auth_jwt.BCRYPT_ROUNDS,
+            "bcrypt": "inline" if args.inline_bcrypt else f"{auth_jwt.PASSWORD_HASH_EXECUTOR}-pool",
+            "login_concurrency": auth_jwt.LOGIN_CONCURRENCY,
+        },
+        "orders_baseline": _percentiles(baseline),
+        "orders_during_login_burst": _percentiles(during),
+        "logins": {"status_codes": login_codes, "burst_seconds": round(login_secs, 2)},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=200, help="orders per phase")
+    parser.add_argument("--rate", type=float, default=50.0, help="orders per second")
+    parser.add_argument("--logins", type=int, default=20, help="concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--inline-bcrypt", action="store_true", help="run bcrypt on the event loop (old behaviour)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    # Must be set before the app (and auth_jwt) are imported
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+    os.environ.setdefault("LOGIN_RATE_LIMIT_PER_MINUTE", "1000000")
+    os.environ.setdefault("LOGIN_QUEUE_TIMEOUT", "60")
+    os.environ.setdefault("CATALOG_PRELOAD", "off")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db_dir = tmp
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    cfg = result["config"]
+    print(f"bcrypt={cfg['bcrypt']} rounds={cfg['bcrypt_rounds']} "
+          f"login_concurrency={cfg['login_concurrency']} logins={cfg['logins']} "
+          f"orders={cfg['orders']}@{cfg['rate_per_sec']}/s\n")
+    for label, key in (("baseline", "orders_baseline"), ("login burst", "orders_during_login_burst")):
+        p = result[key]
+        print(f"  orders {label:<12} p50={p['p50_ms']:8.2f} ms  p99={p['p99_ms']:8.2f} ms  max={p['max_ms']:8.2f} ms")
+    print(f"\n  logins: {result['logins']['status_codes']} in {result['logins']['burst_seconds']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
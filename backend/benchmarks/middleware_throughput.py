@@ -0,0 +1,151 @@
+"""
+Middleware throughput benchmark
+===============================
+Requests/sec through the full app for a public endpoint (/api/health), the
+lightweight /health alias and an authenticated in-memory endpoint.
+
+Requests are driven straight into the ASGI app (no sockets, no HTTP client)
+so the numbers reflect server-side cost only: middleware + routing +
+handler.  Run it on two revisions to compare middleware stacks.
+
+    cd backend
+    python benchmarks/middleware_throughput.py
+    python benchmarks/middleware_throughput.py --requests 5000 --concurrency 16 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ENDPOINTS = [
+    ("public /api/health", "GET", "/api/health", False),
+    ("public /health", "GET", "/health", False),
+    ("auth /api/strategies/runtime/stats", "GET", "/api/strategies/runtime/stats", True),
+]
+
+
+async def asgi_call(
+    app, method: str, path: str, headers: Optional[List[Tuple[bytes, bytes]]] = None, body: bytes = b"",
+) -> Tuple[int, bytes]:
+    """Minimal ASGI client: one request, returns (status, body)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), *(headers or [])],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)  # never disconnects during a request
+        return {"type": "http.disconnect"}
+
+    status = 0
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def _measure(app, method, path, headers, total: int, concurrency: int) -> Dict:
+    per_worker = max(1, total // concurrency)
+    statuses: Dict[int, int] = {}
+
+    async def worker():
+        for _ in range(per_worker):
+            status, _ = await asgi_call(app, method, path, headers)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done = per_worker * concurrency
+    return {
+        "requests": done,
+        "seconds": round(elapsed, 3),
+        "req_per_sec": round(done / elapsed, 1),
+        "mean_us": round(elapsed / done * 1e6, 1),
+        "status_codes": {str(k): v for k, v in statuses.items()},
+    }
+
+
+async def run(args) -> Dict:
+    import database
+    from nautilus_fastapi import app
+
+    database.DB_PATH = Path(args.db_dir) / "bench.db"
+    results = {}
+    async with app.router.lifespan_context(app):
+        status, body = await asgi_call(
+            app, "POST", "/api/auth/login",
+            headers=[(b"content-type", b"application/json")],
+            body=json.dumps({"username": "admin", "password": "admin"}).encode(),
+        )
+        token = json.loads(body)["access_token"]
+        auth = [(b"authorization", f"Bearer {token}".encode())]
+
+        for label, method, path, needs_auth in ENDPOINTS:
+            headers = auth if needs_auth else []
+            await _measure(app, method, path, headers, min(200, args.requests), args.concurrency)  # warm-up
+            results[label] = await _measure(app, method, path, headers, args.requests, args.concurrency)
+    return {
+        "benchmark": "middleware_throughput",
+        "config": {"requests": args.requests, "concurrency": args.concurrency},
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=3000, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "100000000")
+    os.environ.setdefault("CATALOG_PRELOAD", "off")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db_dir = tmp
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"{cfg['requests']} requests/endpoint, concurrency {cfg['concurrency']}\n")
+    for label, r in result["results"].items():
+        print(f"  {label:<40} {r['req_per_sec']:9.1f} req/s  {r['mean_us']:8.1f} µs/req  {r['status_codes']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
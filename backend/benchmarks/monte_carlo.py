@@ -0,0 +1,91 @@
+"""
+Monte Carlo benchmark
+=====================
+Times montecarlo.simulate on ``--trades`` synthetic closed-trade returns:
+``--simulations`` paths built and reduced as NumPy matrices.
+
+``--mode loop`` instead times a plain-Python loop (one path at a time,
+equity / peak / drawdown per trade) on the same inputs, for comparison.
+
+    cd backend
+    python benchmarks/monte_carlo.py --trades 500 --simulations 10000
+    python benchmarks/monte_carlo.py --trades 500 --simulations 1000 --mode loop --json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _loop(returns: List[float], simulations: int, balance: float) -> float:
+    """Median max drawdown (%) over bootstrap paths, one trade at a time."""
+    rnd = random.Random(3)
+    drawdowns = []
+    for _ in range(simulations):
+        equity = peak = balance
+        worst = 0.0
+        for _ in range(len(returns)):
+            equity *= 1 + returns[rnd.randrange(len(returns))]
+            peak = max(peak, equity)
+            worst = max(worst, (peak - equity) / peak)
+        drawdowns.append(worst * 100)
+    drawdowns.sort()
+    return drawdowns[len(drawdowns) // 2]
+
+
+def run(args) -> Dict:
+    import montecarlo
+
+    rnd = random.Random(7)
+    returns = [rnd.gauss(0.0004, 0.006) for _ in range(args.trades)]
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        if args.mode == "loop":
+            median_dd = _loop(returns, args.simulations, 100_000.0)
+        else:
+            out = montecarlo.simulate(returns, 100_000.0, method=args.method,
+                                      simulations=args.simulations, seed=3)
+            median_dd = out["max_drawdown"]["percentiles"]["p50"]
+        best = min(best, time.perf_counter() - start)
+    return {
+        "benchmark": "monte_carlo",
+        "config": {"mode": args.mode, "method": args.method, "trades": args.trades,
+                   "simulations": args.simulations, "repeat": args.repeat},
+        "ms": round(best * 1000, 1),
+        "paths_per_s": round(args.simulations / best),
+        "median_max_drawdown_pct": round(median_dd, 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trades", type=int, default=500)
+    parser.add_argument("--simulations", type=int, default=10_000)
+    parser.add_argument("--method", choices=("bootstrap", "shuffle"), default="bootstrap")
+    parser.add_argument("--mode", choices=("numpy", "loop"), default="numpy")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"mode={cfg['mode']} method={cfg['method']} trades={cfg['trades']} "
+          f"simulations={cfg['simulations']}\n")
+    print(f"  time               {result['ms']:9.1f} ms")
+    print(f"  paths/s            {result['paths_per_s']:9d}")
+    print(f"  median max DD      {result['median_max_drawdown_pct']:9.3f} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
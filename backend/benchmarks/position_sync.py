@@ -0,0 +1,112 @@
+"""
+Position sync benchmark
+=======================
+Persists ``--rows`` exchange balances into a throwaway DB three times:
+
+    initial     every row is new
+    resync      nothing changed (what most /api/positions/sync calls see)
+    1% change   ``--rows // 100`` quantities moved
+
+``--mode loop`` reproduces the old save_positions (one INSERT OR REPLACE
+per row); ``--mode bulk`` (default) is the executemany upsert that skips
+rows whose content hash is unchanged.
+
+    cd backend
+    python benchmarks/position_sync.py --rows 10000
+    python benchmarks/position_sync.py --rows 10000 --mode loop --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _balances(n: int, moved: int = 0) -> List[Dict]:
+    return [
+        {"id": f"LIVE-BINANCE-A{i}", "instrument": f"A{i}USDT", "side": "LONG",
+         "quantity": 2.0 if i < moved else 1.0}
+        for i in range(n)
+    ]
+
+
+async def _save_loop(positions: List[Dict], strategy_id: str = "") -> None:
+    """The pre-bulk implementation, kept here for comparison."""
+    import aiosqlite
+    import database
+    from migrations import iso_to_ns
+
+    now = datetime.now(timezone.utc).isoformat()
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        for p in positions:
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO positions
+                    (id, instrument, side, quantity, entry_price, exit_price,
+                     pnl, is_open, strategy_id, opened_at, closed_at, opened_ns)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    p.get("id", f"POS-{uuid.uuid4().hex[:8].upper()}"), p.get("instrument", "UNKNOWN"),
+                    p.get("side", "LONG"), float(p.get("quantity", 0)), p.get("entry_price"),
+                    p.get("exit_price"), float(p.get("pnl", 0)), 1 if p.get("is_open", False) else 0,
+                    strategy_id, p.get("opened_at", now), p.get("closed_at"),
+                    iso_to_ns(p.get("opened_at", now)),
+                ),
+            )
+        await db.commit()
+
+
+async def run(args) -> Dict:
+    import database
+
+    database.DB_PATH = Path(args.dir) / "bench.db"
+    await database.init_db()
+    save = database.save_positions if args.mode == "bulk" else _save_loop
+
+    phases = {}
+    for label, batch in (
+        ("initial", _balances(args.rows)),
+        ("resync", _balances(args.rows)),
+        ("1%_change", _balances(args.rows, moved=args.rows // 100)),
+    ):
+        start = time.perf_counter()
+        changes = await save(batch)
+        phases[label] = {
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+            "written": None if changes is None else len(changes["inserted"]) + len(changes["updated"]),
+        }
+    return {"benchmark": "position_sync", "config": {"mode": args.mode, "rows": args.rows}, "phases": phases}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--mode", choices=("bulk", "loop"), default="bulk")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    print(f"mode={args.mode} rows={args.rows}\n")
+    for label, phase in result["phases"].items():
+        written = "all" if phase["written"] is None else phase["written"]
+        print(f"  {label:<10} {phase['ms']:9.1f} ms  rows written: {written}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
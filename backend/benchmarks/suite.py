@@ -0,0 +1,534 @@
+"""
+Benchmark suite
+===============
+One reproducible run over the backend's hot paths, against a throwaway DB
+and backtest dir and an in-process fake exchange (no network):
+
+    order_create        routers.orders.create_order, paper (.SIM): risk + DB + audit
+    order_create_live   the same, routed to the fake exchange (--exchange-latency-ms)
+    risk_check          RiskEngine.check_order with every limit configured
+    live_snapshot       nautilus_fastapi._collect_live_snapshot, --strategies loaded
+    broadcast           ConnectionManager.broadcast of a snapshot to --sockets sockets
+    alert_eval          alert_monitor passes over --alerts active alerts
+    jwt_middleware      RequestPipeline per bearer-token request (vs a public one)
+    backtest_<type>     bars/sec of engine.run() per strategy on synthetic bars
+                        (needs nautilus_trader; reported as skipped otherwise)
+
+Each case reports one headline ``value`` (best of --repeat, after a warm-up)
+plus details such as latency percentiles.  The run is compared with the
+stored baseline (benchmarks/baseline.json): a case regresses when it is
+more than its ``threshold_pct`` worse, and the exit code is then 1.
+Re-record the baseline on the reference machine with --update-baseline
+(per-case thresholds in the file are kept).
+
+    cd backend
+    python benchmarks/suite.py
+    python benchmarks/suite.py --only order_create,risk_check --json
+    python benchmarks/suite.py --output bench.json --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD_PCT = 25.0
+BACKTEST_STRATEGIES = ("sma", "rsi", "macd")
+
+
+# ── Fake exchange ─────────────────────────────────────────────────────────────
+
+class FakeExchange:
+    """
+    Stands in for Binance: fixed tickers in market_data_service's cache
+    (never stale, so nothing is fetched) and order submission through
+    ``live_manager`` answered after ``latency_ms``.
+    """
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+        self.orders = 0
+
+    async def submit_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        self.orders += 1
+        order_id = str(10_000_000 + self.orders)
+        return {"success": True, "order_id": order_id, "exchange_order_id": order_id,
+                "status": "new", "exchange": "FAKE"}
+
+    def install(self) -> None:
+        import market_data_service as svc
+        from state import live_manager
+
+        svc._CACHE_TTL_SECONDS = float("inf")
+        now = time.monotonic()
+        for symbol in svc.SYMBOLS:
+            svc._symbol_cache[symbol] = {"data": svc._fallback_for(symbol), "fetched_at": now}
+        live_manager.submit_order = self.submit_order
+
+    def uninstall(self) -> None:
+        from state import live_manager
+        live_manager.__dict__.pop("submit_order", None)
+        live_manager._connections.pop("binance", None)
+
+    @contextmanager
+    def connected(self, live: bool = True):
+        """``live_manager`` reports a Binance connection while inside."""
+        from live_trading import AdapterConnection
+        from state import live_manager
+
+        if live:
+            live_manager._connections["binance"] = AdapterConnection("binance", "bench")
+        try:
+            yield
+        finally:
+            live_manager._connections.pop("binance", None)
+
+
+# ── Measurement helpers ───────────────────────────────────────────────────────
+
+async def _timed(call, n: int) -> List[float]:
+    """Seconds taken by each of ``n`` sequential awaits of ``call()``."""
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1e6, 1)
+
+    return {"p50_us": pct(50), "p99_us": pct(99), "mean_us": round(sum(samples) / len(samples) * 1e6, 1)}
+
+
+def _rate(samples: List[float]) -> Dict[str, float]:
+    return {"value": len(samples) / sum(samples), **_latency(samples)}
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+# Each case is an async context manager: setup, then yield a coroutine
+# function returning one measurement ({"value": ..., **details}), then cleanup.
+
+@asynccontextmanager
+async def _order_create(ctx, live: bool = False):
+    from routers.orders import OrderCreateRequest, create_order
+
+    req = OrderCreateRequest(instrument="BTCUSDT.BINANCE" if live else "EUR/USD.SIM",
+                             side="BUY", type="LIMIT", quantity=0.01, price=100.0)
+    user = {"sub": "bench", "role": "admin"}
+
+    async def measure():
+        with ctx.exchange.connected(live):
+            return _rate(await _timed(lambda: create_order(req, _user=user), ctx.args.orders))
+
+    yield measure
+
+
+@asynccontextmanager
+async def _order_create_live(ctx):
+    async with _order_create(ctx, live=True) as measure:
+        yield measure
+
+
+@asynccontextmanager
+async def _risk_check(ctx):
+    from risk_engine import risk_engine
+
+    order = {"instrument": "EUR/USD.SIM", "side": "BUY", "type": "LIMIT",
+             "quantity": 0.01, "price": 100.0, "leverage": 1.0}
+
+    async def measure():
+        return _rate(await _timed(lambda: risk_engine.check_order(order), ctx.args.orders))
+
+    yield measure
+
+
+@asynccontextmanager
+async def _live_snapshot(ctx):
+    from nautilus_fastapi import _collect_live_snapshot
+    from state import nautilus_system
+
+    ids = [f"bench-{i}" for i in range(ctx.args.strategies)]
+    for i, sid in enumerate(ids):
+        nautilus_system.strategies[sid] = {"id": sid, "name": f"Bench {i}",
+                                           "status": "running" if i % 2 else "stopped"}
+        nautilus_system.backtest_results[sid] = {"run_id": None, "open_positions": i % 3, "total_orders": i}
+
+    async def measure():
+        return _rate(await _timed(_collect_live_snapshot, ctx.args.snapshots))
+
+    try:
+        yield measure
+    finally:
+        for sid in ids:
+            nautilus_system.strategies.pop(sid, None)
+            nautilus_system.backtest_results.pop(sid, None)
+
+
+class _FakeSocket:
+    """Serialises like starlette's WebSocket.send_json; the send itself is free."""
+
+    def __init__(self) -> None:
+        self.sent_bytes = 0
+
+    async def send_json(self, data: Any) -> None:
+        self.sent_bytes += len(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+
+@asynccontextmanager
+async def _broadcast(ctx):
+    from nautilus_fastapi import _collect_live_snapshot
+    from state import ConnectionManager
+
+    manager = ConnectionManager()
+    manager.active_connections = [_FakeSocket() for _ in range(ctx.args.sockets)]
+    message = await _collect_live_snapshot()
+
+    async def measure():
+        samples = await _timed(lambda: manager.broadcast(message), ctx.args.broadcasts)
+        return {"value": len(samples) * ctx.args.sockets / sum(samples),
+                "per_broadcast_ms": round(sum(samples) / len(samples) * 1000, 3),
+                "message_bytes": len(json.dumps(message, separators=(",", ":")))}
+
+    yield measure
+
+
+@asynccontextmanager
+async def _alert_eval(ctx):
+    import alert_monitor
+    import database
+    import market_data_service as svc
+
+    # Far out of the money: every pass evaluates all of them, none triggers
+    alerts = [await database.create_alert(svc.SYMBOLS[i % len(svc.SYMBOLS)], "above", 1e12, "bench")
+              for i in range(ctx.args.alerts)]
+
+    async def measure():
+        samples = await _timed(alert_monitor._check_alerts, ctx.args.alert_passes)
+        return {"value": len(samples) * len(alerts) / sum(samples),
+                "per_pass_ms": round(sum(samples) / len(samples) * 1000, 3)}
+
+    try:
+        yield measure
+    finally:
+        for alert in alerts:
+            await database.delete_alert(alert["id"])
+
+
+async def _noop_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _pipeline_request(app, path: str, headers: List[tuple]) -> None:
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"",
+             "headers": [(b"host", b"bench"), *headers], "client": ("127.0.0.1", 50000)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} answered {message['status']}")
+
+    await app(scope, receive, send)
+
+
+@asynccontextmanager
+async def _jwt_middleware(ctx):
+    import auth_jwt
+    from middleware import RequestPipeline
+
+    pipeline = RequestPipeline(_noop_app)
+    token = auth_jwt.create_access_token({"sub": "bench", "role": "admin"})
+    bearer = [(b"authorization", f"Bearer {token}".encode())]
+    n = ctx.args.requests
+
+    async def measure():
+        public = await _timed(lambda: _pipeline_request(pipeline, "/api/health", []), n)
+        authed = await _timed(lambda: _pipeline_request(pipeline, "/api/bench", bearer), n)
+        public_us, authed_us = sum(public) / n * 1e6, sum(authed) / n * 1e6
+        return {"value": authed_us, "public_us": round(public_us, 2),
+                "jwt_overhead_us": round(authed_us - public_us, 2)}
+
+    yield measure
+
+
+def _synthetic_bars(bar_type, n: int) -> list:
+    """The demo backtest's seeded random walk (1-minute bars)."""
+    import random
+
+    from nautilus_trader.model.data import Bar
+    from nautilus_trader.model.objects import Price, Quantity
+
+    rnd = random.Random(42)
+    price, start_ts, bar_ns = 1.10000, 1_609_459_200_000_000_000, 60_000_000_000
+    bars = []
+    for i in range(n):
+        close = max(0.5, price * (1 + rnd.gauss(0.00003, 0.00030)))
+        high = max(price, close) * (1 + abs(rnd.gauss(0, 0.00008)))
+        low = min(price, close) * (1 - abs(rnd.gauss(0, 0.00008)))
+        ts = start_ts + i * bar_ns
+        bars.append(Bar(bar_type=bar_type, open=Price.from_str(f"{price:.5f}"),
+                        high=Price.from_str(f"{high:.5f}"), low=Price.from_str(f"{low:.5f}"),
+                        close=Price.from_str(f"{close:.5f}"), volume=Quantity.from_str("1000000"),
+                        ts_event=ts, ts_init=ts))
+        price = close
+    return bars
+
+
+def _backtest(strategy: str):
+    @asynccontextmanager
+    async def case(ctx):
+        from decimal import Decimal
+
+        from nautilus_trader.backtest.engine import BacktestEngine, BacktestEngineConfig
+        from nautilus_trader.config import LoggingConfig
+        from nautilus_trader.model.currencies import USD
+        from nautilus_trader.model.data import BarType
+        from nautilus_trader.model.enums import AccountType, OmsType
+        from nautilus_trader.model.identifiers import TraderId, Venue
+        from nautilus_trader.model.objects import Money
+        from nautilus_trader.test_kit.providers import TestInstrumentProvider
+
+        venue = Venue("SIM")
+        instrument = TestInstrumentProvider.default_fx_ccy("EUR/USD", venue=venue)
+        bar_type = BarType.from_str(f"{instrument.id}-1-MINUTE-BID-INTERNAL")
+        bars = _synthetic_bars(bar_type, ctx.args.bars)
+        common = {"instrument_id": str(instrument.id), "bar_type": str(bar_type), "trade_size": Decimal("100000")}
+
+        def make_strategy():
+            if strategy == "rsi":
+                from strategies.rsi_strategy import RSIStrategy, RSIStrategyConfig
+                return RSIStrategy(RSIStrategyConfig(**common))
+            if strategy == "macd":
+                from strategies.macd_strategy import MACDStrategy, MACDStrategyConfig
+                return MACDStrategy(MACDStrategyConfig(**common))
+            from strategies.sma_crossover import SMACrossoverConfig, SMACrossoverStrategy
+            return SMACrossoverStrategy(SMACrossoverConfig(strategy_id="bench_sma", **common))
+
+        def run_once() -> float:
+            engine = BacktestEngine(config=BacktestEngineConfig(
+                trader_id=TraderId("BENCH-001"), logging=LoggingConfig(log_level="ERROR")))
+            try:
+                engine.add_venue(venue=venue, oms_type=OmsType.HEDGING, account_type=AccountType.MARGIN,
+                                 base_currency=USD, starting_balances=[Money(100_000, USD)])
+                engine.add_instrument(instrument)
+                engine.add_data(bars)
+                engine.add_strategy(strategy=make_strategy())
+                start = time.perf_counter()
+                engine.run()
+                return time.perf_counter() - start
+            finally:
+                engine.dispose()
+
+        async def measure():
+            seconds = await asyncio.to_thread(run_once)
+            return {"value": len(bars) / seconds, "run_ms": round(seconds * 1000, 1), "bars": len(bars)}
+
+        yield measure
+
+    return case
+
+
+# name -> (case, unit, higher_is_better)
+CASES = {
+    "order_create": (_order_create, "orders/s", True),
+    "order_create_live": (_order_create_live, "orders/s", True),
+    "risk_check": (_risk_check, "checks/s", True),
+    "live_snapshot": (_live_snapshot, "snapshots/s", True),
+    "broadcast": (_broadcast, "deliveries/s", True),
+    "alert_eval": (_alert_eval, "alerts/s", True),
+    "jwt_middleware": (_jwt_middleware, "us/request", False),
+    **{f"backtest_{s}": (_backtest(s), "bars/s", True) for s in BACKTEST_STRATEGIES},
+}
+
+
+async def _run_case(name: str, ctx) -> Dict[str, Any]:
+    case, unit, higher = CASES[name]
+    try:
+        async with case(ctx) as measure:
+            await measure()  # warm-up: connections, caches, imports
+            runs = [await measure() for _ in range(ctx.args.repeat)]
+    except ImportError as exc:
+        return {"skipped": f"missing dependency: {exc.name or exc}"}
+    best = (max if higher else min)(runs, key=lambda r: r["value"])
+    return {**best, "value": round(best["value"], 2), "unit": unit, "higher_is_better": higher}
+
+
+# ── Baseline comparison ───────────────────────────────────────────────────────
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Any],
+            threshold_pct: Optional[float] = None) -> Dict[str, Dict]:
+    """
+    Per case: the baseline value, change (%) and status: ok, improved,
+    regressed (more than the threshold worse), new (no baseline) or skipped.
+    """
+    default = threshold_pct if threshold_pct is not None else baseline.get("threshold_pct", DEFAULT_THRESHOLD_PCT)
+    out = {}
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if "skipped" in result:
+            out[name] = {"status": "skipped"}
+            continue
+        if not base or not base.get("value"):
+            out[name] = {"status": "new"}
+            continue
+        limit = base.get("threshold_pct", default)
+        change = (result["value"] - base["value"]) / abs(base["value"]) * 100
+        worse = -change if result["higher_is_better"] else change
+        status = "regressed" if worse > limit else "improved" if worse < -limit else "ok"
+        out[name] = {"baseline": base["value"], "change_pct": round(change, 1),
+                     "threshold_pct": limit, "status": status}
+    return out
+
+
+def make_baseline(report: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+    """A baseline from ``report``'s results, keeping ``previous``'s thresholds."""
+    old = previous.get("results", {})
+    results = {}
+    for name, result in report["results"].items():
+        if "skipped" in result:
+            if name in old:
+                results[name] = old[name]
+            continue
+        entry = {"value": result["value"], "unit": result["unit"], "higher_is_better": result["higher_is_better"]}
+        if "threshold_pct" in old.get(name, {}):
+            entry["threshold_pct"] = old[name]["threshold_pct"]
+        results[name] = entry
+    return {
+        "threshold_pct": previous.get("threshold_pct", DEFAULT_THRESHOLD_PCT),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": report["environment"],
+        "config": report["config"],
+        "results": results,
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "machine": platform.machine(), "cpus": os.cpu_count()}
+    try:
+        env["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        env["commit"] = None
+    return env
+
+
+async def run(args) -> Dict[str, Any]:
+    import backtest_store
+    import database
+    from nautilus_fastapi import app
+
+    database.DB_PATH = Path(args.dir) / "bench.db"
+    backtest_store.BACKTEST_DIR = Path(args.dir) / "backtests"
+    exchange = FakeExchange(args.exchange_latency_ms)
+    exchange.install()
+    ctx = SimpleNamespace(args=args, exchange=exchange)
+    names = args.only or list(CASES)
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            # Every risk check enabled (and never tripped) so each one does its DB reads
+            await database.update_risk_limits({
+                "max_position_size": 1e12, "max_daily_loss": 1e12,
+                "max_leverage": 1000.0, "max_orders_per_day": 10 ** 9,
+            })
+            for name in names:
+                results[name] = await _run_case(name, ctx)
+    finally:
+        exchange.uninstall()
+    return {
+        "benchmark": "suite",
+        "config": {k: getattr(args, k) for k in (
+            "repeat", "orders", "exchange_latency_ms", "strategies", "snapshots", "sockets",
+            "broadcasts", "alerts", "alert_passes", "requests", "bars")},
+        "environment": _environment(),
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--only", type=lambda s: [c for c in s.split(",") if c],
+                        help=f"comma-separated cases: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=300, help="orders / risk checks per measurement")
+    parser.add_argument("--exchange-latency-ms", type=float, default=0.0)
+    parser.add_argument("--strategies", type=int, default=100)
+    parser.add_argument("--snapshots", type=int, default=2000)
+    parser.add_argument("--sockets", type=int, default=500)
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--alert-passes", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=3000, help="middleware requests per measurement")
+    parser.add_argument("--bars", type=int, default=10_000)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, help="override the baseline's default threshold_pct")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--output", type=Path, help="also write the JSON report here")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+    unknown = set(args.only or ()) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "100000000")
+    os.environ.setdefault("CATALOG_PRELOAD", "off")
+    os.environ.setdefault("MAINTENANCE_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("AUDIT_ARCHIVE_INTERVAL_HOURS", "0")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        report = asyncio.run(run(args))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.is_file() else {}
+    report["comparison"] = compare(report["results"], baseline, args.threshold)
+    report["regressions"] = [n for n, c in report["comparison"].items() if c["status"] == "regressed"]
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(make_baseline(report, baseline), indent=2) + "\n")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        env = report["environment"]
+        print(f"python {env['python']} on {env['machine']} ({env['cpus']} cpus), commit {env['commit']}\n")
+        for name, result in report["results"].items():
+            if "skipped" in result:
+                print(f"  {name:<20} {'skipped':>14}  {result['skipped']}")
+                continue
+            cmp = report["comparison"][name]
+            delta = f"{cmp['change_pct']:+6.1f}% vs {cmp['baseline']}" if "change_pct" in cmp else ""
+            print(f"  {name:<20} {result['value']:>14,.2f} {result['unit']:<13} {cmp['status']:<10} {delta}")
+        if args.update_baseline:
+            print(f"\nbaseline written to {args.baseline}")
+    return 1 if report["regressions"] and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
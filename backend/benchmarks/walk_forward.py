@@ -0,0 +1,115 @@
+"""
+Walk-forward scheduling benchmark
+=================================
+Runs walk_forward.run_walk_forward with a CPU-bound stand-in for the
+catalog backtest (``--trial-ms`` of pure-Python work per trial) so the
+pool's scheduling can be measured without a data catalog:
+
+    wall_s          total time for all windows
+    speedup         serial trial time / wall time
+    first_oos_s     when the first out-of-sample result streamed out
+    cpu_busy_pct    summed worker CPU time / (wall time x workers)
+
+    cd backend
+    python benchmarks/walk_forward.py --windows 24 --grid 16
+    python benchmarks/walk_forward.py --windows 24 --grid 16 --workers 1 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def burn_trial(trial: Dict) -> Dict:
+    """Spin for trial_ms of CPU, then report metrics that favour fast_period=10."""
+    started = time.process_time()
+    deadline = started + trial["base_config"]["trial_ms"] / 1000
+    x = 0
+    while time.process_time() < deadline:
+        x += sum(range(1000))
+    fast = trial["params"]["fast_period"]
+    balance = trial["starting_balance"]
+    return {
+        "metrics": {"total_pnl": 100.0, "total_trades": 3, "win_rate": 50.0, "max_drawdown": 1.0,
+                    "sharpe_ratio": -float((fast - 10) ** 2), "cpu_s": time.process_time() - started},
+        "equity_curve": [{"time": trial["start_date"], "equity": balance},
+                         {"time": trial["end_date"], "equity": balance + 100.0}],
+    }
+
+
+def run(args) -> Dict:
+    import backtest_store
+    import walk_forward
+
+    backtest_store.BACKTEST_DIR = Path(args.dir)
+    fasts = list(range(2, 2 + args.grid))
+    train, test = 60, 15
+    end = date(2020, 1, 1) + timedelta(days=train + test * args.windows)
+
+    async def drive():
+        first_oos = None
+        started = time.perf_counter()
+        oos = 0
+        async for event in walk_forward.run_walk_forward(
+            catalog_path="", strategy_type="sma_crossover", base_config={"trial_ms": args.trial_ms},
+            param_grid={"fast_period": fasts, "slow_period": [100]},
+            start_date="2020-01-01", end_date=end.isoformat(), train_days=train, test_days=test,
+            workers=args.workers, evaluate=burn_trial,
+        ):
+            if event["event"] == "oos":
+                oos += 1
+                if first_oos is None:
+                    first_oos = time.perf_counter() - started
+        return time.perf_counter() - started, first_oos, oos
+
+    wall, first_oos, oos = asyncio.run(drive())
+    trials = args.windows * (args.grid + 1)
+    serial = trials * args.trial_ms / 1000
+    return {
+        "benchmark": "walk_forward",
+        "config": {"windows": args.windows, "grid": args.grid, "workers": args.workers,
+                   "trial_ms": args.trial_ms, "executor": walk_forward.WALK_FORWARD_EXECUTOR},
+        "trials": trials,
+        "oos_results": oos,
+        "wall_s": round(wall, 2),
+        "speedup": round(serial / wall, 2),
+        "first_oos_s": round(first_oos or 0.0, 2),
+        "cpu_busy_pct": round(serial / (wall * args.workers) * 100, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--windows", type=int, default=24)
+    parser.add_argument("--grid", type=int, default=16, help="parameter sets per window")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--trial-ms", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.dir = tmp
+        result = run(args)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    cfg = result["config"]
+    print(f"windows={cfg['windows']} grid={cfg['grid']} workers={cfg['workers']} "
+          f"trial={cfg['trial_ms']} ms ({result['trials']} trials)\n")
+    for name in ("wall_s", "speedup", "first_oos_s", "cpu_busy_pct"):
+        print(f"  {name:<14} {result[name]:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,20 @@ Async SQLite persistence for orders, alerts, risk limits, and settings.
 Replaces the in-memory dicts that were lost on every server restart.
 """
 
+import base64
+import hashlib
 import json
 import os
 import uuid
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiosqlite
 
+from audit_log import audit_writer
+from migrations import day_bounds_ns, iso_to_ns, migrate
+
 DB_PATH = Path(__file__).parent / "data" / "nautilus.db"
 
 # ── Default values ────────────────────────────────────────────────────────────
@@ -60,6 +65,14 @@ async def init_db() -> None:
     """Create all tables if they don't exist and seed defaults."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     async with aiosqlite.connect(DB_PATH) as db:
+        # WAL (persistent in the file): readers — including online backups —
+        # never block writers, and writers never block readers.
+        await db.execute("PRAGMA journal_mode=WAL")
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='strategy_performance'"
+        ) as cur:
+            had_perf_table = await cur.fetchone() is not None
+
         await db.executescript(
             """
             CREATE TABLE IF NOT EXISTS orders (
@@ -165,6 +178,15 @@ async def init_db() -> None:
 
             CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
 
+            CREATE TABLE IF NOT EXISTS strategy_performance (
+                strategy_id     TEXT PRIMARY KEY,
+                total_pnl       REAL NOT NULL DEFAULT 0,
+                trade_count     INTEGER NOT NULL DEFAULT 0,
+                win_count       INTEGER NOT NULL DEFAULT 0,
+                loss_count      INTEGER NOT NULL DEFAULT 0,
+                last_trade_at   TEXT
+            );
+
             CREATE INDEX IF NOT EXISTS idx_orders_status    ON orders(status);
             CREATE INDEX IF NOT EXISTS idx_orders_timestamp ON orders(timestamp);
             CREATE INDEX IF NOT EXISTS idx_alerts_symbol    ON alerts(symbol);
@@ -173,23 +195,32 @@ async def init_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_strategies_created_at ON strategies(created_at);
             CREATE INDEX IF NOT EXISTS idx_positions_is_open     ON positions(is_open);
             CREATE INDEX IF NOT EXISTS idx_positions_strategy_id ON positions(strategy_id);
+
+            -- Keyset pagination: (filter column, ts, id) so every page is an index range scan
+            CREATE INDEX IF NOT EXISTS idx_orders_ts_id            ON orders(timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_orders_status_ts        ON orders(status, timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_orders_instrument_ts    ON orders(instrument, timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_positions_open_ts       ON positions(is_open, opened_at, id);
+            CREATE INDEX IF NOT EXISTS idx_positions_instrument_ts ON positions(instrument, opened_at, id);
+            CREATE INDEX IF NOT EXISTS idx_positions_strategy_ts   ON positions(strategy_id, opened_at, id);
+            CREATE INDEX IF NOT EXISTS idx_alerts_ts_id            ON alerts(created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_alerts_status_ts        ON alerts(status, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_alerts_symbol_ts        ON alerts(symbol, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_ts_id        ON audit_logs(timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_user_ts      ON audit_logs(user_id, timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_action_ts    ON audit_logs(action, timestamp, id);
             """
         )
         await db.commit()
 
-        # Idempotent column migrations
-        for migration in [
-            "ALTER TABLE orders ADD COLUMN pnl REAL DEFAULT 0",
-            "ALTER TABLE orders ADD COLUMN strategy_id TEXT",
-            "ALTER TABLE orders ADD COLUMN exchange_order_id TEXT",
-            "ALTER TABLE users ADD COLUMN totp_secret TEXT",
-            "ALTER TABLE users ADD COLUMN two_factor_enabled INTEGER NOT NULL DEFAULT 0",
-        ]:
-            try:
-                await db.execute(migration)
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass  # Column already exists — expected on re-initialization
+        # Versioned migrations (PRAGMA user_version) — see migrations.py
+        await migrate(db)
+
+        # Triggers reference orders.strategy_id, so they go after the migrations
+        await db.executescript(_STRATEGY_PERFORMANCE_TRIGGERS)
+        if not had_perf_table:
+            await _rebuild_strategy_performance(db)
+        await db.commit()
 
         await _seed_defaults(db)
 
@@ -198,6 +229,85 @@ async def init_db() -> None:
     await seed_admin_user(admin_pw)
 
 
+# Keep strategy_performance in step with filled orders on every write path
+# (create, exchange status update, raw SQL), so the read side is one SELECT.
+_STRATEGY_PERFORMANCE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_orders_perf_insert
+AFTER INSERT ON orders
+WHEN NEW.strategy_id IS NOT NULL AND NEW.status IN ('filled', 'FILLED')
+BEGIN
+    INSERT INTO strategy_performance
+        (strategy_id, total_pnl, trade_count, win_count, loss_count, last_trade_at)
+    VALUES (
+        NEW.strategy_id, COALESCE(NEW.pnl, 0), 1,
+        COALESCE(NEW.pnl, 0) > 0, COALESCE(NEW.pnl, 0) < 0, NEW.timestamp
+    )
+    ON CONFLICT(strategy_id) DO UPDATE SET
+        total_pnl     = total_pnl + excluded.total_pnl,
+        trade_count   = trade_count + 1,
+        win_count     = win_count + excluded.win_count,
+        loss_count    = loss_count + excluded.loss_count,
+        last_trade_at = MAX(COALESCE(last_trade_at, ''), excluded.last_trade_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_perf_update
+AFTER UPDATE OF status, pnl, strategy_id ON orders
+BEGIN
+    UPDATE strategy_performance SET
+        total_pnl   = total_pnl - COALESCE(OLD.pnl, 0),
+        trade_count = trade_count - 1,
+        win_count   = win_count - (COALESCE(OLD.pnl, 0) > 0),
+        loss_count  = loss_count - (COALESCE(OLD.pnl, 0) < 0)
+    WHERE strategy_id = OLD.strategy_id AND OLD.status IN ('filled', 'FILLED');
+
+    INSERT INTO strategy_performance
+        (strategy_id, total_pnl, trade_count, win_count, loss_count, last_trade_at)
+    SELECT
+        NEW.strategy_id, COALESCE(NEW.pnl, 0), 1,
+        COALESCE(NEW.pnl, 0) > 0, COALESCE(NEW.pnl, 0) < 0, NEW.timestamp
+    WHERE NEW.strategy_id IS NOT NULL AND NEW.status IN ('filled', 'FILLED')
+    ON CONFLICT(strategy_id) DO UPDATE SET
+        total_pnl     = total_pnl + excluded.total_pnl,
+        trade_count   = trade_count + 1,
+        win_count     = win_count + excluded.win_count,
+        loss_count    = loss_count + excluded.loss_count,
+        last_trade_at = MAX(COALESCE(last_trade_at, ''), excluded.last_trade_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_perf_delete
+AFTER DELETE ON orders
+WHEN OLD.strategy_id IS NOT NULL AND OLD.status IN ('filled', 'FILLED')
+BEGIN
+    UPDATE strategy_performance SET
+        total_pnl   = total_pnl - COALESCE(OLD.pnl, 0),
+        trade_count = trade_count - 1,
+        win_count   = win_count - (COALESCE(OLD.pnl, 0) > 0),
+        loss_count  = loss_count - (COALESCE(OLD.pnl, 0) < 0)
+    WHERE strategy_id = OLD.strategy_id;
+END;
+"""
+
+
+async def _rebuild_strategy_performance(db: aiosqlite.Connection) -> None:
+    """Recompute strategy_performance from scratch (first run on an existing DB)."""
+    await db.execute("DELETE FROM strategy_performance")
+    await db.execute(
+        """
+        INSERT INTO strategy_performance
+            (strategy_id, total_pnl, trade_count, win_count, loss_count, last_trade_at)
+        SELECT strategy_id,
+               COALESCE(SUM(pnl), 0),
+               COUNT(*),
+               SUM(COALESCE(pnl, 0) > 0),
+               SUM(COALESCE(pnl, 0) < 0),
+               MAX(timestamp)
+        FROM orders
+        WHERE strategy_id IS NOT NULL AND status IN ('filled', 'FILLED')
+        GROUP BY strategy_id
+        """
+    )
+
+
 async def _seed_defaults(db: aiosqlite.Connection) -> None:
     """Populate kv_store with defaults if they don't exist yet."""
     # Single query: which namespaces already have rows?
@@ -222,12 +332,155 @@ async def _seed_defaults(db: aiosqlite.Connection) -> None:
     await db.commit()
 
 
+# ── Keyset pagination ─────────────────────────────────────────────────────────
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(ts: str, row_id: str) -> str:
+    """Encode the (timestamp, id) of the last row on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{ts}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor(). Raises ValueError on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+    except Exception as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+    return ts, row_id
+
+
+async def _keyset_page(
+    table: str,
+    ts_col: str,
+    *,
+    filters: Dict[str, Any],
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return one page of ``table`` newest-first plus the cursor for the next page.
+
+    Pages are anchored on (ts_col, id) rather than OFFSET, so page N costs the
+    same index range scan as page 1. ``filters`` are equality matches; None
+    values are ignored. ``table`` / ``ts_col`` are trusted internal names.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    conditions: List[str] = []
+    params: List[Any] = []
+    for column, value in filters.items():
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        conditions.append(f"{ts_col} >= ?")
+        params.append(since)
+    if until:
+        conditions.append(f"{ts_col} < ?")
+        params.append(until)
+    if cursor:
+        cur_ts, cur_id = decode_cursor(cursor)
+        conditions.append(f"({ts_col}, id) < (?, ?)")
+        params += [cur_ts, cur_id]
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    params.append(limit + 1)
+
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"SELECT * FROM {table} {where} ORDER BY {ts_col} DESC, id DESC LIMIT ?",
+            params,
+        ) as cur:
+            rows = [dict(r) for r in await cur.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][ts_col], rows[-1]["id"])
+    return rows, next_cursor
+
+
+async def query_orders(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    instrument: Optional[str] = None,
+    strategy_id: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated orders, newest first. Returns (rows, next_cursor)."""
+    return await _keyset_page(
+        "orders", "timestamp",
+        filters={"instrument": instrument, "strategy_id": strategy_id, "status": status},
+        since=since, until=until, cursor=cursor, limit=limit,
+    )
+
+
+async def query_positions(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    open_only: bool = True,
+    instrument: Optional[str] = None,
+    strategy_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated positions ordered by opened_at, newest first."""
+    return await _keyset_page(
+        "positions", "opened_at",
+        filters={
+            "is_open": 1 if open_only else None,
+            "instrument": instrument,
+            "strategy_id": strategy_id,
+        },
+        since=since, until=until, cursor=cursor, limit=limit,
+    )
+
+
+async def query_alerts(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    symbol: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated alerts ordered by created_at, newest first."""
+    return await _keyset_page(
+        "alerts", "created_at",
+        filters={"symbol": symbol, "status": status},
+        since=since, until=until, cursor=cursor, limit=limit,
+    )
+
+
+async def query_audit_logs(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated audit log, newest first."""
+    await audit_writer.flush()
+    return await _keyset_page(
+        "audit_logs", "timestamp",
+        filters={"user_id": user_id or None, "action": action or None},
+        since=since, until=until, cursor=cursor, limit=limit,
+    )
+
+
 # ── Orders ────────────────────────────────────────────────────────────────────
 
-async def list_orders() -> List[Dict[str, Any]]:
+async def list_orders(limit: int = 200) -> List[Dict[str, Any]]:
     async with aiosqlite.connect(DB_PATH) as db:
         db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM orders ORDER BY timestamp DESC LIMIT 200") as cur:
+        async with db.execute("SELECT * FROM orders ORDER BY timestamp DESC LIMIT ?", (limit,)) as cur:
             rows = await cur.fetchall()
     return [dict(r) for r in rows]
 
@@ -238,6 +491,8 @@ async def create_order(
     order_type: str = "MARKET",
     quantity: float = 0.0,
     price: Optional[float] = None,
+    strategy_id: Optional[str] = None,
+    exchange_order_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     order = {
         "id": f"ORD-{uuid.uuid4().hex[:8].upper()}",
@@ -248,15 +503,19 @@ async def create_order(
         "price": price,
         "status": "PENDING",
         "filled_qty": 0.0,
+        "strategy_id": strategy_id,
+        "exchange_order_id": exchange_order_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
             """
-            INSERT INTO orders (id, instrument, side, type, quantity, price, status, filled_qty, timestamp)
-            VALUES (:id, :instrument, :side, :type, :quantity, :price, :status, :filled_qty, :timestamp)
+            INSERT INTO orders (id, instrument, side, type, quantity, price, status, filled_qty,
+                                strategy_id, exchange_order_id, timestamp, ts_ns)
+            VALUES (:id, :instrument, :side, :type, :quantity, :price, :status, :filled_qty,
+                    :strategy_id, :exchange_order_id, :timestamp, :ts_ns)
             """,
-            order,
+            {**order, "ts_ns": iso_to_ns(order["timestamp"])},
         )
         await db.commit()
     return order
@@ -301,10 +560,12 @@ async def create_alert(
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
             """
-            INSERT INTO alerts (id, symbol, condition, price, message, status, created_at, triggered_at)
-            VALUES (:id, :symbol, :condition, :price, :message, :status, :created_at, :triggered_at)
+            INSERT INTO alerts (id, symbol, condition, price, message, status, created_at, triggered_at,
+                                created_ns)
+            VALUES (:id, :symbol, :condition, :price, :message, :status, :created_at, :triggered_at,
+                    :created_ns)
             """,
-            alert,
+            {**alert, "created_ns": iso_to_ns(alert["created_at"])},
         )
         await db.commit()
     return alert
@@ -548,6 +809,15 @@ async def delete_strategy(strategy_id: str) -> bool:
         return cur.rowcount > 0
 
 
+async def get_strategy_performance() -> Dict[str, Dict[str, Any]]:
+    """Return live fill aggregates for every strategy, keyed by strategy_id (one query)."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute("SELECT * FROM strategy_performance") as cur:
+            rows = await cur.fetchall()
+    return {r["strategy_id"]: dict(r) for r in rows}
+
+
 # ── Positions ─────────────────────────────────────────────────────────────────
 
 async def list_db_positions(open_only: bool = True) -> List[Dict[str, Any]]:
@@ -562,34 +832,95 @@ async def list_db_positions(open_only: bool = True) -> List[Dict[str, Any]]:
     return [dict(r) for r in rows]
 
 
-async def save_positions(positions: List[Dict[str, Any]], strategy_id: str = "") -> None:
-    """Upsert a list of position dicts (from backtest results) into DB."""
+# Columns written by save_positions, in bind order; content_hash covers all of them
+_POSITION_COLUMNS = (
+    "id", "instrument", "side", "quantity", "entry_price", "exit_price",
+    "pnl", "is_open", "strategy_id", "opened_at", "closed_at", "opened_ns",
+)
+_POSITION_UPDATES = ", ".join(f"{c} = excluded.{c}" for c in _POSITION_COLUMNS[1:])
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_IN_CHUNK = 500
+
+
+def _position_hash(row: tuple) -> str:
+    return hashlib.blake2b(repr(row).encode(), digest_size=16).hexdigest()
+
+
+async def save_positions(positions: List[Dict[str, Any]], strategy_id: str = "") -> Dict[str, Any]:
+    """
+    Bulk-upsert position dicts (backtest results, exchange sync) in one
+    transaction.  Rows whose content hash matches the stored one are not
+    written.  Returns the change set::
+
+        {"inserted": [position, ...], "updated": [position, ...], "unchanged": n}
+
+    A position without ``opened_at`` keeps the stored one (or gets now).
+    """
     now = datetime.now(timezone.utc).isoformat()
+    ids = [p.get("id") or f"POS-{uuid.uuid4().hex[:8].upper()}" for p in positions]
+    inserted: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    writes: List[tuple] = []
+
     async with aiosqlite.connect(DB_PATH) as db:
-        for p in positions:
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO positions
-                    (id, instrument, side, quantity, entry_price, exit_price,
-                     pnl, is_open, strategy_id, opened_at, closed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        # Take the write lock first so the diff can't race another writer
+        await db.execute("BEGIN IMMEDIATE")
+        existing: Dict[str, tuple] = {}
+        unique_ids = list(dict.fromkeys(ids))
+        for i in range(0, len(unique_ids), _IN_CHUNK):
+            chunk = unique_ids[i:i + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT id, content_hash, opened_at FROM positions WHERE id IN ({marks})", chunk
+            ) as cur:
+                for pid, digest, opened_at in await cur.fetchall():
+                    existing[pid] = (digest, opened_at)
+
+        latest: Dict[str, int] = {}
+        for pos_id, p in zip(ids, positions):
+            stored = existing.get(pos_id)
+            opened_at = p.get("opened_at") or (stored[1] if stored else now)
+            row = (
+                pos_id,
+                p.get("instrument", "UNKNOWN"),
+                p.get("side", "LONG"),
+                float(p.get("quantity", 0)),
+                p.get("entry_price"),
+                p.get("exit_price"),
+                float(p.get("pnl", 0)),
+                1 if p.get("is_open", False) else 0,
+                strategy_id,
+                opened_at,
+                p.get("closed_at"),
+                iso_to_ns(opened_at),
+            )
+            digest = _position_hash(row)
+            if stored is not None and stored[0] == digest:
+                continue
+            if pos_id in latest:  # duplicate id in one batch: last one wins
+                writes[latest[pos_id]] = None
+            latest[pos_id] = len(writes)
+            writes.append(row + (digest,))
+
+        writes = [w for w in writes if w is not None]
+        if writes:
+            await db.executemany(
+                f"""
+                INSERT INTO positions ({", ".join(_POSITION_COLUMNS)}, content_hash)
+                VALUES ({", ".join("?" * (len(_POSITION_COLUMNS) + 1))})
+                ON CONFLICT(id) DO UPDATE SET {_POSITION_UPDATES}, content_hash = excluded.content_hash
+                WHERE positions.content_hash IS NOT excluded.content_hash
                 """,
-                (
-                    p.get("id", f"POS-{uuid.uuid4().hex[:8].upper()}"),
-                    p.get("instrument", "UNKNOWN"),
-                    p.get("side", "LONG"),
-                    float(p.get("quantity", 0)),
-                    p.get("entry_price"),
-                    p.get("exit_price"),
-                    float(p.get("pnl", 0)),
-                    1 if p.get("is_open", False) else 0,
-                    strategy_id,
-                    p.get("opened_at", now),
-                    p.get("closed_at"),
-                ),
+                writes,
             )
         await db.commit()
 
+    for w in writes:
+        pos = dict(zip(_POSITION_COLUMNS, w))
+        pos["is_open"] = bool(pos["is_open"])
+        (updated if w[0] in existing else inserted).append(pos)
+    return {"inserted": inserted, "updated": updated, "unchanged": len(positions) - len(writes)}
+
 
 async def close_db_position(position_id: str) -> bool:
     now = datetime.now(timezone.utc).isoformat()
@@ -713,13 +1044,13 @@ async def get_daily_realized_loss() -> float:
     Return the total realized loss from filled orders today (UTC).
     Loss is a negative number; we return its absolute value is implied by callers.
     """
-    from datetime import datetime, timezone
-    today = datetime.now(timezone.utc).date().isoformat()
+    start, end = day_bounds_ns(datetime.now(timezone.utc).date().isoformat())
     async with aiosqlite.connect(DB_PATH) as db:
+        # Range scan on idx_orders_status_ts_ns
         async with db.execute(
             """SELECT COALESCE(SUM(pnl), 0) FROM orders
-               WHERE status='filled' AND date(timestamp)=? AND pnl < 0""",
-            (today,),
+               WHERE status='filled' AND ts_ns >= ? AND ts_ns < ? AND pnl < 0""",
+            (start, end),
         ) as cur:
             row = await cur.fetchone()
     return float(row[0]) if row and row[0] is not None else 0.0
@@ -727,12 +1058,12 @@ async def get_daily_realized_loss() -> float:
 
 async def count_orders_today() -> int:
     """Return the number of orders created today (UTC)."""
-    from datetime import datetime, timezone
-    today = datetime.now(timezone.utc).date().isoformat()
+    start, end = day_bounds_ns(datetime.now(timezone.utc).date().isoformat())
     async with aiosqlite.connect(DB_PATH) as db:
+        # Covered by idx_orders_ts_ns — counts index entries only
         async with db.execute(
-            "SELECT COUNT(*) FROM orders WHERE date(timestamp)=?",
-            (today,),
+            "SELECT COUNT(*) FROM orders WHERE ts_ns >= ? AND ts_ns < ?",
+            (start, end),
         ) as cur:
             row = await cur.fetchone()
     return int(row[0]) if row and row[0] is not None else 0
@@ -802,10 +1133,10 @@ async def update_user_password(user_id: str, hashed_password: str) -> bool:
 
 async def seed_admin_user(admin_password: str) -> None:
     """Ensure the admin user exists in the DB; creates it if absent."""
-    import bcrypt as _bcrypt
+    from auth_jwt import hash_password_async
     existing = await get_user("admin")
     if not existing:
-        hashed = _bcrypt.hashpw(admin_password.encode(), _bcrypt.gensalt()).decode()
+        hashed = await hash_password_async(admin_password)
         try:
             await create_user("admin", hashed, role="admin")
         except ValueError:
@@ -865,22 +1196,25 @@ async def log_action(
     details: str = "",
     ip_address: str = "",
 ) -> None:
-    """Append an audit log entry."""
-    import uuid as _uuid
-    entry = {
-        "id": f"AUD-{_uuid.uuid4().hex[:8].upper()}",
+    """Append an audit log entry (buffered; see audit_log.AuditWriter)."""
+    await audit_writer.submit({
+        "id": f"AUD-{uuid.uuid4().hex[:8].upper()}",
         "user_id": user_id,
         "action": action,
         "resource": resource,
         "details": details,
         "ip_address": ip_address,
         "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    })
+
+
+async def insert_audit_entries(entries: List[Dict[str, Any]]) -> None:
+    """Insert a batch of audit entries in one transaction."""
     async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """INSERT INTO audit_logs (id, user_id, action, resource, details, ip_address, timestamp)
-               VALUES (:id, :user_id, :action, :resource, :details, :ip_address, :timestamp)""",
-            entry,
+        await db.executemany(
+            """INSERT INTO audit_logs (id, user_id, action, resource, details, ip_address, timestamp, ts_ns)
+               VALUES (:id, :user_id, :action, :resource, :details, :ip_address, :timestamp, :ts_ns)""",
+            [{**e, "ts_ns": e.get("ts_ns") or iso_to_ns(e["timestamp"])} for e in entries],
         )
         await db.commit()
 
@@ -892,6 +1226,7 @@ async def get_audit_logs(
     action: str = "",
 ) -> list:
     """Return audit log entries, optionally filtered by user_id or action."""
+    await audit_writer.flush()
     conditions = []
     params: list = []
     if user_id:
@@ -935,6 +1270,16 @@ async def is_token_revoked(jti: str) -> bool:
             return await cur.fetchone() is not None
 
 
+async def list_revoked_tokens() -> List[Tuple[str, str]]:
+    """Return (jti, expires_at) for every revoked token that has not yet expired."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(
+            "SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > ?",
+            (datetime.now(timezone.utc).isoformat(),),
+        ) as cur:
+            return [(r[0], r[1]) for r in await cur.fetchall()]
+
+
 async def purge_expired_revoked_tokens() -> int:
     """Delete expired tokens from the blacklist. Returns count removed."""
     async with aiosqlite.connect(DB_PATH) as db:
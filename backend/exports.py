@@ -0,0 +1,305 @@
+"""
+Order Exports
+=============
+Streaming exports for ``GET /api/performance/export`` that run in constant
+memory and never block the event loop, however many orders there are.
+
+    csv, parquet   streamed: one read cursor walks the orders table
+                   EXPORT_CHUNK_ROWS rows at a time (``fetchmany``); each
+                   chunk is encoded in a worker thread (CSV text or one
+                   Parquet row group) and sent before the next is read
+    xlsx, pdf      rendered on the export pool (spawned worker processes
+                   by default; EXPORT_EXECUTOR=thread to share the process)
+                   into a temp file, then streamed from disk and deleted.
+                   XLSX uses openpyxl's write-only mode; PDF draws page by
+                   page on a reportlab canvas and stops after
+                   EXPORT_PDF_MAX_ROWS rows (noted on the last page)
+
+The main DB is in WAL mode, so the long-lived read cursor never blocks
+order writes.  Parquet needs ``pyarrow`` (installed with nautilus_trader).
+"""
+
+import asyncio
+import csv
+import io
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import aiosqlite
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_EXECUTOR = os.getenv("EXPORT_EXECUTOR", "process").lower()
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_PDF_MAX_ROWS = int(os.getenv("EXPORT_PDF_MAX_ROWS", "50000"))
+
+COLUMNS = ("id", "instrument", "side", "type", "quantity", "price", "status", "filled_qty", "pnl", "timestamp")
+HEADERS = ("ID", "Instrument", "Side", "Type", "Quantity", "Price", "Status", "Filled Qty", "PnL", "Timestamp")
+_SELECT = f"SELECT {', '.join(COLUMNS)} FROM orders ORDER BY ts_ns DESC, id DESC"
+_FILE_CHUNK = 256 * 1024
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+
+def check_format(fmt: str) -> None:
+    """Raise ValueError if ``fmt`` can't be produced on this install."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires the 'pyarrow' package")
+
+
+# ── Streamed formats ──────────────────────────────────────────────────────────
+
+class _Sink:
+    """Write-only file object whose bytes are drained after every chunk."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+class _CsvEncoder:
+    def __init__(self) -> None:
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+        self._writer.writerow(HEADERS)
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        self._writer.writerows(rows)
+        out = self._buf.getvalue().encode()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return out
+
+    def finish(self) -> bytes:
+        return self._buf.getvalue().encode()
+
+
+class _ParquetEncoder:
+    def __init__(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            (c, pa.float64() if c in ("quantity", "price", "filled_qty", "pnl") else pa.string())
+            for c in COLUMNS
+        ])
+        self._sink = _Sink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(col, type=field.type) for col, field in zip(columns, self._schema)],
+            schema=self._schema,
+        ))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+async def stream_rows(db_path: Path, chunk: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[List[tuple]]:
+    """Orders newest first, ``chunk`` rows at a time, from one read cursor."""
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(_SELECT) as cur:
+            while True:
+                rows = await cur.fetchmany(chunk)
+                if not rows:
+                    return
+                yield rows
+
+
+async def stream_export(fmt: str, db_path: Path, chunk: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[bytes]:
+    """Response body for a csv / parquet export."""
+    encoder = await asyncio.to_thread(_CsvEncoder if fmt == "csv" else _ParquetEncoder)
+    async for rows in stream_rows(db_path, chunk):
+        data = await asyncio.to_thread(encoder.encode, rows)
+        if data:
+            yield data
+    tail = await asyncio.to_thread(encoder.finish)
+    if tail:
+        yield tail
+
+
+# ── Rendered formats (export pool) ────────────────────────────────────────────
+
+def _iter_rows(db_path: str, chunk: int) -> Iterator[tuple]:
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.execute(_SELECT)
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
+def _render_xlsx(db_path: str, out_path: str, chunk: int) -> int:
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)  # rows go to a temp file, not memory
+    ws = wb.create_sheet("Performance")
+    ws.append(HEADERS)
+    count = 0
+    for row in _iter_rows(db_path, chunk):
+        ws.append(row)
+        count += 1
+    wb.save(out_path)
+    return count
+
+
+def _render_pdf(db_path: str, out_path: str, chunk: int, max_rows: int) -> int:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    headers = ("ID", "Instrument", "Side", "Qty", "Price", "Status", "PnL", "Timestamp")
+    picks = (0, 1, 2, 4, 5, 6, 8, 9)
+    widths = (90, 120, 50, 70, 80, 80, 80, 130)
+    width, height = landscape(A4)
+    margin, line = 36, 14
+    per_page = int((height - 2 * margin - 40) // line)
+
+    c = canvas.Canvas(out_path, pagesize=(width, height), pageCompression=1)
+
+    def page_header(title: bool) -> float:
+        y = height - margin
+        if title:
+            c.setFont("Helvetica-Bold", 16)
+            c.drawString(margin, y - 16, "Nautilus — Performance Report")
+            y -= 30
+        c.setFillColor(colors.HexColor("#1e3a5f"))
+        c.rect(margin, y - line + 3, sum(widths), line, fill=1, stroke=0)
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 8)
+        x = margin
+        for h, w in zip(headers, widths):
+            c.drawString(x + 2, y - line + 7, h)
+            x += w
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", 8)
+        return y - line
+
+    y, on_page, count, truncated = page_header(True), 0, 0, False
+    for row in _iter_rows(db_path, chunk):
+        if count >= max_rows:
+            truncated = True
+            break
+        if on_page >= per_page:
+            c.showPage()
+            y, on_page = page_header(False), 0
+        if on_page % 2:
+            c.setFillColor(colors.HexColor("#f0f4f8"))
+            c.rect(margin, y - line + 3, sum(widths), line, fill=1, stroke=0)
+            c.setFillColor(colors.black)
+        x = margin
+        for i, w in zip(picks, widths):
+            value = row[i]
+            text = "" if value is None else str(value)
+            c.drawString(x + 2, y - line + 7, text[:19] if i == 9 else text)
+            x += w
+        y -= line
+        on_page += 1
+        count += 1
+    if truncated:
+        c.setFont("Helvetica-Oblique", 8)
+        c.drawString(margin, margin / 2, f"Truncated to the newest {max_rows} orders — use CSV or Parquet for the full history.")
+    c.save()
+    return count
+
+
+def render_file(fmt: str, db_path: str, out_path: str, chunk: int = EXPORT_CHUNK_ROWS,
+                pdf_max_rows: int = EXPORT_PDF_MAX_ROWS) -> int:
+    """Pool entry point: write an xlsx / pdf export to ``out_path``; returns rows written."""
+    if fmt == "xlsx":
+        return _render_xlsx(db_path, out_path, chunk)
+    return _render_pdf(db_path, out_path, chunk, pdf_max_rows)
+
+
+_export_pool: Optional[Executor] = None
+
+
+def _pool() -> Executor:
+    global _export_pool
+    if _export_pool is None:
+        if EXPORT_EXECUTOR == "process":
+            # spawn, not fork: the server process already runs aiosqlite / bcrypt / audit threads
+            _export_pool = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _export_pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+    return _export_pool
+
+
+def shutdown_export_pool() -> None:
+    """Release pool workers (called on app shutdown; recreated on next use)."""
+    global _export_pool
+    if _export_pool is not None:
+        _export_pool.shutdown(wait=False, cancel_futures=True)
+        _export_pool = None
+
+
+async def render_export(fmt: str, db_path: Path) -> Path:
+    """Render on the export pool; the caller streams and deletes the file."""
+    fd, out = tempfile.mkstemp(prefix="nautilus_export_", suffix=f".{FORMATS[fmt][1]}")
+    os.close(fd)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_pool(), render_file, fmt, str(db_path), out)
+    except BaseException:
+        Path(out).unlink(missing_ok=True)
+        raise
+    return Path(out)
+
+
+async def stream_file(path: Path) -> AsyncIterator[bytes]:
+    """Read a rendered export in chunks off the event loop, then delete it."""
+    try:
+        with open(path, "rb") as fh:
+            while True:
+                data = await asyncio.to_thread(fh.read, _FILE_CHUNK)
+                if not data:
+                    return
+                yield data
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,408 @@
+"""
+Fake Binance Exchange
+=====================
+A local stand-in for the Binance spot API, so load tests and capacity
+runs never touch api.binance.com:
+
+    GET    /api/v3/ping, /api/v3/time
+    GET    /api/v3/ticker/24hr     ?symbol=X | ?symbols=["X","Y"] | all
+    GET    /api/v3/ticker/price    ?symbol=X | all
+    POST   /api/v3/order           MARKET fills at the last price; LIMIT rests unless marketable
+    DELETE /api/v3/order           ?symbol=&orderId=
+    GET    /api/v3/order, /api/v3/openOrders
+    GET    /api/v3/account         balances move with fills
+    WS     /ws/<symbol>@ticker     a 24hrTicker event every ws_interval_ms
+    WS     /stream?streams=a@ticker/b@ticker   combined: {"stream": ..., "data": ...}
+
+Prices are a seeded random walk per symbol, starting from
+market_data_service's fallback values and stepped every ws_interval_ms.
+Signatures are not checked; any API key is accepted.
+
+Fault injection (FAKE_EXCHANGE_* env defaults, changed at runtime with
+``POST /_fake/config``):
+
+    latency_ms, jitter_ms   added to every REST response (uniform jitter)
+    error_rate              share of REST requests answered 500 {"code": -1000}
+    throttle_rate           share answered 429 {"code": -1003} + Retry-After
+    ws_drop_rate            chance per WS message that the stream is closed
+
+``GET /_fake/stats`` has request counts per endpoint and injected faults;
+``POST /_fake/reset`` clears stats, orders and balances.
+
+    cd backend
+    python fake_exchange.py --port 9100 --latency-ms 40 --error-rate 0.01
+    BINANCE_BASE_URL=http://127.0.0.1:9100 BINANCE_WS_URL=ws://127.0.0.1:9100 python nautilus_fastapi.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl
+
+from fastapi import Depends, FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+import market_data_service as svc
+
+QUOTE_ASSET = "USDT"
+STARTING_BALANCES = {QUOTE_ASSET: 100_000.0, **{s[:-4]: 0.0 for s in svc.SYMBOLS}}
+
+
+@dataclass
+class FakeExchangeConfig:
+    latency_ms: float = float(os.getenv("FAKE_EXCHANGE_LATENCY_MS", "0"))
+    jitter_ms: float = float(os.getenv("FAKE_EXCHANGE_JITTER_MS", "0"))
+    error_rate: float = float(os.getenv("FAKE_EXCHANGE_ERROR_RATE", "0"))
+    throttle_rate: float = float(os.getenv("FAKE_EXCHANGE_THROTTLE_RATE", "0"))
+    ws_drop_rate: float = float(os.getenv("FAKE_EXCHANGE_WS_DROP_RATE", "0"))
+    ws_interval_ms: float = float(os.getenv("FAKE_EXCHANGE_WS_INTERVAL_MS", "1000"))
+    seed: int = int(os.getenv("FAKE_EXCHANGE_SEED", "7"))
+
+
+class BinanceError(Exception):
+    """Answered as Binance does: ``{"code": <negative int>, "msg": ...}``."""
+
+    def __init__(self, status: int, code: int, msg: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(msg)
+        self.status, self.code, self.msg, self.headers = status, code, msg, headers
+
+
+class FakeExchange:
+    """Market, order book-less matching and account state behind the app."""
+
+    def __init__(self, config: FakeExchangeConfig) -> None:
+        self.config = config
+        self.reset()
+
+    def reset(self) -> None:
+        self.rng = random.Random(self.config.seed)
+        self.fault_rng = random.Random(self.config.seed + 1)
+        self.tickers: Dict[str, Dict[str, float]] = {}
+        for symbol in svc.SYMBOLS:
+            fb = svc._fallback_for(symbol)
+            self.tickers[symbol] = {"open": fb["price"], "last": fb["price"], "high": fb["price"],
+                                    "low": fb["price"], "volume": 0.0, "quote_volume": fb["volume_24h"],
+                                    "count": 0}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.balances = dict(STARTING_BALANCES)
+        self.next_order_id = 1
+        self.stats: Counter = Counter()
+        self.faults: Counter = Counter()
+        self.ws_clients = 0
+
+    # ── Market ────────────────────────────────────────────────────────────────
+
+    def step(self) -> None:
+        """Advance every symbol's random walk by one tick."""
+        for t in self.tickers.values():
+            t["last"] = max(t["last"] * (1 + self.rng.gauss(0, 0.0005)), 1e-8)
+            t["high"], t["low"] = max(t["high"], t["last"]), min(t["low"], t["last"])
+            qty = abs(self.rng.gauss(0, 1))
+            t["volume"] += qty
+            t["quote_volume"] += qty * t["last"]
+            t["count"] += 1
+
+    def _symbol(self, symbol: Optional[str]) -> str:
+        upper = (symbol or "").upper()
+        if upper not in self.tickers:
+            raise BinanceError(400, -1121, "Invalid symbol.")
+        return upper
+
+    def ticker_24hr(self, symbol: str) -> Dict[str, Any]:
+        t = self.tickers[symbol]
+        spread = t["last"] * 0.0001
+        now = int(time.time() * 1000)
+        return {
+            "symbol": symbol,
+            "priceChange": f"{t['last'] - t['open']:.8f}",
+            "priceChangePercent": f"{(t['last'] / t['open'] - 1) * 100:.3f}",
+            "lastPrice": f"{t['last']:.8f}",
+            "bidPrice": f"{t['last'] - spread:.8f}",
+            "askPrice": f"{t['last'] + spread:.8f}",
+            "openPrice": f"{t['open']:.8f}",
+            "highPrice": f"{t['high']:.8f}",
+            "lowPrice": f"{t['low']:.8f}",
+            "volume": f"{t['volume']:.8f}",
+            "quoteVolume": f"{t['quote_volume']:.8f}",
+            "openTime": now - 86_400_000,
+            "closeTime": now,
+            "count": t["count"],
+        }
+
+    def ticker_event(self, symbol: str) -> Dict[str, Any]:
+        """The ``<symbol>@ticker`` stream payload."""
+        t = self.ticker_24hr(symbol)
+        return {"e": "24hrTicker", "E": t["closeTime"], "s": symbol, "p": t["priceChange"],
+                "P": t["priceChangePercent"], "c": t["lastPrice"], "b": t["bidPrice"], "a": t["askPrice"],
+                "o": t["openPrice"], "h": t["highPrice"], "l": t["lowPrice"], "v": t["volume"],
+                "q": t["quoteVolume"], "n": t["count"]}
+
+    # ── Orders ────────────────────────────────────────────────────────────────
+
+    def new_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+        symbol = self._symbol(params.get("symbol"))
+        side = params.get("side", "").upper()
+        order_type = params.get("type", "").upper()
+        if side not in ("BUY", "SELL"):
+            raise BinanceError(400, -1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+        if order_type not in ("MARKET", "LIMIT"):
+            raise BinanceError(400, -1116, "Invalid orderType.")
+        try:
+            qty = float(params.get("quantity", "0"))
+            price = float(params["price"]) if order_type == "LIMIT" else None
+        except (KeyError, ValueError):
+            raise BinanceError(400, -1102, "Mandatory parameter 'price' was not sent, was empty/null, or malformed.")
+        if qty <= 0:
+            raise BinanceError(400, -1013, "Invalid quantity.")
+
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        order = {
+            "symbol": symbol, "orderId": order_id,
+            "clientOrderId": params.get("newClientOrderId") or f"fake-{order_id}",
+            "transactTime": int(time.time() * 1000), "price": f"{price or 0:.8f}",
+            "origQty": f"{qty:.8f}", "executedQty": "0.00000000", "cummulativeQuoteQty": "0.00000000",
+            "status": "NEW", "timeInForce": params.get("timeInForce", "GTC"), "type": order_type,
+            "side": side, "fills": [],
+        }
+        last = self.tickers[symbol]["last"]
+        if order_type == "MARKET" or (side == "BUY" and price >= last) or (side == "SELL" and price <= last):
+            self._fill(order, qty, last)
+        self.orders[order_id] = order
+        return order
+
+    def _fill(self, order: Dict[str, Any], qty: float, price: float) -> None:
+        base = order["symbol"][:-len(QUOTE_ASSET)]
+        sign = 1 if order["side"] == "BUY" else -1
+        self.balances[base] = self.balances.get(base, 0.0) + sign * qty
+        self.balances[QUOTE_ASSET] -= sign * qty * price
+        order.update(status="FILLED", executedQty=f"{qty:.8f}", cummulativeQuoteQty=f"{qty * price:.8f}",
+                     fills=[{"price": f"{price:.8f}", "qty": f"{qty:.8f}", "commission": "0",
+                             "commissionAsset": QUOTE_ASSET}])
+
+    def get_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            order = self.orders[int(params.get("orderId", "0"))]
+        except (KeyError, ValueError):
+            raise BinanceError(400, -2013, "Order does not exist.")
+        return order
+
+    def cancel_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+        order = self.get_order(params)
+        if order["status"] != "NEW":
+            raise BinanceError(400, -2011, "Unknown order sent.")
+        order["status"] = "CANCELED"
+        return order
+
+    def account(self) -> Dict[str, Any]:
+        return {
+            "makerCommission": 10, "takerCommission": 10, "canTrade": True, "canWithdraw": True,
+            "canDeposit": True, "accountType": "SPOT", "updateTime": int(time.time() * 1000),
+            "balances": [{"asset": a, "free": f"{v:.8f}", "locked": "0.00000000"} for a, v in self.balances.items()],
+            "permissions": ["SPOT"],
+        }
+
+    # ── Fault injection ───────────────────────────────────────────────────────
+
+    async def inject(self, request: Request) -> None:
+        """Per-request dependency: count, delay, then maybe fail."""
+        self.stats[f"{request.method} {request.url.path}"] += 1
+        cfg = self.config
+        delay = cfg.latency_ms + (self.fault_rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = self.fault_rng.random()
+        if roll < cfg.throttle_rate:
+            self.faults["throttled"] += 1
+            raise BinanceError(429, -1003, "Too many requests; current limit is 1200 request weight per 1 MINUTE.",
+                               {"Retry-After": "1"})
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            self.faults["errors"] += 1
+            raise BinanceError(500, -1000, "An unknown error occurred while processing the request.")
+
+
+async def _params(request: Request) -> Dict[str, str]:
+    """Binance takes parameters in the query string or a urlencoded body."""
+    params = dict(request.query_params)
+    body = await request.body()
+    if body:
+        params.update(parse_qsl(body.decode()))
+    return params
+
+
+def create_app(config: Optional[FakeExchangeConfig] = None) -> FastAPI:
+    exchange = FakeExchange(config or FakeExchangeConfig())
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async def ticker_loop():
+            while True:
+                await asyncio.sleep(exchange.config.ws_interval_ms / 1000)
+                exchange.step()
+
+        task = asyncio.create_task(ticker_loop())
+        yield
+        task.cancel()
+
+    app = FastAPI(title="Fake Binance", lifespan=lifespan)
+    app.state.exchange = exchange
+    rest = [Depends(exchange.inject)]
+
+    @app.exception_handler(BinanceError)
+    async def binance_error(_request: Request, exc: BinanceError):
+        return JSONResponse({"code": exc.code, "msg": exc.msg}, status_code=exc.status, headers=exc.headers)
+
+    @app.get("/api/v3/ping", dependencies=rest)
+    async def ping():
+        return {}
+
+    @app.get("/api/v3/time", dependencies=rest)
+    async def server_time():
+        return {"serverTime": int(time.time() * 1000)}
+
+    @app.get("/api/v3/ticker/24hr", dependencies=rest)
+    async def ticker_24hr(symbol: Optional[str] = None, symbols: Optional[str] = None):
+        if symbol:
+            return exchange.ticker_24hr(exchange._symbol(symbol))
+        try:
+            wanted = json.loads(symbols) if symbols else list(exchange.tickers)
+        except ValueError:
+            raise BinanceError(400, -1100, "Illegal characters found in parameter 'symbols'.")
+        return [exchange.ticker_24hr(exchange._symbol(s)) for s in wanted]
+
+    @app.get("/api/v3/ticker/price", dependencies=rest)
+    async def ticker_price(symbol: Optional[str] = None):
+        wanted = [exchange._symbol(symbol)] if symbol else list(exchange.tickers)
+        prices = [{"symbol": s, "price": f"{exchange.tickers[s]['last']:.8f}"} for s in wanted]
+        return prices[0] if symbol else prices
+
+    @app.post("/api/v3/order", dependencies=rest)
+    async def new_order(request: Request):
+        return exchange.new_order(await _params(request))
+
+    @app.get("/api/v3/order", dependencies=rest)
+    async def get_order(request: Request):
+        return exchange.get_order(await _params(request))
+
+    @app.delete("/api/v3/order", dependencies=rest)
+    async def cancel_order(request: Request):
+        return exchange.cancel_order(await _params(request))
+
+    @app.get("/api/v3/openOrders", dependencies=rest)
+    async def open_orders(symbol: Optional[str] = None):
+        return [o for o in exchange.orders.values()
+                if o["status"] == "NEW" and (symbol is None or o["symbol"] == symbol.upper())]
+
+    @app.get("/api/v3/account", dependencies=rest)
+    async def account():
+        return exchange.account()
+
+    async def stream(websocket: WebSocket, streams: List[str], combined: bool) -> None:
+        symbols = []
+        for name in streams:
+            symbol, _, kind = name.partition("@")
+            if kind != "ticker" or symbol.upper() not in exchange.tickers:
+                await websocket.close(code=1008, reason=f"Unsupported stream {name}")
+                return
+            symbols.append((name, symbol.upper()))
+        await websocket.accept()
+        exchange.ws_clients += 1
+        try:
+            while True:
+                for name, symbol in symbols:
+                    if exchange.config.ws_drop_rate and exchange.fault_rng.random() < exchange.config.ws_drop_rate:
+                        exchange.faults["ws_dropped"] += 1
+                        await websocket.close(code=1011, reason="Injected disconnect")
+                        return
+                    event = exchange.ticker_event(symbol)
+                    await websocket.send_json({"stream": name, "data": event} if combined else event)
+                    exchange.stats["WS message"] += 1
+                await asyncio.sleep(exchange.config.ws_interval_ms / 1000)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            exchange.ws_clients -= 1
+
+    @app.websocket("/ws/{name}")
+    async def raw_stream(websocket: WebSocket, name: str):
+        await stream(websocket, [name], combined=False)
+
+    @app.websocket("/stream")
+    async def combined_stream(websocket: WebSocket, streams: str = ""):
+        await stream(websocket, [s for s in streams.split("/") if s], combined=True)
+
+    @app.get("/_fake/config")
+    async def get_config():
+        return asdict(exchange.config)
+
+    @app.post("/_fake/config")
+    async def update_config(updates: Dict[str, float]):
+        known = {f.name: f.type for f in fields(FakeExchangeConfig)}
+        unknown = set(updates) - set(known)
+        if unknown:
+            return JSONResponse({"detail": f"Unknown settings: {', '.join(sorted(unknown))}"}, status_code=400)
+        for name, value in updates.items():
+            setattr(exchange.config, name, int(value) if name == "seed" else float(value))
+        return asdict(exchange.config)
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return {"requests": dict(exchange.stats), "faults": dict(exchange.faults),
+                "ws_clients": exchange.ws_clients, "orders": exchange.next_order_id - 1}
+
+    @app.post("/_fake/reset")
+    async def reset():
+        exchange.reset()
+        return {"success": True}
+
+    return app
+
+
+@contextmanager
+def serve_in_thread(app, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run an ASGI app with uvicorn on a background thread; yields its base URL."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, name="fake-exchange", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("server failed to start")
+        time.sleep(0.01)
+    bound = server.servers[0].sockets[0].getsockname()
+    try:
+        yield f"http://{bound[0]}:{bound[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_EXCHANGE_PORT", "9100")))
+    config = FakeExchangeConfig()
+    for f in fields(FakeExchangeConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=f.type, default=getattr(config, f.name))
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = FakeExchangeConfig(**{f.name: getattr(args, f.name) for f in fields(FakeExchangeConfig)})
+    print(f"Fake Binance on http://{args.host}:{args.port} ({asdict(config)})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+"""
+Instrument Registry
+===================
+Indexed view over the instruments loaded from the Nautilus data catalog.
+
+    catalog.instruments() ──► InstrumentRegistry.load()
+                                  │  builds one immutable _Index snapshot:
+                                  │    by_id      {"EUR/USD.SIM": instrument}
+                                  │    by_symbol  {"EUR/USD": ["EUR/USD.SIM", …]}
+                                  │    by_venue   {"SIM": ["EUR/USD.SIM", …]}
+                                  │    meta       {"EUR/USD.SIM": {…serialized…}}
+                                  │    keys       sorted (search key, id) for prefix search
+                                  ▼
+              get / resolve / search / listing  — O(1) or O(log n + k)
+
+``load()`` runs in a worker thread during the background catalog preload,
+so it builds a complete new snapshot and swaps it in with one assignment;
+readers on the event loop never see a half-built index.
+
+Listing responses are cached per venue filter and discarded when a new
+snapshot is loaded.  ``catalog_fingerprint()`` is a cheap change detector
+(directory mtimes, not a file walk) used to decide when to reload.
+"""
+
+import bisect
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _enum_name(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return getattr(value, "name", None) or str(value)
+
+
+def serialize_instrument(instrument: Any) -> Dict[str, Any]:
+    """JSON-ready metadata for one Nautilus instrument (computed once per load)."""
+    iid = instrument.id
+    meta: Dict[str, Any] = {
+        "id": str(iid),
+        "symbol": str(iid.symbol),
+        "venue": str(iid.venue),
+        "type": type(instrument).__name__,
+    }
+    for attr in ("price_precision", "size_precision"):
+        value = getattr(instrument, attr, None)
+        if value is not None:
+            meta[attr] = int(value)
+    for attr in ("price_increment", "size_increment", "lot_size", "base_currency", "quote_currency"):
+        value = getattr(instrument, attr, None)
+        if value is not None:
+            meta[attr] = str(value)
+    meta["asset_class"] = _enum_name(getattr(instrument, "asset_class", None))
+    return meta
+
+
+def _search_keys(meta: Dict[str, Any]) -> Iterable[str]:
+    """Lower-cased keys an instrument is findable by ("eur/usd", "eurusd", …)."""
+    symbol = meta["symbol"].lower()
+    return {meta["id"].lower(), symbol, symbol.replace("/", "")}
+
+
+@dataclass(frozen=True)
+class _Index:
+    by_id: Dict[str, Any] = field(default_factory=dict)
+    by_symbol: Dict[str, List[str]] = field(default_factory=dict)
+    by_venue: Dict[str, List[str]] = field(default_factory=dict)
+    meta: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    keys: List[Tuple[str, str]] = field(default_factory=list)
+    version: int = 0
+    fingerprint: Optional[Tuple] = None
+
+
+class InstrumentRegistry:
+    """O(1) instrument lookup by id / symbol / venue with cached listings."""
+
+    def __init__(self) -> None:
+        self._index = _Index()
+        self._listing_cache: Dict[Tuple[int, Optional[str]], Dict[str, Any]] = {}
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    def load(self, instruments: Iterable[Any], fingerprint: Optional[Tuple] = None) -> int:
+        """Replace the index with ``instruments``; return the new version."""
+        by_id: Dict[str, Any] = {}
+        by_symbol: Dict[str, List[str]] = {}
+        by_venue: Dict[str, List[str]] = {}
+        meta: Dict[str, Dict[str, Any]] = {}
+        keys: List[Tuple[str, str]] = []
+        for instrument in instruments:
+            m = serialize_instrument(instrument)
+            iid = m["id"]
+            if iid in by_id:
+                continue
+            by_id[iid] = instrument
+            meta[iid] = m
+            by_symbol.setdefault(m["symbol"], []).append(iid)
+            by_venue.setdefault(m["venue"], []).append(iid)
+            keys.extend((k, iid) for k in _search_keys(m))
+        keys.sort()
+
+        index = _Index(
+            by_id=by_id,
+            by_symbol=by_symbol,
+            by_venue=by_venue,
+            meta=meta,
+            keys=keys,
+            version=self._index.version + 1,
+            fingerprint=fingerprint,
+        )
+        self._index = index
+        self._listing_cache = {}
+        return index.version
+
+    @property
+    def version(self) -> int:
+        return self._index.version
+
+    @property
+    def fingerprint(self) -> Optional[Tuple]:
+        return self._index.fingerprint
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._index.by_id)
+
+    def __contains__(self, instrument_id: str) -> bool:
+        return instrument_id in self._index.by_id
+
+    @property
+    def instruments(self) -> List[Any]:
+        return list(self._index.by_id.values())
+
+    def get(self, instrument_id: str) -> Optional[Any]:
+        return self._index.by_id.get(instrument_id)
+
+    def resolve(self, ref: str) -> Optional[Any]:
+        """Look up by full id, falling back to a symbol listed on exactly one venue."""
+        index = self._index
+        instrument = index.by_id.get(ref)
+        if instrument is not None:
+            return instrument
+        ids = index.by_symbol.get(ref)
+        if ids and len(ids) == 1:
+            return index.by_id[ids[0]]
+        return None
+
+    def by_symbol(self, symbol: str) -> List[Any]:
+        index = self._index
+        return [index.by_id[i] for i in index.by_symbol.get(symbol, ())]
+
+    def by_venue(self, venue: str) -> List[Any]:
+        index = self._index
+        return [index.by_id[i] for i in index.by_venue.get(venue, ())]
+
+    def metadata(self, instrument_id: str) -> Optional[Dict[str, Any]]:
+        return self._index.meta.get(instrument_id)
+
+    def venues(self) -> List[str]:
+        return sorted(self._index.by_venue)
+
+    # ── Search / listing ──────────────────────────────────────────────────────
+
+    def search(self, prefix: str, limit: int = 20, venue: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Instruments whose id or symbol starts with ``prefix`` (case-insensitive)."""
+        index = self._index
+        needle = prefix.lower()
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        pos = bisect.bisect_left(index.keys, (needle, ""))
+        while pos < len(index.keys) and len(results) < limit:
+            key, iid = index.keys[pos]
+            if not key.startswith(needle):
+                break
+            pos += 1
+            if iid in seen:
+                continue
+            seen.add(iid)
+            m = index.meta[iid]
+            if venue and m["venue"] != venue:
+                continue
+            results.append(m)
+        return results
+
+    def listing(self, venue: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Cached ``{"instruments": [...], "count": n}`` response body.  Only the
+        full listing and catalog venues are cached: an unknown venue (any
+        string a client sends) gets a fresh empty body, so the cache stays
+        bounded by the catalog.
+        """
+        index = self._index
+        venue = venue or None
+        if venue is not None and venue not in index.by_venue:
+            return {"instruments": [], "count": 0}
+        key = (index.version, venue)
+        cached = self._listing_cache.get(key)
+        if cached is not None:
+            return cached
+        ids = index.by_venue[venue] if venue else list(index.by_id)
+        items = [index.meta[i] for i in ids]
+        body = {"instruments": items, "count": len(items)}
+        self._listing_cache[key] = body
+        return body
+
+
+def catalog_fingerprint(catalog_path: str) -> Optional[Tuple]:
+    """
+    Cheap change marker for a ParquetDataCatalog: mtimes of ``data/`` and its
+    per-class directories.  Adding or removing an instrument (or any data
+    directory) changes a directory mtime; no per-file walk is needed.
+    """
+    data_dir = os.path.join(catalog_path, "data")
+    try:
+        entries = [(".", os.stat(data_dir).st_mtime_ns)]
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                if entry.is_dir():
+                    entries.append((entry.name, entry.stat().st_mtime_ns))
+    except OSError:
+        return None
+    return tuple(sorted(entries))
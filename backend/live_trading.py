@@ -20,12 +20,18 @@ State:
 import asyncio
 import json
 import logging
+import os
 import uuid
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional
 
+import market_data_service
+
 logger = logging.getLogger(__name__)
 
+# REST base comes from market_data_service.BINANCE_BASE (BINANCE_BASE_URL)
+BINANCE_WS_BASE = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443").rstrip("/")
+
 
 class BinanceAuthError(ConnectionError):
     """Raised when Binance explicitly rejects credentials (HTTP 401/403)."""
@@ -114,7 +120,7 @@ class LiveTradingManager:
             clock=clock,
             api_key=api_key,
             api_secret=api_secret,
-            base_url="https://api.binance.com",
+            base_url=market_data_service.BINANCE_BASE,
         )
         return BinanceSpotAccountHttpAPI(
             client=client,
@@ -435,6 +441,7 @@ class LiveTradingManager:
             if total > 0:
                 asset = str(getattr(balance, "asset", ""))
                 positions.append({
+                    "id": f"LIVE-BINANCE-{asset}",  # stable, so re-syncs update in place
                     "instrument": f"{asset}USDT",
                     "side": "LONG",
                     "quantity": total,
@@ -455,6 +462,7 @@ class LiveTradingManager:
                 if total > 0:
                     asset = str(getattr(coin, "coin", ""))
                     positions.append({
+                        "id": f"LIVE-BYBIT-{asset}",
                         "instrument": f"{asset}USDT",
                         "side": "LONG",
                         "quantity": total,
@@ -475,7 +483,7 @@ class LiveTradingManager:
         """
         import websockets  # type: ignore
 
-        url = f"wss://stream.binance.com:9443/ws/{symbol.lower()}@ticker"
+        url = f"{BINANCE_WS_BASE}/ws/{symbol.lower()}@ticker"
         async with websockets.connect(url, ping_interval=20, ping_timeout=20) as ws:
             async for raw in ws:
                 data = json.loads(raw)
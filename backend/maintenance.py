@@ -0,0 +1,307 @@
+"""
+Database Maintenance
+====================
+Background housekeeping for the main SQLite DB, built from short
+transactions so trading writes are never held up for more than a few ms.
+
+Every MAINTENANCE_INTERVAL_SECONDS (and on demand) one run does:
+
+    ttl         chunked retention deletes per TTLPolicy — at most
+                MAINTENANCE_DELETE_CHUNK rows per transaction; the chunk
+                halves whenever a transaction holds the write lock longer
+                than MAINTENANCE_MAX_LOCK_MS and grows back when it's cheap
+    vacuum      PRAGMA incremental_vacuum(MAINTENANCE_VACUUM_PAGES) in a
+                loop until the freelist is empty (auto_vacuum=INCREMENTAL,
+                see migrations v3)
+    optimize    PRAGMA optimize with a bounded analysis_limit
+    checkpoint  PRAGMA wal_checkpoint(PASSIVE); TRUNCATE (without waiting)
+                once the -wal file exceeds MAINTENANCE_WAL_TRUNCATE_MB
+
+Work happens in a worker thread on its own sqlite3 connection.  Each run
+is recorded (rows deleted, pages freed, checkpoint frames, the longest
+single write-lock hold) and the recent runs are served by
+GET /api/database/maintenance and the system metrics.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "900"))
+MAINTENANCE_DELETE_CHUNK = int(os.getenv("MAINTENANCE_DELETE_CHUNK", "5000"))
+MAINTENANCE_MAX_LOCK_MS = float(os.getenv("MAINTENANCE_MAX_LOCK_MS", "5"))
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "256"))
+MAINTENANCE_WAL_TRUNCATE_MB = float(os.getenv("MAINTENANCE_WAL_TRUNCATE_MB", "64"))
+# Pause between transactions so queued writers get the lock first
+MAINTENANCE_YIELD_MS = float(os.getenv("MAINTENANCE_YIELD_MS", "2"))
+
+_MIN_CHUNK = 50
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+@dataclass(frozen=True)
+class TTLPolicy:
+    """Delete rows of ``table`` matching ``where`` once ``ts_column`` is older than ``days``."""
+
+    name: str
+    table: str
+    ts_column: str
+    where: str
+    days: float
+
+    def cutoff_ns(self, now: Optional[float] = None) -> int:
+        now_ns = int((now if now is not None else time.time()) * 1_000_000_000)
+        return now_ns - int(self.days * _NS_PER_DAY)
+
+
+# Cancelled / rejected orders only: deleting filled ones would take their PnL out of
+# strategy_performance (trg_orders_perf_delete).  Write paths differ in status case.
+_CLOSED_ORDERS = "UPPER(status) IN ('CANCELLED', 'CANCELED', 'REJECTED')"
+
+
+def default_policies() -> List[TTLPolicy]:
+    """Scheduled retention; a days value of 0 disables the policy."""
+    policies = [
+        TTLPolicy("triggered_alerts", "alerts", "created_ns", "status = 'triggered'",
+                  float(os.getenv("TTL_TRIGGERED_ALERTS_DAYS", "30"))),
+        # Order history is kept unless explicitly configured
+        TTLPolicy("closed_orders", "orders", "ts_ns", _CLOSED_ORDERS,
+                  float(os.getenv("TTL_CLOSED_ORDERS_DAYS", "0"))),
+    ]
+    return [p for p in policies if p.days > 0]
+
+
+def clean_policies(days: float = 30) -> List[TTLPolicy]:
+    """What POST /api/database/clean removes."""
+    return [
+        TTLPolicy("triggered_alerts", "alerts", "created_ns", "status = 'triggered'", days),
+        TTLPolicy("closed_orders", "orders", "ts_ns", _CLOSED_ORDERS, days),
+    ]
+
+
+# ── Run record ────────────────────────────────────────────────────────────────
+
+@dataclass
+class MaintenanceRun:
+    id: str
+    trigger: str
+    tasks: Sequence[str]
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    duration_ms: float = 0.0
+    ttl: Dict[str, dict] = field(default_factory=dict)
+    vacuum: dict = field(default_factory=dict)
+    optimize: dict = field(default_factory=dict)
+    checkpoint: dict = field(default_factory=dict)
+    max_lock_ms: float = 0.0
+    error: Optional[str] = None
+
+    def _lock(self, ms: float) -> None:
+        self.max_lock_ms = max(self.max_lock_ms, round(ms, 3))
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "tasks": list(self.tasks),
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "ttl": self.ttl,
+            "vacuum": self.vacuum,
+            "optimize": self.optimize,
+            "checkpoint": self.checkpoint,
+            "max_lock_ms": self.max_lock_ms,
+            "error": self.error,
+        }
+
+
+# ── Tasks (worker thread) ─────────────────────────────────────────────────────
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # Autocommit: every statement below decides its own transaction scope
+    conn = sqlite3.connect(str(path), timeout=5, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+def _timed(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> tuple:
+    start = time.perf_counter()
+    cur = conn.execute(sql, params)
+    rows = cur.fetchall()
+    return rows, cur.rowcount, (time.perf_counter() - start) * 1000
+
+
+def prune(conn: sqlite3.Connection, policy: TTLPolicy, run: MaintenanceRun, chunk: int,
+          now: Optional[float] = None) -> dict:
+    cutoff = policy.cutoff_ns(now)
+    deleted = chunks = 0
+    max_ms = 0.0
+    while True:
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
+            f"""DELETE FROM {policy.table} WHERE rowid IN (
+                    SELECT rowid FROM {policy.table}
+                    WHERE {policy.where} AND {policy.ts_column} < ? LIMIT ?)""",
+            (cutoff, chunk),
+        )
+        n = cur.rowcount
+        conn.execute("COMMIT")
+        ms = (time.perf_counter() - start) * 1000
+        deleted += n
+        chunks += 1
+        max_ms = max(max_ms, ms)
+        run._lock(ms)
+        if n < chunk:
+            break
+        # Adapt the chunk to the lock budget
+        if ms > MAINTENANCE_MAX_LOCK_MS:
+            chunk = max(_MIN_CHUNK, chunk // 2)
+        elif ms < MAINTENANCE_MAX_LOCK_MS / 4:
+            chunk = min(MAINTENANCE_DELETE_CHUNK, chunk * 2)
+        time.sleep(MAINTENANCE_YIELD_MS / 1000)
+    return {"deleted": deleted, "chunks": chunks, "final_chunk": chunk, "max_lock_ms": round(max_ms, 3)}
+
+
+def incremental_vacuum(conn: sqlite3.Connection, run: MaintenanceRun, pages: int = MAINTENANCE_VACUUM_PAGES) -> dict:
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        return {"skipped": "auto_vacuum is not INCREMENTAL", "freelist": conn.execute("PRAGMA freelist_count").fetchone()[0]}
+    freed = steps = 0
+    while True:
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if before == 0:
+            break
+        _, _, ms = _timed(conn, f"PRAGMA incremental_vacuum({int(pages)})")
+        run._lock(ms)
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        freed += before - after
+        steps += 1
+        if after >= before:
+            break
+        time.sleep(MAINTENANCE_YIELD_MS / 1000)
+    return {"pages_freed": freed, "steps": steps}
+
+
+def optimize(conn: sqlite3.Connection, run: MaintenanceRun) -> dict:
+    conn.execute("PRAGMA analysis_limit = 400")
+    _, _, ms = _timed(conn, "PRAGMA optimize")
+    run._lock(ms)
+    return {"ms": round(ms, 3)}
+
+
+def checkpoint(conn: sqlite3.Connection, path: Path, run: MaintenanceRun) -> dict:
+    wal = Path(f"{path}-wal")
+    wal_bytes = wal.stat().st_size if wal.exists() else 0
+    mode = "PASSIVE"
+    if wal_bytes > MAINTENANCE_WAL_TRUNCATE_MB * 1024 * 1024:
+        mode = "TRUNCATE"
+        conn.execute("PRAGMA busy_timeout = 0")  # give up rather than wait on readers
+    rows, _, ms = _timed(conn, f"PRAGMA wal_checkpoint({mode})")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    run._lock(ms)
+    busy, log_frames, checkpointed = rows[0] if rows else (0, 0, 0)
+    return {
+        "mode": mode,
+        "busy": bool(busy),
+        "log_frames": log_frames,
+        "checkpointed_frames": checkpointed,
+        "wal_bytes_before": wal_bytes,
+        "wal_bytes_after": wal.stat().st_size if wal.exists() else 0,
+        "ms": round(ms, 3),
+    }
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+
+ALL_TASKS = ("ttl", "vacuum", "optimize", "checkpoint")
+
+
+class MaintenanceScheduler:
+    """Runs maintenance passes one at a time and keeps their records."""
+
+    def __init__(self, history: int = 20) -> None:
+        self.runs: "deque[MaintenanceRun]" = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.totals = {"runs": 0, "rows_deleted": 0, "pages_freed": 0, "errors": 0}
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run_once(
+        self,
+        db_path: Path,
+        tasks: Sequence[str] = ALL_TASKS,
+        policies: Optional[List[TTLPolicy]] = None,
+        trigger: str = "manual",
+        now: Optional[float] = None,
+    ) -> MaintenanceRun:
+        """One maintenance pass (blocking; call from a worker thread)."""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Maintenance is already running")
+        run = MaintenanceRun(id=f"MNT-{uuid.uuid4().hex[:8].upper()}", trigger=trigger, tasks=tuple(tasks))
+        start = time.perf_counter()
+        try:
+            conn = _connect(db_path)
+            try:
+                if "ttl" in tasks:
+                    for policy in default_policies() if policies is None else policies:
+                        run.ttl[policy.name] = prune(conn, policy, run, MAINTENANCE_DELETE_CHUNK, now)
+                if "vacuum" in tasks:
+                    run.vacuum = incremental_vacuum(conn, run)
+                if "optimize" in tasks:
+                    run.optimize = optimize(conn, run)
+                if "checkpoint" in tasks:
+                    run.checkpoint = checkpoint(conn, db_path, run)
+            finally:
+                conn.close()
+        except Exception as exc:
+            logger.warning("Maintenance run %s failed: %s", run.id, exc)
+            run.error = str(exc)
+            self.totals["errors"] += 1
+        finally:
+            run.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.totals["runs"] += 1
+            self.totals["rows_deleted"] += sum(t["deleted"] for t in run.ttl.values())
+            self.totals["pages_freed"] += run.vacuum.get("pages_freed", 0)
+            self.runs.append(run)
+            self._lock.release()
+        return run
+
+    async def run(self, tasks: Sequence[str] = ALL_TASKS, policies: Optional[List[TTLPolicy]] = None,
+                  trigger: str = "manual") -> MaintenanceRun:
+        import database
+        return await asyncio.to_thread(self.run_once, Path(database.DB_PATH), tasks, policies, trigger)
+
+    async def run_forever(self, interval: float = MAINTENANCE_INTERVAL_SECONDS) -> None:
+        """Lifespan task: one scheduled pass every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run(trigger="schedule")
+            except RuntimeError:
+                pass  # a manual run is in progress; try next interval
+
+    def stats(self) -> dict:
+        last = self.runs[-1].to_dict() if self.runs else None
+        return {
+            "interval_seconds": MAINTENANCE_INTERVAL_SECONDS,
+            "running": self.busy,
+            **self.totals,
+            "policies": [{"name": p.name, "table": p.table, "days": p.days} for p in default_policies()],
+            "last_run": last,
+        }
+
+
+scheduler = MaintenanceScheduler()
@@ -12,6 +12,7 @@ Fall-back chain (most to least authoritative):
 """
 
 import asyncio
+import os
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
@@ -56,7 +57,8 @@ _instruments_cache: Optional[Dict[str, Any]] = None
 # A lock so concurrent requests don't all fire off to Binance simultaneously
 _fetch_lock = asyncio.Lock()
 
-BINANCE_BASE = "https://api.binance.com"
+# Point at fake_exchange.py for load tests (no live traffic)
+BINANCE_BASE = os.getenv("BINANCE_BASE_URL", "https://api.binance.com").rstrip("/")
 
 
 # ---------------------------------------------------------------------------
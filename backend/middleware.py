@@ -0,0 +1,130 @@
+"""
+Request Pipeline
+================
+One pure-ASGI middleware that runs every per-request gate in a fixed,
+short-circuiting order:
+
+    public path? ──► API key ──► JWT ──► rate limit ──► request counter ──► app
+        │               │          │          │
+        │              401        401        429        (rejections stop here)
+        └─ public paths skip the auth stages but are still rate limited
+
+It replaces the stacked ``@app.middleware("http")`` handlers and
+``auth.ApiKeyMiddleware``.  Each BaseHTTPMiddleware layer spawned a task
+and wrapped the response body stream; this runs inline on the ASGI scope
+and only touches the ``http.response.start`` message (to add
+X-RateLimit-Remaining), so streaming responses pass through untouched.
+
+The verified JWT payload is stored in ``scope["state"]["user"]`` — i.e.
+``request.state.user`` — for ``auth_jwt.get_current_user`` to reuse.
+"""
+
+import math
+import secrets
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import auth
+import auth_jwt
+from rate_limit import limiter
+
+# Paths that are always public for JWT purposes (no token required)
+PUBLIC_PATHS = frozenset(
+    [
+        "/",
+        "/health",
+        "/api/health",
+        "/api/auth/login",
+        "/api/auth/logout",
+        "/api/auth/refresh",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/ws",
+    ]
+)
+
+
+def _header(scope: Scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+class RequestPipeline:
+    """API key → JWT → rate limit → counter, as a single ASGI middleware."""
+
+    def __init__(self, app: ASGIApp, on_request=None) -> None:
+        self.app = app
+        self.on_request = on_request
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            # WebSockets authenticate themselves (/ws?token=...); lifespan passes through
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        method: str = scope["method"]
+
+        # 1. API key (only when API_KEY is configured)
+        key_ok = False
+        if auth.API_KEY:
+            provided = _header(scope, b"x-api-key")
+            key_ok = bool(provided) and secrets.compare_digest(provided, auth.API_KEY)
+            if not key_ok and method != "OPTIONS" and not auth._is_public(path):
+                await _reject(scope, receive, send, 401, "Invalid or missing API key")
+                return
+
+        # 2. JWT — API routes only; a valid API key is an alternative credential
+        user: Optional[dict] = None
+        if not key_ok and path.startswith("/api/") and path not in PUBLIC_PATHS:
+            authorization = _header(scope, b"authorization")
+            if not authorization.startswith("Bearer "):
+                await _reject(scope, receive, send, 401, "Missing authentication token")
+                return
+            user, error = auth_jwt.authenticate_bearer(authorization[7:])
+            if error:
+                await _reject(scope, receive, send, 401, error)
+                return
+            scope.setdefault("state", {})["user"] = user
+
+        # 3. Rate limit — every request, per IP and (when known) per user
+        client = scope.get("client")
+        decision = limiter.check(
+            method, path, (client[0] if client else None) or "unknown", user.get("sub") if user else None
+        )
+        if not decision.allowed:
+            retry_after = max(1, math.ceil(decision.retry_after))
+            scope_name = "Global rate limit" if decision.policy == "global" else "Rate limit"
+            await _reject(
+                scope, receive, send, 429,
+                f"{scope_name} exceeded. Retry after {retry_after} seconds.",
+                {"Retry-After": str(retry_after), "X-RateLimit-Remaining": "0"},
+            )
+            return
+
+        # 4. Request counter
+        if self.on_request is not None:
+            self.on_request()
+
+        if decision.remaining < 0:
+            await self.app(scope, receive, send)
+            return
+
+        remaining = str(decision.remaining)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-RateLimit-Remaining", remaining)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, status: int, detail: str, headers=None) -> None:
+    await JSONResponse({"detail": detail}, status_code=status, headers=headers)(scope, receive, send)
@@ -0,0 +1,221 @@
+"""
+Schema Migrations
+=================
+Versioned, forward-only migrations for the main SQLite database.
+
+The applied version lives in ``PRAGMA user_version``.  ``database.init_db``
+creates the base tables, then ``migrate()`` runs every migration above the
+stored version in order and bumps ``user_version`` after each one.
+
+Every step is written to be safe to re-run (columns are added only when
+missing, backfills only touch NULL rows), so a migration interrupted half
+way — or raced by a second worker at startup — simply continues.
+
+Versions
+--------
+1  legacy columns that used to be try/except ALTER TABLEs (+ the index on
+   orders.strategy_id, which the base script could not create on old DBs)
+2  integer epoch-nanosecond columns next to the ISO-8601 TEXT timestamps
+   (orders.ts_ns, positions.opened_ns, alerts.created_ns, audit_logs.ts_ns),
+   chunked backfill, composite (filter, ns) indexes and fill-in triggers
+3  auto_vacuum=INCREMENTAL, so maintenance.py can return free pages to the
+   filesystem a few hundred at a time instead of a full VACUUM
+4  positions.content_hash, so bulk upserts can skip unchanged rows
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Rows per backfill UPDATE batch (one commit each, so writers are never
+# locked out for long on a large table)
+BACKFILL_CHUNK = 5000
+
+# Switching an existing DB to incremental auto-vacuum needs one full VACUUM;
+# above this size it is left to an explicit POST /api/database/optimize?full=true
+AUTOVACUUM_CONVERT_MAX_MB = float(os.getenv("AUTOVACUUM_CONVERT_MAX_MB", "256"))
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def iso_to_ns(ts: Optional[str]) -> Optional[int]:
+    """ISO-8601 string → integer nanoseconds since the epoch (naive = UTC)."""
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def day_bounds_ns(day: str) -> tuple:
+    """[start, end) of a UTC calendar day (``YYYY-MM-DD``) in epoch-ns."""
+    start = iso_to_ns(f"{day}T00:00:00+00:00")
+    return start, start + 86_400 * 1_000_000_000
+
+
+def _sql_ns(column: str) -> str:
+    """
+    SQL equivalent of iso_to_ns() for triggers on raw-SQL inserts.
+    SQLite's date functions stop at milliseconds, so this is ms-precise.
+    """
+    return (
+        f"CAST(strftime('%s', {column}) AS INTEGER) * 1000000000"
+        f" + CAST(round((strftime('%f', {column}) - CAST(strftime('%S', {column}) AS INTEGER))"
+        f" * 1000) AS INTEGER) * 1000000"
+    )
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+async def _columns(db: aiosqlite.Connection, table: str) -> List[str]:
+    async with db.execute(f"PRAGMA table_info({table})") as cur:
+        return [row[1] for row in await cur.fetchall()]
+
+
+async def add_column(db: aiosqlite.Connection, table: str, column: str, decl: str) -> bool:
+    """ALTER TABLE ADD COLUMN unless the column already exists."""
+    if column in await _columns(db, table):
+        return False
+    await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return True
+
+
+async def backfill_ns(db: aiosqlite.Connection, table: str, src: str, dst: str) -> int:
+    """Fill ``dst`` from the ISO ``src`` column in BACKFILL_CHUNK-row batches."""
+    total = 0
+    while True:
+        async with db.execute(
+            f"SELECT rowid, {src} FROM {table} WHERE {dst} IS NULL AND {src} IS NOT NULL LIMIT ?",
+            (BACKFILL_CHUNK,),
+        ) as cur:
+            rows = await cur.fetchall()
+        # Unparseable timestamps get 0 so they are not selected again
+        updates = [(iso_to_ns(ts) or 0, rowid) for rowid, ts in rows]
+        if updates:
+            await db.executemany(f"UPDATE {table} SET {dst}=? WHERE rowid=?", updates)
+            await db.commit()
+            total += len(updates)
+        if len(rows) < BACKFILL_CHUNK:
+            return total
+
+
+# ── Migrations ────────────────────────────────────────────────────────────────
+
+async def _v1_legacy_columns(db: aiosqlite.Connection) -> None:
+    await add_column(db, "orders", "pnl", "REAL DEFAULT 0")
+    await add_column(db, "orders", "strategy_id", "TEXT")
+    await add_column(db, "orders", "exchange_order_id", "TEXT")
+    await add_column(db, "users", "totp_secret", "TEXT")
+    await add_column(db, "users", "two_factor_enabled", "INTEGER NOT NULL DEFAULT 0")
+    # Needs orders.strategy_id, which pre-v1 databases don't have yet
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_strategy_ts ON orders(strategy_id, timestamp, id)"
+    )
+
+
+# (table, ISO column, ns column)
+NS_COLUMNS = [
+    ("orders", "timestamp", "ts_ns"),
+    ("positions", "opened_at", "opened_ns"),
+    ("alerts", "created_at", "created_ns"),
+    ("audit_logs", "timestamp", "ts_ns"),
+]
+
+
+async def _v2_epoch_ns(db: aiosqlite.Connection) -> None:
+    for table, src, dst in NS_COLUMNS:
+        await add_column(db, table, dst, "INTEGER")
+        await db.commit()
+        filled = await backfill_ns(db, table, src, dst)
+        if filled:
+            logger.info("Backfilled %s.%s for %d rows", table, dst, filled)
+        # App inserts set the column themselves; this catches raw-SQL writers
+        await db.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{dst}
+                AFTER INSERT ON {table} WHEN NEW.{dst} IS NULL
+                BEGIN
+                    UPDATE {table} SET {dst} = {_sql_ns(f"NEW.{src}")} WHERE rowid = NEW.rowid;
+                END"""
+        )
+    await db.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_ts_ns           ON orders(ts_ns);
+        CREATE INDEX IF NOT EXISTS idx_orders_status_ts_ns    ON orders(status, ts_ns);
+        CREATE INDEX IF NOT EXISTS idx_orders_strategy_ts_ns  ON orders(strategy_id, ts_ns);
+        CREATE INDEX IF NOT EXISTS idx_positions_strategy_ns  ON positions(strategy_id, opened_ns);
+        CREATE INDEX IF NOT EXISTS idx_alerts_status_ns       ON alerts(status, created_ns);
+        CREATE INDEX IF NOT EXISTS idx_audit_logs_ts_ns       ON audit_logs(ts_ns);
+        """
+    )
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+async def _v3_incremental_vacuum(db: aiosqlite.Connection) -> None:
+    async with db.execute("PRAGMA auto_vacuum") as cur:
+        if (await cur.fetchone())[0] == 2:
+            return
+    await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    async with db.execute("PRAGMA page_count") as cur:
+        pages = (await cur.fetchone())[0]
+    async with db.execute("PRAGMA page_size") as cur:
+        size_mb = pages * (await cur.fetchone())[0] / 1024 / 1024
+    if size_mb > AUTOVACUUM_CONVERT_MAX_MB:
+        logger.warning(
+            "auto_vacuum=INCREMENTAL takes effect after a full VACUUM (%.0f MB DB); "
+            "run POST /api/database/optimize?full=true in a quiet window", size_mb,
+        )
+        return
+    await db.commit()  # VACUUM can't run inside a transaction
+    await db.execute("VACUUM")
+
+
+async def _v4_position_hash(db: aiosqlite.Connection) -> None:
+    # NULL for existing rows: the first save of each position rewrites it once
+    await add_column(db, "positions", "content_hash", "TEXT")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "legacy columns", _v1_legacy_columns),
+    Migration(2, "epoch-ns timestamps", _v2_epoch_ns),
+    Migration(3, "incremental auto-vacuum", _v3_incremental_vacuum),
+    Migration(4, "position content hash", _v4_position_hash),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+async def get_version(db: aiosqlite.Connection) -> int:
+    async with db.execute("PRAGMA user_version") as cur:
+        return (await cur.fetchone())[0]
+
+
+async def migrate(db: aiosqlite.Connection, target: int = SCHEMA_VERSION) -> List[int]:
+    """Apply pending migrations up to ``target``; returns the versions applied."""
+    current = await get_version(db)
+    applied = []
+    for migration in MIGRATIONS:
+        if current < migration.version <= target:
+            logger.info("Applying migration %d: %s", migration.version, migration.name)
+            await migration.apply(db)
+            # PRAGMA can't be parameterised; version is an int from MIGRATIONS
+            await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+            await db.commit()
+            applied.append(migration.version)
+    return applied
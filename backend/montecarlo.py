@@ -0,0 +1,188 @@
+"""
+Monte Carlo Robustness
+======================
+Resamples a stored run's closed-trade returns to put confidence intervals
+around its drawdown, terminal equity and Sharpe ratio.
+
+Each trade's return is its realized PnL over the equity before it (trades
+in close order, starting from the run's starting balance).  A simulation
+is a path of ``horizon`` such returns (default: the run's trade count):
+
+    bootstrap   drawn with replacement
+    shuffle     the run's own returns in random order (terminal equity
+                is then fixed; only the path, hence drawdown, varies)
+
+All paths are built as one (simulations x horizon) NumPy matrix and
+reduced along the trade axis (equity in log space: cumulative sums,
+running maxima), in row blocks of at most MONTE_CARLO_MAX_CELLS cells so
+memory stays bounded for long runs.
+Sharpe uses the same convention as the run summary (per-trade returns,
+annualised by sqrt(252)), so the observed ``sharpe_ratio`` can be placed
+in the simulated distribution.
+
+Needs ``numpy`` and ``pyarrow`` (installed with nautilus_trader).
+"""
+
+import os
+from typing import Any, Dict, Optional, Sequence
+
+import backtest_store
+
+MONTE_CARLO_MAX_CELLS = int(os.getenv("MONTE_CARLO_MAX_CELLS", "4000000"))
+
+METHODS = ("bootstrap", "shuffle")
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+# Drawdown depths (fraction of peak equity) reported in ``drawdown_exceedance``
+DRAWDOWN_LEVELS = (0.1, 0.2, 0.3, 0.5)
+HISTOGRAM_BINS = 20
+_ANNUALISATION = 252 ** 0.5
+
+
+def trade_returns(pnls: Sequence[float], starting_balance: float):
+    """Per-trade returns of a PnL sequence, each relative to the equity before it."""
+    import numpy as np
+
+    pnl = np.asarray(pnls, dtype=np.float64)
+    if not pnl.size:
+        return pnl
+    equity_before = starting_balance + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    if np.any(equity_before <= 0):
+        raise ValueError("Equity reached zero during the run; returns are undefined")
+    return pnl / equity_before
+
+
+def _path_stats(r, log_r, idx, starting_balance: float, ruin_log: float) -> Dict[str, Any]:
+    """
+    Max drawdown (%), terminal equity, Sharpe and ruin flag of each path;
+    row i of ``idx`` holds path i's trade indices into ``r``.  Equity is
+    tracked in log space, so every full-matrix step is an add / compare.
+    """
+    import numpy as np
+
+    log_equity = np.cumsum(log_r.take(idx), axis=1)
+    terminal = log_equity[:, -1].copy()
+    lowest = log_equity.min(axis=1)
+    peak = np.maximum.accumulate(log_equity, axis=1)
+    np.maximum(peak, 0.0, out=peak)  # the starting balance is the first peak
+    np.subtract(log_equity, peak, out=log_equity)
+    deepest = log_equity.min(axis=1)
+
+    paths = r.take(idx)
+    n = paths.shape[1]
+    mean = paths.sum(axis=1) / n
+    var = (np.einsum("ij,ij->i", paths, paths) - n * mean ** 2) / max(n - 1, 1)
+    std = np.sqrt(np.maximum(var, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 1e-12, mean / std * _ANNUALISATION, 0.0)
+    return {
+        "max_drawdown": -np.expm1(deepest) * 100,
+        "terminal_equity": starting_balance * np.exp(terminal),
+        "sharpe_ratio": sharpe,
+        "ruined": lowest <= ruin_log,
+    }
+
+
+def _distribution(values, observed: Optional[float] = None) -> Dict[str, Any]:
+    import numpy as np
+
+    lo, hi = float(values.min()), float(values.max())
+    if hi - lo <= 1e-9 * max(1.0, abs(hi)):  # e.g. shuffled terminal equity
+        lo, hi = lo - 0.5, hi + 0.5
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(lo, hi))
+    out = {
+        "mean": round(float(values.mean()), 4),
+        "std": round(float(values.std()), 4),
+        "percentiles": {f"p{p}": round(float(v), 4)
+                        for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+        "histogram": {"counts": counts.tolist(), "edges": [round(float(e), 4) for e in edges]},
+    }
+    if observed is not None:
+        out["observed"] = round(float(observed), 4)
+        out["observed_percentile"] = round(float((values <= observed).mean() * 100), 2)
+    return out
+
+
+def simulate(
+    returns: Sequence[float],
+    starting_balance: float,
+    *,
+    method: str = "bootstrap",
+    simulations: int = 10_000,
+    horizon: Optional[int] = None,
+    ruin_threshold: float = 0.5,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Distributions of max drawdown (%), terminal equity and Sharpe over
+    ``simulations`` resampled paths, plus risk of ruin: the share of paths
+    whose equity ever falls to ``(1 - ruin_threshold) x starting_balance``.
+    """
+    import numpy as np
+
+    if method not in METHODS:
+        raise ValueError(f"method must be one of: {', '.join(METHODS)}")
+    r = np.asarray(returns, dtype=np.float64)
+    if len(r) < 2:
+        raise ValueError("Monte Carlo needs at least 2 closed trades")
+    if not 0 < ruin_threshold < 1:
+        raise ValueError("ruin_threshold must be between 0 and 1")
+    horizon = horizon or len(r)
+    if method == "shuffle" and horizon != len(r):
+        raise ValueError("shuffle resamples the run's own trades; horizon must equal the trade count")
+
+    seed = int(np.random.SeedSequence(seed).entropy) if seed is None else seed
+    rng = np.random.default_rng(seed)
+    log_r = np.log1p(r)
+    ruin_equity = starting_balance * (1 - ruin_threshold)
+    ruin_log = np.log1p(-ruin_threshold)
+    block = max(1, MONTE_CARLO_MAX_CELLS // horizon)
+    parts = []
+    for start in range(0, simulations, block):
+        rows = min(block, simulations - start)
+        if method == "bootstrap":
+            idx = rng.integers(0, len(r), size=(rows, horizon))
+        else:
+            idx = rng.permuted(np.broadcast_to(np.arange(len(r)), (rows, horizon)), axis=1)
+        parts.append(_path_stats(r, log_r, idx, starting_balance, ruin_log))
+    stats = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    observed = None
+    if horizon == len(r):
+        observed = _path_stats(r, log_r, np.arange(len(r))[None, :], starting_balance, ruin_log)
+    dd = stats["max_drawdown"]
+    terminal = stats["terminal_equity"]
+    return {
+        "method": method,
+        "simulations": simulations,
+        "horizon": horizon,
+        "trades": len(r),
+        "seed": seed,
+        "starting_balance": starting_balance,
+        "max_drawdown": _distribution(dd, observed and observed["max_drawdown"][0]),
+        "terminal_equity": _distribution(terminal, observed and observed["terminal_equity"][0]),
+        "sharpe_ratio": _distribution(stats["sharpe_ratio"], observed and observed["sharpe_ratio"][0]),
+        "probability_of_loss": round(float((terminal < starting_balance).mean()), 4),
+        "risk_of_ruin": {
+            "threshold": ruin_threshold,
+            "ruin_equity": round(ruin_equity, 2),
+            "probability": round(float(stats["ruined"].mean()), 4),
+        },
+        "drawdown_exceedance": {
+            f"{int(level * 100)}%": round(float((dd >= level * 100).mean()), 4) for level in DRAWDOWN_LEVELS
+        },
+    }
+
+
+def simulate_run(run_id: str, **kwargs) -> Dict[str, Any]:
+    """
+    ``simulate`` over a stored run's closed trades.  Raises KeyError for an
+    unknown run, ValueError for bad parameters or too few trades.
+    """
+    summary = backtest_store.store.get(run_id)
+    if summary is None:
+        raise KeyError(run_id)
+    starting_balance = float(summary.get("starting_balance") or 100_000.0)
+    trades = backtest_store.store.closed_positions(run_id, columns=["realized_pnl", "ts_closed"])
+    trades.sort(key=lambda t: t["ts_closed"] or 0)
+    returns = trade_returns([t["realized_pnl"] or 0.0 for t in trades], starting_balance)
+    return {"run_id": run_id, **simulate(returns, starting_balance, **kwargs)}
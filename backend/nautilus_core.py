@@ -6,24 +6,26 @@ Uses low-level BacktestEngine API for direct control
 
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from decimal import Decimal
 
+import backtest_cache
+import backtest_store
+import run_profile
+from instrument_registry import InstrumentRegistry, catalog_fingerprint
+
 logger = logging.getLogger(__name__)
 
-from nautilus_trader.backtest.engine import BacktestEngine, BacktestEngineConfig
-from nautilus_trader.config import LoggingConfig
-from nautilus_trader.model.identifiers import TraderId, Venue, InstrumentId
-from nautilus_trader.model.currencies import USD
-from nautilus_trader.model.objects import Money
-from nautilus_trader.model.enums import AccountType, OmsType
-from nautilus_trader.persistence.catalog import ParquetDataCatalog
+# Nautilus Trader (and the strategies built on it) cost ~1s to import, so
+# they are imported on first use inside the methods below.  Importing this
+# module — and therefore ``state`` and every router — stays cheap.
+TRADER_ID = "TRADER-001"
 
-# Import our real strategies
-from strategies.sma_crossover import SMACrossoverStrategy, SMACrossoverConfig
-from strategies.rsi_strategy import RSIStrategy, RSIStrategyConfig
+# Minimum seconds between catalog change checks (see refresh_instruments)
+_CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "5"))
 
 
 class NautilusTradingSystem:
@@ -39,20 +41,22 @@ class NautilusTradingSystem:
         Args:
             catalog_path: Path to Nautilus data catalog
         """
-        self.trader_id = TraderId("TRADER-001")
+        self.trader_id = TRADER_ID
         self.catalog_path = catalog_path or "/home/ubuntu/nautilus_data/catalog"
         
-        # Engine
-        self.engine: Optional[BacktestEngine] = None
+        # Engine (nautilus_trader BacktestEngine, created on demand)
+        self.engine: Optional[Any] = None
         
-        # Catalog for data
-        self.catalog: Optional[ParquetDataCatalog] = None
+        # Catalog for data (nautilus_trader ParquetDataCatalog, loaded on demand)
+        self.catalog: Optional[Any] = None
         
         # State tracking
         self.strategies: Dict[str, Any] = {}
-        self.backtest_results: Dict[str, Any] = {}
+        # Summary of each strategy's latest run (LRU; rows live in backtest_store)
+        self.backtest_results = backtest_store.SummaryCache()
         self.is_initialized = False
-        self.instruments = []
+        self.registry = InstrumentRegistry()
+        self._catalog_checked_at = 0.0
         
     def initialize(self) -> Dict[str, Any]:
         """
@@ -61,13 +65,15 @@ class NautilusTradingSystem:
         try:
             # Load data catalog
             if os.path.exists(self.catalog_path):
+                from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+                fingerprint = catalog_fingerprint(self.catalog_path)
                 self.catalog = ParquetDataCatalog(self.catalog_path)
-                self.instruments = self.catalog.instruments()
-                
+                self.registry.load(self.catalog.instruments(), fingerprint)
+                self._catalog_checked_at = time.monotonic()
+
                 logger.info("Loaded catalog from %s", self.catalog_path)
-                logger.info("Available instruments: %d", len(self.instruments))
-                for instrument in self.instruments:
-                    logger.info("  - %s", instrument.id)
+                logger.info("Available instruments: %d", len(self.registry))
             else:
                 logger.warning("Catalog path not found: %s", self.catalog_path)
                 return {
@@ -82,7 +88,7 @@ class NautilusTradingSystem:
                 "message": "Nautilus Trading System initialized",
                 "trader_id": str(self.trader_id),
                 "catalog_path": self.catalog_path,
-                "instruments_count": len(self.instruments)
+                "instruments_count": len(self.registry)
             }
             
         except Exception as e:
@@ -94,6 +100,35 @@ class NautilusTradingSystem:
                 "trace": traceback.format_exc()
             }
     
+    @property
+    def instruments(self) -> List[Any]:
+        """Catalog instruments (kept for callers that iterate; prefer ``registry``)."""
+        return self.registry.instruments
+
+    def catalog_changed(self) -> bool:
+        """
+        True when the catalog on disk differs from the loaded registry.
+        Checked at most every CATALOG_CHECK_INTERVAL seconds.
+        """
+        if not self.is_initialized:
+            return False
+        now = time.monotonic()
+        if now - self._catalog_checked_at < _CATALOG_CHECK_INTERVAL:
+            return False
+        self._catalog_checked_at = now
+        return catalog_fingerprint(self.catalog_path) != self.registry.fingerprint
+
+    def refresh_instruments(self) -> int:
+        """Reload catalog instruments into the registry; return the new count."""
+        if self.catalog is None:
+            return len(self.registry)
+        fingerprint = catalog_fingerprint(self.catalog_path)
+        self.registry.load(self.catalog.instruments(), fingerprint)
+        self._catalog_checked_at = time.monotonic()
+        backtest_cache.forget_data_version(self.catalog_path)
+        logger.info("Instrument registry refreshed: %d instruments", len(self.registry))
+        return len(self.registry)
+
     def get_system_info(self) -> Dict[str, Any]:
         """Get system information."""
         return {
@@ -130,6 +165,8 @@ class NautilusTradingSystem:
             strategy_type = config.get("type", "sma_crossover")
             
             if strategy_type == "sma_crossover":
+                from strategies.sma_crossover import SMACrossoverConfig
+
                 strategy_config = SMACrossoverConfig(
                     strategy_id=strategy_id,
                     instrument_id=config.get("instrument_id", "EUR/USD.SIM"),
@@ -140,6 +177,8 @@ class NautilusTradingSystem:
                 )
                 name = config.get("name", "SMA Crossover")
             elif strategy_type == "rsi":
+                from strategies.rsi_strategy import RSIStrategyConfig
+
                 strategy_config = RSIStrategyConfig(
                     strategy_id=strategy_id,
                     instrument_id=config.get("instrument_id", "EUR/USD.SIM"),
@@ -214,7 +253,10 @@ class NautilusTradingSystem:
         strategy_id: str,
         start_date: str = "2020-01-01",
         end_date: str = "2020-01-31",
-        starting_balance: float = 100000.0
+        starting_balance: float = 100000.0,
+        use_cache: bool = True,
+        persist: bool = True,
+        profile: bool = False,
     ) -> Dict[str, Any]:
         """
         Run a real backtest using Nautilus BacktestEngine (low-level API).
@@ -224,7 +266,14 @@ class NautilusTradingSystem:
             start_date: Start date for backtest (YYYY-MM-DD)
             end_date: End date for backtest (YYYY-MM-DD)
             starting_balance: Starting account balance
+            use_cache: Serve an identical earlier run from backtest_cache
+            persist: Store the run (False: return summary + equity curve
+                only, for optimizer trials such as walk_forward.py)
+            profile: Capture a cProfile of the run (run_profile.py); also
+                bypasses the cache, since a cached run has nothing to profile
         """
+        started = time.perf_counter()
+        prof = None
         try:
             if not self.is_initialized:
                 return {
@@ -255,13 +304,48 @@ class NautilusTradingSystem:
             else:
                 cfg_instrument_id = strategy_config.instrument_id
 
+            cache_key = backtest_cache.make_key(
+                "backtest",
+                strategy_type=strategy_type,
+                config=strategy_config,
+                instrument_id=cfg_instrument_id,
+                start_date=start_date,
+                end_date=end_date,
+                starting_balance=starting_balance,
+                data_version=backtest_cache.data_version(self.catalog_path),
+                owner=strategy_id,
+            )
+            use_cache = use_cache and persist and not profile
+            cached = backtest_cache.cache.lookup(cache_key) if use_cache else None
+            if cached is not None:
+                logger.info("Backtest for %s served from cache (run %s)", strategy_id, cached["run_id"])
+                self.backtest_results[strategy_id] = backtest_store.store.get(cached["run_id"])
+                self.strategies[strategy_id]["status"] = "backtested"
+                self.strategies[strategy_id]["last_backtest"] = datetime.now(timezone.utc).isoformat()
+                return {
+                    "success": True,
+                    "message": "Backtest served from cache",
+                    "result": cached,
+                }
+
+            prof = run_profile.RunProfiler(profile=profile)
+            prof.phase("setup")
+            from nautilus_trader.backtest.engine import BacktestEngine, BacktestEngineConfig
+            from nautilus_trader.config import LoggingConfig
+            from nautilus_trader.model.currencies import USD
+            from nautilus_trader.model.enums import AccountType, OmsType
+            from nautilus_trader.model.identifiers import TraderId, Venue
+            from nautilus_trader.model.objects import Money
+            from strategies.rsi_strategy import RSIStrategy
+            from strategies.sma_crossover import SMACrossoverStrategy
+
             logger.info("Starting backtest for %s", strategy_id)
             logger.info("Period: %s to %s", start_date, end_date)
             logger.info("Starting balance: $%.2f", starting_balance)
 
             # Create BacktestEngine with configuration
             engine_config = BacktestEngineConfig(
-                trader_id=self.trader_id,
+                trader_id=TraderId(self.trader_id),
                 logging=LoggingConfig(log_level="INFO"),
             )
 
@@ -278,11 +362,7 @@ class NautilusTradingSystem:
             )
 
             # Get instrument from catalog
-            instrument = None
-            for instr in self.instruments:
-                if str(instr.id) == cfg_instrument_id:
-                    instrument = instr
-                    break
+            instrument = self.registry.get(cfg_instrument_id)
 
             if not instrument:
                 return {
@@ -295,6 +375,7 @@ class NautilusTradingSystem:
             
             # Load quote tick data from catalog
             logger.info("Loading quote tick data for %s...", instrument.id)
+            prof.phase("load_data")
             quote_ticks = self.catalog.quote_ticks(
                 instrument_ids=[str(instrument.id)],
                 start=start_date,
@@ -308,10 +389,14 @@ class NautilusTradingSystem:
                 }
             
             logger.info("Loaded %d quote ticks", len(quote_ticks))
-            
+            prof.count("quote_ticks", len(quote_ticks))
+
             # Add data to engine
+            prof.phase("add_data")
             engine.add_data(quote_ticks)
-            
+
+            prof.phase("run")
+
             # Create and add strategy (dispatch by type)
             if strategy_info["type"] == "rsi":
                 strategy = RSIStrategy(config=strategy_config)
@@ -324,8 +409,9 @@ class NautilusTradingSystem:
             engine.run()
             
             logger.info("Backtest completed")
-            
+
             # Extract results from engine
+            prof.phase("extract")
             # Get account
             accounts = list(engine.cache.accounts())
             account = accounts[0] if accounts else None
@@ -359,9 +445,11 @@ class NautilusTradingSystem:
             max_drawdown = self._calc_max_drawdown(equity_curve)
             sharpe_ratio = self._calc_sharpe(equity_curve)
 
-            # Store results
-            backtest_result = {
+            summary = {
+                "kind": "backtest",
                 "strategy_id": strategy_id,
+                "strategy_type": strategy_type,
+                "instrument_id": str(instrument.id),
                 "start_date": start_date,
                 "end_date": end_date,
                 "starting_balance": starting_balance,
@@ -374,13 +462,19 @@ class NautilusTradingSystem:
                 "max_drawdown": max_drawdown,
                 "sharpe_ratio": sharpe_ratio,
                 "total_orders": len(orders),
+                "total_positions": len(positions),
+                "open_positions": sum(1 for p in positions if p.is_open),
                 "completed_at": datetime.now(timezone.utc).isoformat(),
-                "equity_curve": equity_curve,
-                "orders": [self._order_to_dict(o) for o in orders[:200]],
-                "positions": [self._position_to_dict(p) for p in positions[:200]],
             }
-            
-            self.backtest_results[strategy_id] = backtest_result
+            if not persist:
+                report = prof.finish(events=len(quote_ticks))
+                return {"success": True,
+                        "result": {**summary, "equity_curve": equity_curve, "timings": report["timings"]}}
+            backtest_result = self._store_run(summary, orders, positions, equity_curve, prof=prof)
+            self._attach_profile(prof, backtest_result, events=len(quote_ticks))
+            backtest_cache.cache.store(cache_key, backtest_result["summary"]["run_id"],
+                                       time.perf_counter() - started)
+            self.backtest_results[strategy_id] = backtest_result["summary"]
             self.strategies[strategy_id]["status"] = "backtested"
             self.strategies[strategy_id]["last_backtest"] = datetime.now(timezone.utc).isoformat()
             
@@ -391,7 +485,7 @@ class NautilusTradingSystem:
             return {
                 "success": True,
                 "message": "Backtest completed successfully",
-                "result": backtest_result
+                "result": backtest_result["result"]
             }
 
         except Exception as e:
@@ -407,16 +501,282 @@ class NautilusTradingSystem:
                 "trace": error_trace
             }
         finally:
+            if prof is not None:
+                prof.finish()  # stops the sampler thread on early returns / errors
             # Always dispose engine to release resources, regardless of success/failure
             try:
                 engine.dispose()
             except Exception:
                 pass  # engine may not have been created if error was early
     
+    def run_portfolio_backtest(
+        self,
+        strategy_ids: List[str],
+        start_date: str = "2020-01-01",
+        end_date: str = "2020-01-31",
+        starting_balance: float = 100000.0,
+        name: str = "portfolio",
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Backtest several strategies together in one BacktestEngine run.
+
+        Every distinct instrument is added once and its quote ticks loaded in
+        a single catalog query; all strategies trade one SIM margin account,
+        so they compete for the same margin.  The result carries combined
+        account metrics plus a ``strategies`` list with each strategy's
+        metrics computed from its own positions.
+
+        Args:
+            strategy_ids: Strategies to run together (created via create_strategy)
+            start_date: Start date for backtest (YYYY-MM-DD)
+            end_date: End date for backtest (YYYY-MM-DD)
+            starting_balance: Starting balance of the shared account
+            name: Label the run is stored under (its ``strategy_id``)
+            use_cache: Serve an identical earlier run from backtest_cache
+        """
+        started = time.perf_counter()
+        engine = None
+        try:
+            if not self.is_initialized:
+                return {
+                    "success": False,
+                    "message": "System not initialized. Call initialize() first."
+                }
+            missing = [sid for sid in strategy_ids if sid not in self.strategies]
+            if missing:
+                return {"success": False, "message": f"Strategies not found: {', '.join(missing)}"}
+            unsupported = [sid for sid in strategy_ids if self.strategies[sid]["type"] == "macd"]
+            if unsupported:
+                return {
+                    "success": False,
+                    "message": f"MACD backtest is not yet supported in the engine: {', '.join(unsupported)}",
+                }
+
+            infos = [self.strategies[sid] for sid in strategy_ids]
+            instrument_ids = list(dict.fromkeys(_config_instrument_id(i["config"]) for i in infos))
+
+            cache_key = backtest_cache.make_key(
+                "portfolio",
+                strategy_type="+".join(i["type"] for i in infos),
+                config={sid: info["config"] for sid, info in zip(strategy_ids, infos)},
+                instrument_id=",".join(instrument_ids),
+                start_date=start_date,
+                end_date=end_date,
+                starting_balance=starting_balance,
+                data_version=backtest_cache.data_version(self.catalog_path),
+                owner=name,
+            )
+            cached = backtest_cache.cache.lookup(cache_key) if use_cache else None
+            if cached is not None:
+                logger.info("Portfolio backtest %s served from cache (run %s)", name, cached["run_id"])
+                self.backtest_results[name] = backtest_store.store.get(cached["run_id"])
+                now = datetime.now(timezone.utc).isoformat()
+                for sid in strategy_ids:
+                    self.strategies[sid]["status"] = "backtested"
+                    self.strategies[sid]["last_backtest"] = now
+                return {"success": True, "message": "Backtest served from cache", "result": cached}
+
+            from nautilus_trader.backtest.engine import BacktestEngine, BacktestEngineConfig
+            from nautilus_trader.config import LoggingConfig
+            from nautilus_trader.model.currencies import USD
+            from nautilus_trader.model.enums import AccountType, OmsType
+            from nautilus_trader.model.identifiers import TraderId, Venue
+            from nautilus_trader.model.objects import Money
+
+            instruments = []
+            for instrument_id in instrument_ids:
+                instrument = self.registry.get(instrument_id)
+                if not instrument:
+                    return {"success": False, "message": f"Instrument {instrument_id} not found in catalog"}
+                instruments.append(instrument)
+
+            # One query for every instrument's ticks: each file is read once
+            quote_ticks = self.catalog.quote_ticks(
+                instrument_ids=[str(i.id) for i in instruments],
+                start=start_date,
+                end=end_date,
+            )
+            loaded = {str(t.instrument_id) for t in quote_ticks}
+            empty = [str(i.id) for i in instruments if str(i.id) not in loaded]
+            if empty:
+                return {
+                    "success": False,
+                    "message": f"No quote tick data found for {', '.join(empty)} between {start_date} and {end_date}",
+                }
+            logger.info("Portfolio %s: %d strategies, %d instruments, %d quote ticks",
+                        name, len(strategy_ids), len(instruments), len(quote_ticks))
+
+            engine = BacktestEngine(config=BacktestEngineConfig(
+                trader_id=TraderId(self.trader_id),
+                logging=LoggingConfig(log_level="WARNING"),
+            ))
+            engine.add_venue(
+                venue=Venue("SIM"),
+                oms_type=OmsType.HEDGING,
+                account_type=AccountType.MARGIN,
+                base_currency=USD,
+                starting_balances=[Money(starting_balance, USD)],
+            )
+            for instrument in instruments:
+                engine.add_instrument(instrument)
+            engine.add_data(quote_ticks)
+
+            labels: Dict[str, str] = {}  # engine StrategyId → our strategy id
+            for sid, info in zip(strategy_ids, infos):
+                strategy = _build_strategy(info)
+                engine.add_strategy(strategy=strategy)
+                labels[str(strategy.id)] = sid
+
+            engine.run()
+
+            accounts = list(engine.cache.accounts())
+            account = accounts[0] if accounts else None
+            orders = list(engine.cache.orders())
+            positions = list(engine.cache.positions())
+            ending_balance = float(account.balance_total(USD).as_double()) if account else starting_balance
+
+            equity_curve = self._build_equity_curve(positions, starting_balance, start_date)
+            combined = self._position_metrics(positions, starting_balance, start_date, equity_curve)
+            per_strategy = []
+            for sid, info in zip(strategy_ids, infos):
+                own = [p for p in positions if labels.get(str(p.strategy_id)) == sid]
+                per_strategy.append({
+                    "strategy_id": sid,
+                    "strategy_type": info["type"],
+                    "instrument_id": _config_instrument_id(info["config"]),
+                    "total_orders": sum(1 for o in orders if labels.get(str(o.strategy_id)) == sid),
+                    "total_positions": len(own),
+                    **self._position_metrics(own, starting_balance, start_date),
+                })
+
+            summary = {
+                "kind": "portfolio",
+                "strategy_id": name,
+                "strategy_ids": list(strategy_ids),
+                "instrument_ids": [str(i.id) for i in instruments],
+                "start_date": start_date,
+                "end_date": end_date,
+                "starting_balance": starting_balance,
+                "ending_balance": ending_balance,
+                "total_pnl": ending_balance - starting_balance,
+                **combined,
+                "total_orders": len(orders),
+                "total_positions": len(positions),
+                "open_positions": sum(1 for p in positions if p.is_open),
+                "data_points": len(quote_ticks),
+                "strategies": per_strategy,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            backtest_result = self._store_run(summary, orders, positions, equity_curve, labels)
+            backtest_cache.cache.store(cache_key, backtest_result["summary"]["run_id"],
+                                       time.perf_counter() - started)
+            self.backtest_results[name] = backtest_result["summary"]
+            now = datetime.now(timezone.utc).isoformat()
+            for sid in strategy_ids:
+                self.strategies[sid]["status"] = "backtested"
+                self.strategies[sid]["last_backtest"] = now
+
+            return {
+                "success": True,
+                "message": "Portfolio backtest completed successfully",
+                "result": backtest_result["result"],
+            }
+
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            logger.error("Portfolio backtest failed: %s", e)
+            logger.debug(error_trace)
+            return {
+                "success": False,
+                "message": f"Portfolio backtest failed: {str(e)}",
+                "error": str(e),
+                "trace": error_trace,
+            }
+        finally:
+            if engine is not None:
+                engine.dispose()
+
     def get_backtest_results(self, strategy_id: str) -> Optional[Dict[str, Any]]:
-        """Get backtest results for a strategy."""
-        return self.backtest_results.get(strategy_id)
+        """
+        Summary of a strategy's latest run (or of a run, given a run id),
+        read from the store when it is no longer cached.
+        """
+        summary = self.backtest_results.get(strategy_id)
+        if summary is not None:
+            return summary
+        if strategy_id.startswith("BT-"):
+            return backtest_store.store.get(strategy_id)
+        summary = backtest_store.store.latest(strategy_id)
+        if summary is not None:
+            self.backtest_results[strategy_id] = summary
+        return summary
+
+    def _store_run(self, summary: Dict[str, Any], orders, positions,
+                   equity_curve: List[Dict], labels: Optional[Dict[str, str]] = None,
+                   prof: Optional[run_profile.RunProfiler] = None) -> Dict[str, Any]:
+        """
+        Persist a finished run in full through backtest_store.  Returns
+        ``{"summary": ..., "result": ...}`` where ``result`` is the response
+        body: the summary plus the equity curve and the first
+        PREVIEW_ROWS orders / positions (the rest are paged from disk).
+        ``labels`` renames engine strategy ids in the rows' ``strategy_id``.
+        ``prof`` times the row conversion and the write as their own phases.
+        """
+        if prof is not None:
+            prof.phase("serialize")
+        order_rows = [self._order_to_dict(o) for o in orders]
+        position_rows = [self._position_to_dict(p) for p in positions]
+        if labels:
+            for row in order_rows + position_rows:
+                row["strategy_id"] = labels.get(row["strategy_id"], row["strategy_id"])
+        fills = self._fills_to_dicts(orders)
+        if prof is not None:
+            prof.phase("persist")
+        try:
+            stored = backtest_store.store.save(summary, {
+                "orders": order_rows,
+                "fills": fills,
+                "positions": position_rows,
+                "equity": equity_curve,
+            })
+        except Exception:
+            # The run itself succeeded: still answer, just without a run id
+            logger.exception("Could not persist backtest run for %s", summary.get("strategy_id"))
+            stored = {**summary, "run_id": None}
+        preview = backtest_store.PREVIEW_ROWS
+        return {
+            "summary": stored,
+            "result": {
+                **stored,
+                "equity_curve": equity_curve,
+                "orders": order_rows[:preview],
+                "positions": position_rows[:preview],
+            },
+        }
     
+    def _attach_profile(self, prof: run_profile.RunProfiler, stored: Dict[str, Any], events: int) -> None:
+        """
+        Finish ``prof`` and add its timings (and profile files, if any) to
+        a run returned by ``_store_run``, both on disk and in ``stored``.
+        """
+        report = prof.finish(events=events)
+        fields = {"timings": report["timings"], "profile": report["profile"]}
+        stored["summary"].update(fields)
+        stored["result"].update(fields)
+        run_id = stored["summary"].get("run_id")
+        if run_id is None:
+            return
+        try:
+            backtest_store.store.attach(run_id, fields, report["files"])
+        except Exception:
+            logger.exception("Could not store the profile of run %s", run_id)
+        timings = report["timings"]
+        if timings["total_wall_ms"] >= run_profile.BACKTEST_SLOW_SECONDS * 1000:
+            logger.warning("Slow backtest run %s: %.1f s (%s)", run_id, timings["total_wall_ms"] / 1000,
+                           ", ".join(f"{k} {v['wall_ms'] / 1000:.1f} s" for k, v in timings["phases"].items()))
+
     def get_all_strategies(self) -> List[Dict[str, Any]]:
         """Get all strategies."""
         return list(self.strategies.values())
@@ -441,7 +801,8 @@ class NautilusTradingSystem:
             equity_curve.append({"time": time_str, "equity": round(running, 2)})
         return equity_curve
 
-    def _calc_max_drawdown(self, equity_curve: List[Dict]) -> float:
+    @staticmethod
+    def _calc_max_drawdown(equity_curve: List[Dict]) -> float:
         """Calculate maximum drawdown percentage from equity curve."""
         max_dd = 0.0
         peak = 0.0
@@ -455,7 +816,8 @@ class NautilusTradingSystem:
                     max_dd = dd
         return round(max_dd, 2)
 
-    def _calc_sharpe(self, equity_curve: List[Dict]) -> float:
+    @staticmethod
+    def _calc_sharpe(equity_curve: List[Dict]) -> float:
         """Approximate annualised Sharpe ratio from equity curve returns."""
         import statistics
         if len(equity_curve) < 3:
@@ -475,22 +837,69 @@ class NautilusTradingSystem:
         except Exception:
             return 0.0
 
+    def _position_metrics(self, positions, starting_balance: float, start_date: str,
+                          equity_curve: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Trade counts, win rate, realized PnL, drawdown and Sharpe of ``positions``."""
+        closed = [p for p in positions if p.is_closed]
+        pnls = [float(p.realized_pnl.as_double()) if p.realized_pnl else 0.0 for p in closed]
+        winning = sum(1 for pnl in pnls if pnl > 0)
+        losing = sum(1 for pnl in pnls if pnl < 0)
+        if equity_curve is None:
+            equity_curve = self._build_equity_curve(positions, starting_balance, start_date)
+        return {
+            "realized_pnl": round(sum(pnls), 2),
+            "total_trades": len(closed),
+            "winning_trades": winning,
+            "losing_trades": losing,
+            "win_rate": round(winning / len(closed) * 100, 2) if closed else 0.0,
+            "max_drawdown": self._calc_max_drawdown(equity_curve),
+            "sharpe_ratio": self._calc_sharpe(equity_curve),
+        }
+
     def run_demo_backtest(
         self,
         fast_period: int = 10,
         slow_period: int = 20,
         starting_balance: float = 100000.0,
         num_bars: int = 500,
+        use_cache: bool = True,
+        profile: bool = False,
     ) -> Dict[str, Any]:
         """
         Run a demo backtest using synthetic price data.
         Works without a real data catalog – uses TestInstrumentProvider.
+        The synthetic series is seeded, so identical parameters are served
+        from backtest_cache unless ``use_cache`` is False (or ``profile``
+        asks for a cProfile of a fresh run).
         """
         import random
+        started = time.perf_counter()
+        prof = None
         try:
+            cache_key = backtest_cache.make_key(
+                "demo",
+                strategy_type="sma",
+                config={"fast_period": fast_period, "slow_period": slow_period, "num_bars": num_bars},
+                instrument_id="EUR/USD.SIM",
+                start_date="2021-01-01",
+                end_date="2021-01-08",
+                starting_balance=starting_balance,
+                data_version="synthetic",
+            )
+            cached = backtest_cache.cache.lookup(cache_key) if use_cache and not profile else None
+            if cached is not None:
+                return {"success": True, "result": cached}
+            prof = run_profile.RunProfiler(profile=profile)
+            prof.phase("setup")
+            from nautilus_trader.backtest.engine import BacktestEngine, BacktestEngineConfig
+            from nautilus_trader.config import LoggingConfig
             from nautilus_trader.test_kit.providers import TestInstrumentProvider
+            from nautilus_trader.model.currencies import USD
             from nautilus_trader.model.data import Bar, BarType
-            from nautilus_trader.model.objects import Price, Quantity
+            from nautilus_trader.model.enums import AccountType, OmsType
+            from nautilus_trader.model.identifiers import TraderId, Venue
+            from nautilus_trader.model.objects import Money, Price, Quantity
+            from strategies.sma_crossover import SMACrossoverConfig, SMACrossoverStrategy
 
             engine_config = BacktestEngineConfig(
                 trader_id=TraderId("DEMO-001"),
@@ -516,6 +925,7 @@ class NautilusTradingSystem:
             engine.add_instrument(instrument)
 
             # Generate synthetic bar data (geometric brownian motion with slight upward drift)
+            prof.phase("generate_data")
             bar_type = BarType.from_str(f"{instrument.id}-1-MINUTE-BID-INTERNAL")
             bars = []
             current_price = 1.10000
@@ -543,9 +953,13 @@ class NautilusTradingSystem:
                 )
                 bars.append(bar)
                 current_price = close_p
+            prof.count("bars", len(bars))
 
+            prof.phase("add_data")
             engine.add_data(bars)
 
+            prof.phase("run")
+
             strategy_config = SMACrossoverConfig(
                 strategy_id="demo_sma",
                 instrument_id=str(instrument.id),
@@ -561,6 +975,7 @@ class NautilusTradingSystem:
             engine.run()
             logger.info("Demo backtest complete")
 
+            prof.phase("extract")
             accounts = list(engine.cache.accounts())
             account = accounts[0] if accounts else None
             orders = list(engine.cache.orders())
@@ -579,9 +994,11 @@ class NautilusTradingSystem:
             max_drawdown = self._calc_max_drawdown(equity_curve)
             sharpe_ratio = self._calc_sharpe(equity_curve)
 
-            result = {
+            summary = {
+                "kind": "demo",
                 "strategy_id": "demo",
                 "strategy_name": f"SMA Crossover (fast={fast_period}, slow={slow_period})",
+                "instrument_id": str(instrument.id),
                 "start_date": "2021-01-01",
                 "end_date": "2021-01-08",
                 "starting_balance": starting_balance,
@@ -594,14 +1011,17 @@ class NautilusTradingSystem:
                 "max_drawdown": max_drawdown,
                 "sharpe_ratio": sharpe_ratio,
                 "total_orders": len(orders),
+                "total_positions": len(positions),
+                "open_positions": sum(1 for p in positions if p.is_open),
                 "completed_at": datetime.now(timezone.utc).isoformat(),
-                "equity_curve": equity_curve,
-                "orders": [self._order_to_dict(o) for o in orders[:200]],
-                "positions": [self._position_to_dict(p) for p in positions[:200]],
                 "fast_period": fast_period,
                 "slow_period": slow_period,
                 "num_bars": num_bars,
             }
+            stored = self._store_run(summary, orders, positions, equity_curve, prof=prof)
+            self._attach_profile(prof, stored, events=len(bars))
+            result = stored["result"]
+            backtest_cache.cache.store(cache_key, result["run_id"], time.perf_counter() - started)
 
             engine.dispose()
             return {"success": True, "result": result}
@@ -617,11 +1037,15 @@ class NautilusTradingSystem:
                 "error": str(e),
                 "trace": error_trace,
             }
+        finally:
+            if prof is not None:
+                prof.finish()
 
     def _order_to_dict(self, order) -> Dict[str, Any]:
         """Convert Nautilus Order to dictionary."""
         return {
             "id": str(order.client_order_id),
+            "strategy_id": str(order.strategy_id),
             "instrument_id": str(order.instrument_id),
             "side": str(order.side),
             "type": str(order.order_type),
@@ -630,12 +1054,36 @@ class NautilusTradingSystem:
             "filled_qty": float(order.filled_qty),
             "avg_px": float(order.avg_px) if order.avg_px else None,
             "ts_init": order.ts_init,
+            "ts_last": order.ts_last,
         }
+
+    def _fills_to_dicts(self, orders) -> List[Dict[str, Any]]:
+        """Every OrderFilled event of ``orders``, as dictionaries."""
+        fills = []
+        for order in orders:
+            for event in order.events:
+                if type(event).__name__ != "OrderFilled":
+                    continue
+                commission = event.commission
+                fills.append({
+                    "order_id": str(event.client_order_id),
+                    "trade_id": str(event.trade_id),
+                    "instrument_id": str(event.instrument_id),
+                    "side": str(event.order_side),
+                    "last_qty": float(event.last_qty),
+                    "last_px": float(event.last_px),
+                    "commission": float(commission.as_double()) if commission else 0.0,
+                    "commission_currency": str(commission.currency) if commission else None,
+                    "liquidity_side": str(event.liquidity_side),
+                    "ts_event": event.ts_event,
+                })
+        return fills
     
     def _position_to_dict(self, position) -> Dict[str, Any]:
         """Convert Nautilus Position to dictionary."""
         return {
             "id": str(position.id),
+            "strategy_id": str(position.strategy_id),
             "instrument_id": str(position.instrument_id),
             "side": str(position.side),
             "quantity": float(position.quantity),
@@ -650,6 +1098,23 @@ class NautilusTradingSystem:
         }
 
 
+def _config_instrument_id(config) -> str:
+    """Instrument id of a strategy config object or plain dict."""
+    if isinstance(config, dict):
+        return config.get("instrument_id", "EUR/USD.SIM")
+    return str(config.instrument_id)
+
+
+def _build_strategy(strategy_info: Dict[str, Any]):
+    """Nautilus strategy instance for a stored strategy (dispatch by type)."""
+    from strategies.rsi_strategy import RSIStrategy
+    from strategies.sma_crossover import SMACrossoverStrategy
+
+    if strategy_info["type"] == "rsi":
+        return RSIStrategy(config=strategy_info["config"])
+    return SMACrossoverStrategy(config=strategy_info["config"])
+
+
 # Global instance
 nautilus_system = NautilusTradingSystem()
 
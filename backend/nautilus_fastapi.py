@@ -6,28 +6,32 @@ This file wires the FastAPI app together; business logic lives in routers/.
 import asyncio
 import json
 import os
-import secrets
 import sys
 import time
-from collections import defaultdict
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
 # Ensure backend dir is on the path so routers can import sibling modules
 sys.path.insert(0, str(Path(__file__).parent))
 
+# First app import: starts the startup-phase clock
+import startup_profile
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+
+import analytics
+import audit_archive
 import database
-import auth as _auth_module
-from auth import ApiKeyMiddleware
-from auth_jwt import decode_token
+import auth_jwt
+import exports
+import maintenance
+from audit_log import audit_writer
 from routers import (
     adapters,
     alerts,
+    analytics as analytics_router,
     auth as auth_router_module,
     backtest,
     components,
@@ -40,10 +44,14 @@ from routers import (
     system,
     users,
 )
-from routers.strategies import load_strategies_from_db
+from routers.strategies import load_strategies_from_db, resume_live_strategies
 from routers.components import load_component_states
 from state import manager, nautilus_system
 from alert_monitor import run_alert_monitor
+from strategy_runtime import strategy_host
+from middleware import RequestPipeline
+
+startup_profile.mark("imports")
 
 
 # ── Lifespan (startup / shutdown) ─────────────────────────────────────────────
@@ -82,33 +90,112 @@ def _check_production_secrets() -> None:
         print(f"{border}\n", file=sys.stderr)
 
 
+# Revocations made by other worker processes become visible within this many seconds
+_REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", "30"))
+
+
 async def _purge_expired_tokens_loop() -> None:
-    """Hourly purge of expired entries from the token revocation table."""
+    """Re-sync the in-memory revocation set; hourly purge of expired DB entries."""
+    last_purge = time.monotonic()
     while True:
-        await asyncio.sleep(3600)
+        await asyncio.sleep(_REVOCATION_SYNC_SECONDS)
         try:
-            removed = await database.purge_expired_revoked_tokens()
-            if removed:
-                print(f"[auth] Purged {removed} expired revoked token(s)")
+            await auth_jwt.load_revoked_tokens()
+            if time.monotonic() - last_purge >= 3600:
+                last_purge = time.monotonic()
+                removed = await database.purge_expired_revoked_tokens()
+                if removed:
+                    print(f"[auth] Purged {removed} expired revoked token(s)")
         except Exception:
             pass
 
 
+# Audit rows older than AUDIT_HOT_DAYS move to compressed day partitions
+_AUDIT_ARCHIVE_INTERVAL_HOURS = float(os.getenv("AUDIT_ARCHIVE_INTERVAL_HOURS", "24"))
+
+
+async def _audit_archive_loop() -> None:
+    """Archive old audit rows shortly after startup, then every interval."""
+    await asyncio.sleep(60)
+    while True:
+        try:
+            await audit_archive.archive_audit_logs()
+        except Exception as exc:
+            print(f"[audit] Archival failed: {exc}", file=sys.stderr)
+        await asyncio.sleep(_AUDIT_ARCHIVE_INTERVAL_HOURS * 3600)
+
+
+# Catalog preload: "background" (default) loads instruments in a worker thread
+# once the app is serving, "blocking" loads them before the first request,
+# "off" leaves it to POST /api/engine/initialize or the first backtest.
+_CATALOG_PRELOAD = os.getenv("CATALOG_PRELOAD", "background").lower()
+
+
+async def _load_catalog() -> None:
+    """Load catalog instruments off the event loop (imports nautilus_trader)."""
+    if nautilus_system.is_initialized:
+        startup_profile.set_catalog_state("ready")
+        return
+    startup_profile.set_catalog_state("loading")
+    try:
+        result = await asyncio.to_thread(nautilus_system.initialize)
+    except Exception as exc:
+        startup_profile.set_catalog_state("error", str(exc))
+        return
+    if result.get("success"):
+        startup_profile.set_catalog_state(
+            "ready", f"{result.get('instruments_count', 0)} instruments"
+        )
+    else:
+        startup_profile.set_catalog_state("unavailable", result.get("message"))
+    startup_profile.mark("catalog_loaded")
+
+
+async def _restore_strategies() -> None:
+    """Restore persisted strategies once serving: their configs import nautilus_trader."""
+    try:
+        await load_strategies_from_db()
+        resume_live_strategies()
+    except Exception as exc:
+        print(f"[strategies] Restore failed: {exc}", file=sys.stderr)
+    startup_profile.mark("strategies_restored")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: check secrets before anything else
     _check_production_secrets()
     # Initialise the SQLite schema + seed defaults
     await database.init_db()
-    # Restore persisted strategies and component states
-    await load_strategies_from_db()
+    await auth_jwt.load_revoked_tokens()
+    await audit_writer.start()
+    startup_profile.mark("init_db")
+    # Restore component states (strategies follow in the background, see below)
     await load_component_states()
+    startup_profile.mark("restore_state")
     # Start background tasks
     alert_task = asyncio.create_task(run_alert_monitor())
     purge_task = asyncio.create_task(_purge_expired_tokens_loop())
+    tasks = [alert_task, purge_task]
+    if _AUDIT_ARCHIVE_INTERVAL_HOURS > 0:
+        tasks.append(asyncio.create_task(_audit_archive_loop()))
+    if maintenance.MAINTENANCE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(maintenance.scheduler.run_forever()))
+    if _CATALOG_PRELOAD == "blocking":
+        await _load_catalog()
+    elif _CATALOG_PRELOAD != "off":
+        tasks.append(asyncio.create_task(_load_catalog()))
+    tasks.append(asyncio.create_task(_restore_strategies()))
+    startup_profile.mark("ready")
     yield
-    # Shutdown: cancel background tasks
-    for task in (alert_task, purge_task):
+    # Shutdown: stop live strategy workers, then cancel background tasks
+    await strategy_host.shutdown()
+    auth_jwt.shutdown_password_pool()
+    exports.shutdown_export_pool()
+    analytics.engine.close()
+    # Drain buffered audit entries (strategy shutdown may have just added some)
+    await audit_writer.stop()
+    for task in tasks:
         task.cancel()
         try:
             await task
@@ -125,6 +212,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# ── Middleware ────────────────────────────────────────────────────────────────
+# Added innermost-first: RequestPipeline (API key → JWT → rate limit → counter,
+# see middleware.py) sits inside CORS so preflights and error responses still
+# get CORS headers.
+
+app.add_middleware(RequestPipeline, on_request=system.increment_request_counter)
+
 # CORS — set CORS_ORIGINS env var in production (comma-separated)
 _cors_env = os.getenv("CORS_ORIGINS", "")
 CORS_ORIGINS = (
@@ -140,127 +234,6 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type", "X-API-Key"],
 )
 
-# API key auth (enabled when API_KEY env var is set)
-app.add_middleware(ApiKeyMiddleware)
-
-# ── Rate limiting ─────────────────────────────────────────────────────────────
-
-_GLOBAL_RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_MINUTE", "200"))
-_LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", "5"))
-
-# Per-IP sliding window counters: {ip: {"count": N, "window_start": T}}
-_global_counters: dict = defaultdict(lambda: {"count": 0, "window_start": 0.0})
-_login_counters: dict = defaultdict(lambda: {"count": 0, "window_start": 0.0})
-
-
-def _check_rate_limit(counters: dict, key: str, limit: int, now: float) -> tuple[int, bool]:
-    """
-    Check and update a rate-limit counter.
-    Returns (remaining, is_exceeded).
-    """
-    state = counters[key]
-    if now - state["window_start"] >= 60.0:
-        state["count"] = 0
-        state["window_start"] = now
-    state["count"] += 1
-    remaining = max(0, limit - state["count"])
-    return remaining, state["count"] > limit
-
-
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    client_ip = (request.client.host if request.client else "unknown") or "unknown"
-    now = time.time()
-
-    # Tight limit on login endpoint
-    if request.url.path == "/api/auth/login":
-        _, exceeded = _check_rate_limit(_login_counters, client_ip, _LOGIN_RATE_LIMIT, now)
-        if exceeded:
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Rate limit exceeded. Retry after 60 seconds."},
-                headers={"Retry-After": "60", "X-RateLimit-Remaining": "0"},
-            )
-
-    # Global rate limit (applied to all routes)
-    remaining, exceeded = _check_rate_limit(_global_counters, client_ip, _GLOBAL_RATE_LIMIT, now)
-    if exceeded:
-        return JSONResponse(
-            status_code=429,
-            content={"detail": "Global rate limit exceeded. Retry after 60 seconds."},
-            headers={"Retry-After": "60", "X-RateLimit-Remaining": "0"},
-        )
-
-    response = await call_next(request)
-    response.headers["X-RateLimit-Remaining"] = str(remaining)
-    return response
-
-
-# ── JWT authentication middleware ─────────────────────────────────────────────
-
-# Paths that are always public (no token required)
-_PUBLIC_PATHS = frozenset(
-    [
-        "/",
-        "/health",
-        "/api/health",
-        "/api/auth/login",
-        "/api/auth/logout",
-        "/api/auth/refresh",
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-        "/ws",
-    ]
-)
-
-
-@app.middleware("http")
-async def jwt_middleware(request: Request, call_next):
-    path = request.url.path
-
-    # Allow public paths and non-API routes
-    if path in _PUBLIC_PATHS or not path.startswith("/api/"):
-        return await call_next(request)
-
-    # Skip JWT check when a valid API key is already provided (alternative auth)
-    api_key_header = request.headers.get("X-API-Key", "")
-    if _auth_module.API_KEY and api_key_header and secrets.compare_digest(api_key_header, _auth_module.API_KEY):
-        return await call_next(request)
-
-    # Check for valid Bearer token
-    auth_header = request.headers.get("Authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Missing authentication token"},
-        )
-
-    token = auth_header[7:]
-    payload = decode_token(token)
-    if not payload:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Invalid or expired token"},
-        )
-
-    # Check persistent DB blacklist (survives restarts)
-    if payload.get("jti") and await database.is_token_revoked(payload["jti"]):
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Token has been revoked"},
-        )
-
-    request.state.user = payload
-    return await call_next(request)
-
-
-# Request counter middleware
-@app.middleware("http")
-async def _count_requests(request: Request, call_next):
-    system.increment_request_counter()
-    return await call_next(request)
-
 
 # ── Include routers ───────────────────────────────────────────────────────────
 
@@ -277,6 +250,7 @@ app.include_router(adapters.router)
 app.include_router(database_ops.router)
 app.include_router(components.router)
 app.include_router(users.router)
+app.include_router(analytics_router.router)
 
 
 # ── Root endpoint ─────────────────────────────────────────────────────────────
@@ -329,17 +303,10 @@ async def _collect_live_snapshot() -> dict:
         for s in nautilus_system.get_all_strategies()
     ]
 
-    # Open positions (from latest backtest results, filtered by closed set)
-    all_positions = []
-    for results in nautilus_system.backtest_results.values():
-        all_positions.extend(results.get("positions", []))
-    open_positions = [p for p in all_positions if p.get("is_open")]
-
-    # Recent orders count
-    order_count = sum(
-        len(r.get("orders", []))
-        for r in nautilus_system.backtest_results.values()
-    )
+    # Open positions / orders of the latest backtest runs (summary counts)
+    summaries = list(nautilus_system.backtest_results.values())
+    open_positions_count = sum(r.get("open_positions", 0) for r in summaries)
+    order_count = sum(r.get("total_orders", 0) for r in summaries)
 
     return {
         "type": "live_data",
@@ -352,7 +319,7 @@ async def _collect_live_snapshot() -> dict:
         },
         "metrics": metrics,
         "strategies": strategy_list,
-        "open_positions_count": len(open_positions),
+        "open_positions_count": open_positions_count,
         "total_orders_count": order_count,
     }
 
@@ -370,13 +337,9 @@ async def websocket_endpoint(websocket: WebSocket, token: str = ""):
         await websocket.close(code=4001, reason="Missing authentication token")
         return
 
-    payload = decode_token(token)
-    if not payload:
-        await websocket.close(code=4001, reason="Invalid or expired token")
-        return
-
-    if payload.get("jti") and await database.is_token_revoked(payload["jti"]):
-        await websocket.close(code=4001, reason="Token has been revoked")
+    payload, error = auth_jwt.authenticate_bearer(token)
+    if error:
+        await websocket.close(code=4001, reason=error)
         return
 
     await manager.connect(websocket)
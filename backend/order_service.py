@@ -0,0 +1,82 @@
+"""
+Order Service
+=============
+The one path every new order takes, whether it comes from
+``POST /api/orders`` or a live strategy (strategy_runtime.route_order):
+
+    1. RiskEngine.check_order()         RiskCheckError (422)
+    2. adapter gate                      400: a non-.SIM instrument needs a
+                                         connected adapter until risk limits
+                                         have been explicitly configured
+    3. LiveTradingManager.submit_order() when an adapter is connected;
+                                         400 (rejected) / 502 (exchange error)
+    4. persisted order row               paper mode when no adapter
+    5. audit entry
+
+Failures are raised as HTTPException subclasses (like RiskCheckError), so
+the router lets them through and other callers read ``status_code``.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+import database
+from risk_engine import risk_engine
+from state import live_manager
+
+
+async def place_order(order: Dict[str, Any], *, user_id: str,
+                      strategy_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run ``order`` (instrument, side, type, quantity, price, leverage)
+    through the steps above.  Returns ``{"order": row, "exchange_order_id": ...}``.
+    """
+    # 1. Risk check — runs before anything else
+    await risk_engine.check_order(order)
+
+    # 2. Require adapter for live-exchange instruments when no risk limits configured.
+    # When risk limits have never been explicitly set, the system is in pristine/demo
+    # mode and live-instrument orders need a connected adapter.
+    # Once limits are explicitly configured, paper trading is permitted on any instrument.
+    if not live_manager.is_connected() and not order["instrument"].endswith(".SIM"):
+        limits_configured = await database.risk_limits_explicitly_set()
+        if not limits_configured:
+            raise HTTPException(
+                status_code=400,
+                detail="No adapter connected. Connect an exchange adapter before placing live orders.",
+            )
+
+    # 3. Live routing when adapter is connected
+    exchange_order_id = None
+    if live_manager.is_connected():
+        try:
+            exchange_result = await live_manager.submit_order(order)
+            if isinstance(exchange_result, dict):
+                exchange_order_id = (
+                    exchange_result.get("exchange_order_id")
+                    or exchange_result.get("order_id")
+                )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except Exception as exc:
+            raise HTTPException(status_code=502, detail=f"Exchange error: {str(exc)}")
+
+    # 4. Persist order to DB (paper mode when no adapter, live mode otherwise)
+    row = await database.create_order(
+        instrument=order["instrument"],
+        side=order["side"],
+        order_type=order["type"],
+        quantity=order["quantity"],
+        price=order.get("price"),
+        strategy_id=strategy_id,
+        exchange_order_id=exchange_order_id,
+    )
+    await database.log_action(
+        action="order_created",
+        user_id=user_id,
+        resource=f"order:{row['id']}",
+        details=(f"instrument={order['instrument']} side={order['side']} "
+                 f"qty={order['quantity']} price={order.get('price')}"),
+    )
+    return {"order": row, "exchange_order_id": exchange_order_id}
@@ -0,0 +1,312 @@
+"""
+Rate Limiting
+=============
+Token-bucket rate limiter (GCRA form) with bounded memory and an optional
+store shared between worker processes.
+
+GCRA keeps a single number per key — the "theoretical arrival time" (TAT)
+of the next request.  A policy of ``limit`` requests per ``period`` seconds
+gives an emission interval of ``period / limit``; a request is allowed while
+``TAT - period <= now`` and each allowed request pushes TAT forward by one
+interval.  That is exactly a bucket of ``limit`` tokens refilling
+continuously, with no fixed-window edge bursts and O(1) state per key.
+
+Policies (evaluated in order, first rejection wins; the policies already
+charged for a rejected request are refunded, so it costs no tokens):
+
+    route   — prefix-matched paths, e.g. login: 5/min per IP (always on)
+    user    — per authenticated user (USER_RATE_LIMIT_PER_MINUTE, off by default)
+    global  — every request, per client IP (RATE_LIMIT_PER_MINUTE)
+
+Backends:
+
+    memory  — per-process OrderedDict, LRU-capped at RATE_LIMIT_MAX_KEYS
+    sqlite  — one row per key in RATE_LIMIT_DB, updated with a single atomic
+              UPSERT so all uvicorn workers share the same buckets
+
+Keys whose TAT has passed are equivalent to a full bucket, so evicting them
+(or the least-recently-used ones under IP-spray) never over-restricts.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    name: str
+    limit: int
+    period: float = 60.0
+    key: str = "ip"            # "ip" | "user" | "user_or_ip"
+    path_prefix: str = ""      # route policies only
+    methods: Tuple[str, ...] = ()
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.path_prefix and not path.startswith(self.path_prefix):
+            return False
+        return not self.methods or method in self.methods
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+    policy: Optional[str] = None
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class MemoryBackend:
+    """Per-process TAT store, LRU-bounded."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
+
+    def hit(self, key: str, interval: float, period: float, now: float) -> Tuple[bool, float]:
+        """Apply one request; return (allowed, resulting TAT)."""
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + interval
+        if new_tat - period > now:
+            if key in self._tat:
+                self._tat.move_to_end(key)
+            return False, tat
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+            self.evictions += 1
+        return True, new_tat
+
+    def refund(self, key: str, interval: float) -> None:
+        """Undo one allowed hit (the request was rejected by a later policy)."""
+        if key in self._tat:
+            self._tat[key] -= interval
+
+    def size(self) -> int:
+        return len(self._tat)
+
+    def reset(self) -> None:
+        self._tat.clear()
+
+
+class SQLiteBackend:
+    """
+    TAT store in a local SQLite file shared by every worker process.
+
+    Each hit is one autocommit UPSERT … RETURNING: SQLite serialises writers,
+    so concurrent workers cannot both spend the last token.  Rows whose TAT
+    has passed are pruned periodically, and the table is capped at max_keys.
+    """
+
+    name = "sqlite"
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, max_keys: int = 100_000) -> None:
+        self.path = path
+        self.max_keys = max_keys
+        self.errors = 0
+        self._hits = 0
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits(tat)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=0.05, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, interval: float, period: float, now: float) -> Tuple[bool, float]:
+        conn = self._conn()
+        try:
+            row = conn.execute(
+                """INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval)
+                   ON CONFLICT(key) DO UPDATE SET tat = max(tat, :now) + :interval
+                   WHERE max(tat, :now) + :interval - :period <= :now
+                   RETURNING tat""",
+                {"key": key, "now": now, "interval": interval, "period": period},
+            ).fetchone()
+            if row is None:
+                cur = conn.execute("SELECT tat FROM rate_limits WHERE key=?", (key,)).fetchone()
+                return False, cur[0] if cur else now
+            self._hits += 1
+            if self._hits % self._PRUNE_EVERY == 0:
+                self._prune(now)
+            return True, row[0]
+        except sqlite3.Error as exc:
+            # Fail open: a locked/corrupt limiter store must not take the API down
+            self.errors += 1
+            logger.warning("Rate-limit store error (allowing request): %s", exc)
+            return True, now
+
+    def refund(self, key: str, interval: float) -> None:
+        try:
+            self._conn().execute("UPDATE rate_limits SET tat = tat - ? WHERE key = ?", (interval, key))
+        except sqlite3.Error as exc:
+            self.errors += 1
+            logger.warning("Rate-limit store error (refund skipped): %s", exc)
+
+    def _prune(self, now: float) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        conn.execute(
+            """DELETE FROM rate_limits WHERE key IN (
+                   SELECT key FROM rate_limits ORDER BY tat DESC LIMIT -1 OFFSET ?)""",
+            (self.max_keys,),
+        )
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def reset(self) -> None:
+        self._conn().execute("DELETE FROM rate_limits")
+
+
+# ── Limiter ───────────────────────────────────────────────────────────────────
+
+def parse_route_policies(spec: str) -> List[RatePolicy]:
+    """
+    Parse ``RATE_LIMIT_ROUTES``: comma-separated ``[METHOD ]/prefix=N/unit[:key]``
+    entries, e.g. ``"POST /api/orders=120/min:user, /api/backtest=10/min"``.
+    Units: sec, min, hour.  Key defaults to user_or_ip.
+    """
+    periods = {"s": 1.0, "sec": 1.0, "m": 60.0, "min": 60.0, "h": 3600.0, "hour": 3600.0}
+    policies = []
+    for raw in filter(None, (p.strip() for p in spec.split(","))):
+        target, _, rate = raw.partition("=")
+        rate, _, key = rate.partition(":")
+        count, _, unit = rate.partition("/")
+        parts = target.split()
+        methods = (parts[0].upper(),) if len(parts) == 2 else ()
+        prefix = parts[-1]
+        try:
+            policy = RatePolicy(
+                name=f"route:{raw.split('=')[0].strip()}",
+                limit=int(count),
+                period=periods[unit.strip().lower() or "min"],
+                key=key.strip() or "user_or_ip",
+                path_prefix=prefix,
+                methods=methods,
+            )
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid RATE_LIMIT_ROUTES entry: {raw!r}")
+        policies.append(policy)
+    return policies
+
+
+@dataclass
+class RateLimiter:
+    backend: object
+    global_policy: Optional[RatePolicy]
+    route_policies: List[RatePolicy] = field(default_factory=list)
+    user_policy: Optional[RatePolicy] = None
+    rejected: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+        if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "sqlite":
+            default_db = Path(__file__).parent / "data" / "rate_limits.db"
+            backend = SQLiteBackend(os.getenv("RATE_LIMIT_DB", str(default_db)), max_keys=max_keys)
+        else:
+            backend = MemoryBackend(max_keys=max_keys)
+
+        global_limit = int(os.getenv("RATE_LIMIT_PER_MINUTE", "200"))
+        login_limit = int(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", "5"))
+        user_limit = int(os.getenv("USER_RATE_LIMIT_PER_MINUTE", "0"))
+        routes = [
+            RatePolicy("login", login_limit, key="ip", path_prefix="/api/auth/login"),
+            *parse_route_policies(os.getenv("RATE_LIMIT_ROUTES", "")),
+        ]
+        return cls(
+            backend=backend,
+            global_policy=RatePolicy("global", global_limit) if global_limit > 0 else None,
+            route_policies=[p for p in routes if p.limit > 0],
+            user_policy=RatePolicy("user", user_limit, key="user") if user_limit > 0 else None,
+        )
+
+    def _clock(self) -> float:
+        # Shared store: wall clock (comparable across processes)
+        return time.time() if isinstance(self.backend, SQLiteBackend) else time.monotonic()
+
+    def _identity(self, policy: RatePolicy, ip: str, user: Optional[str]) -> Optional[str]:
+        if policy.key == "ip":
+            return ip
+        if policy.key == "user":
+            return user
+        return user or ip
+
+    def check(self, method: str, path: str, ip: str, user: Optional[str] = None) -> Decision:
+        """
+        Charge one request against every applicable policy.  A rejection
+        refunds the policies charged before it, so a client held back by
+        one limit does not drain its other budgets.
+        """
+        policies = [p for p in self.route_policies if p.matches(method, path)]
+        if self.user_policy and user:
+            policies.append(self.user_policy)
+        if self.global_policy:
+            policies.append(self.global_policy)
+
+        now = self._clock()
+        remaining: Optional[int] = None
+        charged: List[Tuple[str, float]] = []
+        for policy in policies:
+            ident = self._identity(policy, ip, user)
+            if ident is None:
+                continue
+            key = f"{policy.name}|{ident}"
+            allowed, tat = self.backend.hit(key, policy.interval, policy.period, now)
+            if not allowed:
+                for charged_key, interval in charged:
+                    self.backend.refund(charged_key, interval)
+                self.rejected[policy.name] = self.rejected.get(policy.name, 0) + 1
+                retry = max(0.0, tat + policy.interval - policy.period - now)
+                return Decision(False, 0, retry_after=retry, policy=policy.name)
+            charged.append((key, policy.interval))
+            left = max(0, int((policy.period - (tat - now)) / policy.interval + 1e-9))
+            remaining = left if remaining is None else min(remaining, left)
+        return Decision(True, remaining if remaining is not None else -1)
+
+    def reset(self) -> None:
+        self.backend.reset()
+        self.rejected.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "tracked_keys": self.backend.size(),
+            "max_keys": self.backend.max_keys,
+            "rejected": dict(self.rejected),
+            "policies": [
+                {"name": p.name, "limit": p.limit, "period": p.period, "key": p.key}
+                for p in [*self.route_policies, self.user_policy, self.global_policy] if p
+            ],
+        }
+
+
+limiter = RateLimiter.from_env()
@@ -84,10 +84,12 @@ class RiskEngine:
         try:
             import database
             from state import nautilus_system
+            from strategy_runtime import strategy_host
             strategies = await database.list_strategies()
             for s in strategies:
                 if s.get("status") == "running":
                     await database.update_strategy_status(s["id"], "stopped")
+                    await strategy_host.stop(s["id"])
                     if s["id"] in nautilus_system.strategies:
                         nautilus_system.strategies[s["id"]]["status"] = "stopped"
         except Exception:
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
 import database
@@ -17,9 +17,22 @@ class AlertCreateRequest(BaseModel):
 
 
 @router.get("")
-async def list_alerts():
-    alerts = await database.list_alerts()
-    return {"alerts": alerts, "count": len(alerts)}
+async def list_alerts(
+    limit: int = Query(default=100, ge=1, le=database.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    symbol: Optional[str] = Query(default=None),
+    status: Optional[str] = Query(default=None),
+    since: Optional[str] = Query(default=None),
+    until: Optional[str] = Query(default=None),
+):
+    """List alerts newest first, keyset-paginated via ``cursor``/``next_cursor``."""
+    try:
+        alerts, next_cursor = await database.query_alerts(
+            limit=limit, cursor=cursor, symbol=symbol, status=status, since=since, until=until,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"alerts": alerts, "count": len(alerts), "next_cursor": next_cursor}
 
 
 @router.post("")
@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+import analytics
+import database
+from auth_jwt import get_current_user, require_admin
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+_DAY = r"^\d{4}-\d{2}-\d{2}$"
+_SOURCE = "^(all|live|backtest)$"
+
+
+def _db_path() -> Path:
+    # Read per call: database.DB_PATH is reassigned by tests and scripts
+    return Path(database.DB_PATH)
+
+
+async def _run(fn, *args, **kwargs):
+    """Run an analytics query in a worker thread; map engine errors to HTTP."""
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    except analytics.AnalyticsUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/pnl")
+async def pnl(
+    by: str = Query(default="day", pattern="^(day|instrument|strategy|source)$"),
+    source: str = Query(default="all", pattern=_SOURCE),
+    start: Optional[str] = Query(default=None, pattern=_DAY),
+    end: Optional[str] = Query(default=None, pattern=_DAY),
+    limit: int = Query(default=1000, ge=1, le=10_000),
+    _user: dict = Depends(get_current_user),
+):
+    """Realised PnL of closed trades per day (with running total), instrument, strategy or source."""
+    rows = await _run(analytics.pnl_by, _db_path(), by, source, start, end, limit)
+    return {"by": by, "source": source, "rows": rows}
+
+
+@router.get("/win-rate")
+async def win_rate(
+    by: str = Query(default="strategy", pattern="^(strategy|instrument|hour|weekday|holding)$"),
+    source: str = Query(default="all", pattern=_SOURCE),
+    start: Optional[str] = Query(default=None, pattern=_DAY),
+    end: Optional[str] = Query(default=None, pattern=_DAY),
+    _user: dict = Depends(get_current_user),
+):
+    """Win rate, average win / loss, profit factor and expectancy per bucket."""
+    rows = await _run(analytics.win_rate_by, _db_path(), by, source, start, end)
+    return {"by": by, "source": source, "buckets": rows}
+
+
+@router.get("/holding-times")
+async def holding_times(
+    by: Optional[str] = Query(default=None, pattern="^(strategy|instrument)$"),
+    source: str = Query(default="all", pattern=_SOURCE),
+    start: Optional[str] = Query(default=None, pattern=_DAY),
+    end: Optional[str] = Query(default=None, pattern=_DAY),
+    _user: dict = Depends(get_current_user),
+):
+    """Holding-time quantiles and histogram of closed trades."""
+    rows = await _run(analytics.holding_times, _db_path(), by, source, start, end)
+    return {
+        "by": by,
+        "source": source,
+        "bins": [label for label, _ in analytics.HOLDING_BINS],
+        "groups": rows,
+    }
+
+
+@router.get("/fee-drag")
+async def fee_drag(
+    by: str = Query(default="strategy", pattern="^(day|instrument|strategy|source)$"),
+    source: str = Query(default="all", pattern=_SOURCE),
+    start: Optional[str] = Query(default=None, pattern=_DAY),
+    end: Optional[str] = Query(default=None, pattern=_DAY),
+    fee_bps: Optional[float] = Query(default=None, ge=0, le=1000),
+    _user: dict = Depends(get_current_user),
+):
+    """Estimated fees (filled notional × fee_bps) against gross realised PnL."""
+    rows = await _run(analytics.fee_drag, _db_path(), by, source, start, end, fee_bps)
+    return {"by": by, "source": source, "rows": rows}
+
+
+@router.get("/status")
+async def analytics_status(_user: dict = Depends(get_current_user)):
+    """Engine mode (attached SQLite or snapshot), snapshot age, backtest sources."""
+    return analytics.engine.status()
+
+
+@router.post("/refresh")
+async def refresh(_admin: dict = Depends(require_admin)):
+    """Re-read the SQLite snapshot and rescan backtest outputs now."""
+    return await _run(analytics.engine.refresh, _db_path())
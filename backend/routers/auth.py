@@ -11,14 +11,13 @@ Endpoints:
   GET  /api/auth/2fa/status         — return current 2FA state for caller
 """
 
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
-import pyotp
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
 import database
-from auth_jwt import authenticate_user, create_access_token, get_current_user, decode_token
+from auth_jwt import authenticate_user, create_access_token, get_current_user, revoke_token, verify_token
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -37,6 +36,8 @@ class TotpVerifyRequest(BaseModel):
 
 def _verify_totp(secret: str, code: str) -> bool:
     """Return True if the TOTP code is valid (allows ±1 window for clock drift)."""
+    import pyotp
+
     totp = pyotp.TOTP(secret)
     return totp.verify(code, valid_window=1)
 
@@ -89,20 +90,14 @@ async def login(body: LoginRequest, request: Request):
 async def logout(request: Request):
     """
     Invalidate the caller's JWT by persisting its JTI to the DB blacklist.
-    The token stays blocked across server restarts until it naturally expires.
+    The token stays blocked across server restarts until it naturally expires,
+    and is rejected immediately via the in-memory revocation set.
     """
     auth_header = request.headers.get("Authorization", "")
     if auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-        payload = decode_token(token)
+        payload = verify_token(auth_header[7:])
         if payload and payload.get("jti"):
-            # Store expiry so we can purge old entries; fall back to 24 h
-            exp_ts = payload.get("exp")
-            if exp_ts:
-                expires_at = datetime.fromtimestamp(exp_ts, tz=timezone.utc).isoformat()
-            else:
-                expires_at = (datetime.now(timezone.utc) + timedelta(hours=24)).isoformat()
-            await database.revoke_token(payload["jti"], expires_at)
+            await revoke_token(payload)
     return {"success": True, "message": "Logged out successfully"}
 
 
@@ -134,6 +129,8 @@ async def setup_2fa(payload: dict = Depends(get_current_user)):
     Returns the Base32 secret and an otpauth URI suitable for QR code display.
     The caller must confirm with /2fa/enable before 2FA is actually enforced.
     """
+    import pyotp
+
     username = payload["sub"]
     secret = pyotp.random_base32()
 
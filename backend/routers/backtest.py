@@ -1,11 +1,22 @@
+import asyncio
+import json
 import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 
+import backtest_cache
+import backtest_store
 import database
-from auth_jwt import get_current_user
+import montecarlo
+import run_profile
+import walk_forward
+from auth_jwt import get_current_user, require_admin
 from state import nautilus_system, manager
+from utils import position_changes_message
 
 router = APIRouter(prefix="/api/nautilus", tags=["backtest"])
 
@@ -24,6 +35,8 @@ class BacktestRequest(BaseModel):
     start_date: str = "2020-01-01"
     end_date: str = "2020-01-31"
     starting_balance: float = Field(100_000.0, gt=0)
+    use_cache: bool = True
+    profile: bool = False  # capture a cProfile (see GET /backtests/{run_id}/profile)
 
     @field_validator("start_date", "end_date")
     @classmethod
@@ -44,6 +57,8 @@ class DemoBacktestRequest(BaseModel):
     slow_period: int = Field(20, ge=1, le=500)
     starting_balance: float = Field(100_000.0, gt=0)
     num_bars: int = Field(500, ge=10, le=10_000)
+    use_cache: bool = True
+    profile: bool = False
 
     @field_validator("slow_period")
     @classmethod
@@ -66,12 +81,82 @@ async def run_backtest(request: BacktestRequest, _user: dict = Depends(get_curre
             start_date=request.start_date,
             end_date=request.end_date,
             starting_balance=request.starting_balance,
+            use_cache=request.use_cache,
+            profile=request.profile,
         )
         if not result["success"]:
             raise HTTPException(status_code=500, detail=result["message"])
         positions = result.get("result", {}).get("positions", [])
         if positions:
-            await database.save_positions(positions, strategy_id=request.strategy_id)
+            changes = await database.save_positions(positions, strategy_id=request.strategy_id)
+            message = position_changes_message(changes, source="backtest")
+            if message:
+                await manager.broadcast(message)
+        return result
+    finally:
+        _backtest_lock = False
+
+
+class PortfolioBacktestRequest(BaseModel):
+    strategy_ids: List[str] = Field(..., min_length=1, max_length=50)
+    name: str = Field("portfolio", min_length=1, max_length=64, pattern=r"^[\w.-]+$")
+    start_date: str = "2020-01-01"
+    end_date: str = "2020-01-31"
+    starting_balance: float = Field(100_000.0, gt=0)
+    use_cache: bool = True
+
+    @field_validator("strategy_ids")
+    @classmethod
+    def check_unique(cls, v: List[str]) -> List[str]:
+        if len(set(v)) != len(v):
+            raise ValueError("strategy_ids must be unique")
+        return v
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def check_date_format(cls, v: str) -> str:
+        return _validate_date(v)
+
+    @field_validator("end_date")
+    @classmethod
+    def check_end_after_start(cls, v: str, info) -> str:
+        start = info.data.get("start_date", "")
+        if start and v <= start:
+            raise ValueError("end_date must be after start_date")
+        return v
+
+
+@router.post("/portfolio-backtest")
+async def run_portfolio_backtest(request: PortfolioBacktestRequest,
+                                 _user: dict = Depends(get_current_user)):
+    """
+    Run several strategies together in one engine over one pass of the
+    data, on a shared account.  Returns combined metrics plus
+    ``strategies`` (per-strategy metrics); the run is stored under ``name``.
+    """
+    global _backtest_lock
+    if _backtest_lock:
+        raise HTTPException(status_code=409, detail="A backtest is already running. Please wait.")
+    _backtest_lock = True
+    try:
+        result = nautilus_system.run_portfolio_backtest(
+            strategy_ids=request.strategy_ids,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            starting_balance=request.starting_balance,
+            name=request.name,
+            use_cache=request.use_cache,
+        )
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["message"])
+        by_strategy = defaultdict(list)
+        for position in result.get("result", {}).get("positions", []):
+            by_strategy[position.get("strategy_id") or request.name].append(position)
+        for strategy_id, positions in by_strategy.items():
+            changes = await database.save_positions(positions, strategy_id=strategy_id)
+            message = position_changes_message(changes, source="backtest")
+            if message:
+                await manager.broadcast(message)
         return result
     finally:
         _backtest_lock = False
@@ -79,7 +164,11 @@ async def run_backtest(request: BacktestRequest, _user: dict = Depends(get_curre
 
 @router.get("/backtest/{strategy_id}")
 async def get_backtest_results(strategy_id: str):
-    results = nautilus_system.get_backtest_results(strategy_id)
+    """
+    Summary of a strategy's latest run (or of one run, by run id).  Rows and
+    the equity curve are paged from GET /backtests/{run_id}/{table}.
+    """
+    results = await asyncio.to_thread(nautilus_system.get_backtest_results, strategy_id)
     if not results:
         raise HTTPException(
             status_code=404,
@@ -88,6 +177,122 @@ async def get_backtest_results(strategy_id: str):
     return {"success": True, "results": results}
 
 
+@router.get("/backtests")
+async def list_backtest_runs(
+    strategy_id: Optional[str] = Query(default=None),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """Stored run summaries, newest first."""
+    runs = await asyncio.to_thread(backtest_store.store.list_runs, strategy_id, offset, limit)
+    return {"runs": runs, "count": len(runs), "offset": offset}
+
+
+@router.get("/backtests/{run_id}")
+async def get_backtest_run(run_id: str):
+    summary = await asyncio.to_thread(backtest_store.store.get, run_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Backtest run {run_id} not found")
+    return summary
+
+
+@router.get("/backtests/{run_id}/monte-carlo")
+async def get_backtest_monte_carlo(
+    run_id: str,
+    method: str = Query(default="bootstrap", pattern="^(bootstrap|shuffle)$"),
+    simulations: int = Query(default=10_000, ge=100, le=100_000),
+    horizon: Optional[int] = Query(default=None, ge=2, le=100_000,
+                                   description="Trades per path (default: the run's trade count)"),
+    ruin_threshold: float = Query(default=0.5, gt=0, lt=1,
+                                  description="Loss of starting balance that counts as ruin"),
+    seed: Optional[int] = Query(default=None, ge=0),
+):
+    """
+    Monte Carlo resampling of a run's closed-trade returns: drawdown,
+    terminal equity and Sharpe distributions plus risk of ruin.
+    """
+    try:
+        return await asyncio.to_thread(
+            montecarlo.simulate_run, run_id, method=method, simulations=simulations,
+            horizon=horizon, ruin_threshold=ruin_threshold, seed=seed,
+        )
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Monte Carlo analysis requires numpy")
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Backtest run {run_id} not found")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/backtests/{run_id}/profile")
+async def get_backtest_profile(
+    run_id: str,
+    format: str = Query(default="collapsed", pattern="^(pstats|collapsed)$"),
+):
+    """
+    A run's stored profile: ``pstats`` (cProfile, runs requested with
+    ``profile: true``) or ``collapsed`` stacks for flamegraph.pl / speedscope
+    (also kept for every run slower than BACKTEST_SLOW_SECONDS).
+    """
+    name = run_profile.PSTATS_FILE if format == "pstats" else run_profile.COLLAPSED_FILE
+    try:
+        path = await asyncio.to_thread(backtest_store.store.artifact_path, run_id, name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No {format} profile for backtest run {run_id}")
+    media_type = "application/octet-stream" if format == "pstats" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=f"{run_id}.{name}")
+
+
+@router.get("/backtests/{run_id}/{table}")
+async def get_backtest_rows(
+    run_id: str,
+    table: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=10_000),
+    columns: Optional[str] = Query(default=None, description="Comma-separated column subset"),
+):
+    """One page of a run's orders, fills, positions or equity, read from Parquet."""
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        return await asyncio.to_thread(
+            backtest_store.store.read_rows, run_id, table, offset, limit, cols
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Backtest run {run_id} not found")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.delete("/backtests/{run_id}")
+async def delete_backtest_run(run_id: str, _admin: dict = Depends(require_admin)):
+    try:
+        deleted = await asyncio.to_thread(backtest_store.store.delete, run_id)
+    except KeyError:
+        deleted = False
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Backtest run {run_id} not found")
+    for key, summary in list(nautilus_system.backtest_results.items()):
+        if summary.get("run_id") == run_id:
+            del nautilus_system.backtest_results[key]
+    return {"success": True, "run_id": run_id}
+
+
+@router.get("/backtest-cache")
+async def get_backtest_cache_stats():
+    """Result cache hit / miss counters and size."""
+    return await asyncio.to_thread(backtest_cache.cache.stats)
+
+
+@router.post("/backtest-cache/invalidate")
+async def invalidate_backtest_cache(
+    kind: Optional[str] = Query(default=None, pattern="^(backtest|demo)$"),
+    _admin: dict = Depends(require_admin),
+):
+    """Drop cached entries (stored runs are kept)."""
+    dropped = await asyncio.to_thread(backtest_cache.cache.invalidate, kind)
+    return {"success": True, "dropped": dropped}
+
+
 @router.post("/demo-backtest")
 async def run_demo_backtest(request: DemoBacktestRequest, _user: dict = Depends(get_current_user)):
     global _backtest_lock
@@ -100,6 +305,8 @@ async def run_demo_backtest(request: DemoBacktestRequest, _user: dict = Depends(
             slow_period=request.slow_period,
             starting_balance=request.starting_balance,
             num_bars=request.num_bars,
+            use_cache=request.use_cache,
+            profile=request.profile,
         )
         if not result["success"]:
             raise HTTPException(
@@ -107,7 +314,10 @@ async def run_demo_backtest(request: DemoBacktestRequest, _user: dict = Depends(
             )
         demo_positions = result.get("result", {}).get("positions", [])
         if demo_positions:
-            await database.save_positions(demo_positions, strategy_id="demo")
+            changes = await database.save_positions(demo_positions, strategy_id="demo")
+            message = position_changes_message(changes, source="backtest")
+            if message:
+                await manager.broadcast(message)
         await manager.broadcast(
             {
                 "type": "backtest_complete",
@@ -231,6 +441,106 @@ async def run_parameter_sweep(request: ParameterSweepRequest, _user: dict = Depe
     }
 
 
+# Tunable parameters per strategy type (other create_strategy keys are fixed)
+WALK_FORWARD_PARAMS = {
+    "sma_crossover": ("fast_period", "slow_period"),
+    "rsi": ("rsi_period", "oversold_level", "overbought_level"),
+}
+# Typed int in the strategy configs: a float here would fail every trial
+_WALK_FORWARD_INT_PARAMS = {"fast_period", "slow_period", "rsi_period"}
+_walk_forward_running = False
+
+
+class WalkForwardRequest(BaseModel):
+    strategy_type: str = Field("sma_crossover", pattern="^(sma_crossover|rsi)$")
+    instrument_id: str = "EUR/USD.SIM"
+    bar_type: str = "EUR/USD.SIM-1-MINUTE-BID-INTERNAL"
+    trade_size: float = Field(100_000.0, gt=0)
+    param_grid: Dict[str, List[Union[int, float]]]
+    start_date: str
+    end_date: str
+    train_days: int = Field(60, ge=1, le=3650)
+    test_days: int = Field(20, ge=1, le=3650)
+    step_days: Optional[int] = Field(None, ge=1, le=3650)
+    anchored: bool = False
+    objective: str = Field("sharpe_ratio", pattern="^(total_pnl|sharpe_ratio|win_rate)$")
+    min_trades: int = Field(1, ge=0)
+    starting_balance: float = Field(100_000.0, gt=0)
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def check_date_format(cls, v: str) -> str:
+        return _validate_date(v)
+
+    @field_validator("param_grid")
+    @classmethod
+    def check_grid(cls, v: Dict[str, List[Union[int, float]]], info) -> Dict[str, List[Union[int, float]]]:
+        allowed = WALK_FORWARD_PARAMS[info.data.get("strategy_type", "sma_crossover")]
+        unknown = [name for name in v if name not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) {', '.join(unknown)}; tunable: {', '.join(allowed)}")
+        if not v or any(not values for values in v.values()):
+            raise ValueError("param_grid needs at least one value per parameter")
+        for name in _WALK_FORWARD_INT_PARAMS.intersection(v):
+            if any(float(x) != int(x) for x in v[name]):
+                raise ValueError(f"{name} values must be integers")
+            v[name] = [int(x) for x in v[name]]
+        return v
+
+
+@router.post("/walk-forward")
+async def run_walk_forward(request: WalkForwardRequest, _user: dict = Depends(get_current_user)):
+    """
+    Walk-forward optimization over the catalog, streamed as NDJSON events
+    (plan, window, oos, error, summary) while the trials run on a process
+    pool.  See walk_forward.py.
+    """
+    if not nautilus_system.is_initialized:
+        raise HTTPException(status_code=400, detail="System not initialized. Call /initialize first.")
+    try:
+        walk_forward.make_windows(request.start_date, request.end_date, request.train_days,
+                                  request.test_days, request.step_days, request.anchored)
+        walk_forward.param_combinations(request.param_grid)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if _walk_forward_running:
+        raise HTTPException(status_code=409, detail="A walk-forward run is already in progress.")
+
+    async def body():
+        # The flag is owned by the stream: a client gone before the first
+        # chunk never starts body(), so nothing is left set
+        global _walk_forward_running
+        if _walk_forward_running:
+            yield json.dumps({"event": "error", "phase": None, "window": None, "params": None,
+                              "error": "A walk-forward run is already in progress."}) + "\n"
+            return
+        _walk_forward_running = True
+        events = walk_forward.run_walk_forward(
+            catalog_path=nautilus_system.catalog_path,
+            strategy_type=request.strategy_type,
+            base_config={"instrument_id": request.instrument_id, "bar_type": request.bar_type,
+                         "trade_size": request.trade_size},
+            param_grid=request.param_grid,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            train_days=request.train_days,
+            test_days=request.test_days,
+            step_days=request.step_days,
+            anchored=request.anchored,
+            objective=request.objective,
+            min_trades=request.min_trades,
+            starting_balance=request.starting_balance,
+        )
+        try:
+            async for event in events:
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            await events.aclose()
+            _walk_forward_running = False
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
 @router.get("/system-info")
 async def get_system_info():
     return nautilus_system.get_system_info()
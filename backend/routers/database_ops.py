@@ -1,22 +1,29 @@
-import os
+import asyncio
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
+import backup
 import database
+import maintenance
 from auth_jwt import require_admin
 
 router = APIRouter(prefix="/api/database", tags=["database"])
 
-# Path to main SQLite file (same as database.py)
-_DB_PATH = database.DB_PATH
+
+def _db_path() -> Path:
+    # Read per call: database.DB_PATH is reassigned by tests and scripts
+    return Path(database.DB_PATH)
 
 
 class DatabaseOpRequest(BaseModel):
     db_type: str = "all"
+    compression: Optional[str] = None  # backup only: none | gzip | zstd (default BACKUP_COMPRESSION)
+    background: bool = False  # backup only: return the job id at once instead of awaiting the copy
 
 
 class CacheOpRequest(BaseModel):
@@ -29,8 +36,13 @@ class RestoreRequest(BaseModel):
 
 @router.post("/backup")
 async def backup_database(req: DatabaseOpRequest, _admin: dict = Depends(require_admin)):
-    """Copy the SQLite database file to a timestamped backup."""
-    db_path = Path(_DB_PATH)
+    """
+    Back up the DB as a job on a worker thread.  The handler awaits the job
+    (the event loop stays free) and answers with the backup file; with
+    ``background`` it returns the job id at once, for polling
+    GET /api/database/backup/jobs/{job_id}.
+    """
+    db_path = _db_path()
     if not db_path.exists():
         return {
             "success": False,
@@ -38,151 +50,190 @@ async def backup_database(req: DatabaseOpRequest, _admin: dict = Depends(require
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "size_mb": 0.0,
         }
-
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    backup_path = db_path.parent / f"nautilus_backup_{timestamp}.db"
-
     try:
-        # sqlite3.connect + backup() gives a consistent hot-copy even while DB is in use
-        src = sqlite3.connect(str(db_path))
-        dst = sqlite3.connect(str(backup_path))
-        src.backup(dst)
-        dst.close()
-        src.close()
-
-        size_mb = round(backup_path.stat().st_size / 1024 / 1024, 3)
+        job = backup.manager.start(db_path, req.compression)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if req.background:
         return {
             "success": True,
-            "message": f"Backup saved to {backup_path.name}",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "backup_file": str(backup_path),
-            "size_mb": size_mb,
+            "message": f"Backup {job.id} started",
+            "job_id": job.id,
+            "status": job.status,
+            "timestamp": job.created_at,
         }
-    except Exception as exc:
+
+    job = await backup.manager.wait_async(job.id)
+    if job.status != "completed":
         return {
             "success": False,
-            "message": f"Backup failed: {exc}",
+            "message": f"Backup failed: {job.error}",
+            "job_id": job.id,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "size_mb": 0.0,
         }
+    return {
+        "success": True,
+        "message": f"Backup saved to {job.file}",
+        "job_id": job.id,
+        "timestamp": job.finished_at,
+        "backup_file": str(db_path.parent / job.file),
+        "size_mb": round(job.size_bytes / 1024 / 1024, 3),
+    }
+
+
+@router.get("/backup/jobs")
+async def list_backup_jobs(_admin: dict = Depends(require_admin)):
+    jobs = [j.to_dict() for j in backup.manager.list()]
+    return {"jobs": jobs, "count": len(jobs)}
+
+
+@router.get("/backup/jobs/{job_id}")
+async def get_backup_job(job_id: str, _admin: dict = Depends(require_admin)):
+    job = backup.manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backup job '{job_id}' not found")
+    return job.to_dict()
 
 
 @router.get("/backups")
 async def list_backups():
-    """List all available backup files in the data directory."""
-    db_dir = Path(_DB_PATH).parent
-    backups = sorted(
-        [
-            {
-                "filename": f.name,
-                "size_mb": round(f.stat().st_size / 1024 / 1024, 3),
-                "created_at": datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc).isoformat(),
-            }
-            for f in db_dir.glob("nautilus_backup_*.db")
-        ],
-        key=lambda x: x["created_at"],
-        reverse=True,
-    )
-    return {"backups": backups, "count": len(backups)}
+    """List all completed backup files in the data directory."""
+    files = await asyncio.to_thread(backup.list_backup_files, _db_path().parent)
+    backups = [
+        {
+            "filename": f.name,
+            "size_mb": round(f.stat().st_size / 1024 / 1024, 3),
+            "compressed": not f.name.endswith(".db"),
+            "created_at": datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc).isoformat(),
+        }
+        for f in files
+    ]
+    return {"backups": backups, "count": len(backups), "retention": backup.BACKUP_RETENTION}
 
 
 @router.post("/restore")
 async def restore_database(req: RestoreRequest, _admin: dict = Depends(require_admin)):
-    """Restore the main database from a named backup file."""
-    db_dir = Path(_DB_PATH).parent
+    """Restore the main database from a named backup file (plain or compressed)."""
+    db_path = _db_path()
+    db_dir = db_path.parent
     backup_path = db_dir / req.backup_file
 
     # Safety: only allow files in the same data directory with the expected prefix
     if not backup_path.exists():
         raise HTTPException(status_code=404, detail=f"Backup file '{req.backup_file}' not found")
-    if not req.backup_file.startswith("nautilus_backup_") or not req.backup_file.endswith(".db"):
+    if not backup.is_backup_name(req.backup_file):
         raise HTTPException(status_code=400, detail="Invalid backup filename")
     if backup_path.parent.resolve() != db_dir.resolve():
         raise HTTPException(status_code=400, detail="Path traversal not allowed")
+    active = backup.manager.active
+    if active is not None:
+        raise HTTPException(status_code=409, detail=f"Backup {active.id} is running; restore once it finishes")
 
     try:
-        # Copy current DB to a safety snapshot first
-        safety_ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        safety_path = db_dir / f"nautilus_pre_restore_{safety_ts}.db"
-        src = sqlite3.connect(str(_DB_PATH))
-        dst = sqlite3.connect(str(safety_path))
-        src.backup(dst)
-        dst.close()
-        src.close()
-
-        # Restore from backup
-        bak = sqlite3.connect(str(backup_path))
-        live = sqlite3.connect(str(_DB_PATH))
-        bak.backup(live)
-        live.close()
-        bak.close()
-
+        # Snapshot + copy run off the event loop
+        safety_name = await asyncio.to_thread(backup.restore, db_path, backup_path)
         return {
             "success": True,
             "message": f"Restored from '{req.backup_file}'",
-            "safety_snapshot": safety_path.name,
+            "safety_snapshot": safety_name,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Restore failed: {exc}")
 
 
+def _full_vacuum(db_path: Path) -> None:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
 @router.post("/optimize")
-async def optimize_database(req: DatabaseOpRequest, _admin: dict = Depends(require_admin)):
-    """Run VACUUM + ANALYZE to reclaim space and update query planner stats."""
-    db_path = Path(_DB_PATH)
+async def optimize_database(req: DatabaseOpRequest, full: bool = False, _admin: dict = Depends(require_admin)):
+    """
+    Incremental vacuum + PRAGMA optimize + WAL checkpoint in short
+    transactions.  ``?full=true`` runs the old blocking VACUUM + ANALYZE
+    (off the event loop, but writers wait for it) — for quiet windows only.
+    """
+    db_path = _db_path()
     if not db_path.exists():
         return {"success": False, "message": "Database file not found"}
 
     size_before = db_path.stat().st_size
     try:
-        conn = sqlite3.connect(str(db_path))
-        conn.execute("VACUUM")
-        conn.execute("ANALYZE")
-        conn.close()
-        size_after = db_path.stat().st_size
-        saved_kb = round((size_before - size_after) / 1024, 1)
-        return {
-            "success": True,
-            "message": f"VACUUM + ANALYZE complete — freed {max(0, saved_kb)} KB",
-            "size_before_kb": round(size_before / 1024, 1),
-            "size_after_kb": round(size_after / 1024, 1),
-        }
+        if full:
+            await asyncio.to_thread(_full_vacuum, db_path)
+            run = None
+        else:
+            run = await maintenance.scheduler.run(tasks=("vacuum", "optimize", "checkpoint"))
+            if run.error:
+                return {"success": False, "message": f"Optimize failed: {run.error}", "run": run.to_dict()}
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     except Exception as exc:
         return {"success": False, "message": f"Optimize failed: {exc}"}
 
+    size_after = db_path.stat().st_size
+    saved_kb = round((size_before - size_after) / 1024, 1)
+    label = "VACUUM + ANALYZE" if full else "Incremental vacuum + optimize"
+    return {
+        "success": True,
+        "message": f"{label} complete — freed {max(0, saved_kb)} KB",
+        "size_before_kb": round(size_before / 1024, 1),
+        "size_after_kb": round(size_after / 1024, 1),
+        "run": run.to_dict() if run else None,
+    }
+
 
 @router.post("/clean")
 async def clean_cache(req: CacheOpRequest, _admin: dict = Depends(require_admin)):
-    """Delete triggered/cancelled records older than 30 days to reduce DB size."""
-    db_path = Path(_DB_PATH)
+    """Delete triggered/cancelled records older than 30 days, in small chunks."""
+    db_path = _db_path()
     if not db_path.exists():
         return {"success": False, "message": "Database file not found"}
 
     try:
-        conn = sqlite3.connect(str(db_path))
-        # Remove triggered alerts
-        cur = conn.execute(
-            "DELETE FROM alerts WHERE status = 'triggered' "
-            "AND created_at < datetime('now', '-30 days')"
-        )
-        alerts_removed = cur.rowcount
-        # Remove cancelled / filled orders
-        cur = conn.execute(
-            "DELETE FROM orders WHERE status IN ('CANCELLED', 'FILLED') "
-            "AND timestamp < datetime('now', '-30 days')"
-        )
-        orders_removed = cur.rowcount
-        conn.commit()
-        conn.close()
-
-        total = alerts_removed + orders_removed
-        return {
-            "success": True,
-            "message": f"Removed {total} old records "
-                       f"({alerts_removed} alerts, {orders_removed} orders)",
-            "alerts_removed": alerts_removed,
-            "orders_removed": orders_removed,
-        }
-    except Exception as exc:
-        return {"success": False, "message": f"Clean failed: {exc}"}
+        run = await maintenance.scheduler.run(tasks=("ttl",), policies=maintenance.clean_policies(30))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if run.error:
+        return {"success": False, "message": f"Clean failed: {run.error}", "run": run.to_dict()}
+
+    alerts_removed = run.ttl["triggered_alerts"]["deleted"]
+    orders_removed = run.ttl["closed_orders"]["deleted"]
+    total = alerts_removed + orders_removed
+    return {
+        "success": True,
+        "message": f"Removed {total} old records "
+                   f"({alerts_removed} alerts, {orders_removed} orders)",
+        "alerts_removed": alerts_removed,
+        "orders_removed": orders_removed,
+        "run": run.to_dict(),
+    }
+
+
+# ── Maintenance ───────────────────────────────────────────────────────────────
+
+@router.get("/maintenance")
+async def maintenance_status(_admin: dict = Depends(require_admin)):
+    """Scheduler settings, totals and the recent maintenance runs."""
+    runs = [r.to_dict() for r in reversed(maintenance.scheduler.runs)]
+    return {**maintenance.scheduler.stats(), "runs": runs}
+
+
+@router.post("/maintenance/run")
+async def run_maintenance(_admin: dict = Depends(require_admin)):
+    """Run one full scheduled-style pass now (TTL policies, vacuum, optimize, checkpoint)."""
+    if not _db_path().exists():
+        raise HTTPException(status_code=404, detail="Database file not found")
+    try:
+        run = await maintenance.scheduler.run(trigger="manual")
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return run.to_dict()
@@ -1,12 +1,14 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
+import backtest_store
 import database
+import order_service
 from auth_jwt import get_current_user
-from risk_engine import risk_engine, RiskCheckError
 from state import live_manager, nautilus_system
 from utils import normalize_order
 
@@ -23,75 +25,48 @@ class OrderCreateRequest(BaseModel):
 
 
 @router.get("/orders")
-async def list_orders():
-    """List orders: backtest orders + persistent user-created orders."""
-    all_orders: List[Dict[str, Any]] = []
+async def list_orders(
+    limit: int = Query(default=100, ge=1, le=database.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    instrument: Optional[str] = Query(default=None),
+    strategy_id: Optional[str] = Query(default=None),
+    status: Optional[str] = Query(default=None),
+    since: Optional[str] = Query(default=None, description="ISO-8601 lower bound (inclusive)"),
+    until: Optional[str] = Query(default=None, description="ISO-8601 upper bound (exclusive)"),
+):
+    """
+    List orders: persistent user-created orders, keyset-paginated newest first.
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page.
+    Up to ``limit`` orders of the cached latest backtest runs are prepended
+    to the first unfiltered page only.
+    """
+    try:
+        db_orders, next_cursor = await database.query_orders(
+            limit=limit, cursor=cursor, instrument=instrument,
+            strategy_id=strategy_id, status=status, since=since, until=until,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    for results in nautilus_system.backtest_results.values():
-        for o in results.get("orders", []):
+    all_orders: List[Dict[str, Any]] = []
+    if not any((cursor, instrument, strategy_id, status, since, until)):
+        run_ids = [s["run_id"] for s in nautilus_system.backtest_results.values() if s.get("run_id")]
+        for o in await asyncio.to_thread(backtest_store.store.recent_rows, run_ids, "orders", limit):
             row = normalize_order(o)
             row["timestamp"] = datetime.now(timezone.utc).isoformat()
             all_orders.append(row)
 
-    db_orders = await database.list_orders()
     all_orders.extend(db_orders)
-    return {"orders": all_orders, "count": len(all_orders)}
+    return {"orders": all_orders, "count": len(all_orders), "next_cursor": next_cursor}
 
 
 @router.post("/orders")
 async def create_order(req: OrderCreateRequest, _user: dict = Depends(get_current_user)):
-    order_dict = req.model_dump()
-
-    # 1. Risk check — runs before anything else
-    try:
-        await risk_engine.check_order(order_dict)
-    except RiskCheckError:
-        raise  # Re-raise with 422
-
-    # 2. Require adapter for live-exchange instruments when no risk limits configured.
-    # When risk limits have never been explicitly set, the system is in pristine/demo
-    # mode and live-instrument orders need a connected adapter.
-    # Once limits are explicitly configured, paper trading is permitted on any instrument.
-    if not live_manager.is_connected() and not req.instrument.endswith(".SIM"):
-        limits_configured = await database.risk_limits_explicitly_set()
-        if not limits_configured:
-            raise HTTPException(
-                status_code=400,
-                detail="No adapter connected. Connect an exchange adapter before placing live orders.",
-            )
-
-    # 3. Live routing when adapter is connected
-    exchange_order_id = None
-    if live_manager.is_connected():
-        try:
-            exchange_result = await live_manager.submit_order(order_dict)
-            if isinstance(exchange_result, dict):
-                exchange_order_id = (
-                    exchange_result.get("exchange_order_id")
-                    or exchange_result.get("order_id")
-                )
-        except RuntimeError as exc:
-            raise HTTPException(status_code=400, detail=str(exc))
-        except Exception as exc:
-            raise HTTPException(status_code=502, detail=f"Exchange error: {str(exc)}")
-
-    # 3. Persist order to DB (paper mode when no adapter, live mode otherwise)
-    order = await database.create_order(
-        instrument=req.instrument,
-        side=req.side,
-        order_type=req.type,
-        quantity=req.quantity,
-        price=req.price,
-    )
-    await database.log_action(
-        action="order_created",
-        user_id=_user.get("sub", ""),
-        resource=f"order:{order['id']}",
-        details=f"instrument={req.instrument} side={req.side} qty={req.quantity} price={req.price}",
-    )
-    result: Dict[str, Any] = {"success": True, "order": order}
-    if exchange_order_id:
-        result["exchange_order_id"] = exchange_order_id
+    # Risk check → adapter gate → exchange → DB → audit (order_service.py)
+    placed = await order_service.place_order(req.model_dump(), user_id=_user.get("sub", ""))
+    result: Dict[str, Any] = {"success": True, "order": placed["order"]}
+    if placed["exchange_order_id"]:
+        result["exchange_order_id"] = placed["exchange_order_id"]
     return result
 
 
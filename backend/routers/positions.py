@@ -9,14 +9,16 @@ matches a supported crypto symbol (e.g. BTCUSDT).
 
 import asyncio
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
+import backtest_store
 import database
 from auth_jwt import get_current_user
 import market_data_service as svc
-from state import live_manager, nautilus_system
+from state import live_manager, manager, nautilus_system
+from utils import position_changes_message
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["positions"])
@@ -67,24 +69,45 @@ async def _enrich_current_prices(positions: List[Dict[str, Any]]) -> List[Dict[s
 
 
 @router.get("/positions")
-async def list_positions():
+async def list_positions(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=database.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    open_only: bool = Query(default=True),
+    instrument: Optional[str] = Query(default=None),
+    strategy_id: Optional[str] = Query(default=None),
+    since: Optional[str] = Query(default=None),
+    until: Optional[str] = Query(default=None),
+):
+    """
+    List positions newest first. The body stays a plain list; the cursor for
+    the next page is returned in the ``X-Next-Cursor`` response header.
+    """
     # Primary: DB-persisted positions (survive restarts, reflect latest backtest)
-    db_positions = await database.list_db_positions(open_only=True)
+    try:
+        db_positions, next_cursor = await database.query_positions(
+            limit=limit, cursor=cursor, open_only=open_only, instrument=instrument,
+            strategy_id=strategy_id, since=since, until=until,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     # Determine data source
     source = "live" if live_manager.is_connected() else "cached"
 
-    if db_positions:
+    if db_positions or cursor:
         enriched = await _enrich_current_prices(db_positions)
         for pos in enriched:
             pos["source"] = source
         return enriched
 
-    # Fallback: in-memory backtest results (before first backtest persists to DB)
-    all_positions = []
-    for results in nautilus_system.backtest_results.values():
-        all_positions.extend(results.get("positions", []))
-    open_pos = [p for p in all_positions if p.get("is_open", False)]
+    # Fallback: latest backtest runs (before first backtest persists to DB)
+    open_pos = []
+    for results in list(nautilus_system.backtest_results.values()):
+        if results.get("open_positions") and results.get("run_id"):
+            open_pos.extend(await asyncio.to_thread(backtest_store.store.open_positions, results["run_id"]))
     enriched = await _enrich_current_prices(open_pos)
     for pos in enriched:
         pos["source"] = source
@@ -96,13 +119,21 @@ async def sync_positions(_user: dict = Depends(get_current_user)):
     """Sync open positions from the connected exchange."""
     live_positions = await live_manager.sync_positions()
 
-    # Persist synced positions to DB
+    # Persist synced positions to DB; only rows that changed are written and pushed
+    changed = unchanged = 0
     if live_positions:
-        await database.save_positions(live_positions)
+        changes = await database.save_positions(live_positions)
+        changed = len(changes["inserted"]) + len(changes["updated"])
+        unchanged = changes["unchanged"]
+        message = position_changes_message(changes, source="sync")
+        if message:
+            await manager.broadcast(message)
 
     return {
         "success": True,
         "synced_count": len(live_positions),
+        "changed_count": changed,
+        "unchanged_count": unchanged,
         "positions": live_positions,
     }
 
@@ -3,6 +3,8 @@ Strategies router — full CRUD with SQLite persistence.
 Supports: sma_crossover, rsi, macd
 """
 
+import asyncio
+import importlib
 import json
 import uuid
 from datetime import datetime, timezone
@@ -14,6 +16,7 @@ from pydantic import BaseModel, Field
 import database
 from auth_jwt import get_current_user
 import state as _state
+from strategy_runtime import strategy_host
 
 
 def _nautilus():
@@ -97,9 +100,24 @@ def _db_row_to_strategy(row: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# Imported by strategy configs (create_strategy) and live signal models
+_ENGINE_MODULES = ("strategies.sma_crossover", "strategies.rsi_strategy", "nautilus_trader.indicators")
+
+
+def _import_engine_modules() -> None:
+    for name in _ENGINE_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # create_strategy / the live host report it per strategy
+
+
 async def load_strategies_from_db() -> None:
-    """Called at startup to restore persisted strategies into _nautilus()."""
+    """Restore persisted strategies into _nautilus() (run in the background after startup)."""
     rows = await database.list_strategies()
+    if any(row["type"] in _STRATEGY_TYPES for row in rows):
+        # Pull in nautilus_trader (~1 s) on a worker thread, not the event loop
+        await asyncio.to_thread(_import_engine_modules)
     for row in rows:
         sid = row["id"]
         if sid not in _nautilus().strategies:
@@ -129,6 +147,18 @@ async def load_strategies_from_db() -> None:
                     _nautilus().strategies[sid]["status"] = s["status"]
 
 
+def resume_live_strategies() -> int:
+    """Re-host every strategy persisted as 'running' (after load_strategies_from_db)."""
+    resumed = 0
+    for s in _nautilus().get_all_strategies():
+        if s.get("status") != "running":
+            continue
+        runtime = _runtime_config(s["id"])
+        if runtime and strategy_host.start(s["id"], runtime["type"], runtime["config"]):
+            resumed += 1
+    return resumed
+
+
 # ── Strategy types metadata endpoint ─────────────────────────────────────────
 
 @router.get("/strategy-types")
@@ -172,6 +202,8 @@ async def list_strategies():
     except Exception:
         pass  # Never fail the list endpoint due to risk check errors
     strategies = _nautilus().get_all_strategies()
+    # Live fill aggregates for every strategy in a single query (maintained by DB triggers)
+    live_perf = await database.get_strategy_performance()
     result = []
     for strategy in strategies:
         br = _nautilus().get_backtest_results(strategy["id"])
@@ -182,17 +214,17 @@ async def list_strategies():
             instrument = cfg.get("instrument_id", "EUR/USD.SIM")
         else:
             instrument = "EUR/USD.SIM"
-        # Merge backtest results with live DB orders for up-to-date performance
-        db_orders = await database.list_orders()
-        filled_orders = [o for o in db_orders if o.get("status") == "filled"]
-        db_pnl = sum(float(o.get("pnl") or 0) for o in filled_orders)
-        db_trades = len(filled_orders)
+        # Live fills for this strategy take precedence over the last backtest
+        perf = live_perf.get(strategy["id"])
         total_pnl = br.get("total_pnl", 0.0) if br else 0.0
         total_trades = br.get("total_trades", 0) if br else 0
-        # Use DB values if greater (live orders supplement backtest)
-        if db_pnl != 0.0 or db_trades > 0:
-            total_pnl = db_pnl
-            total_trades = db_trades
+        win_rate = (br.get("win_rate", 0.0) / 100.0) if br else 0.0
+        last_trade_at = None
+        if perf and perf["trade_count"] > 0:
+            total_pnl = round(perf["total_pnl"], 8)
+            total_trades = perf["trade_count"]
+            win_rate = perf["win_count"] / perf["trade_count"]
+            last_trade_at = perf["last_trade_at"]
         result.append(
             {
                 "id": strategy["id"],
@@ -204,7 +236,8 @@ async def list_strategies():
                 "performance": {
                     "total_pnl": total_pnl,
                     "total_trades": total_trades,
-                    "win_rate": (br.get("win_rate", 0.0) / 100.0) if br else 0.0,
+                    "win_rate": win_rate,
+                    "last_trade_at": last_trade_at,
                 },
             }
         )
@@ -303,6 +336,7 @@ async def delete_strategy(strategy_id: str, _user: dict = Depends(get_current_us
     sys = _nautilus()
     if hasattr(sys, "strategies") and isinstance(sys.strategies, dict) and strategy_id in sys.strategies:
         del sys.strategies[strategy_id]
+    await strategy_host.stop(strategy_id)
     await database.delete_strategy(strategy_id)
     return {"success": True, "message": f"Strategy {strategy_id} deleted"}
 
@@ -318,16 +352,31 @@ async def _strategy_exists(strategy_id: str) -> bool:
     return any(r["id"] == strategy_id for r in rows)
 
 
+def _runtime_config(strategy_id: str) -> Optional[Dict[str, Any]]:
+    """Return {"type", "config"} for the live host, or None if unavailable."""
+    strategy = _nautilus().get_strategy(strategy_id)
+    if not isinstance(strategy, dict):
+        return None
+    cfg = strategy.get("config") or {}
+    if not isinstance(cfg, dict):
+        # Nautilus StrategyConfig (frozen msgspec struct) → plain dict
+        cfg = {k: getattr(cfg, k) for k in getattr(cfg, "__struct_fields__", ())}
+    return {"type": strategy.get("type", "sma_crossover"), "config": cfg}
+
+
 @router.post("/strategies/{strategy_id}/start")
 async def start_strategy(strategy_id: str, _user: dict = Depends(get_current_user)):
     if not await _strategy_exists(strategy_id):
         raise HTTPException(status_code=404, detail=f"Strategy {strategy_id} not found")
     _nautilus().start_strategy(strategy_id)
     await database.update_strategy_status(strategy_id, "running")
+    runtime = _runtime_config(strategy_id)
+    hosted = bool(runtime) and strategy_host.start(strategy_id, runtime["type"], runtime["config"])
     return {
         "success": True,
         "message": f"Strategy {strategy_id} started",
         "live_engine_registered": True,
+        "live_runtime": hosted,
     }
 
 
@@ -336,9 +385,25 @@ async def stop_strategy(strategy_id: str, _user: dict = Depends(get_current_user
     if not await _strategy_exists(strategy_id):
         raise HTTPException(status_code=404, detail=f"Strategy {strategy_id} not found")
     _nautilus().stop_strategy(strategy_id)
+    await strategy_host.stop(strategy_id)
     await database.update_strategy_status(strategy_id, "stopped")
     return {
         "success": True,
         "message": f"Strategy {strategy_id} stopped",
         "live_engine_registered": False,
     }
+
+
+@router.get("/strategies/runtime/stats")
+async def runtime_stats():
+    """Per-strategy live loop latency, tick-to-order latency and counters."""
+    workers = strategy_host.stats()
+    return {"workers": workers, "count": len(workers), "bar_seconds": strategy_host.bar_seconds}
+
+
+@router.get("/strategies/{strategy_id}/runtime")
+async def strategy_runtime_stats(strategy_id: str):
+    stats = strategy_host.get_stats(strategy_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Strategy {strategy_id} is not running live")
+    return stats
@@ -1,4 +1,4 @@
-import io
+import asyncio
 import json
 import time
 from datetime import datetime, timezone
@@ -8,8 +8,16 @@ import httpx
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
+import audit_archive
+import backtest_store
 import database
-from auth_jwt import get_current_user, require_admin
+import exports
+import maintenance
+import market_data_service
+import startup_profile
+from audit_log import audit_writer
+from auth_jwt import get_current_user, login_stats, require_admin, token_cache_stats
+from rate_limit import limiter
 from state import live_manager, nautilus_system
 from utils import normalize_order
 
@@ -53,7 +61,7 @@ async def health_check():
     # 4. Market data service reachable?
     try:
         async with httpx.AsyncClient(timeout=3.0) as client:
-            resp = await client.get("https://api.binance.com/api/v3/ping")
+            resp = await client.get(f"{market_data_service.BINANCE_BASE}/api/v3/ping")
         checks["market_data"] = "ok" if resp.status_code == 200 else f"http_{resp.status_code}"
     except Exception:
         # Binance unreachable — degraded but not critical in backtest mode
@@ -104,6 +112,19 @@ async def initialize_system(_admin: dict = Depends(require_admin)):
     return result
 
 
+@router.get("/system/startup")
+async def get_startup_profile(
+    imports: bool = Query(False, description="Include an import-time breakdown (spawns a child interpreter)"),
+    top: int = Query(25, ge=1, le=200),
+    _admin: dict = Depends(require_admin),
+):
+    """Startup phase timings, catalog preload state and optional import profile."""
+    report = startup_profile.report()
+    if imports:
+        report["imports"] = await asyncio.to_thread(startup_profile.import_breakdown, "nautilus_fastapi", top)
+    return report
+
+
 @router.post("/engine/shutdown")
 async def shutdown_system(_admin: dict = Depends(require_admin)):
     return {"success": True, "message": "Engine shutdown requested"}
@@ -133,6 +154,11 @@ async def get_system_metrics():
         "uptime_seconds": round(uptime_secs),
         "uptime_formatted": f"{hours}h {minutes}m",
         "requests_total": _request_counter,
+        "auth_cache": token_cache_stats(),
+        "logins": login_stats(),
+        "rate_limit": limiter.stats(),
+        "audit": audit_writer.stats(),
+        "maintenance": maintenance.scheduler.stats(),
     }
     try:
         import psutil
@@ -177,8 +203,8 @@ async def get_performance_summary():
         total_trades += results.get("total_trades", 0)
         winning_trades += results.get("winning_trades", 0)
         losing_trades += results.get("losing_trades", 0)
-        all_positions += len(results.get("positions", []))
-        open_positions += sum(1 for p in results.get("positions", []) if p.get("is_open"))
+        all_positions += results.get("total_positions", 0)
+        open_positions += results.get("open_positions", 0)
 
     win_rate = (winning_trades / total_trades * 100) if total_trades else 0.0
     return {
@@ -196,13 +222,16 @@ async def get_performance_summary():
 
 @router.get("/trades")
 async def list_trades(limit: int = 20):
+    summaries = list(nautilus_system.backtest_results.values())
+    orders = await asyncio.to_thread(
+        backtest_store.store.recent_rows, [s["run_id"] for s in summaries if s.get("run_id")], "orders", limit
+    )
     all_trades = []
-    for results in nautilus_system.backtest_results.values():
-        for order in results.get("orders", []):
-            row = normalize_order(order)
-            row["timestamp"] = datetime.now(timezone.utc).isoformat()
-            all_trades.append(row)
-    return {"trades": all_trades[:limit], "count": len(all_trades)}
+    for order in orders:
+        row = normalize_order(order)
+        row["timestamp"] = datetime.now(timezone.utc).isoformat()
+        all_trades.append(row)
+    return {"trades": all_trades, "count": sum(s.get("total_orders", 0) for s in summaries)}
 
 
 @router.post("/notifications/test-email")
@@ -247,27 +276,50 @@ async def test_telegram(body: Dict[str, Any] = Body(...), _admin: dict = Depends
         return {"success": False, "error": str(exc)}
 
 
+_DEMO_INSTRUMENTS = [
+    {"id": "EUR/USD.SIM",    "symbol": "EUR/USD",  "venue": "SIM"},
+    {"id": "GBP/USD.SIM",    "symbol": "GBP/USD",  "venue": "SIM"},
+    {"id": "USD/JPY.SIM",    "symbol": "USD/JPY",  "venue": "SIM"},
+    {"id": "AUD/USD.SIM",    "symbol": "AUD/USD",  "venue": "SIM"},
+    {"id": "BTCUSDT.BINANCE","symbol": "BTCUSDT",  "venue": "BINANCE"},
+    {"id": "ETHUSDT.BINANCE","symbol": "ETHUSDT",  "venue": "BINANCE"},
+]
+
+
+async def _instrument_registry():
+    """Registry, reloaded off the event loop if the catalog changed on disk."""
+    if nautilus_system.catalog_changed():
+        await asyncio.to_thread(nautilus_system.refresh_instruments)
+    return nautilus_system.registry
+
+
 @router.get("/instruments")
-async def list_instruments():
-    instruments = []
-    for instr in nautilus_system.instruments:
-        instruments.append(
-            {
-                "id": str(instr.id),
-                "symbol": str(instr.id.symbol),
-                "venue": str(instr.id.venue),
-            }
-        )
-    if not instruments:
+async def list_instruments(
+    q: Optional[str] = Query(default=None, description="Prefix of instrument id or symbol"),
+    venue: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=1000, description="Max results for prefix search"),
+):
+    registry = await _instrument_registry()
+    if not len(registry):
         instruments = [
-            {"id": "EUR/USD.SIM",    "symbol": "EUR/USD",  "venue": "SIM"},
-            {"id": "GBP/USD.SIM",    "symbol": "GBP/USD",  "venue": "SIM"},
-            {"id": "USD/JPY.SIM",    "symbol": "USD/JPY",  "venue": "SIM"},
-            {"id": "AUD/USD.SIM",    "symbol": "AUD/USD",  "venue": "SIM"},
-            {"id": "BTCUSDT.BINANCE","symbol": "BTCUSDT",  "venue": "BINANCE"},
-            {"id": "ETHUSDT.BINANCE","symbol": "ETHUSDT",  "venue": "BINANCE"},
+            i for i in _DEMO_INSTRUMENTS
+            if (not venue or i["venue"] == venue)
+            and (not q or i["id"].lower().startswith(q.lower()) or i["symbol"].lower().startswith(q.lower()))
         ]
-    return {"instruments": instruments, "count": len(instruments)}
+        return {"instruments": instruments, "count": len(instruments)}
+    if q:
+        instruments = registry.search(q, limit=limit, venue=venue)
+        return {"instruments": instruments, "count": len(instruments)}
+    return registry.listing(venue)
+
+
+@router.get("/instruments/{instrument_id:path}")
+async def get_instrument(instrument_id: str):
+    registry = await _instrument_registry()
+    instrument = registry.resolve(instrument_id)
+    if instrument is None:
+        raise HTTPException(status_code=404, detail=f"Instrument {instrument_id} not found")
+    return registry.metadata(str(instrument.id))
 
 
 # ── Audit Log ─────────────────────────────────────────────────────────────────
@@ -275,93 +327,88 @@ async def list_instruments():
 @router.get("/admin/audit-logs")
 async def list_audit_logs(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Deprecated — prefer cursor"),
+    cursor: Optional[str] = Query(default=None),
     user_id: str = Query(default=""),
     action: str = Query(default=""),
+    since: Optional[str] = Query(default=None),
+    until: Optional[str] = Query(default=None),
     _admin: dict = Depends(require_admin),
 ):
-    """Return audit log entries (admin only). Append-only — no DELETE."""
-    logs = await database.get_audit_logs(limit=limit, offset=offset, user_id=user_id, action=action)
-    return {"logs": logs, "count": len(logs), "limit": limit, "offset": offset}
+    """
+    Return audit log entries (admin only). Append-only — no DELETE.
+
+    Keyset-paginated: pass ``next_cursor`` back as ``cursor``. ``offset`` is
+    still honoured for old clients but gets slower the deeper it pages and
+    only sees the hot table; cursor pages continue into the archive.
+    """
+    if offset and not cursor:
+        logs = await database.get_audit_logs(limit=limit, offset=offset, user_id=user_id, action=action)
+        next_cursor = None
+    else:
+        try:
+            logs, next_cursor = await audit_archive.query_audit_logs(
+                limit=limit, cursor=cursor, user_id=user_id, action=action, since=since, until=until,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return {
+        "logs": logs,
+        "count": len(logs),
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/admin/audit-logs/archive")
+async def get_audit_archive(
+    verify: bool = Query(default=False, description="Re-hash every partition"),
+    _admin: dict = Depends(require_admin),
+):
+    """Archive size, partition range and (optionally) checksum verification."""
+    stats = await asyncio.to_thread(audit_archive.archive.stats)
+    stats["hot_days"] = audit_archive.AUDIT_HOT_DAYS
+    if verify:
+        checks = await asyncio.to_thread(audit_archive.archive.verify)
+        stats["corrupt_partitions"] = sorted(day for day, ok in checks.items() if not ok)
+    return stats
+
+
+@router.post("/admin/audit-logs/archive")
+async def run_audit_archive(
+    older_than_days: int = Query(default=audit_archive.AUDIT_HOT_DAYS, ge=1),
+    _admin: dict = Depends(require_admin),
+):
+    """Move audit rows older than ``older_than_days`` (whole days) into the archive."""
+    return await audit_archive.archive_audit_logs(hot_days=older_than_days)
 
 
 # ── Performance Export ────────────────────────────────────────────────────────
 
 @router.get("/performance/export")
 async def export_performance(
-    format: str = Query(default="excel", pattern="^(excel|pdf)$"),
+    format: str = Query(default="excel", pattern="^(excel|xlsx|pdf|csv|parquet)$"),
     _user: dict = Depends(get_current_user),
 ):
-    """Export trade performance as Excel or PDF."""
-    trades = await database.list_orders(limit=1000)
-
-    if format == "excel":
-        import openpyxl
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Performance"
-        headers = ["ID", "Instrument", "Side", "Type", "Quantity", "Price", "Status", "Filled Qty", "PnL", "Timestamp"]
-        ws.append(headers)
-        for t in trades:
-            ws.append([
-                t.get("id", ""),
-                t.get("instrument", ""),
-                t.get("side", ""),
-                t.get("type", ""),
-                t.get("quantity", ""),
-                t.get("price", ""),
-                t.get("status", ""),
-                t.get("filled_qty", ""),
-                t.get("pnl", ""),
-                t.get("timestamp", ""),
-            ])
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
-        return StreamingResponse(
-            buf,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=performance.xlsx"},
-        )
-
-    elif format == "pdf":
-        from reportlab.lib.pagesizes import A4, landscape
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-        from reportlab.lib.styles import getSampleStyleSheet
-
-        buf = io.BytesIO()
-        doc = SimpleDocTemplate(buf, pagesize=landscape(A4))
-        styles = getSampleStyleSheet()
-        elements = [Paragraph("Nautilus — Performance Report", styles["Title"])]
-
-        headers = ["ID", "Instrument", "Side", "Qty", "Price", "Status", "PnL", "Timestamp"]
-        data = [headers]
-        for t in trades:
-            data.append([
-                t.get("id", ""),
-                t.get("instrument", ""),
-                t.get("side", ""),
-                str(t.get("quantity", "")),
-                str(t.get("price", "")),
-                t.get("status", ""),
-                str(t.get("pnl", "")),
-                t.get("timestamp", "")[:19] if t.get("timestamp") else "",
-            ])
-        table = Table(data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f4f8")]),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        elements.append(table)
-        doc.build(elements)
-        buf.seek(0)
-        return StreamingResponse(
-            buf,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=performance.pdf"},
-        )
+    """
+    Export every order as CSV or Parquet (streamed chunk by chunk) or as
+    Excel / PDF (rendered on the export pool, then streamed from disk).
+    """
+    fmt = "xlsx" if format == "excel" else format
+    try:
+        exports.check_format(fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    media_type, ext = exports.FORMATS[fmt]
+    db_path = database.DB_PATH
+    if fmt in ("csv", "parquet"):
+        body = exports.stream_export(fmt, db_path)
+    else:
+        body = exports.stream_file(await exports.render_export(fmt, db_path))
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=performance.{ext}"},
+    )
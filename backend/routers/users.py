@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
 import database
-from auth_jwt import hash_password, require_admin
+from auth_jwt import hash_password_async, require_admin
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -39,7 +39,7 @@ async def list_users(_admin=Depends(require_admin)):
 @router.post("", status_code=201)
 async def create_user(body: CreateUserRequest, _admin=Depends(require_admin)):
     """Create a new user account."""
-    hashed = hash_password(body.password)
+    hashed = await hash_password_async(body.password)
     try:
         user = await database.create_user(body.username, hashed, role=body.role)
     except ValueError as exc:
@@ -59,7 +59,7 @@ async def delete_user(user_id: str, _admin=Depends(require_admin)):
 @router.post("/{user_id}/password")
 async def change_password(user_id: str, body: ChangePasswordRequest, _admin=Depends(require_admin)):
     """Update a user's password."""
-    hashed = hash_password(body.password)
+    hashed = await hash_password_async(body.password)
     found = await database.update_user_password(user_id, hashed)
     if not found:
         raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,218 @@
+"""
+Backtest Run Profiling
+======================
+Instrumentation for one backtest run, used by ``NautilusTradingSystem``:
+
+    prof = RunProfiler(profile=False)
+    prof.phase("load_data")
+    ticks = catalog.quote_ticks(...)
+    prof.count("quote_ticks", len(ticks))
+    prof.phase("add_data")          # ends load_data
+    engine.add_data(ticks)
+    ...
+    report = prof.finish(events=len(ticks))
+
+Each phase records wall time, CPU time of the running thread (so other
+requests served meanwhile don't count) and RSS when it ended.  ``finish``
+adds totals, the run's peak RSS, data volume and events / sec (data
+events over the ``run`` phase).
+
+Two profiles can be captured:
+
+* stack sampler (always on unless BACKTEST_PROFILE=0): a daemon thread
+  reads the run thread's Python stack every BACKTEST_PROFILE_INTERVAL_MS
+  (``sys._current_frames``), and samples RSS.  Cheap enough to leave on;
+  the stacks are kept as ``profile.collapsed`` (flamegraph.pl /
+  speedscope format) whenever the run took at least BACKTEST_SLOW_SECONDS,
+  so every slow run comes with its own profile.
+* cProfile (opt-in, ``profile=True``): deterministic, with call counts;
+  kept as ``profile.pstats`` (``python -m pstats profile.pstats``).
+
+Only Python frames are visible to either (strategy callbacks, result
+extraction); time spent inside the compiled engine shows up under the
+Python frame that called it.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_PROFILE = os.getenv("BACKTEST_PROFILE", "1") != "0"
+BACKTEST_PROFILE_INTERVAL_MS = float(os.getenv("BACKTEST_PROFILE_INTERVAL_MS", "5"))
+BACKTEST_SLOW_SECONDS = float(os.getenv("BACKTEST_SLOW_SECONDS", "30"))
+
+# Artifact file names inside a run directory (see backtest_store.attach)
+PSTATS_FILE = "profile.pstats"
+COLLAPSED_FILE = "profile.collapsed"
+TOP_FUNCTIONS = 15
+_RSS_EVERY = 10  # samples between RSS readings
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / 1e6, 1)
+    except Exception:
+        return None
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}".replace(";", ",").replace(" ", "_")
+
+
+class _StackSampler(threading.Thread):
+    """
+    Counts the target thread's Python stacks up to the first frame running
+    ``root_code`` (collapsed format).  Only the code object is kept: holding
+    the caller's frame would keep its locals (ticks, engine) alive after it
+    returns, through the frame → profiler → sampler → frame cycle.
+    """
+
+    def __init__(self, thread_id: int, root_code, interval_s: float) -> None:
+        super().__init__(name="backtest-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.peak_rss_mb = _rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                if frame.f_code is self.root_code:
+                    break
+                frame = frame.f_back
+            frame = None
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+            if self.samples % _RSS_EVERY == 0:
+                rss = _rss_mb()
+                if rss is not None and (self.peak_rss_mb is None or rss > self.peak_rss_mb):
+                    self.peak_rss_mb = rss
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> bytes:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common()).encode()
+
+
+class RunProfiler:
+    """Phase timings, counters and optional profiles of one backtest run."""
+
+    def __init__(self, profile: bool = False, sample: bool = BACKTEST_PROFILE) -> None:
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {}
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+        self._cprofile = None
+        self._sampler: Optional[_StackSampler] = None
+        self._finished: Optional[Dict[str, Any]] = None
+        self._current: Optional[tuple] = None
+        if sample:
+            # Stacks are cut at the caller (run_backtest), not the server's frames
+            self._sampler = _StackSampler(threading.get_ident(), sys._getframe(1).f_code,
+                                          BACKTEST_PROFILE_INTERVAL_MS / 1000)
+            self._sampler.start()
+        if profile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:  # another profiler is already active on this thread
+                logger.warning("cProfile unavailable for this run: another profiler is active")
+                self._cprofile = None
+
+    def phase(self, name: str) -> None:
+        """End the current phase (if any) and start ``name``."""
+        self._end_phase()
+        self._current = (name, time.perf_counter(), time.thread_time())
+
+    def _end_phase(self) -> None:
+        if self._current is None:
+            return
+        name, wall, cpu = self._current
+        entry = self.phases.setdefault(name, {"wall_ms": 0.0, "cpu_ms": 0.0})
+        entry["wall_ms"] = round(entry["wall_ms"] + (time.perf_counter() - wall) * 1000, 2)
+        entry["cpu_ms"] = round(entry["cpu_ms"] + (time.thread_time() - cpu) * 1000, 2)
+        entry["rss_mb"] = _rss_mb()
+        self._current = None
+
+    def count(self, name: str, n: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def finish(self, events: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stop profiling; returns ``{"timings": ..., "profile": ..., "files": ...}``
+        where ``files`` maps artifact names to bytes (empty when nothing is kept).
+        """
+        if self._finished is not None:
+            return self._finished
+        self._end_phase()
+        files: Dict[str, bytes] = {}
+        profile: Dict[str, Any] = {}
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            files[PSTATS_FILE], profile["top_functions"] = _pstats(self._cprofile)
+        if self._sampler is not None:
+            self._sampler.stop()
+        wall_s = time.perf_counter() - self._wall0
+        slow = wall_s >= BACKTEST_SLOW_SECONDS
+        if self._sampler is not None and self._sampler.samples and (slow or self._cprofile is not None):
+            files[COLLAPSED_FILE] = self._sampler.collapsed()
+            profile["samples"] = self._sampler.samples
+            profile["interval_ms"] = BACKTEST_PROFILE_INTERVAL_MS
+        if files:
+            profile["reason"] = "requested" if self._cprofile is not None else "slow"
+            profile["formats"] = [name.split(".", 1)[1] for name in files]
+
+        rss = [p["rss_mb"] for p in self.phases.values() if p.get("rss_mb") is not None]
+        if self._sampler is not None and self._sampler.peak_rss_mb is not None:
+            rss.append(self._sampler.peak_rss_mb)
+        run_s = self.phases.get("run", {}).get("wall_ms", 0.0) / 1000
+        events = events if events is not None else self.counts.get("events", 0)
+        timings = {
+            "phases": self.phases,
+            "total_wall_ms": round(wall_s * 1000, 2),
+            "total_cpu_ms": round((time.thread_time() - self._cpu0) * 1000, 2),
+            "peak_rss_mb": max(rss, default=None),
+            "data": dict(self.counts),
+            "events": events,
+            "events_per_sec": round(events / run_s) if run_s > 0 else None,
+        }
+        self._finished = {"timings": timings, "profile": profile or None, "files": files}
+        return self._finished
+
+
+def _pstats(profiler) -> tuple:
+    """Marshalled pstats data (the ``dump_stats`` format) and the top functions by own time."""
+    import marshal
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    top = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:TOP_FUNCTIONS]
+    return marshal.dumps(stats.stats), [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": nc,
+            "tottime_ms": round(tt * 1000, 2),
+            "cumtime_ms": round(ct * 1000, 2),
+        }
+        for (filename, line, name), (cc, nc, tt, ct, callers) in top
+    ]
@@ -0,0 +1,168 @@
+"""
+Startup Profile
+===============
+Records how long each startup phase takes (module imports, DB init, state
+restore, …) and produces an import-time breakdown of the application by
+re-importing it in a child interpreter with ``python -X importtime``.
+
+The phase timeline is exposed at GET /api/system/startup; the import
+breakdown is opt-in there (``?imports=true``) because it spawns a process.
+It can also be run from the command line:
+
+    cd backend
+    python startup_profile.py            # top 25 modules by cumulative time
+    python startup_profile.py --top 50 --json
+"""
+
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Captured as early as possible: nautilus_fastapi imports this module first.
+_T0 = time.perf_counter()
+_STARTED_AT = time.time()
+
+_phases: List[Dict[str, Any]] = []
+_last_mark = _T0
+
+# Catalog preload state: "pending" → "loading" → "ready" | "unavailable" | "error"
+catalog_state = "pending"
+_catalog_detail: Optional[str] = None
+
+
+def mark(phase: str) -> float:
+    """Close the current phase under ``phase``; return its duration in ms."""
+    global _last_mark
+    now = time.perf_counter()
+    duration_ms = round((now - _last_mark) * 1000, 2)
+    _phases.append({
+        "phase": phase,
+        "duration_ms": duration_ms,
+        "at_ms": round((now - _T0) * 1000, 2),
+    })
+    _last_mark = now
+    return duration_ms
+
+
+def set_catalog_state(state: str, detail: Optional[str] = None) -> None:
+    global catalog_state, _catalog_detail
+    catalog_state = state
+    _catalog_detail = detail
+
+
+def report() -> Dict[str, Any]:
+    """Phase timeline since process start plus readiness information."""
+    ready = next((p for p in _phases if p["phase"] == "ready"), None)
+    return {
+        "started_at": _STARTED_AT,
+        "ready_after_ms": ready["at_ms"] if ready else None,
+        "phases": list(_phases),
+        "catalog": {"state": catalog_state, "detail": _catalog_detail},
+        "heavy_modules_loaded": {
+            name: name in sys.modules
+            for name in ("nautilus_trader", "reportlab", "openpyxl", "pyotp")
+        },
+    }
+
+
+# ── Import-time breakdown ─────────────────────────────────────────────────────
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into rows (self/cumulative µs, depth)."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        rows.append({
+            "module": m.group(4),
+            "self_us": int(m.group(1)),
+            "cumulative_us": int(m.group(2)),
+            "depth": (len(m.group(3)) - 1) // 2,
+        })
+    return rows
+
+
+def import_breakdown(module: str = "nautilus_fastapi", top: int = 25) -> Dict[str, Any]:
+    """
+    Import ``module`` in a fresh interpreter and summarise where the time goes.
+
+    ``top_level`` lists the direct imports of ``module`` (what an import of
+    the app actually pays for each dependency); ``slowest`` lists the
+    individual modules with the highest cumulative time anywhere in the tree.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(Path(__file__).parent),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    rows = parse_importtime(proc.stderr)
+    target = next((r for r in rows if r["module"] == module and r["depth"] == 0), None)
+    if target is None:
+        return {
+            "module": module,
+            "success": False,
+            "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output",
+        }
+
+    # importtime prints children before their parent, so the target's subtree
+    # is the run of rows between the previous top-level import and itself.
+    idx = rows.index(target)
+    start = max((i + 1 for i in range(idx) if rows[i]["depth"] == 0), default=0)
+    subtree = rows[start:idx]
+    direct = [r for r in subtree if r["depth"] == 1]
+
+    def _ms(r: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "module": r["module"],
+            "cumulative_ms": round(r["cumulative_us"] / 1000, 2),
+            "self_ms": round(r["self_us"] / 1000, 2),
+        }
+
+    return {
+        "module": module,
+        "success": True,
+        "total_ms": round(target["cumulative_us"] / 1000, 2),
+        "top_level": [_ms(r) for r in sorted(direct, key=lambda r: -r["cumulative_us"])[:top]],
+        "slowest": [_ms(r) for r in sorted(subtree, key=lambda r: -r["cumulative_us"])[:top]],
+    }
+
+
+def _main(argv: List[str]) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the API server")
+    parser.add_argument("--module", default="nautilus_fastapi")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    result = import_breakdown(args.module, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0 if result["success"] else 1
+    if not result["success"]:
+        print(f"import of {args.module} failed: {result['error']}", file=sys.stderr)
+        return 1
+
+    print(f"import {result['module']}: {result['total_ms']:.1f} ms\n")
+    print("Direct imports (cumulative):")
+    for r in result["top_level"]:
+        print(f"  {r['cumulative_ms']:9.1f} ms  {r['module']}")
+    print("\nSlowest modules (cumulative):")
+    for r in result["slowest"]:
+        print(f"  {r['cumulative_ms']:9.1f} ms  {r['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
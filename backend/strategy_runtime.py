@@ -0,0 +1,489 @@
+"""
+Live Strategy Runtime
+=====================
+Hosts started strategies against the live market-data stream.
+
+Data flow for one tick::
+
+    Binance WS ticker ──► LiveStrategyHost.on_tick()
+                              │  BarAggregator (per symbol, time bars)
+                              ▼  bar closed
+                         StrategyWorker queue (one asyncio task per strategy)
+                              │  SignalModel.on_bar()  → 1 / -1 / None (BUY / SELL)
+                              ▼
+                         order_service.place_order(): risk check → adapter gate
+                         → LiveTradingManager.submit_order() (or paper order in DB)
+
+Each worker owns a bounded queue, so a slow or failing strategy drops its own
+stale bars instead of stalling the feed or its neighbours.  Signal models use
+the same NautilusTrader indicators as the backtest strategies in strategies/.
+
+Latency is recorded per worker:
+  - loop latency      : bar dequeued → bar fully processed
+  - tick-to-order     : last tick of the bar received → order accepted
+"""
+
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_BAR_SECONDS = int(os.getenv("LIVE_BAR_SECONDS", "60"))
+_WORKER_QUEUE_SIZE = 256
+_LATENCY_WINDOW = 1000
+
+
+# ── Bars ──────────────────────────────────────────────────────────────────────
+
+@dataclass
+class LiveBar:
+    symbol: str
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+    start_ts: float           # bar window start (epoch seconds)
+    last_tick_mono: float     # time.monotonic() when the closing tick arrived
+
+
+class BarAggregator:
+    """Aggregates (price, ts) ticks for one symbol into fixed-length time bars."""
+
+    def __init__(self, symbol: str, bar_seconds: int = _BAR_SECONDS) -> None:
+        self.symbol = symbol
+        self.bar_seconds = bar_seconds
+        self._bar: Optional[LiveBar] = None
+
+    def update(self, price: float, ts: float) -> Optional[LiveBar]:
+        """Feed one tick. Returns the previous bar when this tick opens a new window."""
+        window = ts - (ts % self.bar_seconds)
+        now = time.monotonic()
+        bar = self._bar
+        if bar is not None and window == bar.start_ts:
+            bar.high = max(bar.high, price)
+            bar.low = min(bar.low, price)
+            bar.close = price
+            bar.ticks += 1
+            bar.last_tick_mono = now
+            return None
+        self._bar = LiveBar(self.symbol, price, price, price, price, 1, window, now)
+        return bar
+
+
+# ── Signal models ─────────────────────────────────────────────────────────────
+
+class SignalModel(ABC):
+    """
+    Pure signal logic for one strategy: feed closes, get a direction or None.
+
+    ``position`` is the net direction (1 long, -1 short, 0 flat) last traded;
+    a model only signals a direction that differs from it, mirroring the
+    portfolio checks in the backtest strategies.  The host commits
+    ``position`` once the order is through, so a rejected signal repeats on
+    the next bar.
+    """
+
+    def __init__(self) -> None:
+        self.position = 0
+
+    @abstractmethod
+    def on_bar(self, close: float) -> Optional[int]:
+        """Feed one bar close; returns the direction to trade towards (1 / -1) or None."""
+
+    def _go(self, direction: int) -> Optional[int]:
+        return None if direction == self.position else direction
+
+
+class SMASignal(SignalModel):
+    def __init__(self, fast_period: int = 10, slow_period: int = 20) -> None:
+        super().__init__()
+        from nautilus_trader.indicators import SimpleMovingAverage
+        self.fast = SimpleMovingAverage(int(fast_period))
+        self.slow = SimpleMovingAverage(int(slow_period))
+
+    def on_bar(self, close: float) -> Optional[int]:
+        self.fast.update_raw(close)
+        self.slow.update_raw(close)
+        if not (self.fast.initialized and self.slow.initialized):
+            return None
+        if self.fast.value > self.slow.value:
+            return self._go(1)
+        if self.fast.value < self.slow.value:
+            return self._go(-1)
+        return None
+
+
+class RSISignal(SignalModel):
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        oversold_level: float = 30.0,
+        overbought_level: float = 70.0,
+    ) -> None:
+        super().__init__()
+        from nautilus_trader.indicators import RelativeStrengthIndex
+        self.rsi = RelativeStrengthIndex(int(rsi_period))
+        self.oversold = float(oversold_level)
+        self.overbought = float(overbought_level)
+        self._prev: Optional[float] = None
+
+    def on_bar(self, close: float) -> Optional[int]:
+        self.rsi.update_raw(close)
+        if not self.rsi.initialized:
+            return None
+        current = self.rsi.value * 100.0  # Nautilus RSI is on a 0–1 scale
+        prev, self._prev = self._prev, current
+        if prev is None:
+            return None
+        if prev < self.oversold <= current:
+            return self._go(1)
+        if prev > self.overbought >= current:
+            return self._go(-1)
+        return None
+
+
+class MACDSignal(SignalModel):
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        super().__init__()
+        from nautilus_trader.indicators import (
+            ExponentialMovingAverage,
+            MovingAverageConvergenceDivergence,
+        )
+        self.macd = MovingAverageConvergenceDivergence(int(fast_period), int(slow_period))
+        self.signal = ExponentialMovingAverage(int(signal_period))
+        self._prev_diff: Optional[float] = None
+
+    def on_bar(self, close: float) -> Optional[int]:
+        self.macd.update_raw(close)
+        if not self.macd.initialized:
+            return None
+        self.signal.update_raw(self.macd.value)
+        if not self.signal.initialized:
+            return None
+        diff = self.macd.value - self.signal.value
+        prev, self._prev_diff = self._prev_diff, diff
+        if prev is None:
+            return None
+        if prev <= 0 < diff:
+            return self._go(1)
+        if prev >= 0 > diff:
+            return self._go(-1)
+        return None
+
+
+def build_signal_model(strategy_type: str, cfg: Dict[str, Any]) -> SignalModel:
+    """Instantiate the signal model for a strategy type from its stored config."""
+    if strategy_type == "sma_crossover":
+        return SMASignal(cfg.get("fast_period", 10), cfg.get("slow_period", 20))
+    if strategy_type == "rsi":
+        return RSISignal(
+            cfg.get("rsi_period", 14),
+            cfg.get("oversold_level", 30.0),
+            cfg.get("overbought_level", 70.0),
+        )
+    if strategy_type == "macd":
+        return MACDSignal(
+            cfg.get("fast_period", 12),
+            cfg.get("slow_period", 26),
+            cfg.get("signal_period", 9),
+        )
+    raise ValueError(f"Unknown strategy type: {strategy_type}")
+
+
+def instrument_to_symbol(instrument_id: str) -> str:
+    """'BTCUSDT.BINANCE' / 'BTC/USDT' → 'BTCUSDT' (same rule as LiveTradingManager)."""
+    return instrument_id.replace("/", "").split(".")[0].upper()
+
+
+# ── Latency stats ─────────────────────────────────────────────────────────────
+
+class LatencyStats:
+    """Rolling window of latency samples in milliseconds."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, ms: float) -> None:
+        self._samples.append(ms)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        if not self._samples:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        ordered = sorted(self._samples)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "p50_ms": round(ordered[n // 2], 3),
+            "p99_ms": round(ordered[min(n - 1, int(n * 0.99))], 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class StrategyWorker:
+    strategy_id: str
+    strategy_type: str
+    instrument: str
+    symbol: str
+    trade_size: float
+    model: SignalModel
+    queue: "asyncio.Queue[LiveBar]" = field(default_factory=lambda: asyncio.Queue(_WORKER_QUEUE_SIZE))
+    task: Optional[asyncio.Task] = None
+    bars: int = 0
+    signals: int = 0
+    orders: int = 0
+    rejected: int = 0
+    errors: int = 0
+    dropped_bars: int = 0
+    last_error: str = ""
+    loop_latency: LatencyStats = field(default_factory=LatencyStats)
+    tick_to_order: LatencyStats = field(default_factory=LatencyStats)
+
+    def offer(self, bar: LiveBar) -> None:
+        """Enqueue a bar without blocking; drop the oldest if the worker is behind."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped_bars += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(bar)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "strategy_id": self.strategy_id,
+            "type": self.strategy_type,
+            "instrument": self.instrument,
+            "symbol": self.symbol,
+            "running": self.task is not None and not self.task.done(),
+            "bars_processed": self.bars,
+            "signals": self.signals,
+            "orders_submitted": self.orders,
+            "orders_rejected": self.rejected,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "queue_depth": self.queue.qsize(),
+            "dropped_bars": self.dropped_bars,
+            "position": self.model.position,
+            "loop_latency": self.loop_latency.summary(),
+            "tick_to_order_latency": self.tick_to_order.summary(),
+        }
+
+
+OrderSink = Callable[[StrategyWorker, Dict[str, Any]], Any]
+
+
+async def route_order(worker: StrategyWorker, order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Default order path: the same order_service.place_order as
+    ``POST /api/orders``, with the row attributed to the strategy.
+    Raises RiskCheckError / HTTPException when the order is refused.
+    """
+    import order_service
+
+    placed = await order_service.place_order(
+        order, user_id=f"strategy:{worker.strategy_id}", strategy_id=worker.strategy_id,
+    )
+    return placed["order"]
+
+
+# ── Host ──────────────────────────────────────────────────────────────────────
+
+def _task_is_live(task: Optional[asyncio.Task]) -> bool:
+    """True if ``task`` is still running on the current event loop."""
+    if task is None or task.done():
+        return False
+    try:
+        return task.get_loop() is asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+
+class LiveStrategyHost:
+    """
+    Runs started strategies as isolated asyncio workers fed by live bars.
+
+    One BarAggregator and (at most) one ticker subscription per symbol are
+    shared by every worker trading that symbol.
+    """
+
+    def __init__(self, order_sink: Optional[OrderSink] = None, bar_seconds: int = _BAR_SECONDS) -> None:
+        self._workers: Dict[str, StrategyWorker] = {}
+        self._aggregators: Dict[str, BarAggregator] = {}
+        self._feeds: Dict[str, asyncio.Task] = {}
+        self._order_sink: OrderSink = order_sink or route_order
+        self.bar_seconds = bar_seconds
+        self.feed_enabled = os.getenv("LIVE_STRATEGY_FEED", "1") != "0"
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def start(self, strategy_id: str, strategy_type: str, config: Dict[str, Any]) -> bool:
+        """Register and start a worker. Returns False for unsupported configs."""
+        existing = self._workers.get(strategy_id)
+        if existing is not None:
+            if _task_is_live(existing.task):
+                return True
+            del self._workers[strategy_id]  # stale: finished or owned by a dead loop
+        try:
+            model = build_signal_model(strategy_type, config)
+            instrument = str(config.get("instrument_id", "EUR/USD.SIM"))
+            trade_size = float(config.get("trade_size", "100000"))
+        except (ValueError, TypeError, ImportError) as exc:
+            logger.warning("Strategy %s not hosted: %s", strategy_id, exc)
+            return False
+
+        worker = StrategyWorker(
+            strategy_id=strategy_id,
+            strategy_type=strategy_type,
+            instrument=instrument,
+            symbol=instrument_to_symbol(instrument),
+            trade_size=trade_size,
+            model=model,
+        )
+        worker.task = asyncio.create_task(self._run_worker(worker), name=f"strategy:{strategy_id}")
+        self._workers[strategy_id] = worker
+        self._ensure_feed(worker.symbol)
+        logger.info("Live strategy %s started on %s", strategy_id, worker.symbol)
+        return True
+
+    async def stop(self, strategy_id: str) -> bool:
+        worker = self._workers.pop(strategy_id, None)
+        if worker is None:
+            return False
+        if worker.task:
+            worker.task.cancel()
+            if worker.task.get_loop() is asyncio.get_running_loop():
+                try:
+                    await worker.task
+                except asyncio.CancelledError:
+                    pass
+        if not any(w.symbol == worker.symbol for w in self._workers.values()):
+            feed = self._feeds.pop(worker.symbol, None)
+            if feed:
+                feed.cancel()
+            self._aggregators.pop(worker.symbol, None)
+        logger.info("Live strategy %s stopped", strategy_id)
+        return True
+
+    async def shutdown(self) -> None:
+        for sid in list(self._workers):
+            await self.stop(sid)
+        for task in self._feeds.values():
+            task.cancel()
+        self._feeds.clear()
+
+    def is_running(self, strategy_id: str) -> bool:
+        return strategy_id in self._workers
+
+    # ── Market data ───────────────────────────────────────────────────────────
+
+    def on_tick(self, symbol: str, price: float, ts: Optional[float] = None) -> int:
+        """
+        Feed one trade/ticker price. Returns the number of workers a closed
+        bar was dispatched to (0 while the current bar is still forming).
+        """
+        agg = self._aggregators.get(symbol)
+        if agg is None:
+            agg = self._aggregators[symbol] = BarAggregator(symbol, self.bar_seconds)
+        bar = agg.update(price, ts if ts is not None else time.time())
+        if bar is None:
+            return 0
+        return self.dispatch_bar(bar)
+
+    def dispatch_bar(self, bar: LiveBar) -> int:
+        delivered = 0
+        for worker in self._workers.values():
+            if worker.symbol == bar.symbol:
+                worker.offer(bar)
+                delivered += 1
+        return delivered
+
+    def _ensure_feed(self, symbol: str) -> None:
+        if not self.feed_enabled or symbol in self._feeds:
+            return
+        import market_data_service as svc
+        if symbol not in svc.SYMBOLS:
+            return  # no live stream for simulated / unsupported instruments
+        from state import live_manager
+
+        async def _on_message(data: Dict[str, Any]) -> None:
+            try:
+                price = float(data["c"])
+                ts = float(data.get("E", time.time() * 1000)) / 1000.0
+            except (KeyError, TypeError, ValueError):
+                return
+            self.on_tick(symbol, price, ts)
+
+        self._feeds[symbol] = asyncio.create_task(
+            live_manager.subscribe_ticker(symbol, _on_message), name=f"feed:{symbol}"
+        )
+
+    # ── Worker loop ───────────────────────────────────────────────────────────
+
+    async def _run_worker(self, worker: StrategyWorker) -> None:
+        from fastapi import HTTPException
+
+        while True:
+            bar = await worker.queue.get()
+            started = time.perf_counter()
+            try:
+                worker.bars += 1
+                direction = worker.model.on_bar(bar.close)
+                if direction:
+                    worker.signals += 1
+                    order = {
+                        "instrument": worker.instrument,
+                        "side": "BUY" if direction > 0 else "SELL",
+                        "type": "MARKET",
+                        "quantity": worker.trade_size,
+                        "price": bar.close,  # reference price for risk valuation
+                        "leverage": 1.0,
+                    }
+                    try:
+                        await self._order_sink(worker, order)
+                        # Only a routed order moves the model; a rejected one re-signals next bar
+                        worker.model.position = direction
+                        worker.orders += 1
+                        worker.tick_to_order.add((time.monotonic() - bar.last_tick_mono) * 1000)
+                    except HTTPException as exc:
+                        # Refused (risk limit, adapter gate, exchange rejection);
+                        # an exchange failure (5xx) counts as an error below
+                        if exc.status_code >= 500:
+                            raise
+                        worker.rejected += 1
+                        worker.last_error = str(exc.detail)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Never let one bad bar kill the strategy
+                worker.errors += 1
+                worker.last_error = str(exc)
+                logger.warning("Strategy %s error: %s", worker.strategy_id, exc)
+            finally:
+                worker.loop_latency.add((time.perf_counter() - started) * 1000)
+
+    # ── Introspection ─────────────────────────────────────────────────────────
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [self._worker_stats(w) for w in self._workers.values()]
+
+    def get_stats(self, strategy_id: str) -> Optional[Dict[str, Any]]:
+        worker = self._workers.get(strategy_id)
+        return self._worker_stats(worker) if worker else None
+
+    def _worker_stats(self, worker: StrategyWorker) -> Dict[str, Any]:
+        return {**worker.stats(), "live_feed": worker.symbol in self._feeds}
+
+
+strategy_host = LiveStrategyHost()
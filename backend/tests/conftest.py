@@ -3,8 +3,10 @@ Shared pytest configuration.
 
 Resets module-level rate-limit counters before each test so that the
 /api/auth/login call inside every `client` fixture is never blocked by the
-5-req/minute cap that accumulates across the test session.
+5-req/minute cap that accumulates across the test session, and points the
+backtest store at a per-test directory so no test writes to data/backtests.
 """
+import os
 import sys
 from pathlib import Path
 
@@ -12,6 +14,9 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Minimum bcrypt cost: every `client` fixture seeds + logs in the admin user
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 
 @pytest.fixture
 def client(tmp_path, monkeypatch):
@@ -34,9 +39,8 @@ def client(tmp_path, monkeypatch):
 def reset_rate_limit_counters():
     """Clear in-memory rate-limit state before every test."""
     try:
-        import nautilus_fastapi
-        nautilus_fastapi._login_counters.clear()
-        nautilus_fastapi._global_counters.clear()
+        from rate_limit import limiter
+        limiter.reset()
     except (ImportError, AttributeError):
         pass
     yield
@@ -52,3 +56,13 @@ def reset_live_manager():
     except (ImportError, AttributeError):
         pass
     yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_backtest_dir(tmp_path, monkeypatch):
+    """Per-test BACKTEST_DIR with empty in-memory backtest summaries."""
+    import backtest_store
+    monkeypatch.setattr(backtest_store, "BACKTEST_DIR", tmp_path / "backtests")
+    backtest_store.store.summaries.clear()
+    yield tmp_path / "backtests"
+    backtest_store.store.summaries.clear()
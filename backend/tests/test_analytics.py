@@ -0,0 +1,227 @@
+"""
+Analytics engine tests.
+
+Covers:
+- PnL by day / instrument / strategy over closed positions
+- Win-rate buckets, holding-time distribution, fee drag
+- Backtest parquet outputs joined into the same views
+- Snapshot re-copied in the background, only after the SQLite file changes
+- The sqlite extension is only loaded, never downloaded unless opted in
+
+Run:
+    cd backend
+    pytest tests/test_analytics.py -v
+"""
+
+import asyncio
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+BASE = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)  # a Monday
+
+
+@pytest.fixture(autouse=True)
+def fresh_engine(monkeypatch):
+    import analytics
+    monkeypatch.setattr(analytics, "ANALYTICS_REFRESH_SECONDS", 0)
+    analytics.engine.close()
+    yield
+    analytics.engine.close()
+
+
+def _seed(path) -> None:
+    """Six closed trades, one open position and three orders (two filled)."""
+    trades = [
+        # id, instrument, strategy, pnl, opened offset, holding seconds
+        ("P1", "BTCUSDT", "STR-A", 100.0, timedelta(hours=0), 30),
+        ("P2", "BTCUSDT", "STR-A", -40.0, timedelta(hours=1), 600),
+        ("P3", "ETHUSDT", "STR-A", 25.0, timedelta(hours=2), 7200),
+        ("P4", "ETHUSDT", "STR-B", -10.0, timedelta(days=1), 120),
+        ("P5", "BTCUSDT", "STR-B", 60.0, timedelta(days=1, hours=1), 3 * 86_400),
+        ("P6", "BTCUSDT", "", 5.0, timedelta(days=1, hours=2), 45),
+    ]
+    conn = sqlite3.connect(str(path))
+    for pid, inst, strat, pnl, offset, hold in trades:
+        opened = BASE + offset
+        conn.execute(
+            "INSERT INTO positions (id, instrument, side, quantity, entry_price, exit_price, pnl,"
+            " is_open, strategy_id, opened_at, closed_at) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (pid, inst, "LONG", 1.0, 100.0, 100.0 + pnl, pnl, 0, strat,
+             opened.isoformat(), (opened + timedelta(seconds=hold)).isoformat()),
+        )
+    conn.execute(
+        "INSERT INTO positions (id, instrument, side, quantity, pnl, is_open, opened_at)"
+        " VALUES ('P7', 'BTCUSDT', 'LONG', 1, 999, 1, ?)", (BASE.isoformat(),),
+    )
+    conn.executemany(
+        "INSERT INTO orders (id, instrument, side, quantity, price, status, filled_qty,"
+        " strategy_id, timestamp) VALUES (?,?,?,?,?,?,?,?,?)",
+        [
+            ("O1", "BTCUSDT", "BUY", 2.0, 1000.0, "FILLED", 2.0, "STR-A", BASE.isoformat()),
+            ("O2", "ETHUSDT", "SELL", 1.0, 500.0, "FILLED", 1.0, "STR-B", (BASE + timedelta(days=1)).isoformat()),
+            ("O3", "ETHUSDT", "BUY", 1.0, 500.0, "PENDING", 0.0, "STR-B", BASE.isoformat()),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "analytics.db")
+    asyncio.run(database.init_db())
+    _seed(database.DB_PATH)
+    return database.DB_PATH
+
+
+def test_pnl_by_day_and_strategy(db_path):
+    import analytics
+    days = analytics.pnl_by(db_path, "day")
+    assert [(r["key"], r["trades"], r["pnl"]) for r in days] == [
+        ("2026-03-02", 3, 85.0), ("2026-03-03", 2, -5.0), ("2026-03-06", 1, 60.0),
+    ]
+    assert days[-1]["cumulative_pnl"] == 140.0
+
+    by_strategy = {r["key"]: r for r in analytics.pnl_by(db_path, "strategy")}
+    assert by_strategy["STR-A"]["wins"] == 2 and by_strategy["STR-A"]["losses"] == 1
+    assert by_strategy["manual"]["pnl"] == 5.0
+    assert "P7" not in str(by_strategy)  # open positions excluded
+
+    window = analytics.pnl_by(db_path, "instrument", start="2026-03-03", end="2026-03-03")
+    assert {r["key"]: r["pnl"] for r in window} == {"ETHUSDT": -10.0, "BTCUSDT": 5.0}
+
+
+def test_win_rate_and_holding_times(db_path):
+    import analytics
+    rates = {r["key"]: r for r in analytics.win_rate_by(db_path, "strategy")}
+    assert rates["STR-A"]["win_rate"] == pytest.approx(66.67)
+    assert rates["STR-A"]["profit_factor"] == pytest.approx(125 / 40, rel=1e-3)
+
+    holding = {r["key"]: r["trades"] for r in analytics.win_rate_by(db_path, "holding")}
+    assert holding == {"<1m": 2, "1-5m": 1, "5-15m": 1, "1-4h": 1, "1-7d": 1}
+
+    (dist,) = analytics.holding_times(db_path)
+    assert dist["trades"] == 6
+    assert dist["max_s"] == 3 * 86_400
+    assert [b["trades"] for b in dist["histogram"]] == [2, 1, 1, 0, 1, 0, 1, 0]
+
+
+def test_fee_drag(db_path):
+    import analytics
+    rows = {r["key"]: r for r in analytics.fee_drag(db_path, "strategy", fee_bps=10)}
+    assert rows["STR-A"]["notional"] == 2000.0
+    assert rows["STR-A"]["est_fees"] == 2.0
+    assert rows["STR-A"]["net_pnl"] == 83.0
+    assert rows["STR-B"]["est_fees"] == 0.5
+    assert rows["manual"]["fills"] == 0
+
+
+def test_backtest_parquet_joins_views(db_path, tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import analytics
+
+    run = tmp_path / "backtests" / "BT-1"
+    run.mkdir(parents=True)
+    t0 = int(BASE.timestamp() * 1e9)
+    pq.write_table(pa.table({
+        "id": ["BP1", "BP2"], "instrument_id": ["EUR/USD.SIM"] * 2, "side": ["LONG", "SHORT"],
+        "quantity": [1.0, 1.0], "avg_px_open": [1.1, 1.2], "avg_px_close": [1.2, 1.1],
+        "realized_pnl": [7.0, -3.0], "is_closed": [True, True],
+        "ts_opened": [t0, t0], "ts_closed": [t0 + 10**9, t0 + 90 * 10**9],
+    }), run / "positions.parquet")
+
+    rows = {r["key"]: r for r in analytics.pnl_by(db_path, "source")}
+    assert rows["backtest"]["trades"] == 2 and rows["backtest"]["pnl"] == 4.0
+    assert rows["live"]["trades"] == 6
+
+    only_bt = analytics.pnl_by(db_path, "strategy", source="backtest")
+    assert [r["key"] for r in only_bt] == ["BT-1"]
+    assert analytics.engine.status()["backtest_sources"] == ["positions"]
+
+
+def _wait_for_refresh(engine) -> None:
+    for _ in range(250):
+        if not engine._refreshing:
+            return
+        time.sleep(0.02)
+
+
+def test_snapshot_refreshes_in_background(db_path):
+    import analytics
+    assert analytics.pnl_by(db_path, "source")[0]["trades"] == 6
+    if analytics.engine.mode != "snapshot":
+        pytest.skip("sqlite extension attached: queries read live data")
+    refresh_ms = analytics.engine.status()["last_refresh_ms"]
+
+    analytics.pnl_by(db_path, "source")  # unchanged file → no re-copy
+    _wait_for_refresh(analytics.engine)
+    assert analytics.engine.status()["last_refresh_ms"] == refresh_ms
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("UPDATE positions SET is_open = 0, closed_at = ? WHERE id = 'P7'",
+                 ((BASE + timedelta(hours=5)).isoformat(),))
+    conn.commit()
+    conn.close()
+    # The stale copy answers while the new one is built
+    assert analytics.pnl_by(db_path, "source")[0]["trades"] == 6
+    _wait_for_refresh(analytics.engine)
+    assert analytics.pnl_by(db_path, "source")[0]["trades"] == 7
+
+
+def test_attach_never_installs_unless_opted_in(monkeypatch, tmp_path):
+    import analytics
+
+    class Recorder:
+        def __init__(self):
+            self.sql = []
+
+        def execute(self, sql):
+            self.sql.append(sql)
+
+    engine = analytics.AnalyticsEngine()
+    engine._con = Recorder()
+    assert engine._try_attach(tmp_path / "it's.db")
+    assert not any(sql.startswith("INSTALL") for sql in engine._con.sql)
+    assert "SET autoinstall_known_extensions = false" in engine._con.sql
+    assert f"ATTACH '{tmp_path}/it''s.db' AS oltp (TYPE sqlite, READ_ONLY)" in engine._con.sql
+
+    monkeypatch.setattr(analytics, "ANALYTICS_INSTALL_EXTENSIONS", True)
+    engine._con = Recorder()
+    engine._try_attach(tmp_path / "a.db")
+    assert engine._con.sql[:2] == ["INSTALL sqlite", "LOAD sqlite"]
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_analytics_endpoints(client):
+    import database
+    _seed(database.DB_PATH)
+
+    r = client.get("/api/analytics/pnl", params={"by": "instrument"})
+    assert r.status_code == 200
+    assert {row["key"] for row in r.json()["rows"]} == {"BTCUSDT", "ETHUSDT"}
+
+    r = client.get("/api/analytics/win-rate", params={"by": "weekday"})
+    assert [b["key"] for b in r.json()["buckets"]] == ["Monday", "Tuesday", "Friday"]
+
+    r = client.get("/api/analytics/holding-times", params={"by": "strategy"})
+    assert r.status_code == 200 and len(r.json()["groups"]) == 3
+
+    r = client.get("/api/analytics/fee-drag", params={"by": "day", "fee_bps": 5})
+    assert r.json()["rows"][0]["fee_bps"] == 5
+
+    assert client.get("/api/analytics/status").json()["mode"] in ("attach", "snapshot")
+    assert client.get("/api/analytics/pnl", params={"by": "hour"}).status_code == 422
+    assert client.get("/api/analytics/pnl", params={"start": "03/02/2026"}).status_code == 422
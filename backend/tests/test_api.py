@@ -651,6 +651,23 @@ def test_backtest_lock_prevents_concurrent_run(client):
         bt_module._backtest_lock = original  # always restore
 
 
+def test_portfolio_backtest_validates_request(client):
+    url = "/api/nautilus/portfolio-backtest"
+    assert client.post(url, json={"strategy_ids": []}).status_code == 422
+    assert client.post(url, json={"strategy_ids": ["a", "a"]}).status_code == 422
+    assert client.post(url, json={"strategy_ids": ["a"], "name": "../x"}).status_code == 422
+    assert client.post(url, json={"strategy_ids": ["a"], "start_date": "2020-02-01",
+                                  "end_date": "2020-01-01"}).status_code == 422
+
+
+def test_portfolio_backtest_reports_unknown_strategies(client, monkeypatch):
+    from state import nautilus_system
+    monkeypatch.setattr(nautilus_system, "is_initialized", True)
+    r = client.post("/api/nautilus/portfolio-backtest", json={"strategy_ids": ["nope-1", "nope-2"]})
+    assert r.status_code == 500
+    assert "nope-1, nope-2" in r.json()["detail"]
+
+
 # ── Strategy config edge cases ────────────────────────────────────────────────
 
 def test_create_strategy_null_config_uses_defaults(client):
@@ -0,0 +1,142 @@
+"""
+Audit archive tests.
+
+Covers:
+- Whole days older than the hot window move to compressed partitions
+- Re-running merges by id (no duplicates, no loss)
+- Cursor pagination spans hot table and archive without gaps
+- Time-range filters and checksum verification
+- Admin archive endpoints
+
+Run:
+    cd backend
+    pytest tests/test_audit_archive.py -v
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+NOW = datetime(2026, 6, 30, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive_env(tmp_path, monkeypatch):
+    import audit_archive
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "audit.db")
+    monkeypatch.setattr(audit_archive.archive, "root", tmp_path / "archive")
+    monkeypatch.setattr(audit_archive, "AUDIT_ARCHIVE_CODEC", "gzip")
+    asyncio.run(database.init_db())
+    return audit_archive, database
+
+
+def _entry(i: int, ts: str, action: str = "order_created") -> dict:
+    return {"id": f"AUD-{i:04d}", "user_id": "admin" if i % 2 else "bob", "action": action,
+            "resource": f"order:{i}", "details": "", "ip_address": "", "timestamp": ts}
+
+
+def _seed(database, entries):
+    asyncio.run(database.insert_audit_entries(entries))
+
+
+def _hot_ids(database):
+    async def q():
+        rows, _ = await database.query_audit_logs(limit=1000)
+        return sorted(r["id"] for r in rows)
+    return asyncio.run(q())
+
+
+def test_old_days_move_to_partitions(archive_env):
+    audit_archive, database = archive_env
+    _seed(database, [
+        _entry(1, "2026-01-10T08:00:00+00:00"),
+        _entry(2, "2026-01-10T09:00:00+00:00"),
+        _entry(3, "2026-02-01T00:00:00+00:00"),
+        _entry(4, "2026-06-29T10:00:00+00:00"),  # inside the 30-day hot window
+    ])
+    result = asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+
+    assert result["archived"] == 3
+    assert [p["day"] for p in result["partitions"]] == ["2026-01-10", "2026-02-01"]
+    assert _hot_ids(database) == ["AUD-0004"]
+
+    path = audit_archive.archive.root / "2026" / "01" / "audit-2026-01-10.jsonl.gz"
+    lines = gzip.decompress(path.read_bytes()).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["AUD-0001", "AUD-0002"]
+    assert audit_archive.archive.verify() == {"2026-01-10": True, "2026-02-01": True}
+
+
+def test_rerun_merges_late_rows(archive_env):
+    audit_archive, database = archive_env
+    _seed(database, [_entry(1, "2026-01-10T08:00:00+00:00")])
+    asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+    _seed(database, [_entry(2, "2026-01-10T07:00:00+00:00"), _entry(1, "2026-01-10T08:00:00+00:00")])
+    asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+
+    rows = audit_archive.archive.read_partition("2026-01-10")
+    assert [r["id"] for r in rows] == ["AUD-0002", "AUD-0001"]
+    assert audit_archive.archive.manifest()["2026-01-10"]["rows"] == 2
+
+
+def test_cursor_pages_span_hot_and_archive(archive_env):
+    audit_archive, database = archive_env
+    entries = [_entry(i, f"2026-{1 + i // 3:02d}-{1 + i % 3:02d}T00:00:00+00:00") for i in range(6)]
+    entries += [_entry(10 + i, f"2026-06-2{i}T00:00:00+00:00") for i in range(3)]
+    _seed(database, entries)
+    asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = asyncio.run(audit_archive.query_audit_logs(limit=4, cursor=cursor))
+        seen += rows
+        if cursor is None:
+            break
+    newest_first = sorted(entries, key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+    assert [r["id"] for r in seen] == [e["id"] for e in newest_first]
+
+
+def test_filters_and_time_range_in_archive(archive_env):
+    audit_archive, database = archive_env
+    _seed(database, [_entry(i, f"2026-01-{10 + i:02d}T00:00:00+00:00") for i in range(6)])
+    asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+
+    rows, _ = asyncio.run(audit_archive.query_audit_logs(
+        since="2026-01-11T00:00:00+00:00", until="2026-01-14T00:00:00+00:00", user_id="admin",
+    ))
+    assert [r["id"] for r in rows] == ["AUD-0003", "AUD-0001"]
+
+
+def test_verify_detects_tampering(archive_env):
+    audit_archive, database = archive_env
+    _seed(database, [_entry(1, "2026-01-10T08:00:00+00:00")])
+    asyncio.run(audit_archive.archive_audit_logs(hot_days=30, now=NOW))
+    path = audit_archive.archive.root / audit_archive.archive.manifest()["2026-01-10"]["file"]
+    path.write_bytes(gzip.compress(b'{"id":"forged"}\n'))
+    assert audit_archive.archive.verify() == {"2026-01-10": False}
+
+
+def test_archive_endpoints(client, tmp_path, monkeypatch):
+    import audit_archive
+    import database
+    monkeypatch.setattr(audit_archive.archive, "root", tmp_path / "archive")
+    monkeypatch.setattr(audit_archive, "AUDIT_ARCHIVE_CODEC", "gzip")
+    asyncio.run(database.insert_audit_entries([_entry(1, "2020-01-01T00:00:00+00:00")]))
+
+    r = client.post("/api/admin/audit-logs/archive", params={"older_than_days": 30})
+    assert r.status_code == 200
+    assert r.json()["archived"] == 1
+
+    stats = client.get("/api/admin/audit-logs/archive", params={"verify": True}).json()
+    assert stats["partitions"] == 1 and stats["codec"] == "gzip"
+    assert stats["corrupt_partitions"] == []
+
+    logs = client.get("/api/admin/audit-logs", params={"until": "2021-01-01"}).json()["logs"]
+    assert [entry["id"] for entry in logs] == ["AUD-0001"]
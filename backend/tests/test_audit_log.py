@@ -0,0 +1,195 @@
+"""
+Write-behind audit log tests.
+
+Covers:
+- Entries are buffered and flushed in one batch (interval / batch size)
+- Shutdown drains the buffer; failed flushes keep entries for the retry
+- Overflow policies (block / drop) and metrics
+- block never discards entries after failed flushes; stop() retries the last flush
+- Audit reads see entries as soon as log_action returns
+
+Run:
+    cd backend
+    pytest tests/test_audit_log.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _db(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "audit.db")
+    asyncio.run(database.init_db())
+    return database
+
+
+async def _count(database) -> int:
+    import aiosqlite
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        async with db.execute("SELECT COUNT(*) FROM audit_logs WHERE action LIKE 'test.%'") as cur:
+            return (await cur.fetchone())[0]
+
+
+def test_entries_flush_in_one_batch(tmp_path, monkeypatch):
+    from audit_log import AuditWriter
+    database = _db(tmp_path, monkeypatch)
+    writer = AuditWriter(flush_interval=60, batch_size=1000)
+    monkeypatch.setattr(database, "audit_writer", writer)
+
+    async def scenario():
+        await writer.start()
+        for i in range(5):
+            await database.log_action(action=f"test.{i}")
+        pending = await _count(database)
+        await writer.stop()
+        return pending, await _count(database)
+
+    assert asyncio.run(scenario()) == (0, 5)
+    stats = writer.stats()
+    assert (stats["written"], stats["batches"], stats["queue_depth"]) == (5, 1, 0)
+    assert stats["max_depth"] == 5
+
+
+def test_batch_size_wakes_writer(tmp_path, monkeypatch):
+    from audit_log import AuditWriter
+    database = _db(tmp_path, monkeypatch)
+    writer = AuditWriter(flush_interval=60, batch_size=3)
+    monkeypatch.setattr(database, "audit_writer", writer)
+
+    async def scenario():
+        await writer.start()
+        for i in range(3):
+            await database.log_action(action=f"test.{i}")
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if writer.written:
+                break
+        written = await _count(database)
+        await writer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_failed_flush_keeps_entries(tmp_path, monkeypatch):
+    from audit_log import AuditWriter
+    database = _db(tmp_path, monkeypatch)
+    writer = AuditWriter(flush_interval=60)
+    real_insert = database.insert_audit_entries
+    calls = []
+
+    async def flaky(entries):
+        calls.append(len(entries))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        await real_insert(entries)
+
+    monkeypatch.setattr(database, "insert_audit_entries", flaky)
+
+    async def scenario():
+        await writer.start()
+        await writer.submit({"id": "AUD-1", "user_id": "", "action": "test.a", "resource": "",
+                             "details": "", "ip_address": "", "timestamp": "2026-01-01T00:00:00"})
+        assert await writer.flush() == 0
+        assert writer.stats()["queue_depth"] == 1
+        await writer.stop()
+        return await _count(database)
+
+    assert asyncio.run(scenario()) == 1
+    assert calls == [1, 1]
+    assert writer.errors == 1
+
+
+def test_overflow_drop_and_block(monkeypatch):
+    import database
+    from audit_log import AuditWriter
+    written = []
+
+    async def sink(entries):
+        written.extend(entries)
+
+    monkeypatch.setattr(database, "insert_audit_entries", sink)
+
+    async def fill(writer):
+        await writer.start()
+        for i in range(5):
+            await writer.submit({"n": i})
+        await writer.stop()
+
+    dropper = AuditWriter(flush_interval=60, max_queue=2, overflow="drop")
+    asyncio.run(fill(dropper))
+    assert [e["n"] for e in written] == [0, 1]
+    assert dropper.dropped == 3
+
+    written.clear()
+    blocker = AuditWriter(flush_interval=60, max_queue=2, overflow="block")
+    asyncio.run(fill(blocker))
+    assert [e["n"] for e in written] == [0, 1, 2, 3, 4]
+    assert (blocker.dropped, blocker.blocked) == (0, 2)
+
+
+def test_block_keeps_entries_through_failed_flushes(monkeypatch):
+    import database
+    from audit_log import AuditWriter
+    written, failures = [], [RuntimeError("database is locked")] * 2
+
+    async def locked_then_ok(entries):
+        if failures:
+            raise failures.pop()
+        written.extend(entries)
+
+    monkeypatch.setattr(database, "insert_audit_entries", locked_then_ok)
+
+    async def fill(writer):
+        await writer.start()
+        for i in range(5):
+            await writer.submit({"n": i})
+        await writer.stop()
+
+    blocker = AuditWriter(flush_interval=0.01, max_queue=2, overflow="block")
+    asyncio.run(fill(blocker))
+    assert [e["n"] for e in written] == [0, 1, 2, 3, 4]
+    assert blocker.dropped == 0 and blocker.errors == 2
+
+
+def test_stop_retries_the_final_flush(monkeypatch):
+    import database
+    from audit_log import AuditWriter
+    written, failures = [], [RuntimeError("database is locked")] * 2
+
+    async def locked_then_ok(entries):
+        if failures:
+            raise failures.pop()
+        written.extend(entries)
+
+    monkeypatch.setattr(database, "insert_audit_entries", locked_then_ok)
+
+    async def scenario(writer):
+        await writer.start()
+        await writer.submit({"n": 1})
+        await writer.stop()
+
+    writer = AuditWriter(flush_interval=0.01)
+    asyncio.run(scenario(writer))
+    assert written == [{"n": 1}] and writer.errors == 2
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_no_writer_writes_inline(tmp_path, monkeypatch):
+    database = _db(tmp_path, monkeypatch)
+    asyncio.run(database.log_action(action="test.inline"))
+    assert asyncio.run(_count(database)) == 1
+
+
+def test_audit_endpoint_sees_order_immediately(client):
+    client.post("/api/orders", json={"instrument": "EUR/USD.SIM", "side": "BUY", "quantity": 1})
+    body = client.get("/api/admin/audit-logs", params={"action": "order_created"}).json()
+    assert body["count"] == 1
+    audit = client.get("/api/system/metrics").json()["audit"]
+    assert audit["running"] is True
+    assert audit["enqueued"] >= 1
+    assert audit["queue_depth"] == 0
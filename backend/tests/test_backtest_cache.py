@@ -0,0 +1,228 @@
+"""
+Backtest result cache tests.
+
+Covers:
+- Keys change with any input (config, dates, data version, code version)
+- Config objects, also nested in portfolio keys, hash by their fields
+- Hits rebuild the response from the stored run; misses are counted
+- LRU bound, persistence across restarts, deleted runs dropped on lookup
+- An unreadable index is treated as empty; engine hits set last_backtest
+- A run is only served to the strategy / portfolio name it was stored under
+- Catalog data changes invalidate entries built on the old data
+- /api/nautilus/backtest-cache stats and invalidation
+
+Run:
+    cd backend
+    pytest tests/test_backtest_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(autouse=True)
+def small_cache(monkeypatch):
+    import backtest_cache
+    monkeypatch.setattr(backtest_cache, "cache", backtest_cache.BacktestCache(capacity=3))
+    monkeypatch.setattr(backtest_cache, "_CATALOG_CHECK_INTERVAL", 0)
+
+
+def _key(fast: int = 10, data_version: str = "synthetic", **overrides):
+    import backtest_cache
+    args = dict(strategy_type="sma", config={"fast_period": fast, "slow_period": 30},
+                instrument_id="EUR/USD.SIM", start_date="2021-01-01", end_date="2021-01-08",
+                starting_balance=100_000.0, data_version=data_version)
+    args.update(overrides)
+    return backtest_cache.make_key("demo", **args)
+
+
+def _save_run(pnl: float = 12.5) -> str:
+    import backtest_store
+    summary = {"kind": "demo", "strategy_id": "demo", "total_pnl": pnl}
+    tables = {
+        "orders": [{"id": f"O-{i}", "side": "BUY", "quantity": 1.0} for i in range(250)],
+        "positions": [{"id": "P-1", "realized_pnl": pnl, "is_closed": True}],
+        "equity": [{"time": "2021-01-01T00:00:00", "equity": 100_000.0},
+                   {"time": "2021-01-01T01:00:00", "equity": 100_000.0 + pnl}],
+    }
+    return backtest_store.store.save(summary, tables)["run_id"]
+
+
+def test_key_covers_every_input():
+    base = _key()
+    assert _key()["key"] == base["key"]
+    assert _key(fast=11)["key"] != base["key"]
+    assert _key(end_date="2021-01-09")["key"] != base["key"]
+    assert _key(starting_balance=50_000)["key"] != base["key"]
+    assert _key(data_version="abc")["key"] != base["key"]
+    assert base["inputs"]["code_version"]
+
+
+def test_key_hashes_nested_config_objects_by_field():
+    class Config:
+        def __init__(self, **fields):
+            self.fields = fields
+
+        def dict(self):
+            return dict(self.fields)
+
+    def key(**configs):
+        return _key(strategy_type="sma+sma", config=configs)["key"]
+
+    # Two equal objects: str() differs (object address), the key does not
+    assert key(a=Config(fast_period=5), b=Config(fast_period=7)) == \
+        key(a=Config(fast_period=5), b=Config(fast_period=7))
+    assert key(a=Config(fast_period=5), b=Config(fast_period=7)) != \
+        key(a=Config(fast_period=5), b=Config(fast_period=8))
+    # A top-level object keys the same as its field dict
+    assert _key(config=Config(fast_period=10, slow_period=30))["key"] == _key()["key"]
+
+
+def test_hit_rebuilds_result_from_store():
+    import backtest_cache
+    cache = backtest_cache.cache
+    key = _key()
+    assert cache.lookup(key) is None
+
+    run_id = _save_run()
+    cache.store(key, run_id, compute_s=2.5)
+    hit = cache.lookup(key)
+    assert hit["run_id"] == run_id and hit["total_pnl"] == 12.5
+    assert hit["cache"]["hit"] is True
+    assert len(hit["orders"]) == 200 and len(hit["positions"]) == 1
+    assert [p["equity"] for p in hit["equity_curve"]] == [100_000.0, 100_012.5]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["saved_seconds"] == 2.5
+
+
+def test_lru_bound_persistence_and_deleted_runs(isolated_backtest_dir):
+    import backtest_cache
+    import backtest_store
+    cache = backtest_cache.cache
+    keys = [_key(fast=f) for f in range(5)]
+    runs = [_save_run(pnl=f) for f in range(5)]
+    for key, run_id in zip(keys, runs):
+        cache.store(key, run_id, 1.0)
+    assert cache.stats()["entries"] == 3 and cache.evictions == 2
+    assert cache.lookup(keys[0]) is None
+    assert backtest_store.store.get(runs[0]) is not None  # eviction keeps the run
+
+    # A fresh cache (as after a restart) reads the persisted index
+    fresh = backtest_cache.BacktestCache(capacity=3)
+    assert fresh.lookup(keys[4])["run_id"] == runs[4]
+
+    backtest_store.store.delete(runs[3])
+    assert fresh.lookup(keys[3]) is None
+    assert fresh.stats()["entries"] == 2
+
+
+def test_catalog_data_change_invalidates(tmp_path):
+    import backtest_cache
+    catalog = tmp_path / "catalog"
+    ticks = catalog / "data" / "quote_tick" / "EURUSD.SIM"
+    ticks.mkdir(parents=True)
+    (ticks / "part-0.parquet").write_bytes(b"x" * 10)
+
+    cache = backtest_cache.cache
+    v1 = backtest_cache.data_version(str(catalog))
+    key = _key(data_version=v1)
+    cache.store(key, _save_run(), 1.0)
+    assert cache.lookup(key) is not None
+
+    (ticks / "part-1.parquet").write_bytes(b"y" * 10)
+    v2 = backtest_cache.data_version(str(catalog))
+    assert v2 != v1
+    assert cache.lookup(_key(data_version=v2)) is None
+    assert cache.stats()["entries"] == 0 and cache.invalidations == 1
+
+
+def test_corrupt_index_is_a_miss(isolated_backtest_dir):
+    import backtest_cache
+    isolated_backtest_dir.mkdir(parents=True)
+    (isolated_backtest_dir / "cache_index.json").write_text('[{"key": "trunc')
+    cache = backtest_cache.BacktestCache(capacity=3)
+    key = _key()
+    assert cache.lookup(key) is None and cache.misses == 1
+
+    run_id = _save_run()
+    cache.store(key, run_id, 1.0)  # rewrites the index
+    assert backtest_cache.BacktestCache(capacity=3).lookup(key)["run_id"] == run_id
+
+
+def test_engine_hit_records_last_backtest(monkeypatch):
+    import backtest_cache
+    from nautilus_core import NautilusTradingSystem
+    monkeypatch.setattr(backtest_cache, "data_version", lambda catalog_path: "v1")
+    system = NautilusTradingSystem()
+    system.is_initialized = True
+    config = {"instrument_id": "EUR/USD.SIM", "fast_period": 10, "slow_period": 30}
+    system.strategies["S1"] = {"type": "sma", "config": config, "status": "created"}
+    key = backtest_cache.make_key("backtest", strategy_type="sma", config=config,
+                                  instrument_id="EUR/USD.SIM", start_date="2020-01-01",
+                                  end_date="2020-01-31", starting_balance=100_000.0,
+                                  data_version="v1", owner="S1")
+    backtest_cache.cache.store(key, _save_run(), 1.0)
+
+    r = system.run_backtest("S1")
+    assert r["success"] and r["result"]["cache"]["hit"] is True
+    assert system.strategies["S1"]["status"] == "backtested"
+    assert system.strategies["S1"]["last_backtest"]
+
+
+def test_hits_stay_with_the_label_they_were_stored_under(monkeypatch):
+    import backtest_cache
+    import backtest_store
+    from nautilus_core import NautilusTradingSystem
+    monkeypatch.setattr(backtest_cache, "data_version", lambda catalog_path: "v1")
+    system = NautilusTradingSystem()
+    system.is_initialized = True
+    configs = {sid: {"instrument_id": "EUR/USD.SIM", "fast_period": f, "slow_period": 30}
+               for sid, f in (("S1", 5), ("S2", 8))}
+    for sid, config in configs.items():
+        system.strategies[sid] = {"type": "sma", "config": config, "status": "created"}
+    key = backtest_cache.make_key("portfolio", strategy_type="sma+sma", config=configs,
+                                  instrument_id="EUR/USD.SIM", start_date="2020-01-01",
+                                  end_date="2020-01-31", starting_balance=100_000.0,
+                                  data_version="v1", owner="alpha")
+    run_id = backtest_store.store.save({"kind": "portfolio", "strategy_id": "alpha"},
+                                       {"equity": []})["run_id"]
+    backtest_cache.cache.store(key, run_id, 1.0)
+
+    hit = system.run_portfolio_backtest(["S1", "S2"], name="alpha")
+    assert hit["result"]["run_id"] == run_id and hit["result"]["strategy_id"] == "alpha"
+    # Members look the same as after a fresh portfolio run
+    for sid in ("S1", "S2"):
+        assert system.strategies[sid]["status"] == "backtested"
+        assert system.strategies[sid]["last_backtest"]
+
+    # Same strategies under another name: a fresh run, never alpha's summary
+    misses = backtest_cache.cache.misses
+    other = system.run_portfolio_backtest(["S1", "S2"], name="beta")
+    assert backtest_cache.cache.misses == misses + 1
+    assert other.get("result", {}).get("run_id") != run_id
+    assert "beta" not in system.backtest_results or \
+        system.backtest_results["beta"]["strategy_id"] == "beta"
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_backtest_cache_endpoints(client):
+    import backtest_cache
+    backtest_cache.cache.store(_key(), _save_run(), 1.0)
+
+    stats = client.get("/api/nautilus/backtest-cache").json()
+    assert stats["entries"] == 1 and stats["capacity"] == 3
+
+    r = client.post("/api/nautilus/backtest-cache/invalidate", params={"kind": "demo"})
+    assert r.json()["dropped"] == 1
+    assert client.get("/api/nautilus/backtest-cache").json()["entries"] == 0
+    assert client.post("/api/nautilus/backtest-cache/invalidate",
+                       params={"kind": "nope"}).status_code == 422
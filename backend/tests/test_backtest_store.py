@@ -0,0 +1,160 @@
+"""
+Backtest result store tests.
+
+Covers:
+- Full runs persisted as run.json + Parquet tables, atomically
+- Paged, column-selected reads that decode only the needed row groups
+- LRU-bounded summaries; latest run per strategy survives a restart
+- /api/nautilus/backtest(s) endpoints serve summaries and pages from disk
+
+Run:
+    cd backend
+    pytest tests/test_backtest_store.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(autouse=True)
+def store_dir(isolated_backtest_dir, monkeypatch):
+    import backtest_store
+    from state import nautilus_system
+    monkeypatch.setattr(backtest_store, "BACKTEST_ROW_GROUP", 100)
+    nautilus_system.backtest_results.clear()
+    yield isolated_backtest_dir
+    nautilus_system.backtest_results.clear()
+
+
+def _run(n_orders: int = 1000, strategy_id: str = "STR-1"):
+    orders = [
+        {"id": f"O-{i:05d}", "instrument_id": "EUR/USD.SIM", "side": "BUY", "type": "MARKET",
+         "quantity": 1.0, "status": "FILLED", "filled_qty": 1.0, "avg_px": 1.1 + i / 1e5,
+         "ts_init": i, "ts_last": i + 1, "not_in_schema": "dropped"}
+        for i in range(n_orders)
+    ]
+    positions = [
+        {"id": f"P-{i}", "instrument_id": "EUR/USD.SIM", "side": "LONG", "quantity": 1.0,
+         "avg_px_open": 1.1, "avg_px_close": None if i == 0 else 1.2, "realized_pnl": 10.0,
+         "is_open": i == 0, "is_closed": i != 0, "ts_opened": i, "ts_closed": None}
+        for i in range(3)
+    ]
+    summary = {"kind": "backtest", "strategy_id": strategy_id, "total_pnl": 20.0,
+               "total_orders": n_orders, "total_positions": 3, "open_positions": 1}
+    tables = {
+        "orders": orders,
+        "positions": positions,
+        "fills": [{"order_id": o["id"], "last_qty": 1.0, "last_px": o["avg_px"], "commission": 0.02}
+                  for o in orders],
+        "equity": [{"time": f"2021-01-01T00:0{i}:00", "equity": 100_000.0 + i} for i in range(5)],
+    }
+    return summary, tables
+
+
+def test_save_persists_full_untruncated_run(store_dir):
+    import backtest_store
+    summary = backtest_store.store.save(*_run(1000))
+    run_dir = store_dir / summary["run_id"]
+    assert sorted(p.name for p in run_dir.iterdir()) == [
+        "equity.parquet", "fills.parquet", "orders.parquet", "positions.parquet", "run.json",
+    ]
+    assert summary["rows"] == {"orders": 1000, "fills": 1000, "positions": 3, "equity": 5}
+    assert not any((store_dir / ".staging").iterdir())
+    assert "orders" not in summary and "equity_curve" not in summary
+
+
+def test_read_rows_pages_and_columns(store_dir):
+    import backtest_store
+    run_id = backtest_store.store.save(*_run(1000))["run_id"]
+
+    page = backtest_store.store.read_rows(run_id, "orders", offset=250, limit=100, columns=["id", "avg_px"])
+    assert page["total"] == 1000 and page["next_offset"] == 350
+    assert [r["id"] for r in page["rows"]][:2] == ["O-00250", "O-00251"]
+    assert set(page["rows"][0]) == {"id", "avg_px"}
+
+    # A page straddling two row groups
+    page = backtest_store.store.read_rows(run_id, "orders", offset=190, limit=20)
+    assert [r["id"] for r in page["rows"]] == [f"O-{i:05d}" for i in range(190, 210)]
+
+    last = backtest_store.store.read_rows(run_id, "orders", offset=990, limit=100)
+    assert len(last["rows"]) == 10 and last["next_offset"] is None
+
+    with pytest.raises(ValueError):
+        backtest_store.store.read_rows(run_id, "orders", columns=["nope"])
+    with pytest.raises(ValueError):
+        backtest_store.store.read_rows(run_id, "trades")
+    with pytest.raises(KeyError):
+        backtest_store.store.read_rows("BT-missing", "orders")
+    with pytest.raises(KeyError):
+        backtest_store.store.read_rows("../etc", "orders")
+
+    assert [p["id"] for p in backtest_store.store.open_positions(run_id)] == ["P-0"]
+
+
+def test_summaries_are_lru_bounded_and_reload_from_disk(store_dir):
+    import backtest_store
+    store = backtest_store.BacktestStore(capacity=3)
+    ids = [store.save(*_run(5, strategy_id=f"STR-{i}"))["run_id"] for i in range(5)]
+    assert list(store.summaries) == ids[2:]
+
+    # A fresh store (as after a restart) finds runs and each strategy's latest
+    fresh = backtest_store.BacktestStore(capacity=3)
+    assert fresh.get(ids[0])["strategy_id"] == "STR-0"
+    assert fresh.latest("STR-4")["run_id"] == ids[4]
+    assert [r["run_id"] for r in fresh.list_runs(limit=2)] == ids[:2:-1][:2]
+    assert [r["run_id"] for r in fresh.list_runs(strategy_id="STR-1")] == [ids[1]]
+    assert fresh.count() == 5
+
+    assert fresh.delete(ids[4])
+    assert fresh.latest("STR-4") is None and fresh.count() == 4
+
+
+def test_nautilus_system_falls_back_to_store(store_dir):
+    import backtest_store
+    from state import nautilus_system
+    run_id = backtest_store.store.save(*_run(10))["run_id"]
+    backtest_store.store.summaries.clear()
+
+    summary = nautilus_system.get_backtest_results("STR-1")
+    assert summary["run_id"] == run_id
+    assert nautilus_system.backtest_results["STR-1"] is summary
+    assert nautilus_system.get_backtest_results(run_id)["total_orders"] == 10
+    assert nautilus_system.get_backtest_results("STR-unknown") is None
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_backtest_endpoints(client):
+    import backtest_store
+    from state import nautilus_system
+    run_id = backtest_store.store.save(*_run(300))["run_id"]
+
+    r = client.get("/api/nautilus/backtest/STR-1")
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert results["run_id"] == run_id and "equity_curve" not in results
+
+    assert client.get("/api/nautilus/backtests").json()["count"] == 1
+    assert client.get(f"/api/nautilus/backtests/{run_id}").json()["total_pnl"] == 20.0
+
+    r = client.get(f"/api/nautilus/backtests/{run_id}/equity", params={"columns": "equity"})
+    assert [row["equity"] for row in r.json()["rows"]] == [100_000.0 + i for i in range(5)]
+    r = client.get(f"/api/nautilus/backtests/{run_id}/orders", params={"offset": 200, "limit": 150})
+    assert len(r.json()["rows"]) == 100 and r.json()["next_offset"] is None
+    assert client.get(f"/api/nautilus/backtests/{run_id}/orders", params={"columns": "x"}).status_code == 400
+    assert client.get("/api/nautilus/backtests/BT-nope/orders").status_code == 404
+
+    # Cached latest runs feed the open-position fallback and the system summary
+    nautilus_system.backtest_results["STR-1"] = backtest_store.store.get(run_id)
+    assert client.get("/api/performance/summary").json()["open_positions"] == 1
+    assert len(client.get("/api/trades", params={"limit": 7}).json()["trades"]) == 7
+
+    assert client.delete(f"/api/nautilus/backtests/{run_id}").status_code == 200
+    assert "STR-1" not in nautilus_system.backtest_results
+    assert client.get("/api/nautilus/backtest/STR-1").status_code == 404
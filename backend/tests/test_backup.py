@@ -0,0 +1,166 @@
+"""
+Online backup tests.
+
+Covers:
+- Paged copy reports progress and lets writers in between steps
+- Backup jobs: id, progress, compressed output, retention
+- Restore from plain and compressed backups (off the event loop); 409 during a backup
+- POST /api/database/backup awaits the job unless "background" is set
+
+Run:
+    cd backend
+    pytest tests/test_backup.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _make_db(path: Path, rows: int = 2000) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, payload TEXT)")
+    conn.executemany("INSERT INTO t (payload) VALUES (?)", [("x" * 500,) for _ in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+def _count(path: Path, table: str = "t") -> int:
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ── Paged copy ────────────────────────────────────────────────────────────────
+
+def test_paged_copy_reports_progress(tmp_path):
+    from backup import paged_copy
+    src, dst = tmp_path / "src.db", tmp_path / "dst.db"
+    _make_db(src)
+    seen = []
+    paged_copy(src, dst, pages=50, sleep_ms=0, on_progress=lambda done, total: seen.append((done, total)))
+
+    total = seen[-1][1]
+    assert len(seen) == -(-total // 50)  # one callback per step
+    assert seen[-1] == (total, total)
+    assert _count(dst) == 2000
+
+
+def test_writers_proceed_between_steps(tmp_path):
+    from backup import paged_copy
+    src, dst = tmp_path / "src.db", tmp_path / "dst.db"
+    _make_db(src)
+    copying = threading.Event()
+    result = {}
+
+    def on_progress(done, total):
+        copying.set()
+
+    def run():
+        result["restarts"] = paged_copy(src, dst, pages=20, sleep_ms=5, on_progress=on_progress)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    copying.wait(5)
+    writer = sqlite3.connect(str(src), timeout=0.5)
+    for _ in range(3):
+        writer.execute("INSERT INTO t (payload) VALUES ('during backup')")
+        writer.commit()  # would raise "database is locked" if the copy held the DB
+    writer.close()
+    worker.join(30)
+
+    assert result["restarts"] >= 1  # source changed → SQLite restarted the copy
+    assert _count(dst) == 2003
+
+
+def test_retention_keeps_newest(tmp_path):
+    from backup import enforce_retention, list_backup_files
+    for i in range(5):
+        f = tmp_path / f"nautilus_backup_2026010{i}_000000.db{'.gz' if i % 2 else ''}"
+        f.write_bytes(b"x")
+        os.utime(f, (1_000_000 + i, 1_000_000 + i))
+    (tmp_path / "unrelated.db").write_bytes(b"x")
+
+    removed = enforce_retention(tmp_path, keep=2)
+    assert sorted(removed) == [
+        "nautilus_backup_20260100_000000.db",
+        "nautilus_backup_20260101_000000.db.gz",
+        "nautilus_backup_20260102_000000.db",
+    ]
+    assert [f.name for f in list_backup_files(tmp_path)] == [
+        "nautilus_backup_20260104_000000.db",
+        "nautilus_backup_20260103_000000.db.gz",
+    ]
+    assert (tmp_path / "unrelated.db").exists()
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def _backup(client, **body):
+    import backup
+    r = client.post("/api/database/backup", json={"db_type": "sqlite", "background": True, **body})
+    assert r.status_code == 200, r.text
+    job_id = r.json()["job_id"]
+    backup.manager.wait(job_id)
+    return client.get(f"/api/database/backup/jobs/{job_id}").json()
+
+
+def test_backup_without_background_answers_with_the_file(client, tmp_path):
+    r = client.post("/api/database/backup", json={})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["success"] is True and body["job_id"].startswith("BKP-")
+    assert Path(body["backup_file"]).parent == tmp_path and Path(body["backup_file"]).exists()
+    assert body["size_mb"] > 0
+    # The job is finished, so a second request does not get 409
+    assert client.post("/api/database/backup", json={}).status_code == 200
+
+
+def test_backup_job_lands_next_to_current_db(client, tmp_path):
+    job = _backup(client)
+    assert job["status"] == "completed", job
+    assert job["progress"] == 1.0 and job["pages_total"] > 0
+    assert (tmp_path / job["file"]).exists()
+
+    listing = client.get("/api/database/backups").json()
+    assert [b["filename"] for b in listing["backups"]] == [job["file"]]
+    assert client.get("/api/database/backup/jobs").json()["jobs"][0]["id"] == job["id"]
+
+
+def test_compressed_backup_restores(client, tmp_path):
+    import database
+    client.post("/api/orders", json={"instrument": "EUR/USD.SIM", "side": "BUY", "quantity": 1})
+    job = _backup(client, compression="gzip")
+    assert job["file"].endswith(".db.gz")
+    assert (tmp_path / job["file"]).read_bytes()[:2] == b"\x1f\x8b"
+
+    client.post("/api/orders", json={"instrument": "EUR/USD.SIM", "side": "SELL", "quantity": 1})
+    assert _count(database.DB_PATH, "orders") == 2
+
+    r = client.post("/api/database/restore", json={"backup_file": job["file"]})
+    assert r.status_code == 200, r.text
+    assert r.json()["safety_snapshot"].startswith("nautilus_pre_restore_")
+    assert _count(database.DB_PATH, "orders") == 1
+
+
+def test_backup_rejects_bad_requests(client):
+    import backup
+    assert client.post("/api/database/backup", json={"compression": "lz4"}).status_code == 400
+    assert client.get("/api/database/backup/jobs/BKP-NOPE").status_code == 404
+    assert client.post("/api/database/restore", json={"backup_file": "../nautilus.db"}).status_code in (400, 404)
+
+    job = _backup(client)
+    backup.manager._active = backup.BackupJob(id="BKP-BUSY")
+    try:
+        r = client.post("/api/database/backup", json={})
+        assert r.status_code == 409
+        r = client.post("/api/database/restore", json={"backup_file": job["file"]})
+        assert r.status_code == 409 and "BKP-BUSY" in r.json()["detail"]
+    finally:
+        backup.manager._active = None
@@ -0,0 +1,97 @@
+"""
+Benchmark suite tests.
+
+Covers:
+- Baseline comparison: thresholds, direction, new / skipped cases
+- Re-recorded baselines keep per-case thresholds
+- Cheap cases run end to end against a temp DB and the fake exchange
+
+Run:
+    cd backend
+    pytest tests/test_benchmark_suite.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import suite  # noqa: E402
+
+
+def _result(value, higher=True):
+    return {"value": value, "unit": "x", "higher_is_better": higher}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {
+        "threshold_pct": 20.0,
+        "results": {
+            "fast": _result(100.0),
+            "slow": _result(100.0),
+            "latency": {**_result(10.0, higher=False), "threshold_pct": 50.0},
+            "better": _result(100.0),
+        },
+    }
+    results = {
+        "fast": _result(85.0),             # 15% worse: within 20%
+        "slow": _result(70.0),             # 30% worse
+        "latency": _result(14.0, False),   # 40% worse: within its own 50%
+        "better": _result(150.0),
+        "brand_new": _result(1.0),
+        "backtest_sma": {"skipped": "missing dependency: nautilus_trader"},
+    }
+    cmp = suite.compare(results, baseline)
+    assert {name: c["status"] for name, c in cmp.items()} == {
+        "fast": "ok", "slow": "regressed", "latency": "ok", "better": "improved",
+        "brand_new": "new", "backtest_sma": "skipped",
+    }
+    assert cmp["slow"]["change_pct"] == -30.0 and cmp["latency"]["threshold_pct"] == 50.0
+    # A stricter command-line threshold applies to cases without their own
+    assert suite.compare({"fast": _result(85.0)}, baseline, threshold_pct=10.0)["fast"]["status"] == "regressed"
+
+
+def test_make_baseline_keeps_thresholds_and_skipped_entries():
+    previous = {"threshold_pct": 30.0, "results": {
+        "a": {**_result(1.0), "threshold_pct": 60.0},
+        "backtest_sma": _result(5000.0),
+    }}
+    report = {"environment": {"python": "3"}, "config": {},
+              "results": {"a": {**_result(2.0), "p50_us": 1.0},
+                          "backtest_sma": {"skipped": "missing dependency: nautilus_trader"}}}
+    baseline = suite.make_baseline(report, previous)
+    assert baseline["threshold_pct"] == 30.0
+    assert baseline["results"]["a"] == {**_result(2.0), "threshold_pct": 60.0}
+    assert baseline["results"]["backtest_sma"] == _result(5000.0)
+
+
+def test_cheap_cases_run_against_temp_db(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "bench.db")
+    monkeypatch.setenv("CATALOG_PRELOAD", "off")
+    args = SimpleNamespace(repeat=1, orders=5, strategies=3, snapshots=5, sockets=4, broadcasts=2,
+                           alerts=6, alert_passes=1, requests=5, exchange_latency_ms=1.0)
+    exchange = suite.FakeExchange(args.exchange_latency_ms)
+
+    async def go():
+        await database.init_db()
+        from audit_log import audit_writer
+        await audit_writer.start()
+        exchange.install()
+        ctx = SimpleNamespace(args=args, exchange=exchange)
+        try:
+            return {name: await suite._run_case(name, ctx) for name in (
+                "order_create_live", "risk_check", "live_snapshot", "broadcast", "alert_eval")}
+        finally:
+            exchange.uninstall()
+            await audit_writer.stop()
+
+    results = asyncio.run(go())
+    assert exchange.orders == 10  # warm-up + one measurement, 5 orders each
+    for name, r in results.items():
+        assert r["value"] > 0 and r["higher_is_better"], name
+    assert results["order_create_live"]["p50_us"] >= 1000  # the fake exchange's 1 ms
+    assert asyncio.run(database.list_active_alerts()) == []
@@ -0,0 +1,131 @@
+"""
+Order export tests.
+
+Covers:
+- CSV / Parquet stream every order, newest first, chunk by chunk
+- XLSX (write-only) and PDF render on the export pool and stream from disk
+- The process pool renders in spawned (not forked) workers
+- PDF row cap, unknown formats
+
+Run:
+    cd backend
+    pytest tests/test_exports.py -v
+"""
+
+import asyncio
+import csv
+import io
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def thread_pool(monkeypatch):
+    import exports
+    monkeypatch.setattr(exports, "EXPORT_EXECUTOR", "thread")
+    exports.shutdown_export_pool()
+    yield
+    exports.shutdown_export_pool()
+
+
+def _seed_orders(path, n: int) -> None:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    conn = sqlite3.connect(str(path))
+    conn.executemany(
+        "INSERT INTO orders (id, instrument, side, quantity, price, status, timestamp) VALUES (?,?,?,?,?,?,?)",
+        [(f"ORD-{i:05d}", "BTCUSDT", "BUY", 1.0, 100.0 + i, "FILLED", (base + timedelta(seconds=i)).isoformat())
+         for i in range(n)],
+    )
+    conn.commit()
+    conn.close()
+
+
+async def _collect(gen):
+    return [chunk async for chunk in gen]
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "exp.db")
+    asyncio.run(database.init_db())
+    _seed_orders(database.DB_PATH, 25)
+    return database.DB_PATH
+
+
+def test_csv_streams_in_chunks(db_path):
+    import exports
+    chunks = asyncio.run(_collect(exports.stream_export("csv", db_path, chunk=7)))
+    assert len(chunks) == 4  # 25 rows / 7 per chunk
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == list(exports.HEADERS)
+    assert len(rows) == 26
+    assert rows[1][0] == "ORD-00024"  # newest first
+
+
+def test_parquet_row_groups(db_path):
+    import pyarrow.parquet as pq
+    import exports
+    data = b"".join(asyncio.run(_collect(exports.stream_export("parquet", db_path, chunk=10))))
+    pf = pq.ParquetFile(io.BytesIO(data))
+    assert pf.metadata.num_rows == 25
+    assert pf.metadata.num_row_groups == 3
+    table = pf.read()
+    assert table.column("id")[0].as_py() == "ORD-00024"
+    assert table.column("price")[0].as_py() == 124.0
+
+
+def test_pdf_row_cap(db_path, tmp_path):
+    import exports
+    out = tmp_path / "r.pdf"
+    assert exports.render_file("pdf", str(db_path), str(out), chunk=5, pdf_max_rows=10) == 10
+    assert out.read_bytes()[:4] == b"%PDF"
+
+
+def test_process_pool_renders_in_spawned_workers(db_path, monkeypatch):
+    import openpyxl
+    import exports
+    monkeypatch.setattr(exports, "EXPORT_EXECUTOR", "process")
+    monkeypatch.setattr(exports, "EXPORT_WORKERS", 1)
+    exports.shutdown_export_pool()
+
+    pool = exports._pool()
+    assert pool._mp_context.get_start_method() == "spawn"
+    out = asyncio.run(exports.render_export("xlsx", db_path))
+    try:
+        rows = list(openpyxl.load_workbook(out, read_only=True).active.iter_rows(values_only=True))
+    finally:
+        out.unlink()
+    assert rows[0] == exports.HEADERS and len(rows) == 26
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_export_endpoint_formats(client, tmp_path):
+    import openpyxl
+    import database
+    _seed_orders(database.DB_PATH, 30)
+
+    r = client.get("/api/performance/export", params={"format": "csv"})
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/csv")
+    assert len(r.text.strip().splitlines()) == 31
+
+    r = client.get("/api/performance/export")  # default: excel
+    assert r.status_code == 200
+    assert "performance.xlsx" in r.headers["content-disposition"]
+    ws = openpyxl.load_workbook(io.BytesIO(r.content), read_only=True)["Performance"]
+    assert sum(1 for _ in ws.iter_rows()) == 31
+
+    r = client.get("/api/performance/export", params={"format": "pdf"})
+    assert r.status_code == 200 and r.content[:4] == b"%PDF"
+    assert not list(Path(tempfile.gettempdir()).glob("nautilus_export_*"))
+
+    assert client.get("/api/performance/export", params={"format": "docx"}).status_code == 422
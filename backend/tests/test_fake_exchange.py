@@ -0,0 +1,225 @@
+"""
+Fake exchange and load test tests.
+
+Covers:
+- fake_exchange.py REST: tickers, order fill / rest / cancel, balances, errors
+- Latency, 500 and 429 injection; runtime config and stats
+- WS ticker streams (raw and combined)
+- market_data_service and live_trading pointed at the fake exchange
+- load_test.py: mix / stage parsing, per-endpoint report, one short stage,
+  Binance-venue orders with --live-orders
+
+Run:
+    cd backend
+    pytest tests/test_fake_exchange.py -v
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import fake_exchange  # noqa: E402
+import load_test  # noqa: E402
+
+
+@pytest.fixture
+def exchange():
+    config = fake_exchange.FakeExchangeConfig(latency_ms=0, jitter_ms=0, error_rate=0, throttle_rate=0,
+                                              ws_drop_rate=0, ws_interval_ms=10, seed=3)
+    with TestClient(fake_exchange.create_app(config)) as client:
+        yield client
+
+
+def test_tickers_follow_a_random_walk(exchange):
+    one = exchange.get("/api/v3/ticker/24hr", params={"symbol": "btcusdt"}).json()
+    assert one["symbol"] == "BTCUSDT"
+    assert float(one["bidPrice"]) < float(one["lastPrice"]) < float(one["askPrice"])
+    time.sleep(0.05)
+    later = exchange.get("/api/v3/ticker/24hr", params={"symbol": "BTCUSDT"}).json()
+    assert later["count"] > one["count"] and later["lastPrice"] != one["lastPrice"]
+
+    both = exchange.get("/api/v3/ticker/24hr", params={"symbols": '["BTCUSDT","ETHUSDT"]'}).json()
+    assert [t["symbol"] for t in both] == ["BTCUSDT", "ETHUSDT"]
+    assert len(exchange.get("/api/v3/ticker/price").json()) == len(fake_exchange.svc.SYMBOLS)
+    r = exchange.get("/api/v3/ticker/24hr", params={"symbol": "NOPE"})
+    assert r.status_code == 400 and r.json() == {"code": -1121, "msg": "Invalid symbol."}
+
+
+def test_orders_fill_rest_and_cancel(exchange):
+    last = float(exchange.get("/api/v3/ticker/price", params={"symbol": "ETHUSDT"}).json()["price"])
+    # Urlencoded body, as the Binance client sends it
+    filled = exchange.post("/api/v3/order", content="symbol=ETHUSDT&side=BUY&type=MARKET&quantity=2",
+                           headers={"Content-Type": "application/x-www-form-urlencoded"}).json()
+    assert filled["status"] == "FILLED" and float(filled["executedQty"]) == 2
+    resting = exchange.post("/api/v3/order", params={"symbol": "ETHUSDT", "side": "BUY", "type": "LIMIT",
+                                                     "quantity": 1, "price": last / 2}).json()
+    assert resting["status"] == "NEW"
+    assert [o["orderId"] for o in exchange.get("/api/v3/openOrders").json()] == [resting["orderId"]]
+
+    balances = {b["asset"]: float(b["free"]) for b in exchange.get("/api/v3/account").json()["balances"]}
+    assert balances["ETH"] == 2
+    assert balances["USDT"] == pytest.approx(100_000 - float(filled["cummulativeQuoteQty"]))
+
+    ids = {"symbol": "ETHUSDT", "orderId": resting["orderId"]}
+    assert exchange.delete("/api/v3/order", params=ids).json()["status"] == "CANCELED"
+    assert exchange.get("/api/v3/order", params=ids).json()["status"] == "CANCELED"
+    assert exchange.delete("/api/v3/order", params=ids).json()["code"] == -2011
+    assert exchange.get("/api/v3/order", params={"orderId": filled["orderId"]}).json()["status"] == "FILLED"
+    bad = exchange.post("/api/v3/order", params={"symbol": "ETHUSDT", "side": "BUY", "type": "LIMIT", "quantity": 1})
+    assert bad.status_code == 400 and bad.json()["code"] == -1102
+
+
+def test_fault_injection_and_stats(exchange):
+    assert exchange.post("/_fake/config", json={"error_rate": 1.0}).json()["error_rate"] == 1.0
+    r = exchange.get("/api/v3/ping")
+    assert r.status_code == 500 and r.json()["code"] == -1000
+
+    exchange.post("/_fake/config", json={"error_rate": 0.0, "throttle_rate": 1.0})
+    r = exchange.get("/api/v3/ping")
+    assert r.status_code == 429 and r.headers["Retry-After"] == "1"
+
+    exchange.post("/_fake/config", json={"throttle_rate": 0.0, "latency_ms": 60})
+    t0 = time.perf_counter()
+    assert exchange.get("/api/v3/ping").status_code == 200
+    assert time.perf_counter() - t0 >= 0.06
+    assert exchange.post("/_fake/config", json={"bogus": 1}).status_code == 400
+
+    stats = exchange.get("/_fake/stats").json()
+    assert stats["requests"]["GET /api/v3/ping"] == 3
+    assert stats["faults"] == {"errors": 1, "throttled": 1}
+    exchange.post("/_fake/reset")
+    assert exchange.get("/_fake/stats").json()["requests"] == {}
+
+
+def test_ws_streams(exchange):
+    with exchange.websocket_connect("/ws/btcusdt@ticker") as ws:
+        first, second = ws.receive_json(), ws.receive_json()
+    assert first["e"] == "24hrTicker" and first["s"] == "BTCUSDT" and second["n"] >= first["n"]
+
+    with exchange.websocket_connect("/stream?streams=btcusdt@ticker/ethusdt@ticker") as ws:
+        streams = {ws.receive_json()["stream"] for _ in range(2)}
+    assert streams == {"btcusdt@ticker", "ethusdt@ticker"}
+
+    exchange.post("/_fake/config", json={"ws_drop_rate": 1.0})
+    with exchange.websocket_connect("/ws/btcusdt@ticker") as ws:
+        with pytest.raises(Exception):
+            ws.receive_json()
+    assert exchange.get("/_fake/stats").json()["faults"]["ws_dropped"] == 1
+
+
+def test_backend_clients_use_the_fake_exchange(monkeypatch):
+    import live_trading
+    import market_data_service as svc
+    config = fake_exchange.FakeExchangeConfig(latency_ms=0, jitter_ms=0, error_rate=0, throttle_rate=0,
+                                              ws_drop_rate=0, ws_interval_ms=10, seed=3)
+    app = fake_exchange.create_app(config)
+    with fake_exchange.serve_in_thread(app) as url:
+        monkeypatch.setattr(svc, "BINANCE_BASE", url)
+        monkeypatch.setattr(live_trading, "BINANCE_WS_BASE", url.replace("http", "ws", 1))
+        monkeypatch.setattr(svc, "_symbol_cache", {})
+
+        async def go():
+            data = await svc.get_symbol_data("SOLUSDT")
+            received = []
+
+            async def on_message(event):
+                received.append(event)
+                if len(received) == 2:
+                    raise asyncio.CancelledError
+
+            with pytest.raises(asyncio.CancelledError):
+                await live_trading.LiveTradingManager()._connect_ws("SOLUSDT", on_message)
+            return data, received
+
+        data, received = asyncio.run(go())
+    assert data["symbol"] == "SOLUSDT"
+    assert app.state.exchange.stats["GET /api/v3/ticker/24hr"] == 1
+    assert [e["s"] for e in received] == ["SOLUSDT", "SOLUSDT"]
+
+
+# ── load_test.py ──────────────────────────────────────────────────────────────
+
+def test_parse_mix_and_stages():
+    import argparse
+    assert load_test._parse_mix("orders=3,alerts") == {"orders": 3.0, "alerts": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        load_test._parse_mix("orderz=1")
+    assert load_test._parse_stages("20x30,50.5x10") == [(20.0, 30.0), (50.5, 10.0)]
+    with pytest.raises(argparse.ArgumentTypeError):
+        load_test._parse_stages("20-30")
+
+
+def test_recorder_report():
+    rec = load_test.Recorder()
+    for ms in range(1, 101):
+        rec.add("GET /a", ms / 1000, 200)
+    rec.add("POST /b", 0.5, 500)
+    rec.add("POST /b", 0.2, "ConnectTimeout")
+    rec.add("WS /ws ping", 0.001, 200)
+    rec.counters.update(scheduled=110, dropped=9)
+    report = rec.report(elapsed=2.0)
+
+    a = report["endpoints"]["GET /a"]
+    assert (a["count"], a["errors"], a["rps"]) == (100, 0, 50.0)
+    assert (a["p50_ms"], a["p90_ms"], a["p99_ms"], a["max_ms"]) == (51.0, 91.0, 100.0, 100.0)
+    assert report["endpoints"]["POST /b"]["status"] == {"500": 1, "ConnectTimeout": 1}
+    # WS round trips are reported per endpoint but not counted as HTTP requests
+    assert (report["requests"], report["errors"], report["arrivals_rps"]) == (102, 2, 50.5)
+    assert report["dropped"] == 9
+
+
+def test_stage_drives_the_mix_in_process(client):
+    import httpx
+    from nautilus_fastapi import app
+    client.post("/api/risk/limits", json={"max_orders_per_day": 0})
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                     headers=dict(client.headers)) as http:
+            session = load_test.Session(http, random.Random(1))
+            session.rec.counters.clear()
+            return await load_test._run_stage(session, {"orders": 1, "alerts": 1, "order_reads": 1},
+                                              rps=100, duration=0.3, max_inflight=50, poisson=True)
+
+    stage = asyncio.run(go())
+    assert stage["target_rps"] == 100 and stage["scheduled"] > 0 and stage["errors"] == 0
+    assert "POST /api/orders" in stage["endpoints"] or "POST /api/alerts" in stage["endpoints"]
+    for e in stage["endpoints"].values():
+        assert e["p50_ms"] <= e["p99_ms"] <= e["max_ms"]
+
+
+def test_live_orders_target_the_binance_venue():
+    import httpx
+
+    class Recording:
+        def __init__(self):
+            self.calls = []
+
+        async def request(self, method, url, **kwargs):
+            self.calls.append((method, url, kwargs.get("json")))
+            return httpx.Response(200, json={"order": {"id": "ORD-1"}})
+
+    client = Recording()
+    session = load_test.Session(client, random.Random(2))
+    session.live = True
+
+    async def go():
+        for _ in range(4):
+            await load_test._orders(session, asyncio.get_running_loop().time())
+        for _ in range(20):
+            await load_test._order_reads(session, asyncio.get_running_loop().time())
+
+    asyncio.run(go())
+    posts = [body for method, url, body in client.calls if (method, url) == ("POST", "/api/orders")]
+    assert len(posts) == 4 and all(b["instrument"].endswith(".BINANCE") for b in posts)
+    assert ("DELETE", "/api/orders/ORD-1", None) in client.calls
+    assert ("POST", "/api/positions/sync", None) in client.calls
@@ -0,0 +1,126 @@
+"""
+Instrument registry tests.
+
+Covers:
+- Indexes by id / symbol / venue and prefix search
+- Cached listings invalidated on reload; unknown venues never cached
+- Catalog change detection against a real ParquetDataCatalog
+- GET /api/instruments and /api/instruments/{id}
+
+Run:
+    cd backend
+    pytest tests/test_instrument_registry.py -v
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _fx(*pairs):
+    from nautilus_trader.model.identifiers import Venue
+    from nautilus_trader.test_kit.providers import TestInstrumentProvider
+    out = []
+    for pair in pairs:
+        symbol, _, venue = pair.partition(".")
+        out.append(TestInstrumentProvider.default_fx_ccy(symbol, venue=Venue(venue or "SIM")))
+    return out
+
+
+def _registry(*pairs):
+    from instrument_registry import InstrumentRegistry
+    reg = InstrumentRegistry()
+    reg.load(_fx(*pairs))
+    return reg
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+def test_lookup_by_id_symbol_and_venue():
+    reg = _registry("EUR/USD.SIM", "GBP/USD.SIM", "EUR/USD.IDEALPRO")
+    assert len(reg) == 3
+    assert str(reg.get("GBP/USD.SIM").id) == "GBP/USD.SIM"
+    assert reg.get("XAU/USD.SIM") is None
+    assert {str(i.id) for i in reg.by_symbol("EUR/USD")} == {"EUR/USD.SIM", "EUR/USD.IDEALPRO"}
+    assert [str(i.id) for i in reg.by_venue("IDEALPRO")] == ["EUR/USD.IDEALPRO"]
+    assert reg.venues() == ["IDEALPRO", "SIM"]
+
+
+def test_resolve_symbol_only_when_unambiguous():
+    reg = _registry("EUR/USD.SIM", "GBP/USD.SIM", "EUR/USD.IDEALPRO")
+    assert str(reg.resolve("GBP/USD").id) == "GBP/USD.SIM"
+    assert reg.resolve("EUR/USD") is None  # listed on two venues
+
+
+def test_metadata_is_serialized():
+    reg = _registry("EUR/USD.SIM")
+    meta = reg.metadata("EUR/USD.SIM")
+    assert meta["symbol"] == "EUR/USD"
+    assert meta["venue"] == "SIM"
+    assert meta["quote_currency"] == "USD"
+    assert meta["price_precision"] == 5
+
+
+def test_prefix_search():
+    reg = _registry("EUR/USD.SIM", "EUR/GBP.SIM", "GBP/USD.SIM", "EUR/USD.IDEALPRO")
+    assert {m["id"] for m in reg.search("eur/")} == {"EUR/USD.SIM", "EUR/GBP.SIM", "EUR/USD.IDEALPRO"}
+    assert [m["id"] for m in reg.search("gbpusd")] == ["GBP/USD.SIM"]  # slash-less alias
+    assert [m["id"] for m in reg.search("EUR", venue="IDEALPRO")] == ["EUR/USD.IDEALPRO"]
+    assert len(reg.search("EUR", limit=1)) == 1
+    assert reg.search("XAU") == []
+
+
+def test_listing_cached_until_reload():
+    reg = _registry("EUR/USD.SIM")
+    first = reg.listing()
+    assert reg.listing() is first
+    assert reg.listing("SIM")["count"] == 1
+    # Unknown venues answer empty and are never cached
+    for i in range(50):
+        assert reg.listing(f"NOPE{i}") == {"instruments": [], "count": 0}
+    assert sorted(v for _, v in reg._listing_cache if v) == ["SIM"]
+    reg.load(_fx("EUR/USD.SIM", "GBP/USD.SIM"))
+    assert reg.listing() is not first
+    assert reg.listing()["count"] == 2
+
+
+def test_catalog_change_detection(tmp_path, monkeypatch):
+    import nautilus_core
+    from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+    catalog = ParquetDataCatalog(str(tmp_path))
+    catalog.write_data(_fx("EUR/USD.SIM"))
+
+    system = nautilus_core.NautilusTradingSystem(catalog_path=str(tmp_path))
+    assert system.initialize()["instruments_count"] == 1
+    assert system.registry.get("EUR/USD.SIM") is not None
+
+    monkeypatch.setattr(nautilus_core, "_CATALOG_CHECK_INTERVAL", 0)
+    assert system.catalog_changed() is False
+    catalog.write_data(_fx("GBP/USD.SIM"))
+    assert system.catalog_changed() is True
+    assert system.refresh_instruments() == 2
+    assert system.catalog_changed() is False
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_instruments_endpoint_uses_registry(client, monkeypatch):
+    from state import nautilus_system
+    monkeypatch.setattr(nautilus_system, "registry", _registry("EUR/USD.SIM", "GBP/USD.SIM"))
+
+    body = client.get("/api/instruments").json()
+    assert body["count"] == 2
+    body = client.get("/api/instruments", params={"q": "gbp"}).json()
+    assert [i["id"] for i in body["instruments"]] == ["GBP/USD.SIM"]
+
+    r = client.get("/api/instruments/EUR/USD.SIM")
+    assert r.status_code == 200
+    assert r.json()["symbol"] == "EUR/USD"
+    assert client.get("/api/instruments/XAU/USD.SIM").status_code == 404
+
+
+def test_instruments_endpoint_falls_back_to_demo_list(client):
+    body = client.get("/api/instruments", params={"venue": "BINANCE"}).json()
+    assert {i["id"] for i in body["instruments"]} == {"BTCUSDT.BINANCE", "ETHUSDT.BINANCE"}
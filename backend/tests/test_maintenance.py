@@ -0,0 +1,181 @@
+"""
+DB maintenance tests.
+
+Covers:
+- Chunked TTL deletes honour the cutoff and adapt the chunk size
+- Order retention removes cancelled / rejected orders only (strategy PnL kept)
+- Fresh DBs use incremental auto-vacuum; freed pages are returned
+- /clean, /optimize and /maintenance go through the scheduler
+
+Run:
+    cd backend
+    pytest tests/test_maintenance.py -v
+"""
+
+import asyncio
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "mnt.db")
+    asyncio.run(database.init_db())
+    return database.DB_PATH
+
+
+def _ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def _seed_alerts(path, old: int, recent: int) -> None:
+    conn = sqlite3.connect(str(path))
+    rows = [(f"A{i}", "BTC", "above", 1.0, "x" * 400, "triggered", _ago(60)) for i in range(old)]
+    rows += [(f"R{i}", "BTC", "above", 1.0, "", "triggered", _ago(1)) for i in range(recent)]
+    rows += [("ACTIVE", "BTC", "above", 1.0, "", "active", _ago(60))]
+    conn.executemany(
+        "INSERT INTO alerts (id, symbol, condition, price, message, status, created_at) VALUES (?,?,?,?,?,?,?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _count(path, sql: str) -> int:
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ── Tasks ─────────────────────────────────────────────────────────────────────
+
+def test_prune_deletes_in_chunks(db_path, monkeypatch):
+    import maintenance
+    monkeypatch.setattr(maintenance, "MAINTENANCE_DELETE_CHUNK", 100)
+    _seed_alerts(db_path, old=1050, recent=5)
+
+    policies = maintenance.clean_policies(30)[:1]
+    run = maintenance.scheduler.run_once(db_path, tasks=("ttl",), policies=policies)
+
+    stats = run.ttl["triggered_alerts"]
+    assert run.error is None
+    assert stats["deleted"] == 1050
+    assert stats["chunks"] >= 6  # never more than 100 rows per transaction
+    assert _count(db_path, "SELECT COUNT(*) FROM alerts") == 6  # recent + active kept
+
+
+def test_prune_halves_chunk_over_lock_budget(db_path, monkeypatch):
+    import maintenance
+    monkeypatch.setattr(maintenance, "MAINTENANCE_MAX_LOCK_MS", 0.0)
+    _seed_alerts(db_path, old=400, recent=0)
+
+    run = maintenance.MaintenanceRun(id="t", trigger="test", tasks=("ttl",))
+    conn = maintenance._connect(db_path)
+    try:
+        stats = maintenance.prune(conn, maintenance.clean_policies(30)[0], run, chunk=200)
+    finally:
+        conn.close()
+    assert stats["deleted"] == 400
+    assert stats["final_chunk"] == maintenance._MIN_CHUNK  # 200 → 100 → 50 (floor)
+    assert run.max_lock_ms > 0
+
+
+def test_incremental_vacuum_returns_free_pages(db_path):
+    import maintenance
+    assert _count(db_path, "PRAGMA auto_vacuum") == 2  # migration v3
+    _seed_alerts(db_path, old=3000, recent=0)
+    pages_before = _count(db_path, "PRAGMA page_count")
+
+    run = maintenance.scheduler.run_once(db_path, policies=maintenance.clean_policies(30))
+    assert run.error is None
+    assert run.vacuum["pages_freed"] > 0
+    assert _count(db_path, "PRAGMA freelist_count") == 0
+    assert _count(db_path, "PRAGMA page_count") < pages_before
+    assert run.checkpoint["mode"] == "PASSIVE" and not run.checkpoint["busy"]
+
+
+def test_closed_orders_policy_keeps_filled_orders_and_performance(db_path):
+    import database
+    import maintenance
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO orders (id, instrument, side, quantity, status, pnl, strategy_id, timestamp) "
+        "VALUES (?,?,?,?,?,?,?,?)",
+        [
+            ("F-1", "EUR/USD.SIM", "BUY", 1, "filled", 12.5, "S1", _ago(90)),
+            ("F-2", "EUR/USD.SIM", "SELL", 1, "FILLED", -2.5, "S1", _ago(90)),
+            ("C-1", "EUR/USD.SIM", "BUY", 1, "CANCELLED", 0, "S1", _ago(90)),
+            ("C-2", "EUR/USD.SIM", "BUY", 1, "cancelled", 0, None, _ago(90)),
+            ("R-1", "EUR/USD.SIM", "BUY", 1, "rejected", 0, "S1", _ago(90)),
+            ("C-NEW", "EUR/USD.SIM", "BUY", 1, "CANCELLED", 0, None, _ago(1)),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    before = asyncio.run(database.get_strategy_performance())
+    assert before["S1"]["trade_count"] == 2
+
+    run = maintenance.scheduler.run_once(db_path, tasks=("ttl",), policies=maintenance.clean_policies(30)[1:])
+    assert run.ttl["closed_orders"]["deleted"] == 3
+    ids = {r[0] for r in sqlite3.connect(str(db_path)).execute("SELECT id FROM orders")}
+    assert ids == {"F-1", "F-2", "C-NEW"}
+    assert asyncio.run(database.get_strategy_performance()) == before
+
+
+def test_scheduled_policies_keep_orders_by_default():
+    import maintenance
+    assert [p.name for p in maintenance.default_policies()] == ["triggered_alerts"]
+
+
+def test_one_run_at_a_time(db_path):
+    import maintenance
+    maintenance.scheduler._lock.acquire()
+    try:
+        with pytest.raises(RuntimeError):
+            maintenance.scheduler.run_once(db_path)
+    finally:
+        maintenance.scheduler._lock.release()
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_clean_removes_old_records(client):
+    import database
+    _seed_alerts(database.DB_PATH, old=20, recent=2)
+    conn = sqlite3.connect(str(database.DB_PATH))
+    conn.execute(
+        "INSERT INTO orders (id, instrument, side, quantity, status, timestamp) VALUES (?,?,?,?,?,?)",
+        ("OLD-1", "EUR/USD.SIM", "BUY", 1, "CANCELLED", _ago(45)),
+    )
+    conn.commit()
+    conn.close()
+
+    body = client.post("/api/database/clean", json={}).json()
+    assert body["success"] is True
+    assert body["alerts_removed"] == 20
+    assert body["orders_removed"] == 1
+    assert body["run"]["ttl"]["triggered_alerts"]["chunks"] >= 1
+
+
+def test_maintenance_endpoints(client):
+    r = client.post("/api/database/optimize", json={})
+    assert r.status_code == 200 and r.json()["run"]["optimize"]["ms"] >= 0
+
+    run = client.post("/api/database/maintenance/run").json()
+    assert run["trigger"] == "manual" and run["error"] is None
+
+    status = client.get("/api/database/maintenance").json()
+    assert status["runs"][0]["id"] == run["id"]
+    assert client.get("/api/system/metrics").json()["maintenance"]["last_run"]["id"] == run["id"]
+
+    r = client.post("/api/database/optimize?full=true", json={})
+    assert r.json()["success"] is True and r.json()["run"] is None
@@ -0,0 +1,117 @@
+"""
+Request pipeline tests.
+
+Covers:
+- CORS preflight on protected routes (CORS sits outside auth)
+- JWT short-circuit and request.state.user hand-off
+- Rate-limit rejection and X-RateLimit-Remaining header
+- Request counter only counts admitted requests
+- Streaming responses pass through chunk by chunk
+
+Run:
+    cd backend
+    pytest tests/test_middleware.py -v
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _bare_app():
+    """Minimal Starlette app wrapped only in RequestPipeline."""
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    from middleware import RequestPipeline
+
+    async def whoami(request: Request):
+        user = getattr(request.state, "user", None)
+        return JSONResponse({"sub": user["sub"] if user else None})
+
+    async def stream(request: Request):
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    counted = []
+    app = Starlette(routes=[Route("/api/whoami", whoami), Route("/health", stream)])
+    app.add_middleware(RequestPipeline, on_request=lambda: counted.append(1))
+    return app, counted
+
+
+def test_preflight_on_protected_route_gets_cors_headers(client):
+    r = client.options(
+        "/api/orders",
+        headers={
+            "Origin": "http://localhost:5173",
+            "Access-Control-Request-Method": "POST",
+            "Authorization": "",
+        },
+    )
+    assert r.status_code == 200
+    assert r.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+
+def test_rejections_still_carry_cors_headers(client):
+    r = client.get("/api/orders", headers={"Origin": "http://localhost:5173", "Authorization": ""})
+    assert r.status_code == 401
+    assert r.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+
+def test_jwt_user_reaches_request_state():
+    from fastapi.testclient import TestClient
+
+    import auth_jwt
+    app, counted = _bare_app()
+    token = auth_jwt.create_access_token({"sub": "alice", "role": "viewer"})
+    with TestClient(app) as c:
+        assert c.get("/api/whoami").json() == {"detail": "Missing authentication token"}
+        assert c.get("/api/whoami", headers={"Authorization": "Bearer nope"}).status_code == 401
+        r = c.get("/api/whoami", headers={"Authorization": f"Bearer {token}"})
+    assert r.json() == {"sub": "alice"}
+    assert int(r.headers["X-RateLimit-Remaining"]) >= 0
+    assert len(counted) == 1  # 401s never reach the counter
+
+
+def test_rate_limit_short_circuits(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import rate_limit
+    from rate_limit import MemoryBackend, RateLimiter, RatePolicy
+    monkeypatch.setattr(
+        "middleware.limiter", RateLimiter(MemoryBackend(), RatePolicy("global", 2))
+    )
+    app, counted = _bare_app()
+    with TestClient(app) as c:
+        codes = [c.get("/health").status_code for _ in range(3)]
+        r = c.get("/health")
+    assert codes == [200, 200, 429]
+    assert r.headers["Retry-After"] == "30"
+    assert r.headers["X-RateLimit-Remaining"] == "0"
+    assert r.json()["detail"].startswith("Global rate limit exceeded")
+    assert len(counted) == 2
+    assert rate_limit.limiter.rejected == {}  # module singleton untouched
+
+
+def test_streaming_response_passes_through():
+    from fastapi.testclient import TestClient
+
+    app, _ = _bare_app()
+    with TestClient(app) as c:
+        with c.stream("GET", "/health") as r:
+            body = list(r.iter_lines())
+            assert r.headers["X-RateLimit-Remaining"]
+    assert body == ["chunk0", "chunk1", "chunk2"]
+
+
+def test_request_counter_counts_admitted_requests(client):
+    before = client.get("/api/system/metrics").json()["requests_total"]
+    client.get("/api/health")
+    client.get("/api/orders", headers={"Authorization": ""})  # 401, not counted
+    after = client.get("/api/system/metrics").json()["requests_total"]
+    assert after - before == 2  # /api/health + this metrics call
@@ -0,0 +1,117 @@
+"""
+Schema migration tests.
+
+Covers:
+- PRAGMA user_version tracking on fresh and legacy databases
+- Chunked epoch-ns backfill and the raw-SQL fill-in trigger
+- Daily risk queries use (status, ts_ns) / (ts_ns) index range scans
+
+Run:
+    cd backend
+    pytest tests/test_migrations.py -v
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "mig.db")
+    return database.DB_PATH
+
+
+async def _query(path, sql, params=()):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute(sql, params) as cur:
+            return await cur.fetchall()
+
+
+def test_iso_to_ns():
+    from migrations import iso_to_ns
+    assert iso_to_ns("1970-01-01T00:00:01+00:00") == 1_000_000_000
+    assert iso_to_ns("2026-01-10T10:00:00.123456+02:00") == 1768032000_123456000
+    assert iso_to_ns("2026-01-10T08:00:00") == 1768032000_000000000  # naive = UTC
+    assert iso_to_ns("not a date") is None
+
+
+def test_fresh_db_is_at_latest_version(db_path):
+    import database
+    from migrations import SCHEMA_VERSION
+    asyncio.run(database.init_db())
+    assert asyncio.run(_query(db_path, "PRAGMA user_version")) == [(SCHEMA_VERSION,)]
+    asyncio.run(database.init_db())  # re-run is a no-op
+    assert asyncio.run(_query(db_path, "PRAGMA user_version")) == [(SCHEMA_VERSION,)]
+
+
+def test_legacy_db_is_migrated_and_backfilled(db_path, monkeypatch):
+    import database
+    import migrations
+    monkeypatch.setattr(migrations, "BACKFILL_CHUNK", 3)
+
+    async def legacy():
+        # Pre-migration shape: no pnl/strategy_id/exchange_order_id, user_version 0
+        async with aiosqlite.connect(db_path) as db:
+            await db.execute(
+                """CREATE TABLE orders (id TEXT PRIMARY KEY, instrument TEXT NOT NULL, side TEXT NOT NULL,
+                   type TEXT NOT NULL DEFAULT 'MARKET', quantity REAL NOT NULL DEFAULT 0, price REAL,
+                   status TEXT NOT NULL DEFAULT 'PENDING', filled_qty REAL NOT NULL DEFAULT 0,
+                   timestamp TEXT NOT NULL)"""
+            )
+            await db.executemany(
+                "INSERT INTO orders (id, instrument, side, timestamp) VALUES (?, 'X', 'BUY', ?)",
+                [(f"O{i}", f"2026-01-10T08:00:0{i}.000001+00:00") for i in range(8)],
+            )
+            await db.commit()
+
+    asyncio.run(legacy())
+    asyncio.run(database.init_db())
+
+    rows = asyncio.run(_query(db_path, "SELECT id, ts_ns, strategy_id FROM orders ORDER BY id"))
+    assert [r[1] for r in rows] == [1768032000_000001000 + i * 1_000_000_000 for i in range(8)]
+    assert all(r[2] is None for r in rows)
+
+
+def test_raw_sql_inserts_get_ns_via_trigger(db_path):
+    import database
+    asyncio.run(database.init_db())
+    asyncio.run(database._execute(
+        "INSERT INTO orders (id, instrument, side, quantity, status, timestamp) "
+        "VALUES ('RAW', 'X', 'BUY', 1, 'filled', '2026-01-10T08:00:00.250+00:00')",
+        commit=True,
+    ))
+    assert asyncio.run(_query(db_path, "SELECT ts_ns FROM orders WHERE id='RAW'")) == [(1768032000_250000000,)]
+
+
+def test_daily_risk_queries_are_index_range_scans(db_path):
+    import database
+    asyncio.run(database.init_db())
+    now = datetime.now(timezone.utc)
+    yesterday = (now - timedelta(days=1)).isoformat()
+    for i, (ts, pnl) in enumerate([(now.isoformat(), -40.0), (now.isoformat(), 10.0), (yesterday, -99.0)]):
+        asyncio.run(database._execute(
+            "INSERT INTO orders (id, instrument, side, quantity, status, pnl, timestamp) "
+            "VALUES (?, 'X', 'BUY', 1, 'filled', ?, ?)",
+            (f"O{i}", pnl, ts), commit=True,
+        ))
+
+    assert asyncio.run(database.get_daily_realized_loss()) == -40.0
+    assert asyncio.run(database.count_orders_today()) == 2
+
+    loss_plan = asyncio.run(_query(
+        db_path,
+        "EXPLAIN QUERY PLAN SELECT SUM(pnl) FROM orders WHERE status='filled' AND ts_ns >= 0 AND ts_ns < 1 AND pnl < 0",
+    ))
+    count_plan = asyncio.run(_query(
+        db_path, "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM orders WHERE ts_ns >= 0 AND ts_ns < 1",
+    ))
+    assert "idx_orders_status_ts_ns (status=? AND ts_ns>? AND ts_ns<?)" in loss_plan[0][3]
+    assert "COVERING INDEX idx_orders_ts_ns" in count_plan[0][3]
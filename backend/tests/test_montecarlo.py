@@ -0,0 +1,103 @@
+"""
+Monte Carlo robustness tests.
+
+Covers:
+- Trade returns relative to the equity before each trade
+- Bootstrap and shuffle distributions, risk of ruin, reproducible seeds
+- Observed run placed in the simulated distributions
+- GET /api/nautilus/backtests/{run_id}/monte-carlo
+
+Run:
+    cd backend
+    pytest tests/test_montecarlo.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyarrow")
+
+
+def test_trade_returns_compound_on_equity():
+    import montecarlo
+    r = montecarlo.trade_returns([100.0, -110.0, 50.0], 1000.0)
+    assert r.tolist() == pytest.approx([0.1, -0.1, 50.0 / 990.0])
+    with pytest.raises(ValueError):
+        montecarlo.trade_returns([-1000.0, 10.0], 1000.0)
+
+
+def test_shuffle_keeps_terminal_equity_and_brackets_drawdown():
+    import montecarlo
+    returns = [0.02, -0.05, 0.03, -0.01, 0.04, -0.03, 0.01, 0.02]
+    out = montecarlo.simulate(returns, 10_000.0, method="shuffle", simulations=2000, seed=1)
+    terminal = 10_000.0 * np.prod(1 + np.array(returns))
+    assert out["terminal_equity"]["std"] == pytest.approx(0.0, abs=1e-6)
+    assert out["terminal_equity"]["observed"] == pytest.approx(terminal, abs=1e-3)
+    assert out["probability_of_loss"] == 0.0
+
+    dd = out["max_drawdown"]
+    # Worst single loss is 5%; all eight losses in a row is ~8.8%
+    assert 5.0 - 1e-9 <= dd["percentiles"]["p1"] and dd["percentiles"]["p99"] <= 8.9
+    assert 0 < dd["observed_percentile"] <= 100
+    assert sum(dd["histogram"]["counts"]) == 2000
+
+
+def test_bootstrap_is_seeded_and_estimates_ruin():
+    import montecarlo
+    returns = [0.1, -0.1] * 10
+    a = montecarlo.simulate(returns, 1000.0, simulations=5000, horizon=50, ruin_threshold=0.3, seed=7)
+    b = montecarlo.simulate(returns, 1000.0, simulations=5000, horizon=50, ruin_threshold=0.3, seed=7)
+    assert a == b
+    assert a["horizon"] == 50 and "observed" not in a["max_drawdown"]
+    # A fair coin with ±10% steps: ruin at -30% is common, far from certain
+    assert 0.2 < a["risk_of_ruin"]["probability"] < 0.9
+    assert a["drawdown_exceedance"]["10%"] >= a["drawdown_exceedance"]["50%"]
+
+    with pytest.raises(ValueError):
+        montecarlo.simulate([0.1], 1000.0)
+    with pytest.raises(ValueError):
+        montecarlo.simulate(returns, 1000.0, method="shuffle", horizon=5)
+
+
+def test_row_blocks_cover_every_simulation(monkeypatch):
+    import montecarlo
+    returns = np.random.default_rng(0).normal(0.001, 0.01, 200)
+    full = montecarlo.simulate(returns, 1e5, simulations=1000, seed=3)
+    monkeypatch.setattr(montecarlo, "MONTE_CARLO_MAX_CELLS", 200 * 64)
+    blocked = montecarlo.simulate(returns, 1e5, simulations=1000, seed=3)
+    assert blocked["max_drawdown"]["observed"] == full["max_drawdown"]["observed"]
+    assert sum(blocked["sharpe_ratio"]["histogram"]["counts"]) == 1000
+    assert blocked["max_drawdown"]["percentiles"]["p50"] == pytest.approx(
+        full["max_drawdown"]["percentiles"]["p50"], rel=0.15)
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_monte_carlo_endpoint(client):
+    import backtest_store
+    positions = [
+        {"id": f"P-{i}", "realized_pnl": pnl, "is_closed": True, "ts_closed": i}
+        for i, pnl in enumerate([500.0, -300.0, 800.0, -200.0, 400.0, -600.0])
+    ] + [{"id": "P-open", "realized_pnl": 9999.0, "is_open": True, "is_closed": False}]
+    run_id = backtest_store.store.save(
+        {"kind": "backtest", "strategy_id": "STR-1", "starting_balance": 100_000.0},
+        {"positions": positions},
+    )["run_id"]
+
+    r = client.get(f"/api/nautilus/backtests/{run_id}/monte-carlo",
+                   params={"simulations": 1000, "seed": 5})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["trades"] == 6 and body["simulations"] == 1000
+    assert body["terminal_equity"]["observed"] == pytest.approx(100_600.0)
+    assert set(body["max_drawdown"]["percentiles"]) == {"p1", "p5", "p25", "p50", "p75", "p95", "p99"}
+
+    url = f"/api/nautilus/backtests/{run_id}/monte-carlo"
+    assert client.get(url, params={"method": "nope"}).status_code == 422
+    assert client.get(url, params={"method": "shuffle", "horizon": 3}).status_code == 400
+    assert client.get("/api/nautilus/backtests/BT-missing/monte-carlo").status_code == 404
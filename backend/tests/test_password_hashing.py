@@ -0,0 +1,104 @@
+"""
+Non-blocking bcrypt tests.
+
+Covers:
+- Hash/verify on the bcrypt pool keep the event loop responsive
+- Rehash-on-login upgrades low-cost hashes
+- Login concurrency cap (queue, then 503)
+
+Run:
+    cd backend
+    pytest tests/test_password_hashing.py -v
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def test_async_hash_round_trip():
+    import auth_jwt
+
+    async def _run():
+        hashed = await auth_jwt.hash_password_async("s3cret-pass")
+        assert await auth_jwt.verify_password_async("s3cret-pass", hashed)
+        assert not await auth_jwt.verify_password_async("wrong", hashed)
+        assert not await auth_jwt.verify_password_async("s3cret-pass", "not-a-hash")
+
+    asyncio.run(_run())
+
+
+def test_verify_does_not_stall_event_loop():
+    import auth_jwt
+    import bcrypt
+    hashed = bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=12)).decode()
+
+    async def _run():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        t0 = time.perf_counter()
+        assert await auth_jwt.verify_password_async("pw", hashed)
+        elapsed = time.perf_counter() - t0
+        tick.cancel()
+        return elapsed, max(gaps)
+
+    elapsed, worst_gap = asyncio.run(_run())
+    # Inline bcrypt would freeze the loop for the whole verify
+    assert worst_gap < elapsed / 2
+
+
+def test_needs_rehash(monkeypatch):
+    import auth_jwt
+    import bcrypt
+    monkeypatch.setattr(auth_jwt, "BCRYPT_ROUNDS", 6)
+    assert auth_jwt.needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=4)).decode())
+    assert not auth_jwt.needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=6)).decode())
+    assert not auth_jwt.needs_rehash("garbage")
+
+
+def test_login_rehashes_low_cost_hash(client, monkeypatch):
+    import auth_jwt
+    import database
+    assert client.post("/api/users", json={"username": "rehash_me", "password": "pw-123456"}).status_code == 201
+    before = asyncio.run(database.get_user("rehash_me"))["hashed_password"]
+
+    monkeypatch.setattr(auth_jwt, "BCRYPT_ROUNDS", int(before.split("$")[2]) + 1)
+    r = client.post("/api/auth/login", json={"username": "rehash_me", "password": "pw-123456"})
+    assert r.status_code == 200
+    after = asyncio.run(database.get_user("rehash_me"))["hashed_password"]
+    assert after != before
+    assert not auth_jwt.needs_rehash(after)
+    assert auth_jwt.verify_password("pw-123456", after)
+
+
+def test_login_concurrency_is_capped(monkeypatch):
+    import auth_jwt
+    from fastapi import HTTPException
+    monkeypatch.setattr(auth_jwt, "LOGIN_CONCURRENCY", 1)
+    monkeypatch.setattr(auth_jwt, "LOGIN_QUEUE_TIMEOUT", 0.05)
+
+    async def _run():
+        async with auth_jwt.login_slot():
+            with pytest.raises(HTTPException) as exc:
+                async with auth_jwt.login_slot():
+                    pass
+            assert exc.value.status_code == 503
+        # Slot released: next login proceeds
+        async with auth_jwt.login_slot():
+            pass
+
+    asyncio.run(_run())
@@ -0,0 +1,110 @@
+"""
+Bulk position persistence tests.
+
+Covers:
+- save_positions change set: inserted / updated / unchanged by content hash
+- Synced rows keep their stored opened_at
+- /api/positions/sync broadcasts only real changes to /ws
+
+Run:
+    cd backend
+    pytest tests/test_position_sync.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import aiosqlite
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import database
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "pos.db")
+    asyncio.run(database.init_db())
+    return database.DB_PATH
+
+
+def _balances(n: int, qty: float = 1.0):
+    return [{"id": f"LIVE-BINANCE-A{i}", "instrument": f"A{i}USDT", "side": "LONG", "quantity": qty}
+            for i in range(n)]
+
+
+async def _rows(path):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute("SELECT id, quantity, opened_at, content_hash FROM positions ORDER BY id") as cur:
+            return await cur.fetchall()
+
+
+def test_change_set(db_path):
+    import database
+    first = asyncio.run(database.save_positions(_balances(3)))
+    assert [p["id"] for p in first["inserted"]] == ["LIVE-BINANCE-A0", "LIVE-BINANCE-A1", "LIVE-BINANCE-A2"]
+    assert first["updated"] == [] and first["unchanged"] == 0
+    opened = {r[0]: r[2] for r in asyncio.run(_rows(db_path))}
+
+    again = asyncio.run(database.save_positions(_balances(3)))
+    assert again == {"inserted": [], "updated": [], "unchanged": 3}
+
+    batch = _balances(3)
+    batch[1]["quantity"] = 2.5
+    batch.append({"id": "LIVE-BINANCE-NEW", "instrument": "NEWUSDT", "quantity": 1})
+    changes = asyncio.run(database.save_positions(batch))
+    assert [p["id"] for p in changes["updated"]] == ["LIVE-BINANCE-A1"]
+    assert changes["updated"][0]["quantity"] == 2.5
+    assert [p["id"] for p in changes["inserted"]] == ["LIVE-BINANCE-NEW"]
+    assert changes["unchanged"] == 2
+
+    rows = {r[0]: r for r in asyncio.run(_rows(db_path))}
+    assert rows["LIVE-BINANCE-A1"][1] == 2.5
+    assert rows["LIVE-BINANCE-A1"][2] == opened["LIVE-BINANCE-A1"]  # opened_at kept
+
+
+def test_rows_without_hash_are_rewritten_once(db_path):
+    import database
+    asyncio.run(database.save_positions(_balances(2)))
+
+    async def clear():
+        async with aiosqlite.connect(db_path) as db:
+            await db.execute("UPDATE positions SET content_hash = NULL")  # pre-v4 rows
+            await db.commit()
+    asyncio.run(clear())
+
+    assert len(asyncio.run(database.save_positions(_balances(2)))["updated"]) == 2
+    assert asyncio.run(database.save_positions(_balances(2)))["unchanged"] == 2
+
+
+def test_large_sync_writes_only_changes(db_path):
+    import database
+    asyncio.run(database.save_positions(_balances(10_000)))
+    batch = _balances(10_000)
+    for p in batch[:10]:
+        p["quantity"] = 9.0
+
+    changes = asyncio.run(database.save_positions(batch))
+    assert len(changes["updated"]) == 10
+    assert changes["unchanged"] == 9_990
+
+
+def test_sync_broadcasts_only_changes(client):
+    from state import manager
+    sent = []
+
+    async def capture(message):
+        sent.append(message)
+
+    with patch("live_trading.LiveTradingManager.sync_positions", new_callable=AsyncMock) as sync, \
+            patch.object(manager, "broadcast", side_effect=capture):
+        sync.return_value = _balances(2)
+        assert client.post("/api/positions/sync").json()["changed_count"] == 2
+        body = client.post("/api/positions/sync").json()
+        assert body["changed_count"] == 0 and body["unchanged_count"] == 2
+
+    assert len(sent) == 1
+    assert sent[0]["type"] == "positions_changed"
+    assert [p["id"] for p in sent[0]["inserted"]] == ["LIVE-BINANCE-A0", "LIVE-BINANCE-A1"]
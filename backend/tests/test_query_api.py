@@ -0,0 +1,137 @@
+"""
+Keyset-paginated query API tests.
+
+Covers cursor pagination and filters on:
+- GET /api/orders
+- GET /api/positions (cursor in X-Next-Cursor header)
+- GET /api/alerts
+- GET /api/admin/audit-logs
+
+Run:
+    cd backend
+    pytest tests/test_query_api.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _insert_orders(n: int, **overrides) -> None:
+    import database
+
+    async def _run():
+        for i in range(n):
+            row = {
+                "id": f"ORD-PG{i:04d}",
+                "instrument": "EUR/USD.SIM",
+                "status": "PENDING",
+                "strategy_id": None,
+                "timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00",
+                **overrides,
+            }
+            await database._execute(
+                "INSERT INTO orders (id, instrument, side, type, quantity, status, strategy_id, timestamp) "
+                "VALUES (?, ?, 'BUY', 'MARKET', 1, ?, ?, ?)",
+                (row["id"], row["instrument"], row["status"], row["strategy_id"], row["timestamp"]),
+                commit=True,
+            )
+
+    asyncio.run(_run())
+
+
+# ── Cursor helpers ────────────────────────────────────────────────────────────
+
+def test_cursor_round_trip():
+    import database
+    cursor = database.encode_cursor("2024-01-01T00:00:00+00:00", "ORD-1")
+    assert database.decode_cursor(cursor) == ("2024-01-01T00:00:00+00:00", "ORD-1")
+
+
+def test_decode_cursor_rejects_garbage():
+    import database
+    with pytest.raises(ValueError):
+        database.decode_cursor("%%%not-a-cursor")
+
+
+# ── Orders ────────────────────────────────────────────────────────────────────
+
+def test_orders_pages_cover_all_rows_once(client):
+    _insert_orders(25)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/orders", params=params).json()
+        seen.extend(o["id"] for o in body["orders"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert seen[0] == "ORD-PG0024"  # newest first
+
+
+def test_orders_filter_by_status_and_strategy(client):
+    _insert_orders(3, status="filled", strategy_id="STR-A")
+    body = client.get("/api/orders", params={"status": "filled", "strategy_id": "STR-A"}).json()
+    assert body["count"] == 3
+    body = client.get("/api/orders", params={"strategy_id": "STR-B"}).json()
+    assert body["count"] == 0
+
+
+def test_orders_time_range(client):
+    _insert_orders(10)
+    body = client.get(
+        "/api/orders",
+        params={"since": "2024-01-01T00:00:03+00:00", "until": "2024-01-01T00:00:06+00:00"},
+    ).json()
+    assert [o["id"] for o in body["orders"]] == ["ORD-PG0005", "ORD-PG0004", "ORD-PG0003"]
+
+
+def test_orders_invalid_cursor_returns_400(client):
+    r = client.get("/api/orders", params={"cursor": "%%%"})
+    assert r.status_code == 400
+
+
+# ── Positions / alerts / audit ────────────────────────────────────────────────
+
+def test_positions_next_cursor_header(client):
+    import database
+    asyncio.run(database.save_positions(
+        [{"id": f"POS-PG{i}", "instrument": "BTCUSDT", "is_open": True,
+          "opened_at": f"2024-01-01T00:00:0{i}+00:00"} for i in range(5)]
+    ))
+    r = client.get("/api/positions", params={"limit": 2})
+    assert len(r.json()) == 2
+    cursor = r.headers["X-Next-Cursor"]
+    r = client.get("/api/positions", params={"limit": 2, "cursor": cursor})
+    assert [p["id"] for p in r.json()] == ["POS-PG2", "POS-PG1"]
+
+
+def test_alerts_paginated(client):
+    for price in (100, 200, 300):
+        client.post("/api/alerts", json={"symbol": "BTCUSDT", "condition": "above", "price": price})
+    body = client.get("/api/alerts", params={"limit": 2}).json()
+    assert body["count"] == 2
+    assert body["next_cursor"]
+    body = client.get("/api/alerts", params={"limit": 2, "cursor": body["next_cursor"]}).json()
+    assert body["count"] == 1
+    assert body["next_cursor"] is None
+
+
+def test_audit_logs_cursor(client):
+    for _ in range(3):
+        client.post("/api/orders", json={"instrument": "EUR/USD.SIM", "side": "BUY", "quantity": 1})
+    body = client.get("/api/admin/audit-logs", params={"action": "order_created", "limit": 2}).json()
+    assert body["count"] == 2
+    body = client.get(
+        "/api/admin/audit-logs",
+        params={"action": "order_created", "limit": 2, "cursor": body["next_cursor"]},
+    ).json()
+    assert body["count"] == 1
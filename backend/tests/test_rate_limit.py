@@ -0,0 +1,152 @@
+"""
+Rate limiter tests.
+
+Covers:
+- GCRA token-bucket semantics (burst, refill, retry-after)
+- LRU-bounded memory under IP spray
+- Shared SQLite backend across "workers"
+- Per-route and per-user policies, RATE_LIMIT_ROUTES parsing
+- A rejected request is refunded to the policies charged before it
+
+Run:
+    cd backend
+    pytest tests/test_rate_limit.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _limiter(backend=None, **kw):
+    from rate_limit import MemoryBackend, RateLimiter, RatePolicy
+    return RateLimiter(
+        backend=backend or MemoryBackend(),
+        global_policy=kw.pop("global_policy", RatePolicy("global", 1000)),
+        **kw,
+    )
+
+
+# ── Token bucket ──────────────────────────────────────────────────────────────
+
+def test_burst_then_refill():
+    from rate_limit import MemoryBackend
+    b = MemoryBackend()
+    # 3 requests / 60 s → one token every 20 s
+    assert [b.hit("k", 20.0, 60.0, 0.0)[0] for _ in range(3)] == [True, True, True]
+    allowed, tat = b.hit("k", 20.0, 60.0, 0.0)
+    assert not allowed
+    assert tat + 20.0 - 60.0 == 20.0  # retry after 20 s
+    assert b.hit("k", 20.0, 60.0, 19.9)[0] is False
+    assert b.hit("k", 20.0, 60.0, 20.0)[0] is True
+
+
+def test_decision_remaining_and_retry_after():
+    from rate_limit import RatePolicy
+    lim = _limiter(global_policy=RatePolicy("global", 3))
+    assert [lim.check("GET", "/api/x", "1.1.1.1").remaining for _ in range(3)] == [2, 1, 0]
+    d = lim.check("GET", "/api/x", "1.1.1.1")
+    assert not d.allowed and d.policy == "global"
+    assert 19.0 < d.retry_after <= 20.0
+    assert lim.check("GET", "/api/x", "2.2.2.2").allowed  # other IP unaffected
+    assert lim.rejected == {"global": 1}
+
+
+def test_memory_stays_bounded_under_ip_spray():
+    from rate_limit import MemoryBackend
+    lim = _limiter(MemoryBackend(max_keys=100))
+    for i in range(10_000):
+        lim.check("GET", "/api/health", f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}")
+    assert lim.backend.size() == 100
+    assert lim.backend.evictions == 9_900
+
+
+# ── Policies ──────────────────────────────────────────────────────────────────
+
+def test_route_policy_by_method_and_prefix():
+    from rate_limit import RatePolicy
+    lim = _limiter(route_policies=[
+        RatePolicy("orders", 1, key="user_or_ip", path_prefix="/api/orders", methods=("POST",)),
+    ])
+    assert lim.check("POST", "/api/orders", "ip", "alice").allowed
+    d = lim.check("POST", "/api/orders", "ip", "alice")
+    assert not d.allowed and d.policy == "orders"
+    assert lim.check("GET", "/api/orders", "ip", "alice").allowed
+    assert lim.check("POST", "/api/orders", "ip", "bob").allowed
+
+
+def test_user_policy_is_keyed_by_user():
+    from rate_limit import RatePolicy
+    lim = _limiter(user_policy=RatePolicy("user", 2, key="user"))
+    assert lim.check("GET", "/api/a", "same-ip", "alice").allowed
+    assert lim.check("GET", "/api/a", "same-ip", "alice").allowed
+    assert not lim.check("GET", "/api/a", "same-ip", "alice").allowed
+    assert lim.check("GET", "/api/a", "same-ip", "bob").allowed
+    assert lim.check("GET", "/api/a", "same-ip", None).allowed  # anonymous: IP policies only
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_rejected_request_costs_no_tokens(backend, tmp_path):
+    from rate_limit import MemoryBackend, RatePolicy, SQLiteBackend
+    store = MemoryBackend() if backend == "memory" else SQLiteBackend(str(tmp_path / "rl.db"))
+    lim = _limiter(store, global_policy=RatePolicy("global", 2),
+                   route_policies=[RatePolicy("api", 4, key="ip", path_prefix="/api")])
+    now = [1000.0]
+    lim._clock = lambda: now[0]
+
+    assert [lim.check("GET", "/api/x", "ip").allowed for _ in range(2)] == [True, True]
+    held_back = [lim.check("GET", "/api/x", "ip") for _ in range(10)]
+    assert all(not d.allowed and d.policy == "global" for d in held_back)
+
+    # Once the global window recovers, the route budget is intact
+    now[0] += 60.0
+    assert [lim.check("GET", "/api/x", "ip").allowed for _ in range(2)] == [True, True]
+    assert lim.rejected == {"global": 10}
+
+
+def test_parse_route_policies():
+    from rate_limit import parse_route_policies
+    policies = parse_route_policies("POST /api/orders=120/min:user, /api/backtest=10/hour")
+    assert [(p.path_prefix, p.methods, p.limit, p.period, p.key) for p in policies] == [
+        ("/api/orders", ("POST",), 120, 60.0, "user"),
+        ("/api/backtest", (), 10, 3600.0, "user_or_ip"),
+    ]
+    with pytest.raises(ValueError):
+        parse_route_policies("/api/x=lots/min")
+
+
+# ── Shared backend ────────────────────────────────────────────────────────────
+
+def test_sqlite_backend_shared_between_workers(tmp_path):
+    from rate_limit import RatePolicy, SQLiteBackend
+    path = str(tmp_path / "rl.db")
+    worker_a = _limiter(SQLiteBackend(path), global_policy=RatePolicy("global", 4))
+    worker_b = _limiter(SQLiteBackend(path), global_policy=RatePolicy("global", 4))
+
+    results = [w.check("GET", "/api/x", "9.9.9.9").allowed for w in (worker_a, worker_b) * 3]
+    assert results == [True, True, True, True, False, False]
+    assert worker_a.backend.size() == 1
+
+
+def test_sqlite_backend_prunes_refilled_keys(tmp_path):
+    from rate_limit import SQLiteBackend
+    b = SQLiteBackend(str(tmp_path / "rl.db"), max_keys=10)
+    for i in range(50):
+        b.hit(f"k{i}", 1.0, 60.0, 1000.0)
+    b._prune(now=1000.5)
+    assert b.size() == 10
+    b._prune(now=2000.0)  # all TATs passed → buckets full → rows dropped
+    assert b.size() == 0
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_metrics_report_rate_limit_state(client):
+    for i in range(6):
+        client.post("/api/auth/login", json={"username": "admin", "password": f"bad{i}"})
+    stats = client.get("/api/system/metrics").json()["rate_limit"]
+    assert stats["backend"] == "memory"
+    assert stats["rejected"].get("login", 0) >= 1
@@ -0,0 +1,161 @@
+"""
+Backtest run profiling tests.
+
+Covers:
+- Phase wall / CPU timings, counters and events / sec
+- Stack sampler output (collapsed stacks) and opt-in cProfile (pstats)
+- Profiles kept for slow runs only unless requested
+- The sampler keeps no reference to the profiled caller's frame
+- backtest_store.attach / artifact_path
+- GET /api/nautilus/backtests/{run_id}/profile
+
+Run:
+    cd backend
+    pytest tests/test_run_profile.py -v
+"""
+
+import marshal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < deadline:
+        x += sum(range(200))
+    return x
+
+
+def test_phases_counts_and_rates(monkeypatch):
+    import run_profile
+    monkeypatch.setattr(run_profile, "BACKTEST_SLOW_SECONDS", 3600.0)
+
+    prof = run_profile.RunProfiler(sample=False)
+    prof.phase("load_data")
+    prof.count("quote_ticks", 600)
+    prof.count("quote_ticks", 400)
+    prof.phase("run")
+    _busy(0.05)
+    prof.phase("extract")
+    report = prof.finish(events=1000)
+
+    timings = report["timings"]
+    assert list(timings["phases"]) == ["load_data", "run", "extract"]
+    run = timings["phases"]["run"]
+    assert run["wall_ms"] >= 50 and run["cpu_ms"] > 0
+    assert timings["data"] == {"quote_ticks": 1000}
+    assert timings["events"] == 1000
+    assert timings["events_per_sec"] == pytest.approx(1000 / (run["wall_ms"] / 1000), rel=0.01)
+    assert timings["total_wall_ms"] >= sum(p["wall_ms"] for p in timings["phases"].values()) - 0.1
+    # Nothing slow and nothing requested: no profile kept
+    assert report["profile"] is None and report["files"] == {}
+    assert prof.finish() is report
+
+
+def test_requested_profile_keeps_pstats_and_collapsed(monkeypatch):
+    import run_profile
+    monkeypatch.setattr(run_profile, "BACKTEST_SLOW_SECONDS", 3600.0)
+    monkeypatch.setattr(run_profile, "BACKTEST_PROFILE_INTERVAL_MS", 1.0)
+
+    prof = run_profile.RunProfiler(profile=True, sample=True)
+    prof.phase("run")
+    _busy(0.1)
+    report = prof.finish(events=10)
+
+    files = report["files"]
+    assert set(files) == {run_profile.PSTATS_FILE, run_profile.COLLAPSED_FILE}
+    assert any("_busy" in fn for (_, _, fn) in marshal.loads(files[run_profile.PSTATS_FILE]))
+    lines = files[run_profile.COLLAPSED_FILE].decode().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    # Stacks start at the profiler's caller and end in the hot function
+    assert stack.startswith("test_run_profile:test_requested_profile") and "_busy" in stack
+    assert int(count) > 0
+    profile = report["profile"]
+    assert profile["reason"] == "requested" and profile["samples"] > 0
+    assert sorted(profile["formats"]) == ["collapsed", "pstats"]
+    assert profile["top_functions"][0]["calls"] >= 1
+
+
+def test_slow_run_keeps_sampled_stacks(monkeypatch):
+    import run_profile
+    monkeypatch.setattr(run_profile, "BACKTEST_SLOW_SECONDS", 0.0)
+    monkeypatch.setattr(run_profile, "BACKTEST_PROFILE_INTERVAL_MS", 1.0)
+
+    prof = run_profile.RunProfiler()
+    prof.phase("run")
+    _busy(0.05)
+    report = prof.finish()
+    assert list(report["files"]) == [run_profile.COLLAPSED_FILE]
+    assert report["profile"]["reason"] == "slow"
+
+
+def test_sampler_does_not_keep_the_callers_locals(monkeypatch):
+    import gc
+    import weakref
+    import run_profile
+    monkeypatch.setattr(run_profile, "BACKTEST_SLOW_SECONDS", 0.0)
+    monkeypatch.setattr(run_profile, "BACKTEST_PROFILE_INTERVAL_MS", 1.0)
+
+    class Ticks:
+        pass
+
+    def run():
+        ticks = Ticks()
+        prof = run_profile.RunProfiler()
+        prof.phase("run")
+        _busy(0.02)
+        report = prof.finish()
+        assert report["files"][run_profile.COLLAPSED_FILE].splitlines()[0].startswith(b"test_run_profile:run;")
+        return weakref.ref(ticks)
+
+    # Freed by reference counting alone, as soon as the call returns
+    gc.disable()
+    try:
+        assert run()() is None
+    finally:
+        gc.enable()
+
+
+def test_attach_and_artifact_path():
+    pytest.importorskip("pyarrow")
+    import backtest_store
+    store = backtest_store.store
+    run_id = store.save({"kind": "demo", "strategy_id": "demo"}, {"equity": []})["run_id"]
+
+    with pytest.raises(KeyError):
+        store.artifact_path(run_id, "profile.pstats")
+    record = store.attach(run_id, {"timings": {"total_wall_ms": 12.5}},
+                          {"profile.pstats": b"stats"})
+    assert record["timings"] == {"total_wall_ms": 12.5}
+    assert store.artifact_path(run_id, "profile.pstats").read_bytes() == b"stats"
+
+    store.summaries.clear()  # re-read from run.json
+    assert store.get(run_id)["timings"] == {"total_wall_ms": 12.5}
+    with pytest.raises(ValueError):
+        store.attach(run_id, {}, {"../escape": b""})
+    with pytest.raises(KeyError):
+        store.attach("BT-missing", {})
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_profile_download_endpoint(client):
+    pytest.importorskip("pyarrow")
+    import backtest_store
+    run_id = backtest_store.store.save({"kind": "demo", "strategy_id": "demo"}, {"equity": []})["run_id"]
+    backtest_store.store.attach(run_id, {"profile": {"reason": "slow"}},
+                                {"profile.collapsed": b"a;b 3\na 1\n"})
+
+    url = f"/api/nautilus/backtests/{run_id}/profile"
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.text == "a;b 3\na 1\n"
+    assert client.get(url, params={"format": "pstats"}).status_code == 404
+    assert client.get(url, params={"format": "svg"}).status_code == 422
+    assert client.get("/api/nautilus/backtests/BT-missing/profile").status_code == 404
@@ -0,0 +1,143 @@
+"""
+Fast-start / startup profile tests.
+
+Covers:
+- Heavy optional modules are not imported by the app at startup
+- -X importtime parsing
+- Background catalog preload state
+- Persisted strategies restored after "ready", without nautilus_trader before it
+- GET /api/system/startup
+
+Run:
+    cd backend
+    pytest tests/test_startup.py -v
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def test_app_import_does_not_load_heavy_modules():
+    # Fresh interpreter: the test session itself may already have them loaded
+    code = (
+        "import sys, nautilus_fastapi\n"
+        "heavy = ('nautilus_trader', 'reportlab', 'openpyxl', 'pyotp')\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == ""
+
+
+def test_persisted_strategies_restore_after_ready(tmp_path):
+    # Fresh interpreter; a meta-path hook records nautilus_trader import attempts,
+    # so this holds whether or not the package is installed
+    code = textwrap.dedent(f"""
+        import asyncio, json, sys
+        from pathlib import Path
+        import database
+        database.DB_PATH = Path({str(tmp_path / "startup.db")!r})
+
+        attempts = []
+
+        class ImportSpy:
+            def find_spec(self, name, path=None, target=None):
+                if name.split(".")[0] == "nautilus_trader":
+                    attempts.append(name)
+                return None
+
+        import nautilus_fastapi, startup_profile
+        from state import nautilus_system
+
+        at_ready = {{}}
+        mark = startup_profile.mark
+
+        def spy(phase):
+            if phase == "ready":
+                at_ready.update(attempts=list(attempts), restored="S-1" in nautilus_system.strategies)
+            return mark(phase)
+
+        startup_profile.mark = spy
+
+        async def main():
+            await database.init_db()
+            await database.save_strategy({{"id": "S-1", "name": "Saved SMA", "type": "sma_crossover",
+                                           "status": "running", "config": {{"fast_period": 5, "slow_period": 10}}}})
+            sys.meta_path.insert(0, ImportSpy())
+            async with nautilus_fastapi.lifespan(nautilus_fastapi.app):
+                for _ in range(500):
+                    if any(p["phase"] == "strategies_restored" for p in startup_profile.report()["phases"]):
+                        break
+                    await asyncio.sleep(0.01)
+                restored = "S-1" in nautilus_system.strategies
+            print(json.dumps({{"at_ready": at_ready, "restored": restored, "attempts": attempts}}))
+
+        asyncio.run(main())
+    """)
+    env = {**os.environ, "CATALOG_PRELOAD": "off", "BACKTEST_DIR": str(tmp_path / "backtests")}
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120, env=env,
+    )
+    assert out.returncode == 0, out.stderr
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["at_ready"] == {"attempts": [], "restored": False}
+    assert result["restored"] is True
+    assert "nautilus_trader" in result["attempts"]  # the restore did pull it in, afterwards
+
+
+def test_parse_importtime():
+    import startup_profile
+    sample = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+        "import time:        50 |        470 | app\n"
+    )
+    rows = startup_profile.parse_importtime(sample)
+    assert [(r["module"], r["depth"], r["cumulative_us"]) for r in rows] == [
+        ("json.decoder", 2, 120), ("json", 1, 420), ("app", 0, 470),
+    ]
+
+
+def test_background_catalog_load_records_state(monkeypatch):
+    import nautilus_fastapi
+    import startup_profile
+    from state import nautilus_system
+
+    monkeypatch.setattr(nautilus_system, "is_initialized", False)
+    monkeypatch.setattr(
+        nautilus_system, "initialize",
+        lambda: {"success": True, "instruments_count": 3},
+    )
+    asyncio.run(nautilus_fastapi._load_catalog())
+    assert startup_profile.catalog_state == "ready"
+    assert startup_profile.report()["catalog"]["detail"] == "3 instruments"
+
+    monkeypatch.setattr(
+        nautilus_system, "initialize",
+        lambda: {"success": False, "message": "Data catalog not found"},
+    )
+    asyncio.run(nautilus_fastapi._load_catalog())
+    assert startup_profile.catalog_state == "unavailable"
+
+
+def test_startup_endpoint_reports_phases(client):
+    r = client.get("/api/system/startup")
+    assert r.status_code == 200
+    body = r.json()
+    phases = [p["phase"] for p in body["phases"]]
+    for phase in ("imports", "init_db", "restore_state", "ready"):
+        assert phase in phases
+    assert body["ready_after_ms"] is not None
+    assert "imports" not in body  # import breakdown is opt-in
@@ -6,6 +6,8 @@ Tests for:
 - Signal generation logic (SMA crossover, RSI)
 - MACD strategy (new)
 - Performance live update
+- Live strategy host (tick → bar → signal → order)
+- Strategy orders take the same order_service path as POST /api/orders
 
 Run:
     cd backend
@@ -125,6 +127,56 @@ class TestStrategyLifecycle:
         perf = found[0].get("performance", {})
         assert perf.get("total_pnl", 0) == 500.0
 
+    def test_performance_is_attributed_per_strategy(self, client):
+        """Fills of one strategy must not show up in another strategy's performance."""
+        sid_a = client.post("/api/strategies", json={"name": "Perf A", "type": "sma_crossover"}).json()["strategy_id"]
+        sid_b = client.post("/api/strategies", json={"name": "Perf B", "type": "sma_crossover"}).json()["strategy_id"]
+
+        import asyncio
+        import database
+
+        async def inject():
+            for oid, pnl in (("ORD-PA-1", 100.0), ("ORD-PA-2", -40.0)):
+                await database._execute(
+                    """INSERT INTO orders
+                       (id, instrument, side, type, quantity, status, pnl, strategy_id, timestamp)
+                       VALUES (?, 'BTC/USDT', 'SELL', 'MARKET', 1, 'filled', ?, ?, datetime('now'))""",
+                    (oid, pnl, sid_a),
+                    commit=True,
+                )
+
+        asyncio.run(inject())
+
+        by_id = {s["id"]: s["performance"] for s in client.get("/api/strategies").json()["strategies"]}
+        assert by_id[sid_a]["total_pnl"] == 60.0
+        assert by_id[sid_a]["total_trades"] == 2
+        assert by_id[sid_a]["win_rate"] == 0.5
+        assert by_id[sid_b]["total_trades"] == 0
+
+    def test_performance_follows_status_updates(self, client):
+        """A PENDING order that later fills is counted once; deleting it removes it."""
+        import asyncio
+        import database
+
+        async def run():
+            await database._execute(
+                """INSERT INTO orders
+                   (id, instrument, side, type, quantity, status, pnl, strategy_id, timestamp)
+                   VALUES ('ORD-PU-1', 'BTC/USDT', 'BUY', 'MARKET', 1, 'PENDING', 25.0, 'STR-PU', datetime('now'))""",
+                commit=True,
+            )
+            before = (await database.get_strategy_performance()).get("STR-PU")
+            await database._execute("UPDATE orders SET status='filled' WHERE id='ORD-PU-1'", commit=True)
+            filled = (await database.get_strategy_performance())["STR-PU"]
+            await database._execute("DELETE FROM orders WHERE id='ORD-PU-1'", commit=True)
+            deleted = (await database.get_strategy_performance())["STR-PU"]
+            return before, filled, deleted
+
+        before, filled, deleted = asyncio.run(run())
+        assert before is None
+        assert filled["trade_count"] == 1 and filled["total_pnl"] == 25.0
+        assert deleted["trade_count"] == 0 and deleted["total_pnl"] == 0.0
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # SECTION 2 — SMA Crossover Signal Logic
@@ -342,3 +394,206 @@ class TestStrategyTypesRegistry:
             json={"name": "Unknown", "type": "neural_network_ai_v9"},
         )
         assert r.status_code in (400, 422)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SECTION 6 — Live Strategy Host
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestLiveStrategyHost:
+    """Live host: tick → bar → signal → order sink, with latency stats."""
+
+    @staticmethod
+    def _feed_trend(host, symbol: str, closes: list, bar_seconds: int = 60) -> None:
+        # One tick per bar; the tick opening bar N+1 closes bar N.
+        for i, price in enumerate(closes + [closes[-1]]):
+            host.on_tick(symbol, price, ts=1_700_000_000 - (1_700_000_000 % bar_seconds) + i * bar_seconds)
+
+    def test_sma_worker_submits_orders_on_crossover(self):
+        import asyncio
+        from strategy_runtime import LiveStrategyHost
+
+        orders = []
+
+        async def sink(worker, order):
+            orders.append((worker.strategy_id, order))
+
+        async def run():
+            host = LiveStrategyHost(order_sink=sink)
+            host.feed_enabled = False
+            assert host.start("S1", "sma_crossover", {
+                "instrument_id": "BTCUSDT.BINANCE", "fast_period": 2, "slow_period": 3, "trade_size": "1",
+            })
+            self._feed_trend(host, "BTCUSDT", [100, 100, 100, 101, 102, 103, 102, 100, 98, 96])
+            await asyncio.sleep(0.05)
+            stats = host.get_stats("S1")
+            await host.shutdown()
+            return stats
+
+        stats = asyncio.run(run())
+        sides = [o["side"] for _, o in orders]
+        assert sides == ["BUY", "SELL"]
+        assert all(o["instrument"] == "BTCUSDT.BINANCE" for _, o in orders)
+        assert stats["bars_processed"] == 10
+        assert stats["orders_submitted"] == 2
+        assert stats["tick_to_order_latency"]["count"] == 2
+        assert stats["loop_latency"]["p99_ms"] is not None
+
+    def test_risk_rejection_is_counted_not_fatal(self):
+        import asyncio
+        from risk_engine import RiskCheckError
+        from strategy_runtime import LiveStrategyHost
+
+        async def sink(worker, order):
+            raise RiskCheckError("limit")
+
+        async def run():
+            host = LiveStrategyHost(order_sink=sink)
+            host.feed_enabled = False
+            host.start("S1", "sma_crossover", {"instrument_id": "ETHUSDT", "fast_period": 2, "slow_period": 3})
+            self._feed_trend(host, "ETHUSDT", [10, 10, 10, 11, 12, 13])
+            await asyncio.sleep(0.05)
+            stats = host.get_stats("S1")
+            await host.shutdown()
+            return stats
+
+        stats = asyncio.run(run())
+        # Rejected orders leave the model flat, so every bar of the uptrend re-signals BUY
+        assert stats["orders_rejected"] == 3
+        assert stats["position"] == 0
+        assert stats["running"] is True
+
+    def test_rejected_signal_repeats_until_routed(self, monkeypatch):
+        import asyncio
+        import strategy_runtime
+        from risk_engine import RiskCheckError
+
+        with pytest.raises(TypeError):
+            strategy_runtime.SignalModel()
+
+        class AlwaysLong(strategy_runtime.SignalModel):
+            def on_bar(self, close):
+                return self._go(1)
+
+        monkeypatch.setattr(strategy_runtime, "build_signal_model", lambda kind, cfg: AlwaysLong())
+        outcomes = [RiskCheckError("limit"), RuntimeError("exchange down"), None]
+        routed = []
+
+        async def sink(worker, order):
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                raise outcome
+            routed.append(order["side"])
+
+        async def run():
+            host = strategy_runtime.LiveStrategyHost(order_sink=sink)
+            host.feed_enabled = False
+            host.start("S1", "scripted", {"instrument_id": "BTCUSDT"})
+            self._feed_trend(host, "BTCUSDT", [100, 101, 102, 103, 104])
+            await asyncio.sleep(0.05)
+            stats = host.get_stats("S1")
+            await host.shutdown()
+            return stats
+
+        stats = asyncio.run(run())
+        assert routed == ["BUY"]
+        assert stats["signals"] == 3 and stats["position"] == 1
+        assert (stats["orders_rejected"], stats["errors"], stats["orders_submitted"]) == (1, 1, 1)
+
+    def test_default_route_shares_the_order_endpoint_gate(self, client):
+        import asyncio
+        from types import SimpleNamespace
+        from fastapi import HTTPException
+        from strategy_runtime import route_order
+
+        order = {"instrument": "BTCUSDT.BINANCE", "side": "BUY", "type": "MARKET",
+                 "quantity": 1.0, "price": 100.0, "leverage": 1.0}
+        worker = SimpleNamespace(strategy_id="S-LIVE")
+
+        # No adapter, risk limits never set: both paths refuse a non-.SIM order
+        r = client.post("/api/orders", json=order)
+        assert r.status_code == 400 and "No adapter connected" in r.json()["detail"]
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(route_order(worker, order))
+        assert exc.value.status_code == 400
+        assert client.get("/api/orders", params={"strategy_id": "S-LIVE"}).json()["count"] == 0
+
+        # Once limits are configured both paths paper-trade it
+        assert client.post("/api/risk/limits", json={"max_orders_per_day": 0}).status_code == 200
+        row = asyncio.run(route_order(worker, order))
+        assert row["strategy_id"] == "S-LIVE" and row["instrument"] == "BTCUSDT.BINANCE"
+        assert client.post("/api/orders", json=order).status_code == 200
+
+    def test_exchange_failure_counts_as_error(self, monkeypatch):
+        import asyncio
+        import strategy_runtime
+        from fastapi import HTTPException
+
+        class AlwaysLong(strategy_runtime.SignalModel):
+            def on_bar(self, close):
+                return self._go(1)
+
+        monkeypatch.setattr(strategy_runtime, "build_signal_model", lambda kind, cfg: AlwaysLong())
+
+        async def sink(worker, order):
+            raise HTTPException(status_code=502, detail="Exchange error: timeout")
+
+        async def run():
+            host = strategy_runtime.LiveStrategyHost(order_sink=sink)
+            host.feed_enabled = False
+            host.start("S1", "scripted", {"instrument_id": "ETHUSDT"})
+            self._feed_trend(host, "ETHUSDT", [10, 11, 12])
+            await asyncio.sleep(0.05)
+            stats = host.get_stats("S1")
+            await host.shutdown()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["orders_rejected"] == 0 and stats["errors"] == 3
+        assert stats["position"] == 0
+
+    def test_host_runs_dozens_of_strategies(self):
+        import asyncio
+        from strategy_runtime import LiveStrategyHost
+
+        count = {"n": 0}
+
+        async def sink(worker, order):
+            count["n"] += 1
+
+        async def run():
+            host = LiveStrategyHost(order_sink=sink)
+            host.feed_enabled = False
+            kinds = [
+                ("sma_crossover", {"fast_period": 2, "slow_period": 3}),
+                ("rsi", {"rsi_period": 3}),
+                ("macd", {"fast_period": 2, "slow_period": 4, "signal_period": 2}),
+            ]
+            for i in range(48):
+                kind, cfg = kinds[i % 3]
+                assert host.start(f"S{i}", kind, {**cfg, "instrument_id": "BTCUSDT"})
+            closes = [100 + (i % 7) * (1 if (i // 7) % 2 == 0 else -1) for i in range(60)]
+            self._feed_trend(host, "BTCUSDT", closes)
+            await asyncio.sleep(0.2)
+            stats = host.stats()
+            await host.shutdown()
+            return stats
+
+        stats = asyncio.run(run())
+        assert len(stats) == 48
+        assert all(s["bars_processed"] == 60 and s["errors"] == 0 for s in stats)
+        assert count["n"] > 0
+
+    def test_start_endpoint_hosts_strategy(self, client):
+        r = client.post("/api/strategies", json={"name": "Live SMA", "type": "sma_crossover"})
+        sid = r.json()["strategy_id"]
+        r = client.post(f"/api/strategies/{sid}/start")
+        assert r.json()["live_runtime"] is True
+
+        r = client.get(f"/api/strategies/{sid}/runtime")
+        assert r.status_code == 200
+        assert r.json()["instrument"] == "EUR/USD.SIM"
+
+        client.post(f"/api/strategies/{sid}/stop")
+        r = client.get(f"/api/strategies/{sid}/runtime")
+        assert r.status_code == 404
@@ -0,0 +1,90 @@
+"""
+Token verification cache + in-memory revocation set tests.
+
+Covers:
+- Authenticated requests decode at most once and never hit the DB for auth
+- Logout revokes immediately; revocations reload from the DB on restart
+- LRU bound and exp-based eviction
+
+Run:
+    cd backend
+    pytest tests/test_token_cache.py -v
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def test_requests_do_not_hit_db_or_redecode(client, monkeypatch):
+    import auth_jwt
+    import database
+
+    async def _no_db(*_a, **_kw):
+        raise AssertionError("auth must not query revoked_tokens per request")
+
+    calls = []
+    real_decode = auth_jwt.decode_token
+    monkeypatch.setattr(database, "is_token_revoked", _no_db)
+    monkeypatch.setattr(auth_jwt, "decode_token", lambda t: calls.append(t) or real_decode(t))
+
+    for _ in range(3):
+        # /api/orders runs the JWT middleware *and* Depends(get_current_user)
+        assert client.get("/api/orders").status_code == 200
+    assert len(calls) == 1  # first request verifies; everything after is cached
+
+
+def test_logout_revokes_immediately(client):
+    assert client.get("/api/orders").status_code == 200
+    assert client.post("/api/auth/logout").status_code == 200
+    r = client.get("/api/orders")
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token has been revoked"
+
+
+def test_revocations_reload_from_db(client):
+    import auth_jwt
+    token = client.headers["Authorization"][7:]
+    payload = auth_jwt.verify_token(token)
+    client.post("/api/auth/logout")
+
+    auth_jwt._revoked.clear()  # simulate a fresh process
+    assert not auth_jwt.is_revoked(payload["jti"])
+    asyncio.run(auth_jwt.load_revoked_tokens())
+    assert auth_jwt.is_revoked(payload["jti"])
+
+
+def test_revocation_evicted_after_expiry(monkeypatch):
+    import auth_jwt
+    monkeypatch.setitem(auth_jwt._revoked, "jti-old", time.time() - 1)
+    monkeypatch.setitem(auth_jwt._revoked, "jti-live", time.time() + 60)
+    assert auth_jwt.evict_expired_revocations() == 1
+    assert "jti-old" not in auth_jwt._revoked
+    assert auth_jwt.is_revoked("jti-live")
+
+
+def test_payload_cache_is_bounded(monkeypatch):
+    import auth_jwt
+    monkeypatch.setattr(auth_jwt, "TOKEN_CACHE_SIZE", 2)
+    monkeypatch.setattr(auth_jwt, "_payload_cache", auth_jwt.OrderedDict())
+    tokens = [auth_jwt.create_access_token({"sub": f"u{i}"}) for i in range(3)]
+    for t in tokens:
+        assert auth_jwt.verify_token(t)["sub"]
+    assert len(auth_jwt._payload_cache) == 2
+    assert auth_jwt._token_key(tokens[0]) not in auth_jwt._payload_cache
+
+
+def test_cached_payload_expires(monkeypatch):
+    import auth_jwt
+    from datetime import timedelta
+    monkeypatch.setattr(auth_jwt, "_payload_cache", auth_jwt.OrderedDict())
+    token = auth_jwt.create_access_token({"sub": "u"}, expires_delta=timedelta(seconds=60))
+    assert auth_jwt.verify_token(token)
+    key = auth_jwt._token_key(token)
+    payload, _ = auth_jwt._payload_cache[key]
+    auth_jwt._payload_cache[key] = (payload, time.time() - 1)
+    assert auth_jwt.verify_token(token) is None
+    assert key not in auth_jwt._payload_cache
@@ -0,0 +1,160 @@
+"""
+Walk-forward optimization tests.
+
+Covers:
+- Rolling and anchored train / test windows
+- In-sample optimum per window, out-of-sample run queued right after it
+- Stitched out-of-sample equity curve and stability statistics
+- Failed trials reported and skipped
+- The process pool spawns its workers (never forks the server)
+- POST /api/nautilus/walk-forward validation and NDJSON stream
+- Integer-only period params; a dropped stream never leaves a run marked active
+
+Trials use a deterministic stand-in for the catalog backtest on a thread
+pool (nautilus_trader is not needed).
+
+Run:
+    cd backend
+    pytest tests/test_walk_forward.py -v
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def thread_pool(monkeypatch):
+    import walk_forward
+    monkeypatch.setattr(walk_forward, "WALK_FORWARD_EXECUTOR", "thread")
+
+
+def fake_trial(trial):
+    """Best in-sample fast period is 10; every run gains 1%; fast=15 fails."""
+    fast = trial["params"]["fast_period"]
+    if fast == 15:
+        raise RuntimeError("engine blew up")
+    balance = trial["starting_balance"]
+    return {
+        "metrics": {"total_pnl": balance * 0.01, "total_trades": 4, "win_rate": 50.0,
+                    "max_drawdown": 1.0, "sharpe_ratio": -float((fast - 10) ** 2)},
+        "equity_curve": [{"time": trial["start_date"], "equity": balance},
+                         {"time": trial["end_date"], "equity": balance * 1.01}],
+    }
+
+
+def _run(**overrides):
+    import walk_forward
+    kwargs = dict(
+        catalog_path="/nowhere", strategy_type="sma_crossover", base_config={"instrument_id": "EUR/USD.SIM"},
+        param_grid={"fast_period": [5, 10, 15], "slow_period": [20, 30]},
+        start_date="2021-01-01", end_date="2021-04-01", train_days=30, test_days=15,
+        workers=3, evaluate=fake_trial,
+    )
+    kwargs.update(overrides)
+
+    async def collect():
+        return [e async for e in walk_forward.run_walk_forward(**kwargs)]
+    return asyncio.run(collect())
+
+
+def test_rolling_and_anchored_windows():
+    import walk_forward
+    rolling = walk_forward.make_windows("2021-01-01", "2021-03-02", 30, 10)
+    assert len(rolling) == 3
+    assert rolling[1] == {"index": 1, "train_start": "2021-01-11", "train_end": "2021-02-10",
+                          "test_start": "2021-02-10", "test_end": "2021-02-20"}
+    anchored = walk_forward.make_windows("2021-01-01", "2021-03-02", 30, 10, anchored=True)
+    assert {w["train_start"] for w in anchored} == {"2021-01-01"}
+    assert len(walk_forward.make_windows("2021-01-01", "2021-03-02", 30, 10, step_days=5)) == 5
+    with pytest.raises(ValueError):
+        walk_forward.make_windows("2021-01-01", "2021-01-20", 30, 10)
+
+    combos = walk_forward.param_combinations({"fast_period": [10, 20], "slow_period": [15, 30]})
+    assert combos == [{"fast_period": 10, "slow_period": 15}, {"fast_period": 10, "slow_period": 30},
+                      {"fast_period": 20, "slow_period": 30}]
+
+
+def test_walk_forward_picks_optimum_and_stitches_oos():
+    events = _run()
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "plan" and kinds[-1] == "summary"
+    plan = events[0]
+    assert len(plan["windows"]) == 4 and plan["param_sets"] == 6
+
+    # Each window's out-of-sample run follows its optimum
+    position = {(e["event"], e.get("window")): i for i, e in enumerate(events)}
+    for index in range(4):
+        assert events[position["window", index]]["params"]["fast_period"] == 10
+        assert position["oos", index] > position["window", index]
+
+    # fast=15 trials failed and were skipped
+    assert sum(1 for e in events if e["event"] == "error") == 4 * 2
+
+    summary = events[-1]
+    assert summary["windows_completed"] == 4
+    assert summary["ending_balance"] == pytest.approx(100_000 * 1.01 ** 4, abs=0.05)
+    assert len(summary["equity_curve"]) == 5
+    assert summary["profitable_windows_pct"] == 100.0
+    assert summary["walk_forward_efficiency"] == pytest.approx(2.0)  # same PnL in half the days
+    assert summary["param_stability"]["fast_period"]["distinct"] == 1
+    assert summary["params_unchanged_pct"] == 100.0
+    assert summary["run_id"].startswith("BT-")
+
+
+def test_stitch_compounds_window_returns():
+    import walk_forward
+    curves = [
+        [{"time": "a", "equity": 100.0}, {"time": "b", "equity": 110.0}],
+        [{"time": "b", "equity": 100.0}, {"time": "c", "equity": 90.0}],
+    ]
+    assert [p["equity"] for p in walk_forward.stitch_equity(curves, 100.0)] == [100.0, 110.0, 99.0]
+
+
+def test_process_pool_uses_spawned_workers(monkeypatch):
+    import os
+    import walk_forward
+    monkeypatch.setattr(walk_forward, "WALK_FORWARD_EXECUTOR", "process")
+    pool = walk_forward._make_pool("/nowhere", 1)
+    try:
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def test_walk_forward_endpoint(client, monkeypatch):
+    import walk_forward
+    from state import nautilus_system
+    url = "/api/nautilus/walk-forward"
+    body = {"param_grid": {"fast_period": [5, 10], "slow_period": [20]},
+            "start_date": "2021-01-01", "end_date": "2021-03-01", "train_days": 30, "test_days": 10}
+
+    assert client.post(url, json=body).status_code == 400  # not initialized
+    monkeypatch.setattr(nautilus_system, "is_initialized", True)
+    monkeypatch.setattr(walk_forward, "evaluate_backtest", fake_trial)
+
+    assert client.post(url, json={**body, "param_grid": {"rsi_period": [14]}}).status_code == 422
+    assert client.post(url, json={**body, "end_date": "2021-01-15"}).status_code == 400
+    r = client.post(url, json={**body, "param_grid": {"fast_period": [5, 7.5], "slow_period": [20]}})
+    assert r.status_code == 422 and "integers" in r.text
+
+    # A response dropped before its first chunk leaves no run marked active
+    from routers import backtest as backtest_router
+    request = backtest_router.WalkForwardRequest(**body)
+    asyncio.run(backtest_router.run_walk_forward(request, {}))
+    assert backtest_router._walk_forward_running is False
+
+    r = client.post(url, json=body)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in r.text.splitlines()]
+    assert events[-1]["event"] == "summary" and events[-1]["windows_completed"] == 2
+    assert client.get(f"/api/nautilus/backtests/{events[-1]['run_id']}").json()["kind"] == "walk_forward"
@@ -1,6 +1,7 @@
 """Shared utilities used by multiple routers."""
 
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
 
 def normalize_order(o: Dict[str, Any]) -> Dict[str, Any]:
@@ -22,3 +23,20 @@ def normalize_order(o: Dict[str, Any]) -> Dict[str, Any]:
         "status": status,
         "filled_qty": o.get("filled_qty", 0),
     }
+
+
+def position_changes_message(changes: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """
+    /ws message for a database.save_positions change set, or None when
+    nothing changed (unchanged rows are never sent).
+    """
+    if not changes["inserted"] and not changes["updated"]:
+        return None
+    return {
+        "type": "positions_changed",
+        "source": source,
+        "inserted": changes["inserted"],
+        "updated": changes["updated"],
+        "unchanged": changes["unchanged"],
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
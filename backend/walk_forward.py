@@ -0,0 +1,350 @@
+"""
+Walk-Forward Optimization
+=========================
+Rolling (or anchored) train / test windows over a date range:
+
+    window i   train [train_start, test_start)   → in-sample grid sweep
+               test  [test_start, test_end)      → one out-of-sample run
+                                                   with the train optimum
+
+Every (window, parameter set) trial is a full catalog backtest run on a
+pool of spawned processes (WALK_FORWARD_WORKERS, default one per core;
+each worker loads the catalog once).  Trials are fed to the pool in window order, at
+most two per worker in flight; the moment a window's last in-sample
+trial finishes its out-of-sample run jumps the queue.  So all cores stay
+busy while results come back early and in roughly window order.
+
+``run_walk_forward`` is an async generator of events, streamed as NDJSON
+by ``POST /api/nautilus/walk-forward``:
+
+    plan             windows, parameter sets, trial count, workers
+    window           a window's in-sample optimum (and its objective)
+    oos              a window's out-of-sample metrics
+    error            a trial that failed (skipped)
+    summary          stitched out-of-sample equity curve + stability stats
+
+The summary run is saved to backtest_store (kind ``walk_forward``, equity
+table only).  WALK_FORWARD_EXECUTOR=thread runs trials in-process.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import statistics
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import backtest_store
+from nautilus_core import NautilusTradingSystem
+
+logger = logging.getLogger(__name__)
+
+WALK_FORWARD_EXECUTOR = os.getenv("WALK_FORWARD_EXECUTOR", "process").lower()
+WALK_FORWARD_WORKERS = int(os.getenv("WALK_FORWARD_WORKERS", "0")) or (os.cpu_count() or 1)
+WALK_FORWARD_MAX_WINDOWS = int(os.getenv("WALK_FORWARD_MAX_WINDOWS", "100"))
+WALK_FORWARD_MAX_COMBOS = int(os.getenv("WALK_FORWARD_MAX_COMBOS", "100"))
+
+OBJECTIVES = ("total_pnl", "sharpe_ratio", "win_rate")
+METRICS = ("total_pnl", "total_trades", "win_rate", "max_drawdown", "sharpe_ratio", "ending_balance")
+
+# Trials in flight per worker: enough to keep every worker fed, few enough
+# that an out-of-sample run queued behind them starts promptly
+_IN_FLIGHT_PER_WORKER = 2
+
+
+# ── Plan ──────────────────────────────────────────────────────────────────────
+
+def make_windows(start_date: str, end_date: str, train_days: int, test_days: int,
+                 step_days: Optional[int] = None, anchored: bool = False) -> List[Dict[str, Any]]:
+    """
+    Train / test windows covering ``[start_date, end_date)``.  Test windows
+    advance by ``step_days`` (default ``test_days``); anchored windows keep
+    training from ``start_date``.  Raises ValueError if none fit.
+    """
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    step = timedelta(days=step_days or test_days)
+    test_start = start + timedelta(days=train_days)
+    windows = []
+    while test_start + timedelta(days=test_days) <= end:
+        windows.append({
+            "index": len(windows),
+            "train_start": (start if anchored else test_start - timedelta(days=train_days)).isoformat(),
+            "train_end": test_start.isoformat(),
+            "test_start": test_start.isoformat(),
+            "test_end": (test_start + timedelta(days=test_days)).isoformat(),
+        })
+        test_start += step
+    if not windows:
+        raise ValueError("Date range is shorter than one train + test window")
+    if len(windows) > WALK_FORWARD_MAX_WINDOWS:
+        raise ValueError(f"{len(windows)} windows exceed the limit of {WALK_FORWARD_MAX_WINDOWS}")
+    return windows
+
+
+def param_combinations(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of ``grid``; SMA-style pairs need slow > fast."""
+    names = sorted(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    combos = [c for c in combos
+              if not ("fast_period" in c and "slow_period" in c) or c["slow_period"] > c["fast_period"]]
+    if not combos:
+        raise ValueError("Parameter grid has no valid combinations")
+    if len(combos) > WALK_FORWARD_MAX_COMBOS:
+        raise ValueError(f"{len(combos)} parameter sets exceed the limit of {WALK_FORWARD_MAX_COMBOS}")
+    return combos
+
+
+# ── Trials (run on the pool) ──────────────────────────────────────────────────
+
+_worker_system: Optional[NautilusTradingSystem] = None
+
+
+def _init_worker(catalog_path: str) -> None:
+    """Pool initializer: one trading system (catalog + registry) per worker."""
+    global _worker_system
+    _worker_system = NautilusTradingSystem(catalog_path)
+    result = _worker_system.initialize()
+    if not result["success"]:
+        logger.error("Walk-forward worker could not load catalog: %s", result["message"])
+
+
+def evaluate_backtest(trial: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pool entry point: one unpersisted catalog backtest.  Returns
+    ``{"metrics": {...}, "equity_curve": [...]}``; raises on failure.
+    """
+    if _worker_system is None:
+        _init_worker(trial["catalog_path"])
+    system = _worker_system
+    strategy_id = f"WF-{uuid.uuid4().hex[:12]}"
+    created = system.create_strategy({
+        **trial["base_config"], **trial["params"], "id": strategy_id, "type": trial["strategy_type"],
+    })
+    if not created["success"]:
+        raise ValueError(created["message"])
+    try:
+        result = system.run_backtest(
+            strategy_id, trial["start_date"], trial["end_date"], trial["starting_balance"],
+            persist=False,
+        )
+    finally:
+        system.strategies.pop(strategy_id, None)
+    if not result["success"]:
+        raise RuntimeError(result["message"])
+    run = result["result"]
+    return {"metrics": {k: run.get(k) for k in METRICS}, "equity_curve": run["equity_curve"]}
+
+
+def _make_pool(catalog_path: str, workers: int) -> Executor:
+    if WALK_FORWARD_EXECUTOR == "process":
+        # spawn, not fork: the server process already runs aiosqlite / bcrypt / audit threads
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(catalog_path,))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="walk-forward")
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+async def run_walk_forward(
+    *,
+    catalog_path: str,
+    strategy_type: str,
+    base_config: Dict[str, Any],
+    param_grid: Dict[str, List[Any]],
+    start_date: str,
+    end_date: str,
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None,
+    anchored: bool = False,
+    objective: str = "sharpe_ratio",
+    min_trades: int = 1,
+    starting_balance: float = 100_000.0,
+    workers: int = WALK_FORWARD_WORKERS,
+    evaluate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a walk-forward optimization, yielding progress events (see module
+    doc).  ``evaluate`` runs one trial on the pool (default: evaluate_backtest).
+    """
+    evaluate = evaluate or evaluate_backtest
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of: {', '.join(OBJECTIVES)}")
+    windows = make_windows(start_date, end_date, train_days, test_days, step_days, anchored)
+    combos = param_combinations(param_grid)
+
+    def trial(params: Dict[str, Any], start: str, end: str) -> Dict[str, Any]:
+        return {
+            "catalog_path": catalog_path, "strategy_type": strategy_type, "base_config": base_config,
+            "params": params, "start_date": start, "end_date": end, "starting_balance": starting_balance,
+        }
+
+    queue: deque = deque(
+        ("is", w["index"], params, trial(params, w["train_start"], w["train_end"]))
+        for w in windows for params in combos
+    )
+    yield {
+        "event": "plan", "windows": windows, "param_sets": len(combos),
+        "trials": len(queue) + len(windows), "workers": workers, "objective": objective,
+    }
+
+    in_sample: Dict[int, List[tuple]] = {w["index"]: [] for w in windows}
+    remaining = {w["index"]: len(combos) for w in windows}
+    chosen: Dict[int, Dict[str, Any]] = {}
+    oos: Dict[int, Dict[str, Any]] = {}
+    loop = asyncio.get_running_loop()
+    pool = _make_pool(catalog_path, workers)
+    running: Dict[asyncio.Future, tuple] = {}
+    try:
+        while queue or running:
+            while queue and len(running) < workers * _IN_FLIGHT_PER_WORKER:
+                phase, index, params, task = queue.popleft()
+                running[loop.run_in_executor(pool, evaluate, task)] = (phase, index, params)
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                phase, index, params = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    outcome = None
+                    yield {"event": "error", "phase": phase, "window": index, "params": params,
+                           "error": str(exc)}
+                if phase == "oos":
+                    if outcome is not None:
+                        oos[index] = {**chosen[index], **outcome}
+                        yield {"event": "oos", "window": index, "params": params,
+                               "metrics": outcome["metrics"]}
+                    continue
+                if outcome is not None:
+                    in_sample[index].append((params, outcome["metrics"]))
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    # Grid order, so ties go to the same parameter set every run
+                    trials = sorted(in_sample.pop(index), key=lambda t: combos.index(t[0]))
+                    best = _pick_best(trials, objective, min_trades)
+                    if best is None:
+                        yield {"event": "error", "phase": "is", "window": index, "params": None,
+                               "error": "no in-sample trial succeeded"}
+                        continue
+                    chosen[index] = {"params": best[0], "in_sample": best[1]}
+                    yield {"event": "window", "window": index, "params": best[0],
+                           "objective": best[1].get(objective), "in_sample": best[1]}
+                    w = windows[index]
+                    queue.appendleft(("oos", index, best[0], trial(best[0], w["test_start"], w["test_end"])))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    summary = summarize(windows, oos, objective, train_days, test_days, starting_balance)
+    record = {
+        "kind": "walk_forward",
+        "strategy_id": f"walk-forward-{strategy_type}",
+        "strategy_type": strategy_type,
+        "instrument_id": base_config.get("instrument_id"),
+        "start_date": start_date,
+        "end_date": end_date,
+        "starting_balance": starting_balance,
+        "objective": objective,
+        "param_grid": param_grid,
+        "train_days": train_days,
+        "test_days": test_days,
+        "anchored": anchored,
+        **{k: v for k, v in summary.items() if k != "equity_curve"},
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        stored = await asyncio.to_thread(
+            backtest_store.store.save, record, {"equity": summary["equity_curve"]}
+        )
+        record["run_id"] = stored["run_id"]
+    except Exception:
+        logger.exception("Could not persist walk-forward run")
+        record["run_id"] = None
+    yield {"event": "summary", **record, "equity_curve": summary["equity_curve"]}
+
+
+def _pick_best(trials: List[tuple], objective: str, min_trades: int) -> Optional[tuple]:
+    """
+    Highest objective among trials with enough trades (any trial if none
+    qualify); the first of equals wins.
+    """
+    if not trials:
+        return None
+    qualified = [t for t in trials if (t[1].get("total_trades") or 0) >= min_trades] or trials
+    return max(qualified, key=lambda t: t[1].get(objective) or 0.0)
+
+
+# ── Stitching and stability ───────────────────────────────────────────────────
+
+def stitch_equity(curves: List[List[Dict[str, Any]]], starting_balance: float) -> List[Dict[str, Any]]:
+    """
+    Chain out-of-sample equity curves: each window's returns are applied
+    to the equity the previous window ended with.
+    """
+    stitched: List[Dict[str, Any]] = []
+    equity = starting_balance
+    for curve in curves:
+        if not curve:
+            continue
+        base = curve[0]["equity"] or starting_balance
+        scale = equity / base
+        points = curve if not stitched else curve[1:]
+        stitched.extend({"time": p["time"], "equity": round(p["equity"] * scale, 2)} for p in points)
+        equity = curve[-1]["equity"] * scale
+    return stitched
+
+
+def summarize(windows: List[Dict[str, Any]], oos: Dict[int, Dict[str, Any]], objective: str,
+              train_days: int, test_days: int, starting_balance: float) -> Dict[str, Any]:
+    """Stitched out-of-sample curve plus walk-forward stability statistics."""
+    done = [oos[w["index"]] for w in windows if w["index"] in oos]
+    curve = stitch_equity([r["equity_curve"] for r in done], starting_balance)
+    final = curve[-1]["equity"] if curve else starting_balance
+
+    # Walk-forward efficiency: out-of-sample PnL per day over in-sample PnL per day
+    efficiencies = [
+        (r["metrics"]["total_pnl"] / test_days) / (r["in_sample"]["total_pnl"] / train_days)
+        for r in done if (r["in_sample"].get("total_pnl") or 0) > 0
+    ]
+    chosen = [r["params"] for r in done]
+    stability = {}
+    for name in sorted({k for p in chosen for k in p}):
+        values = [p.get(name) for p in chosen]
+        numeric = [v for v in values if isinstance(v, (int, float))]
+        mean = statistics.mean(numeric) if numeric else 0.0
+        stability[name] = {
+            "values": values,
+            "distinct": len(set(values)),
+            "cv": round(statistics.pstdev(numeric) / mean, 4) if len(numeric) > 1 and mean else 0.0,
+        }
+    unchanged = sum(1 for a, b in zip(chosen, chosen[1:]) if a == b)
+    is_obj = [r["in_sample"].get(objective) or 0.0 for r in done]
+    oos_obj = [r["metrics"].get(objective) or 0.0 for r in done]
+
+    return {
+        "windows": len(windows),
+        "windows_completed": len(done),
+        "total_pnl": round(final - starting_balance, 2),
+        "total_return_pct": round((final / starting_balance - 1) * 100, 4),
+        "ending_balance": round(final, 2),
+        "max_drawdown": NautilusTradingSystem._calc_max_drawdown(curve),
+        "sharpe_ratio": NautilusTradingSystem._calc_sharpe(curve),
+        "profitable_windows_pct": round(
+            sum(1 for r in done if (r["metrics"]["total_pnl"] or 0) > 0) / len(done) * 100, 2
+        ) if done else 0.0,
+        "walk_forward_efficiency": round(statistics.median(efficiencies), 4) if efficiencies else None,
+        "mean_in_sample_objective": round(statistics.mean(is_obj), 4) if is_obj else None,
+        "mean_out_of_sample_objective": round(statistics.mean(oos_obj), 4) if oos_obj else None,
+        "param_stability": stability,
+        "params_unchanged_pct": round(unchanged / (len(chosen) - 1) * 100, 2) if len(chosen) > 1 else None,
+        "window_results": [
+            {"window": w["index"], **{k: w[k] for k in ("test_start", "test_end")},
+             "params": oos[w["index"]]["params"], "metrics": oos[w["index"]]["metrics"]}
+            for w in windows if w["index"] in oos
+        ],
+        "equity_curve": curve,
+    }